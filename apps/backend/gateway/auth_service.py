@@ -3,7 +3,8 @@ Authentication service for user management
 """
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, select
 from database import User
 from datetime import datetime, timezone
 import uuid
@@ -13,6 +14,8 @@ import hashlib
 import hmac
 import os
 
+from utils.crypto_executor import get_crypto_executor
+
 try:
     import bcrypt  # type: ignore
 except Exception:  # pragma: no cover
@@ -71,6 +74,11 @@ def get_password_hash(password: str) -> str:
     )
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the crypto worker pool instead of the event loop"""
+    return await get_crypto_executor().run(verify_password, plain_password, hashed_password)
+
+
 def validate_email(email: str) -> bool:
     """Validate email format"""
     pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -107,14 +115,24 @@ def get_user_by_id(db: Session, user_id: str) -> Optional[User]:
         return None
 
 
-def create_user(
-    db: Session,
-    email: str,
-    password: str,
-    consent_version: str,
-    is_anonymous: bool = True
-) -> User:
-    """Create a new user"""
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    """Get user by email without blocking the event loop"""
+    result = await db.execute(select(User).where(User.email == email.lower()))
+    return result.scalars().first()
+
+
+async def get_user_by_id_async(db: AsyncSession, user_id: str) -> Optional[User]:
+    """Get user by ID without blocking the event loop"""
+    try:
+        user_uuid = uuid.UUID(str(user_id))
+    except ValueError:
+        return None
+    result = await db.execute(select(User).where(User.id == user_uuid))
+    return result.scalars().first()
+
+
+def _check_new_user(db: Session, email: str, password: str) -> None:
+    """Validate registration input; raises ValueError with a user-facing message"""
     # Validate email
     if not validate_email(email):
         raise ValueError("Invalid email format")
@@ -128,11 +146,16 @@ def create_user(
     existing_user = get_user_by_email(db, email)
     if existing_user:
         raise ValueError("User with this email already exists")
-    
-    # Hash password
-    password_hash = get_password_hash(password)
-    
-    # Create user
+
+
+def _save_new_user(
+    db: Session,
+    email: str,
+    password_hash: str,
+    consent_version: str,
+    is_anonymous: bool
+) -> User:
+    """Insert a user row with an already-hashed password"""
     user = User(
         id=uuid.uuid4(),
         email=email.lower(),
@@ -150,6 +173,39 @@ def create_user(
     return user
 
 
+def create_user(
+    db: Session,
+    email: str,
+    password: str,
+    consent_version: str,
+    is_anonymous: bool = True
+) -> User:
+    """Create a new user"""
+    _check_new_user(db, email, password)
+    password_hash = get_password_hash(password)
+    return _save_new_user(db, email, password_hash, consent_version, is_anonymous)
+
+
+async def create_user_async(
+    db: Session,
+    email: str,
+    password: str,
+    consent_version: str,
+    is_anonymous: bool = True
+) -> User:
+    """Create a new user, hashing the password on the crypto worker pool"""
+    _check_new_user(db, email, password)
+    password_hash = await get_crypto_executor().run(get_password_hash, password)
+    return _save_new_user(db, email, password_hash, consent_version, is_anonymous)
+
+
+def _mark_authenticated(db: Session, user: User) -> User:
+    """Update last active after a successful password check"""
+    user.last_active = datetime.now(timezone.utc)
+    db.commit()
+    return user
+
+
 def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     """Authenticate a user"""
     user = get_user_by_email(db, email)
@@ -164,10 +220,20 @@ def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
     if not verify_password(password, user.password_hash):
         return None
     
-    # Update last active
-    user.last_active = datetime.now(timezone.utc)
-    db.commit()
+    return _mark_authenticated(db, user)
+
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str) -> Optional[User]:
+    """Authenticate a user on the async engine, verifying the password on the crypto worker pool"""
+    user = await get_user_by_email_async(db, email)
+    if not user or not user.password_hash:
+        return None
     
+    if not await verify_password_async(password, user.password_hash):
+        return None
+    
+    user.last_active = datetime.now(timezone.utc)
+    await db.commit()
     return user
 
 
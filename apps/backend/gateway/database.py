@@ -4,9 +4,12 @@ Database connection and models for API Gateway
 
 from sqlalchemy import create_engine, Column, String, Boolean, DateTime, Text, Integer, Float, ForeignKey, Table
 from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
 from datetime import datetime, timezone
+from typing import AsyncIterator
 import os
 import uuid
 from sqlalchemy.pool import StaticPool
@@ -21,23 +24,69 @@ DATABASE_URL = settings.DATABASE_URL
 # - Allow tests to set DATABASE_URL/env before first DB access
 _engine = None
 _SessionLocal = None
+_async_engine = None
+_AsyncSessionLocal = None
 
 
-def get_engine():
-    """Get (or create) the SQLAlchemy engine."""
-    global _engine
-    if _engine is not None:
-        return _engine
+def _pool_options() -> dict:
+    """Pool sizing shared by the sync and async engines"""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": True,
+    }
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
 
-    url = settings.DATABASE_URL
+def build_engine(url: str):
+    """Create a sync engine for `url` with the configured pool"""
     if url.startswith("sqlite"):
-        _engine = create_engine(
+        return create_engine(
             url,
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
-    else:
-        _engine = create_engine(url, pool_pre_ping=True)
+    return create_engine(url, **_pool_options())
+
+
+def to_async_url(url: str) -> URL:
+    """Swap a sync database URL's driver for its asyncio counterpart (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+        # SQLAlchemy's own prepared-statement cache for the asyncpg dialect
+        parsed = parsed.update_query_dict({"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)})
+    elif backend == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed
+
+
+def build_async_engine(url: str):
+    """Create an async engine for `url` with the configured pool"""
+    async_url = to_async_url(url)
+    if async_url.get_backend_name() == "sqlite":
+        # aiosqlite: a shared connection for in-memory databases, a connection per session otherwise
+        if _is_memory_sqlite(async_url):
+            return create_async_engine(async_url, poolclass=StaticPool)
+        return create_async_engine(async_url)
+    connect_args = {}
+    if async_url.get_backend_name() == "postgresql":
+        # asyncpg's per-connection statement cache
+        connect_args["statement_cache_size"] = settings.DB_STATEMENT_CACHE_SIZE
+    return create_async_engine(async_url, connect_args=connect_args, **_pool_options())
+
+
+def get_engine():
+    """Get (or create) the SQLAlchemy engine."""
+    global _engine
+    if _engine is None:
+        _engine = build_engine(settings.DATABASE_URL)
     return _engine
 
 
@@ -49,6 +98,33 @@ def get_sessionmaker():
     _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
     return _SessionLocal
 
+
+def get_async_engine():
+    """Get (or create) the async engine (asyncpg on Postgres, aiosqlite on SQLite)."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = build_async_engine(settings.DATABASE_URL)
+    return _async_engine
+
+
+def get_async_sessionmaker():
+    """Get (or create) the async sessionmaker bound to the async engine."""
+    global _AsyncSessionLocal
+    if _AsyncSessionLocal is not None:
+        return _AsyncSessionLocal
+    # expire_on_commit=False: handlers read attributes after commit without an implicit (sync) reload
+    _AsyncSessionLocal = async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+    return _AsyncSessionLocal
+
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections (application shutdown)"""
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
 # Base class for models
 Base = declarative_base()
 
@@ -217,6 +293,17 @@ def get_db() -> Session:
         db.close()
 
 
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    Get async database session
+
+    Queries await the driver instead of blocking the event loop. Existing sync
+    helpers can run against it unchanged with `await db.run_sync(fn, *args)`.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables (tables should already exist from init.sql)"""
     # Don't create tables here - they're managed by init.sql
@@ -3,37 +3,46 @@ API Gateway Service for Mental Health Platform
 Central entry point for all client requests with authentication, rate limiting, and routing
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Request, status
+from fastapi import FastAPI, HTTPException, Depends, Request, status, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 import httpx
 import redis
 import jwt
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import os
+import sys
+import time
 
+from src.deadline import DeadlineExceeded, deadline_event_hooks, install_deadline
+from src.metrics import instrument_app, time_upstream
 from config import settings
 from middleware.rate_limiter import RateLimiter
 from middleware.auth import AuthMiddleware
 from middleware.logging import LoggingMiddleware
+from middleware.audit import AuditMiddleware, AuditWriter, init_audit_logger
 from middleware.mfa import MFAService, get_mfa_service
 from middleware.rbac import RBACService, get_rbac_service, PermissionChecker, RoleChecker
 from middleware.refresh_token import RefreshTokenService, create_refresh_token_service
 from middleware.api_key_auth import APIKeyService, get_api_key_service, require_api_key
+from middleware.compression import CompressionMiddleware
 from utils.health_check import HealthChecker
-from database import get_db, User, Role, AuditLog, RefreshToken, APIKey
-from auth_service import authenticate_user, create_user, get_user_by_id, get_user_by_email, verify_password, validate_email, validate_password
+from utils.crypto_executor import CryptoOverloadedError, get_crypto_executor
+from utils.session_turn import ServiceCall, build_turn_stages, format_sse, run_stages
+from utils.payload import FastJSONResponse, HEAVY_FIELDS, SELECTOR_PARAMS, loads, parse_selector, select_fields
+from utils.upstream import CLIENT_CLOSED_REQUEST, ClientDisconnected, LatencyTracker, cancel_on_disconnect, hedged_call, is_retryable
+from database import dispose_async_engine, get_async_db, get_db, get_sessionmaker, User, Role, AuditLog, RefreshToken, APIKey
+from auth_service import authenticate_user_async, create_user_async, get_user_by_id, get_user_by_id_async, get_user_by_email, verify_password_async, validate_email, validate_password
 import uuid as uuid_module
 
-# Initialize refresh token service
-refresh_token_service = create_refresh_token_service(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -59,11 +68,42 @@ redis_client = redis.Redis(
     decode_responses=True
 )
 
+# Initialize refresh token service (Redis token index, Postgres as the durable store)
+refresh_token_service = create_refresh_token_service(
+    settings.JWT_SECRET_KEY,
+    settings.JWT_ALGORITHM,
+    redis_client=redis_client
+)
+
 # Initialize HTTP client for service communication
-http_client = httpx.AsyncClient(timeout=30.0)
+http_client = httpx.AsyncClient(timeout=settings.SERVICE_TIMEOUT, event_hooks=deadline_event_hooks())
+
+# Per-service upstream latency, used to decide when to hedge idempotent GETs
+latency_tracker = LatencyTracker(min_samples=settings.HEDGE_MIN_SAMPLES)
+
+# Health checker: polls services in the background and serves cached status
+health_checker = HealthChecker(
+    SERVICE_URLS,
+    timeout=settings.HEALTH_CHECK_TIMEOUT,
+    interval=settings.HEALTH_CHECK_INTERVAL_SECONDS,
+    jitter=settings.HEALTH_CHECK_JITTER,
+    failure_threshold=settings.HEALTH_CHECK_FAILURE_THRESHOLD,
+    dependency_checks={"redis": redis_client.ping}
+)
 
-# Health checker
-health_checker = HealthChecker(SERVICE_URLS)
+def _session_factory():
+    """Open a DB session for background tasks outside request scope"""
+    return get_sessionmaker()()
+
+# Audit logging: events are batched off the request path by a background writer
+audit_writer = AuditWriter(
+    _session_factory,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    max_queue_size=settings.AUDIT_QUEUE_MAX_SIZE,
+    spool_path=settings.AUDIT_SPOOL_PATH
+)
+audit_logger = init_audit_logger(_session_factory, audit_writer)
 
 
 def _run_alembic_migrations_if_needed() -> None:
@@ -105,15 +145,45 @@ async def lifespan(app: FastAPI):
 
     # Ensure DB schema is up-to-date for additive changes (dev-friendly).
     _run_alembic_migrations_if_needed()
+
+    # Start batched audit writer (replays any spooled events on first flush)
+    spool_dir = os.path.dirname(settings.AUDIT_SPOOL_PATH)
+    if spool_dir:
+        os.makedirs(spool_dir, exist_ok=True)
+    audit_writer.start()
+
+    # Subscribe to cross-replica RBAC and API key cache invalidations
+    get_rbac_service().start_invalidation_listener(redis_client)
+    get_api_key_service().start_invalidation_listener(redis_client)
+
+    # Batch API key last-used timestamp writes
+    get_api_key_service().start_last_used_flusher(_session_factory)
     
-    # Check service health
-    await health_checker.check_all_services()
+    # Prune expired refresh tokens on a schedule instead of on demand
+    refresh_token_service.start_pruning(_session_factory, settings.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS)
+    
+    # Interface config ETags are shared across replicas through Redis
+    from src.database.interface_config_cache import configure_interface_config_cache
+    configure_interface_config_cache(redis_client)
+    
+    # Take an initial health snapshot, then keep it fresh in the background
+    await health_checker.refresh()
+    health_checker.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down API Gateway Service")
+    await health_checker.stop()
+    await health_checker.close()
+    get_rbac_service().stop_invalidation_listener()
+    get_api_key_service().stop_invalidation_listener()
+    await get_api_key_service().stop_last_used_flusher(_session_factory)
+    await refresh_token_service.stop_pruning()
+    await audit_writer.stop()
+    get_crypto_executor().shutdown(wait=False)
     await http_client.aclose()
+    await dispose_async_engine()
 
 # Create FastAPI app
 app = FastAPI(
@@ -122,6 +192,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan
 )
 
@@ -146,36 +217,60 @@ app.add_middleware(
 # Custom middleware (order matters - CORS should be first)
 # Note: CORSMiddleware is already added above
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(
+    AuditMiddleware,
+    audit_logger=audit_logger,
+    jwt_secret=settings.JWT_SECRET_KEY,
+    jwt_algorithm=settings.JWT_ALGORITHM
+)
 app.add_middleware(AuthMiddleware)
 app.add_middleware(RateLimiter, redis_client=redis_client)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY
+)
+
+# Every request gets a time budget (the client's X-Deadline-Ms, capped at SERVICE_TIMEOUT)
+install_deadline(app, default_timeout=settings.SERVICE_TIMEOUT, max_timeout=settings.SERVICE_TIMEOUT)
+
+# Prometheus metrics, added last so request timing covers the whole middleware stack
+instrument_app(app)
 
 # Routes
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    try:
-        # Check Redis connection
-        redis_client.ping()
-        
-        # Check service health
-        service_health = await health_checker.check_all_services()
-        
-        return {
-            "status": "healthy",
-            "timestamp": datetime.utcnow().isoformat(),
-            "version": "1.0.0",
-            "services": service_health,
-            "redis": "connected"
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {str(e)}")
+    """Health check endpoint (served from the background health snapshot)"""
+    snapshot = health_checker.get_snapshot()
+    if not health_checker.dependency_ready("redis"):
+        logger.error("Health check failed: Redis unavailable")
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Service unhealthy"
         )
+    
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow().isoformat(),
+        "version": "1.0.0",
+        "services": snapshot.get("services", {}),
+        "redis": "connected",
+        "checked_at": snapshot.get("updated_at"),
+        "crypto_pool": get_crypto_executor().get_stats()
+    }
+
+def _crypto_overloaded(exc: CryptoOverloadedError) -> HTTPException:
+    """Shed password hashing work when the crypto pool is saturated"""
+    logger.warning("Password hashing pool saturated, rejecting request")
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service busy, please retry",
+        headers={"Retry-After": str(exc.retry_after)}
+    )
 
 @app.post("/auth/login")
-async def login(request: Request, db: Session = Depends(get_db)):
+async def login(request: Request, db: AsyncSession = Depends(get_async_db)):
     """User login endpoint with MFA support"""
     try:
         body = await request.json()
@@ -189,7 +284,7 @@ async def login(request: Request, db: Session = Depends(get_db)):
             )
         
         # Authenticate user
-        user = authenticate_user(db, email, password)
+        user = await authenticate_user_async(db, email, password)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -263,6 +358,8 @@ async def login(request: Request, db: Session = Depends(get_db)):
         
     except HTTPException:
         raise
+    except CryptoOverloadedError as e:
+        raise _crypto_overloaded(e)
     except Exception as e:
         logger.error(f"Login failed: {str(e)}")
         raise HTTPException(
@@ -456,7 +553,7 @@ async def setup_mfa(request: Request, credentials: HTTPAuthorizationCredentials
             )
         
         # Verify password
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid password"
@@ -489,6 +586,8 @@ async def setup_mfa(request: Request, credentials: HTTPAuthorizationCredentials
         
     except HTTPException:
         raise
+    except CryptoOverloadedError as e:
+        raise _crypto_overloaded(e)
     except Exception as e:
         logger.error(f"MFA setup failed: {str(e)}")
         raise HTTPException(
@@ -607,7 +706,7 @@ async def disable_mfa(request: Request, credentials: HTTPAuthorizationCredential
             )
         
         # Verify password
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid password"
@@ -647,6 +746,8 @@ async def disable_mfa(request: Request, credentials: HTTPAuthorizationCredential
         
     except HTTPException:
         raise
+    except CryptoOverloadedError as e:
+        raise _crypto_overloaded(e)
     except Exception as e:
         logger.error(f"MFA disable failed: {str(e)}")
         raise HTTPException(
@@ -748,7 +849,7 @@ async def regenerate_backup_codes(request: Request, credentials: HTTPAuthorizati
             )
         
         # Verify password
-        if not verify_password(password, user.password_hash):
+        if not await verify_password_async(password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid password"
@@ -777,6 +878,8 @@ async def regenerate_backup_codes(request: Request, credentials: HTTPAuthorizati
         
     except HTTPException:
         raise
+    except CryptoOverloadedError as e:
+        raise _crypto_overloaded(e)
     except Exception as e:
         logger.error(f"Backup codes regeneration failed: {str(e)}")
         raise HTTPException(
@@ -806,7 +909,7 @@ async def register(request: Request, db: Session = Depends(get_db)):
         
         # Create user
         try:
-            user = create_user(
+            user = await create_user_async(
                 db=db,
                 email=email,
                 password=password,
@@ -844,6 +947,8 @@ async def register(request: Request, db: Session = Depends(get_db)):
         
     except HTTPException:
         raise
+    except CryptoOverloadedError as e:
+        raise _crypto_overloaded(e)
     except Exception as e:
         logger.error(f"Registration failed: {str(e)}")
         raise HTTPException(
@@ -856,7 +961,7 @@ async def register(request: Request, db: Session = Depends(get_db)):
 # ============================================
 
 @app.post("/auth/refresh")
-async def refresh_access_token(request: Request, db: Session = Depends(get_db)):
+async def refresh_access_token(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token using a refresh token"""
     try:
         body = await request.json()
@@ -868,8 +973,8 @@ async def refresh_access_token(request: Request, db: Session = Depends(get_db)):
                 detail="Refresh token required"
             )
         
-        # Validate refresh token
-        token_record = refresh_token_service.validate_refresh_token(db, refresh_token)
+        # Validate refresh token (Redis first; the DB fallback runs on the async driver)
+        token_record = await db.run_sync(refresh_token_service.validate_refresh_token, refresh_token)
         if not token_record:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -877,7 +982,7 @@ async def refresh_access_token(request: Request, db: Session = Depends(get_db)):
             )
         
         # Get user
-        user = db.query(User).filter(User.id == token_record.user_id).first()
+        user = await get_user_by_id_async(db, token_record.user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -888,15 +993,17 @@ async def refresh_access_token(request: Request, db: Session = Depends(get_db)):
         device_info = request.headers.get("User-Agent")
         ip_address = request.client.host if request.client else None
         
-        new_token_record, new_refresh_token = refresh_token_service.rotate_refresh_token(
-            db, refresh_token, device_info, ip_address
+        rotated = await db.run_sync(
+            refresh_token_service.rotate_refresh_token, refresh_token, device_info, ip_address
         )
         
-        if not new_token_record:
+        # None when a concurrent refresh already rotated this token
+        if not rotated:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Failed to refresh token"
             )
+        new_token_record, new_refresh_token = rotated
         
         # Generate new access token
         access_token, expires_in = refresh_token_service.generate_access_token(user)
@@ -982,7 +1089,7 @@ async def logout_all_devices(credentials: HTTPAuthorizationCredentials = Depends
 
 
 @app.get("/auth/sessions")
-async def list_sessions(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+async def list_sessions(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
     """List all active sessions for the current user"""
     try:
         # Decode token
@@ -999,7 +1106,7 @@ async def list_sessions(credentials: HTTPAuthorizationCredentials = Depends(secu
                 detail="Invalid token"
             )
         
-        sessions = refresh_token_service.get_user_sessions(db, user_id)
+        sessions = await db.run_sync(refresh_token_service.get_user_sessions, user_id)
         
         return {
             "sessions": [
@@ -1494,6 +1601,9 @@ async def assign_user_role(
         user.role = role_name
         db.commit()
         
+        # Drop cached permissions for this user on every replica
+        get_rbac_service().invalidate_user(user_id)
+        
         logger.info(f"Role '{role_name}' assigned to user {user_id}")
         
         return {
@@ -1516,12 +1626,12 @@ async def assign_user_role(
 async def get_user_permissions(
     user_id: str,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _: bool = Depends(PermissionChecker("manage_users", "*"))
 ):
     """Get all permissions for a user (admin only)"""
     try:
-        user = get_user_by_id(db, user_id)
+        user = await get_user_by_id_async(db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1529,7 +1639,7 @@ async def get_user_permissions(
             )
         
         rbac = get_rbac_service()
-        permissions = rbac.get_user_permissions(user, db)
+        permissions = await db.run_sync(lambda session: rbac.get_user_permissions(user, session))
         
         return {
             "user_id": user_id,
@@ -1551,7 +1661,7 @@ async def get_user_permissions(
 async def check_permission(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Check if current user has a specific permission"""
     try:
@@ -1579,7 +1689,7 @@ async def check_permission(
                 detail="Permission is required"
             )
         
-        user = get_user_by_id(db, user_id)
+        user = await get_user_by_id_async(db, user_id)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -1587,8 +1697,12 @@ async def check_permission(
             )
         
         rbac = get_rbac_service()
-        has_permission = rbac.has_permission(user, permission, db, resource_owner_id)
-        granted_by = rbac.get_granted_by(user, permission, db) if has_permission else None
+        
+        def resolve(session: Session):
+            has_permission = rbac.has_permission(user, permission, session, resource_owner_id)
+            return has_permission, rbac.get_granted_by(user, permission, session) if has_permission else None
+        
+        has_permission, granted_by = await db.run_sync(resolve)
         
         return {
             "has_permission": has_permission,
@@ -1641,6 +1755,16 @@ async def chat(request: Request, credentials: HTTPAuthorizationCredentials = Dep
     """Route to conversation engine service"""
     return await route_to_service("conversation_engine", "/chat", request, credentials)
 
+@app.post("/conversation/{conversation_id}/end")
+async def end_conversation(conversation_id: str, request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Route to conversation engine service"""
+    return await route_to_service("conversation_engine", f"/conversations/{conversation_id}/end", request, credentials)
+
+@app.delete("/conversation/{conversation_id}")
+async def delete_conversation(conversation_id: str, request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Route to conversation engine service"""
+    return await route_to_service("conversation_engine", f"/conversations/{conversation_id}", request, credentials)
+
 @app.post("/crisis/detect")
 async def detect_crisis(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Route to crisis detection service"""
@@ -1661,13 +1785,167 @@ async def get_cultural_context(request: Request, credentials: HTTPAuthorizationC
     """Route to cultural context service"""
     return await route_to_service("cultural_context", "/context", request, credentials)
 
+# ============================================
+# Voice Session Orchestration
+# ============================================
+
+def _service_caller(request: Request, credentials: HTTPAuthorizationCredentials) -> ServiceCall:
+    """Build an authenticated backend caller for the session-turn stages"""
+    headers = {
+        "Authorization": f"Bearer {credentials.credentials}",
+        "X-Forwarded-For": request.client.host if request.client else "",
+        "X-User-Agent": request.headers.get("User-Agent", "")
+    }
+    
+    async def call(service_name: str, endpoint: str, method: str = "POST", **kwargs) -> Dict[str, Any]:
+        if not health_checker.is_ready(service_name):
+            raise RuntimeError(f"Service {service_name} not available")
+        with time_upstream(service_name):
+            response = await http_client.request(
+                method,
+                f"{SERVICE_URLS[service_name]}{endpoint}",
+                headers=headers,
+                **kwargs
+            )
+            response.raise_for_status()
+        return loads(response.content)
+    
+    return call
+
+@app.post("/session/turn")
+async def session_turn(
+    request: Request,
+    audio_file: UploadFile = File(...),
+    language: Optional[str] = Form(None),
+    conversation_id: Optional[str] = Form(None),
+    session_id: Optional[str] = Form(None),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Process one voice turn in a single request
+    
+    Uploads the audio once and fans out to STT, emotion, dissonance, baseline,
+    cultural context, crisis detection and the conversation engine, each stage
+    starting as soon as its inputs are available. With `Accept: text/event-stream`
+    stage results are streamed as server-sent events (one event per stage,
+    then `done`); otherwise all results are returned together.
+    """
+    if not audio_file.content_type or not audio_file.content_type.startswith("audio/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid audio file format"
+        )
+    
+    audio = await audio_file.read()
+    stages = build_turn_stages(
+        _service_caller(request, credentials),
+        audio,
+        filename=audio_file.filename or "audio",
+        content_type=audio_file.content_type,
+        user_id=getattr(request.state, "user_id", None),
+        conversation_id=conversation_id,
+        session_id=session_id or str(uuid_module.uuid4()),
+        language=language
+    )
+    
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        async def event_stream():
+            statuses = {}
+            elapsed_ms = 0.0
+            async for event in run_stages(stages):
+                statuses[event.stage] = event.status
+                elapsed_ms = event.elapsed_ms
+                yield format_sse(event.stage, event.to_dict())
+            yield format_sse("done", {"stages": statuses, "elapsed_ms": elapsed_ms})
+        
+        return StreamingResponse(
+            event_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    results = {}
+    async for event in run_stages(stages):
+        results[event.stage] = event.to_dict()
+    
+    chat_result = results.get("chat", {})
+    return {
+        "stages": results,
+        "reply": chat_result.get("data") if chat_result.get("status") == "ok" else None
+    }
+
 # ============================================================================
 # INTERFACE CONFIG ENDPOINTS
 # ============================================================================
 
+def _not_modified(etag: str) -> Response:
+    """304 response for a client that already holds the current config"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": "private, no-cache"}
+    )
+
+def _set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+
+def _query_current_interface_config(db: Session, user_id):
+    """Load the user's current InterfaceConfig row"""
+    from src.database.models import InterfaceConfig
+    
+    return db.query(InterfaceConfig).filter(
+        InterfaceConfig.user_id == user_id,
+        InterfaceConfig.is_current == True
+    ).first()
+
+def _cache_interface_metadata(db: Session, user_id, config) -> Dict[str, Any]:
+    """Look up the user's salt for `config` and publish its metadata to the shared cache"""
+    from src.database.models import EncryptionKey
+    from src.database.interface_config_cache import build_metadata, get_interface_config_cache
+    
+    salt = None
+    if config is not None:
+        # Encrypted config is stored as an opaque string; the client needs the per-user salt
+        # for deterministic key derivation (see `encryption_keys.salt`).
+        # Best-effort UUID normalization (interface config user_id should be UUID in DB).
+        try:
+            normalized_user_id = uuid_module.UUID(user_id) if isinstance(user_id, str) else user_id
+        except Exception:
+            normalized_user_id = user_id
+        
+        encryption_key = db.query(EncryptionKey).filter(EncryptionKey.user_id == normalized_user_id).first()
+        salt = encryption_key.salt if encryption_key else None
+    
+    metadata = build_metadata(config, salt)
+    get_interface_config_cache().set(user_id, metadata)
+    return metadata
+
+def _get_interface_metadata(db: Session, user_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Current interface config metadata (version, salt, ETag) for a user
+    
+    The user is looked up first, so a deleted user's cached entry is never
+    served. The metadata comes from the shared cache in steady state and from
+    the database on a miss. Returns None if the user does not exist.
+    """
+    from src.database.interface_config_cache import get_interface_config_cache
+    
+    # Verify user owns this resource
+    if not get_user_by_id(db, user_id):
+        return None
+    
+    metadata = get_interface_config_cache().get(user_id)
+    if metadata is not None:
+        return metadata
+    
+    config = _query_current_interface_config(db, user_id)
+    return _cache_interface_metadata(db, user_id, config)
+
 @app.get("/users/{user_id}/interface/current")
 async def get_user_interface_config(
     user_id: str,
+    request: Request,
+    response: Response,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
@@ -1676,45 +1954,45 @@ async def get_user_interface_config(
     
     Returns encrypted config that client will decrypt using user's key
     The salt is embedded in the encrypted data format from the backend
+    
+    Supports conditional GET: a matching If-None-Match returns 304 after the
+    user lookup, without loading the config.
     """
     try:
-        # Import shared interface config models (no runtime sys.path mutation).
-        from src.database.models import InterfaceConfig, EncryptionKey
+        from src.database.interface_config_cache import etag_matches
         
-        # Verify user owns this resource
-        user = get_user_by_id(db, user_id)
-        if not user:
+        metadata = _get_interface_metadata(db, user_id)
+        if metadata is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Get current interface config
-        config = db.query(InterfaceConfig).filter(
-            InterfaceConfig.user_id == user_id,
-            InterfaceConfig.is_current == True
-        ).first()
+        if metadata["version"] is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No interface configuration found for this user"
+            )
+        
+        if etag_matches(request.headers.get("If-None-Match"), metadata["etag"]):
+            return _not_modified(metadata["etag"])
         
+        # Client is stale: load the encrypted blob
+        config = _query_current_interface_config(db, user_id)
         if not config:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No interface configuration found for this user"
             )
         
-        # Encrypted config is stored as an opaque string; the client needs the per-user salt
-        # for deterministic key derivation (see `encryption_keys.salt`).
-        # Best-effort UUID normalization (interface config user_id should be UUID in DB).
-        try:
-            import uuid as _uuid
-            normalized_user_id = _uuid.UUID(user_id) if isinstance(user_id, str) else user_id
-        except Exception:
-            normalized_user_id = user_id
-
-        encryption_key = db.query(EncryptionKey).filter(EncryptionKey.user_id == normalized_user_id).first()
-        salt = encryption_key.salt if encryption_key else None
+        if config.version != metadata["version"]:
+            # A new config landed after the metadata was cached
+            metadata = _cache_interface_metadata(db, user_id, config)
+        
+        _set_etag(response, metadata["etag"])
         return {
             "encrypted_config": config.ui_config_encrypted,
-            "salt": salt,
+            "salt": metadata.get("salt"),
             "version": config.version,
             "generated_at": config.generated_at.isoformat() if config.generated_at else None,
             "user_id": str(config.user_id),
@@ -1734,38 +2012,33 @@ async def get_user_interface_config(
 @app.get("/users/{user_id}/interface/version")
 async def get_user_interface_version(
     user_id: str,
+    request: Request,
+    response: Response,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ):
     """
     Get current UIConfig version for a user (for update checking)
+    
+    Served from the shared interface config cache; supports If-None-Match.
     """
     try:
-        from src.database.models import InterfaceConfig
+        from src.database.interface_config_cache import etag_matches
         
-        # Verify user owns this resource
-        user = get_user_by_id(db, user_id)
-        if not user:
+        metadata = _get_interface_metadata(db, user_id)
+        if metadata is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        # Get current interface config version
-        config = db.query(InterfaceConfig).filter(
-            InterfaceConfig.user_id == user_id,
-            InterfaceConfig.is_current == True
-        ).first()
-        
-        if not config:
-            return {
-                "version": None,
-                "generated_at": None
-            }
+        if etag_matches(request.headers.get("If-None-Match"), metadata["etag"]):
+            return _not_modified(metadata["etag"])
         
+        _set_etag(response, metadata["etag"])
         return {
-            "version": config.version,
-            "generated_at": config.generated_at.isoformat() if config.generated_at else None
+            "version": metadata["version"],
+            "generated_at": metadata["generated_at"]
         }
     except HTTPException:
         raise
@@ -1791,6 +2064,14 @@ async def route_to_service(
                 detail=f"Service {service_name} not available"
             )
         
+        # Fail fast instead of waiting on an upstream the health aggregator marked down
+        if not health_checker.is_ready(service_name):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Service {service_name} not available",
+                headers={"Retry-After": str(int(settings.HEALTH_CHECK_INTERVAL_SECONDS))}
+            )
+        
         # Get request body
         body = await request.body()
         method = request.method.upper()
@@ -1803,31 +2084,65 @@ async def route_to_service(
             "X-User-Agent": request.headers.get("User-Agent", "")
         }
 
-        params = dict(request.query_params) if method == "GET" else None
-        
-        # Make request to microservice
-        response = await http_client.request(
-            method,
-            f"{service_url}{endpoint}",
-            content=body,
-            headers=headers,
-            params=params,
-        )
-        response.raise_for_status()
-        
-        # Return response
+        fields, verbose = parse_selector(request.query_params)
+        params = None
+        if method == "GET":
+            params = {k: v for k, v in request.query_params.items() if k not in SELECTOR_PARAMS}
+        
+        async def send(base_url: str) -> httpx.Response:
+            started = time.perf_counter()
+            upstream_response = await http_client.request(
+                method,
+                f"{base_url}{endpoint}",
+                content=body,
+                headers=headers,
+                params=params,
+            )
+            # Only successful answers feed the hedge delay; errors are often fast and skew the p95
+            if upstream_response.status_code < 400:
+                latency_tracker.record(service_name, time.perf_counter() - started)
+            upstream_response.raise_for_status()
+            return upstream_response
+
+        # Hedge idempotent GETs to a second replica once the primary is slower than its p95
+        replicas = settings.SERVICE_REPLICA_URLS.get(service_name, [])
+        hedge_delay = latency_tracker.hedge_delay(service_name, floor=settings.HEDGE_MIN_DELAY_MS / 1000.0)
+        if method == "GET" and settings.HEDGE_ENABLED and replicas and hedge_delay is not None:
+            # A 4xx is returned as-is; only timeouts, transport errors and 5xx try another replica
+            upstream = hedged_call(
+                [lambda url=url: send(url) for url in [service_url, *replicas]],
+                hedge_delay,
+                retryable=is_retryable
+            )
+        else:
+            upstream = send(service_url)
+        
+        # Make request to microservice, dropping it if the client goes away
+        with time_upstream(service_name):
+            response = await cancel_on_disconnect(request, upstream)
+        
+        # Return response, slimmed to what the client asked for
         try:
-            return response.json()
+            payload = loads(response.content)
         except Exception:
             # Avoid failing the gateway if a service returns non-JSON unexpectedly.
             return {"raw": response.text}
+        return select_fields(payload, fields, verbose, HEAVY_FIELDS.get(service_name, ()))
         
-    except httpx.TimeoutException:
+    except HTTPException:
+        raise
+    except (httpx.TimeoutException, DeadlineExceeded):
         logger.error(f"Timeout calling {service_name}")
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
             detail=f"Service {service_name} timeout"
         )
+    except ClientDisconnected:
+        logger.info(f"Client disconnected; cancelled call to {service_name}")
+        raise HTTPException(
+            status_code=CLIENT_CLOSED_REQUEST,
+            detail="Client closed request"
+        )
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error calling {service_name}: {e.response.status_code}")
         raise HTTPException(
@@ -1878,13 +2193,15 @@ async def options_ui_config():
 @app.get("/api/ui-config")
 async def get_ui_config(
     request: Request,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's personalized UI configuration
     
     Returns encrypted UI config that was generated by the Overnight Builder
-    based on the user's patterns and mental health needs.
+    based on the user's patterns and mental health needs. Once the user is
+    found, a matching If-None-Match returns 304 from the shared config cache.
     """
     try:
         # Get user from token
@@ -1921,14 +2238,12 @@ async def get_ui_config(
         project_root = Path(__file__).parent.parent.parent.parent
         sys.path.insert(0, str(project_root))
         
+        from src.database.interface_config_cache import get_interface_config_cache, etag_matches
         from src.database.models import InterfaceConfig
         from sqlalchemy import and_
-        from database import User as GatewayUser
         
         # Get gateway user to find their UUID
-        gateway_user = db.query(GatewayUser).filter(
-            GatewayUser.id == token_user_id
-        ).first()
+        gateway_user = await get_user_by_id_async(db, token_user_id) if token_user_id else None
         
         if not gateway_user:
             # User not found in gateway - return default
@@ -1942,10 +2257,20 @@ async def get_ui_config(
                 }
             }
         
+        # Steady-state polling: answer from the shared cache without loading the config
+        cached = get_interface_config_cache().get(token_user_id)
+        if (
+            cached is not None
+            and cached["version"] is not None
+            and etag_matches(request.headers.get("If-None-Match"), cached["etag"])
+        ):
+            return _not_modified(cached["etag"])
+        
         # Try to find config using gateway user's UUID
         # The InterfaceConfig uses user_id (UUID), so we need to map gateway user.id to pattern user_id
         # For now, try to find any config for this user or return default
         config = None
+        user_uuid = None
         
         # Try to find config - since user models might not be perfectly aligned,
         # we'll try to find the most recent config as a fallback for testing
@@ -1957,17 +2282,23 @@ async def get_ui_config(
             else:
                 user_uuid = uuid_module.UUID(str(gateway_user.id))
             
-            config = db.query(InterfaceConfig).filter(
-                and_(
-                    InterfaceConfig.user_id == user_uuid,
-                    InterfaceConfig.is_current == True
+            result = await db.execute(
+                select(InterfaceConfig).where(
+                    and_(
+                        InterfaceConfig.user_id == user_uuid,
+                        InterfaceConfig.is_current == True
+                    )
                 )
-            ).first()
+            )
+            config = result.scalars().first()
         except (ValueError, TypeError, AttributeError):
             # If UUID conversion fails, try to get most recent config for testing
-            config = db.query(InterfaceConfig).filter(
-                InterfaceConfig.is_current == True
-            ).order_by(InterfaceConfig.generated_at.desc()).first()
+            result = await db.execute(
+                select(InterfaceConfig).where(
+                    InterfaceConfig.is_current == True
+                ).order_by(InterfaceConfig.generated_at.desc())
+            )
+            config = result.scalars().first()
         
         if not config:
             # No config yet - return default
@@ -1981,6 +2312,13 @@ async def get_ui_config(
                 }
             }
         
+        if user_uuid is not None:
+            if cached is not None and cached["version"] == config.version:
+                etag = cached["etag"]
+            else:
+                etag = (await db.run_sync(_cache_interface_metadata, user_uuid, config))["etag"]
+            _set_etag(response, etag)
+        
         # Return encrypted config (client will decrypt)
         return {
             "status": "success",
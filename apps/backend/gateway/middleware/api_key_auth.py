@@ -2,32 +2,97 @@
 API Key authentication middleware for service-to-service communication
 """
 
+import asyncio
+import json
 import secrets
 import hashlib
 import logging
-from typing import Optional, Tuple
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status, Request, Depends
 from fastapi.security import APIKeyHeader
 import uuid
 
+from config import settings
 from database import APIKey, get_db
 
+from src.metrics import record_cache_access
+
 logger = logging.getLogger(__name__)
 
 # API key header
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
+@dataclass(frozen=True)
+class VerifiedAPIKey:
+    """
+    Immutable snapshot of a validated API key
+
+    Safe to cache across requests and sessions, unlike the ORM instance.
+    """
+    id: uuid.UUID
+    user_id: Optional[uuid.UUID]
+    name: str
+    key_prefix: str
+    permissions: Tuple[str, ...]
+    rate_limit: int
+    expires_at: Optional[datetime]
+
+    @classmethod
+    def from_model(cls, api_key: APIKey) -> "VerifiedAPIKey":
+        return cls(
+            id=api_key.id,
+            user_id=api_key.user_id,
+            name=api_key.name,
+            key_prefix=api_key.key_prefix,
+            permissions=tuple(api_key.permissions or ()),
+            rate_limit=api_key.rate_limit,
+            expires_at=api_key.expires_at
+        )
+
+
 class APIKeyService:
     """
     API Key management service for service-to-service authentication
+
+    Keys are looked up by their SHA-256 hash (unique-indexed column) and
+    validation results are cached for a short TTL, both positive and
+    negative, keyed by that hash. Revocations and updates are broadcast over
+    Redis pub/sub so every gateway replica drops the cached hash at once.
+    `last_used_at` updates are buffered and written in one bulk UPDATE by
+    `flush_last_used`.
     """
     
     # API key settings
     KEY_LENGTH = 32  # 256 bits
     KEY_PREFIX_LENGTH = 8
+
+    # Verified-key cache settings
+    CACHE_TTL_SECONDS = 30
+    NEGATIVE_CACHE_TTL_SECONDS = 5
+    CACHE_MAX_SIZE = 10000
+    LAST_USED_FLUSH_INTERVAL_SECONDS = 30
+
+    def __init__(self, invalidation_channel: str = "api_key:invalidate"):
+        self.invalidation_channel = invalidation_channel
+        # key_hash -> (VerifiedAPIKey or None, expires_at)
+        self._cache: Dict[str, Tuple[Optional[VerifiedAPIKey], float]] = {}
+        # key_hash -> key_id, to invalidate by id on revoke/update
+        self._hash_by_id: Dict[uuid.UUID, str] = {}
+        # key_id -> most recent use
+        self._pending_last_used: Dict[uuid.UUID, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self._redis = None
+        self._pubsub = None
+        self._pubsub_thread = None
     
     def generate_api_key(self) -> Tuple[str, str, str]:
         """
@@ -142,7 +207,7 @@ class APIKeyService:
         except ValueError:
             return []
     
-    def validate_api_key(self, db: Session, key: str) -> Optional[APIKey]:
+    def validate_api_key(self, db: Session, key: str) -> Optional[VerifiedAPIKey]:
         """
         Validate an API key
         
@@ -151,35 +216,239 @@ class APIKeyService:
             key: API key to validate
             
         Returns:
-            APIKey if valid, None otherwise
+            VerifiedAPIKey if valid, None otherwise
         """
         if not key or len(key) < self.KEY_PREFIX_LENGTH:
             return None
         
-        # Extract prefix
-        key_prefix = key[:self.KEY_PREFIX_LENGTH]
+        key_hash = self.hash_key(key)
+        now = time.monotonic()
+
+        # Serve from the verified-key cache when fresh
+        cached = self._cache.get(key_hash)
+        hit = cached is not None and cached[1] > now
+        record_cache_access("api_key", hit)
+        if hit:
+            verified = cached[0]
+            if verified is not None and self._is_expired(verified):
+                self._invalidate_hash(key_hash)
+                return None
+            if verified is not None:
+                self.record_last_used(verified.id)
+            return verified
         
-        # Find matching keys by prefix
-        potential_keys = db.query(APIKey).filter(
-            APIKey.key_prefix == key_prefix,
+        # Single indexed lookup by hash
+        api_key = db.query(APIKey).filter(
+            APIKey.key_hash == key_hash,
             APIKey.revoked == False
-        ).all()
-        
-        # Verify against each potential key
-        for api_key in potential_keys:
-            if self.verify_key(key, api_key.key_hash):
-                # Check expiration
-                if api_key.expires_at and api_key.expires_at < datetime.utcnow():
-                    logger.warning(f"API key expired: {api_key.name}")
-                    return None
-                
-                # Update last used
-                api_key.last_used_at = datetime.utcnow()
-                db.commit()
-                
-                return api_key
+        ).first()
+
+        if not api_key:
+            self._cache_result(key_hash, None, now + self.NEGATIVE_CACHE_TTL_SECONDS)
+            return None
+
+        # Check expiration
+        if api_key.expires_at and api_key.expires_at < datetime.utcnow():
+            logger.warning(f"API key expired: {api_key.name}")
+            self._cache_result(key_hash, None, now + self.NEGATIVE_CACHE_TTL_SECONDS)
+            return None
+
+        verified = VerifiedAPIKey.from_model(api_key)
+        self._cache_result(key_hash, verified, now + self.CACHE_TTL_SECONDS)
+        self.record_last_used(verified.id)
         
-        return None
+        return verified
+
+    def _is_expired(self, verified: VerifiedAPIKey) -> bool:
+        """Check a cached key's expiration"""
+        return verified.expires_at is not None and verified.expires_at < datetime.utcnow()
+
+    def _cache_result(self, key_hash: str, verified: Optional[VerifiedAPIKey], expires_at: float):
+        """Store a validation result in the verified-key cache"""
+        with self._lock:
+            if len(self._cache) >= self.CACHE_MAX_SIZE:
+                # Drop expired entries first, then the oldest insertions
+                now = time.monotonic()
+                for stale in [h for h, (_, exp) in self._cache.items() if exp <= now]:
+                    self._invalidate_hash_locked(stale)
+                while len(self._cache) >= self.CACHE_MAX_SIZE:
+                    self._invalidate_hash_locked(next(iter(self._cache)))
+            self._cache[key_hash] = (verified, expires_at)
+            if verified is not None:
+                self._hash_by_id[verified.id] = key_hash
+
+    def _invalidate_hash(self, key_hash: str):
+        with self._lock:
+            self._invalidate_hash_locked(key_hash)
+
+    def _invalidate_hash_locked(self, key_hash: str):
+        entry = self._cache.pop(key_hash, None)
+        if entry is not None and entry[0] is not None:
+            self._hash_by_id.pop(entry[0].id, None)
+
+    def invalidate_key(self, key_id, key_hash: Optional[str] = None, broadcast: bool = True) -> None:
+        """
+        Drop a key from the verified-key cache (on revoke/update)
+
+        Args:
+            key_id: API key ID (UUID or string)
+            key_hash: Stored hash of the key, so replicas can drop it by hash
+            broadcast: Publish the invalidation to other gateway replicas
+        """
+        try:
+            key_uuid = key_id if isinstance(key_id, uuid.UUID) else uuid.UUID(str(key_id))
+        except ValueError:
+            key_uuid = None
+        with self._lock:
+            cached_hash = self._hash_by_id.pop(key_uuid, None) if key_uuid is not None else None
+            if cached_hash is not None:
+                self._cache.pop(cached_hash, None)
+            if key_hash:
+                self._invalidate_hash_locked(key_hash)
+        if broadcast:
+            key_hash = key_hash or cached_hash
+            if key_hash:
+                self._publish({"type": "api_key", "name": key_hash})
+
+    def _publish(self, message: Dict[str, str]):
+        """Broadcast an invalidation message to other replicas"""
+        if self._redis is None:
+            return
+        try:
+            self._redis.publish(self.invalidation_channel, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Failed to publish API key invalidation: {e}")
+
+    def _handle_invalidation(self, message: dict):
+        """Apply an invalidation message received from Redis"""
+        try:
+            data = message.get("data")
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            payload = json.loads(data)
+            if payload.get("type") == "api_key" and payload.get("name"):
+                self._invalidate_hash(payload["name"])
+        except Exception as e:
+            logger.error(f"Invalid API key invalidation message: {e}")
+
+    def start_invalidation_listener(self, redis_client) -> bool:
+        """
+        Subscribe to cross-replica API key invalidations on Redis pub/sub
+
+        Args:
+            redis_client: Redis client used for publish and subscribe
+
+        Returns:
+            True if the listener was started
+        """
+        self._redis = redis_client
+        try:
+            self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.invalidation_channel: self._handle_invalidation})
+            self._pubsub_thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            logger.info(f"API key invalidation listener subscribed to {self.invalidation_channel}")
+            return True
+        except Exception as e:
+            # Fall back to TTL expiry only
+            logger.error(f"Failed to start API key invalidation listener: {e}")
+            self._pubsub = None
+            return False
+
+    def stop_invalidation_listener(self):
+        """Stop the Redis pub/sub listener"""
+        try:
+            if self._pubsub_thread is not None:
+                self._pubsub_thread.stop()
+            if self._pubsub is not None:
+                self._pubsub.close()
+        except Exception as e:
+            logger.error(f"Failed to stop API key invalidation listener: {e}")
+        finally:
+            self._pubsub_thread = None
+            self._pubsub = None
+
+    def clear_cache(self):
+        """Clear the verified-key cache"""
+        with self._lock:
+            self._cache.clear()
+            self._hash_by_id.clear()
+
+    def record_last_used(self, key_id: uuid.UUID):
+        """Buffer a last-used timestamp for the next batched write"""
+        with self._lock:
+            self._pending_last_used[key_id] = datetime.utcnow()
+
+    def flush_last_used(self, db: Session) -> int:
+        """
+        Write buffered last-used timestamps in a single bulk UPDATE
+
+        Args:
+            db: Database session
+
+        Returns:
+            Number of keys updated
+        """
+        with self._lock:
+            pending = self._pending_last_used
+            self._pending_last_used = {}
+
+        if not pending:
+            return 0
+
+        rows: List[dict] = [
+            {"id": key_id, "last_used_at": used_at}
+            for key_id, used_at in pending.items()
+        ]
+        try:
+            db.execute(update(APIKey), rows)
+            db.commit()
+            return len(rows)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Failed to flush API key last-used timestamps: {e}")
+            # Re-queue unless a newer use was recorded meanwhile
+            with self._lock:
+                for key_id, used_at in pending.items():
+                    self._pending_last_used.setdefault(key_id, used_at)
+            return 0
+
+    async def _run_last_used_flusher(self, session_factory, interval: float):
+        """Periodically flush last-used timestamps off the event loop"""
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self._flush_with_session, session_factory)
+
+    def _flush_with_session(self, session_factory) -> int:
+        db = session_factory()
+        try:
+            return self.flush_last_used(db)
+        finally:
+            db.close()
+
+    def start_last_used_flusher(self, session_factory, interval: Optional[float] = None):
+        """
+        Start the background task that batches last-used writes
+
+        Args:
+            session_factory: Callable returning a database session
+            interval: Seconds between flushes
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            return
+        self._flush_task = asyncio.get_running_loop().create_task(
+            self._run_last_used_flusher(session_factory, interval or self.LAST_USED_FLUSH_INTERVAL_SECONDS)
+        )
+
+    async def stop_last_used_flusher(self, session_factory):
+        """Stop the background task and write any pending timestamps"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await asyncio.to_thread(self._flush_with_session, session_factory)
     
     def revoke_api_key(self, db: Session, key_id: str) -> bool:
         """
@@ -199,6 +468,7 @@ class APIKeyService:
         api_key.revoked = True
         api_key.revoked_at = datetime.utcnow()
         db.commit()
+        self.invalidate_key(api_key.id, api_key.key_hash)
         
         logger.info(f"API key revoked: {api_key.name}")
         
@@ -238,12 +508,13 @@ class APIKeyService:
         
         db.commit()
         db.refresh(api_key)
+        self.invalidate_key(api_key.id, api_key.key_hash)
         
         return api_key
 
 
 # Global API key service instance
-api_key_service = APIKeyService()
+api_key_service = APIKeyService(invalidation_channel=settings.API_KEY_INVALIDATION_CHANNEL)
 
 
 def get_api_key_service() -> APIKeyService:
@@ -254,7 +525,7 @@ def get_api_key_service() -> APIKeyService:
 async def get_api_key_auth(
     api_key: Optional[str] = Depends(api_key_header),
     db: Session = Depends(get_db)
-) -> Optional[APIKey]:
+) -> Optional[VerifiedAPIKey]:
     """
     Dependency to validate API key authentication
     
@@ -274,7 +545,7 @@ async def get_api_key_auth(
 async def require_api_key(
     api_key: Optional[str] = Depends(api_key_header),
     db: Session = Depends(get_db)
-) -> APIKey:
+) -> VerifiedAPIKey:
     """
     Dependency to require API key authentication
     Raises 401 if key is missing or invalid
@@ -309,12 +580,12 @@ class APIKeyRateLimiter:
     def __init__(self, redis_client):
         self.redis = redis_client
     
-    def check_rate_limit(self, api_key: APIKey) -> bool:
+    def check_rate_limit(self, api_key: VerifiedAPIKey) -> bool:
         """
         Check if API key has exceeded its rate limit
         
         Args:
-            api_key: APIKey model
+            api_key: Validated API key
             
         Returns:
             True if within rate limit
@@ -3,12 +3,17 @@ Audit Logging Middleware for API Gateway
 Logs all security-relevant events for compliance and forensics
 """
 
+import asyncio
 import json
 import logging
-from typing import Callable, Optional, Dict, Any
+import os
+import threading
+from collections import deque
+from typing import Callable, Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from sqlalchemy.exc import DataError, IntegrityError
 from sqlalchemy.orm import Session
 import uuid
 import jwt
@@ -88,20 +93,370 @@ PATH_EVENT_MAPPING = {
 }
 
 
+def _to_row(log_entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a log entry dict into an `audit_logs` row mapping"""
+    timestamp = log_entry.get("timestamp")
+    return {
+        "id": uuid.UUID(log_entry["id"]),
+        "user_id": uuid.UUID(log_entry["user_id"]) if log_entry.get("user_id") else None,
+        "event_type": log_entry["event_type"],
+        "event_action": log_entry["event_action"],
+        "resource_type": log_entry.get("resource_type"),
+        "resource_id": log_entry.get("resource_id"),
+        "ip_address": log_entry.get("ip_address"),
+        "user_agent": log_entry.get("user_agent"),
+        "details": log_entry.get("details"),
+        "severity": log_entry["severity"],
+        "created_at": datetime.fromisoformat(timestamp) if timestamp else datetime.utcnow(),
+    }
+
+
+class AuditWriter:
+    """
+    Asynchronous batched audit log writer
+
+    Events are appended to a bounded in-memory buffer and flushed to the
+    database in bulk inserts by a background task, either every
+    `flush_interval` seconds or as soon as `batch_size` events are pending.
+    Events that do not fit in the buffer, or whose batch fails to insert,
+    are appended to a local spool file (one JSON entry per line) and
+    replayed on a later flush. When a batch fails on a constraint or data
+    error its rows are retried one at a time, and rows that can never insert
+    (like spool lines that cannot be parsed) are moved to
+    `<spool_path>.rejected` so they do not hold up the rest.
+    `stop()` drains everything before returning.
+    """
+
+    def __init__(
+        self,
+        db_session_factory,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        spool_path: Optional[str] = None
+    ):
+        """
+        Initialize audit writer
+
+        Args:
+            db_session_factory: SQLAlchemy session factory
+            batch_size: Maximum number of events per bulk insert
+            flush_interval: Seconds between periodic flushes
+            max_queue_size: Maximum number of events buffered in memory
+            spool_path: Append-only overflow file (disabled if None)
+        """
+        self.db_session_factory = db_session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_queue_size = max(1, max_queue_size)
+        self.spool_path = spool_path
+
+        self._buffer: deque = deque()
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.stats = {"enqueued": 0, "written": 0, "spooled": 0, "replayed": 0, "rejected": 0, "failed_batches": 0}
+
+    @property
+    def running(self) -> bool:
+        """Whether the background flush task is active"""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the background flush task on the running event loop"""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = self._loop.create_task(self._run())
+        logger.info(
+            f"Audit writer started (batch_size={self.batch_size}, "
+            f"flush_interval={self.flush_interval}s, max_queue_size={self.max_queue_size})"
+        )
+
+    async def stop(self):
+        """Stop the background task and drain all pending events"""
+        if self._task is None:
+            return
+        self._stopping = True
+        if self._wakeup:
+            self._wakeup.set()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._task = None
+
+        # Final drain: anything still buffered is written or spooled.
+        await self.flush()
+        if self._buffer:
+            self._spool(self._take(len(self._buffer)))
+        logger.info(f"Audit writer stopped: {self.stats}")
+
+    def submit(self, log_entry: Dict[str, Any]) -> bool:
+        """
+        Enqueue an audit event without blocking
+
+        Args:
+            log_entry: Audit log entry
+
+        Returns:
+            True if the event was accepted (buffered or spooled)
+        """
+        if not self.running:
+            return False
+
+        with self._lock:
+            if len(self._buffer) < self.max_queue_size:
+                self._buffer.append(log_entry)
+                pending = len(self._buffer)
+                accepted = True
+            else:
+                accepted = False
+
+        self.stats["enqueued"] += 1
+        if not accepted:
+            self._spool([log_entry])
+            return True
+
+        if pending >= self.batch_size:
+            self._notify()
+        return True
+
+    async def flush(self) -> int:
+        """
+        Write all buffered events (and spooled overflow) to the database
+
+        Returns:
+            Number of events written
+        """
+        written = 0
+        while self._buffer:
+            batch_written, unwritten = await self._write_batch(self._take(self.batch_size))
+            written += batch_written
+            if unwritten:
+                self._spool(unwritten)
+                break
+
+        written += await self._replay_spool()
+        return written
+
+    def _notify(self):
+        """Wake the flush task (safe from any thread)"""
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            # Loop already closed during shutdown
+            pass
+
+    def _take(self, count: int) -> List[Dict[str, Any]]:
+        """Pop up to `count` events from the buffer"""
+        with self._lock:
+            n = min(count, len(self._buffer))
+            return [self._buffer.popleft() for _ in range(n)]
+
+    async def _run(self):
+        """Background loop: flush on interval or when a batch fills up"""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Audit flush failed: {e}")
+
+    async def _write_batch(self, batch: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Bulk insert a batch off the event loop
+
+        A constraint or data error is pinned to its rows by inserting the
+        batch one row at a time; those rows are rejected and the rest written.
+        Any other error (e.g. the database is unreachable) leaves the events
+        for the caller to spool.
+
+        Args:
+            batch: Events to write
+
+        Returns:
+            (number of events written, events still to be written)
+        """
+        entries: List[Dict[str, Any]] = []
+        rows: List[Dict[str, Any]] = []
+        for entry in batch:
+            try:
+                rows.append(_to_row(entry))
+                entries.append(entry)
+            except (KeyError, TypeError, ValueError) as e:
+                self._reject(entry, e)
+        if not rows:
+            return 0, []
+        try:
+            await asyncio.to_thread(self._insert_rows, rows)
+            self.stats["written"] += len(rows)
+            return len(rows), []
+        except (IntegrityError, DataError) as e:
+            self.stats["failed_batches"] += 1
+            logger.warning(f"Audit batch of {len(rows)} rejected ({e}); inserting rows one at a time")
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"Failed to write audit batch of {len(rows)}: {e}")
+            return 0, entries
+
+        written = 0
+        for position, (entry, row) in enumerate(zip(entries, rows)):
+            try:
+                await asyncio.to_thread(self._insert_rows, [row])
+                written += 1
+            except (IntegrityError, DataError) as e:
+                self._reject(entry, e)
+            except Exception as e:
+                logger.error(f"Failed to write audit event: {e}")
+                self.stats["written"] += written
+                return written, entries[position:]
+        self.stats["written"] += written
+        return written, []
+
+    def _insert_rows(self, rows: List[Dict[str, Any]]):
+        """Execute a single multi-row INSERT for the batch"""
+        from database import AuditLog
+        from sqlalchemy import insert
+
+        db = self.db_session_factory()
+        try:
+            db.execute(insert(AuditLog), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _spool(self, entries: List[Dict[str, Any]]):
+        """Append events to the overflow spool file"""
+        if not entries:
+            return
+        if not self.spool_path:
+            logger.error(f"Audit spool disabled; dropping {len(entries)} events")
+            return
+        try:
+            with self._spool_lock:
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            self.stats["spooled"] += len(entries)
+            logger.warning(f"Spooled {len(entries)} audit events to {self.spool_path}")
+        except Exception as e:
+            logger.critical(f"Failed to spool {len(entries)} audit events: {e}")
+
+    async def _replay_spool(self) -> int:
+        """Move the spool file aside and insert its contents in batches"""
+        if not self.spool_path:
+            return 0
+
+        # A leftover replay file (e.g. from a crash mid-replay) is finished first;
+        # the live spool is rotated in on the next flush.
+        replay_path = f"{self.spool_path}.replay"
+        with self._spool_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spool_path):
+                    return 0
+                os.replace(self.spool_path, replay_path)
+
+        entries, rejected = self._read_spool(replay_path)
+        if rejected:
+            self._quarantine(rejected)
+
+        written = 0
+        for start in range(0, len(entries), self.batch_size):
+            batch_written, unwritten = await self._write_batch(entries[start:start + self.batch_size])
+            written += batch_written
+            if unwritten:
+                # Put the unwritten remainder back in the spool and retry later.
+                self._spool(unwritten + entries[start + self.batch_size:])
+                break
+
+        os.remove(replay_path)
+        self.stats["replayed"] += written
+        return written
+
+    def _read_spool(self, path: str) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Parse a spool file line by line
+
+        Args:
+            path: Spool file to read
+
+        Returns:
+            (decoded events, raw lines that are not JSON objects)
+        """
+        entries: List[Dict[str, Any]] = []
+        rejected: List[str] = []
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError as e:
+                    entry = None
+                    logger.error(f"Skipping unreadable audit spool line {line_number} in {path}: {e}")
+                if isinstance(entry, dict):
+                    entries.append(entry)
+                else:
+                    rejected.append(line.rstrip("\n"))
+        return entries, rejected
+
+    def _reject(self, entry: Dict[str, Any], error: Exception):
+        """Quarantine an event that can never be inserted, with the reason"""
+        logger.error(f"Rejecting audit event {entry.get('id')}: {error}")
+        self._quarantine([json.dumps({"error": str(error), "entry": entry}, default=str)])
+
+    def _quarantine(self, lines: List[str]):
+        """Keep unreadable spool lines and rejected events for inspection instead of retrying them forever"""
+        self.stats["rejected"] += len(lines)
+        if not self.spool_path:
+            logger.error(f"Audit spool disabled; dropping {len(lines)} rejected events")
+            return
+        rejected_path = f"{self.spool_path}.rejected"
+        try:
+            with self._spool_lock:
+                with open(rejected_path, "a", encoding="utf-8") as f:
+                    for line in lines:
+                        f.write(line + "\n")
+            logger.error(f"Moved {len(lines)} audit events to {rejected_path}")
+        except Exception as e:
+            logger.critical(f"Failed to quarantine {len(lines)} audit events: {e}")
+
+
 class AuditLogger:
     """
     Audit logging service
     Logs security events to database and optionally to external systems
     """
-    
-    def __init__(self, db_session_factory=None):
+
+    def __init__(self, db_session_factory=None, writer: Optional[AuditWriter] = None):
         """
         Initialize audit logger
-        
+
         Args:
             db_session_factory: SQLAlchemy session factory
+            writer: Optional batched writer; events are stored inline when it is not running
         """
         self.db_session_factory = db_session_factory
+        self.writer = writer
     
     def log_event(
         self,
@@ -168,8 +523,9 @@ class AuditLogger:
             else:
                 logger.info(log_message)
             
-            # Store in database if available
-            if self.db_session_factory:
+            # Hand off to the batched writer; fall back to an inline write
+            queued = self.writer is not None and self.writer.submit(log_entry)
+            if not queued and self.db_session_factory:
                 self._store_to_database(log_entry)
             
             return log_id
@@ -185,18 +541,7 @@ class AuditLogger:
             
             db = self.db_session_factory()
             try:
-                audit_log = AuditLog(
-                    id=uuid.UUID(log_entry["id"]),
-                    user_id=uuid.UUID(log_entry["user_id"]) if log_entry.get("user_id") else None,
-                    event_type=log_entry["event_type"],
-                    event_action=log_entry["event_action"],
-                    resource_type=log_entry.get("resource_type"),
-                    resource_id=log_entry.get("resource_id"),
-                    ip_address=log_entry.get("ip_address"),
-                    user_agent=log_entry.get("user_agent"),
-                    details=log_entry.get("details"),
-                    severity=log_entry["severity"]
-                )
+                audit_log = AuditLog(**_to_row(log_entry))
                 
                 db.add(audit_log)
                 db.commit()
@@ -418,9 +763,9 @@ def get_audit_logger() -> AuditLogger:
     return _audit_logger
 
 
-def init_audit_logger(db_session_factory=None) -> AuditLogger:
+def init_audit_logger(db_session_factory=None, writer: Optional[AuditWriter] = None) -> AuditLogger:
     """Initialize the global audit logger"""
     global _audit_logger
-    _audit_logger = AuditLogger(db_session_factory)
+    _audit_logger = AuditLogger(db_session_factory, writer)
     return _audit_logger
 
@@ -30,6 +30,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
         # Skip authentication for public endpoints
         public_endpoints = [
             "/health",
+            "/metrics",
             "/docs",
             "/redoc",
             "/openapi.json",
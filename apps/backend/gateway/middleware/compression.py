@@ -0,0 +1,154 @@
+"""
+Response compression middleware for API Gateway
+Negotiates brotli/gzip from Accept-Encoding for JSON and text responses
+"""
+
+import gzip
+import logging
+from typing import Callable, Optional
+
+from fastapi import Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/problem+json",
+    "application/javascript",
+    "text/",
+)
+
+# Streams must reach the client as they are produced, never buffered
+STREAMING_TYPES = ("text/event-stream",)
+
+
+def choose_encoding(accept_encoding: Optional[str], brotli_available: bool = brotli is not None) -> Optional[str]:
+    """
+    Pick the best content coding the client accepts
+
+    Args:
+        accept_encoding: Raw Accept-Encoding header
+        brotli_available: Whether the brotli module is installed
+
+    Returns:
+        "br", "gzip" or None for identity
+    """
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+
+    wildcard = weights.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli_available else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = weights.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    """Whether a response body of this type is worth compressing"""
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    if content_type.startswith(STREAMING_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware(BaseHTTPMiddleware):
+    """Compress responses above a size threshold using the client's preferred coding"""
+
+    def __init__(
+        self,
+        app,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4
+    ):
+        """
+        Initialize compression middleware
+
+        Args:
+            app: FastAPI application
+            minimum_size: Bodies smaller than this are sent uncompressed
+            gzip_level: gzip compression level (1-9)
+            brotli_quality: brotli quality (0-11); 4 is close to gzip's CPU cost with smaller output
+        """
+        super().__init__(app)
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        """Compress a body with the given content coding"""
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level)
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        """Compress eligible responses"""
+        response = await call_next(request)
+
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 304)
+            or "content-encoding" in response.headers
+            or not is_compressible(response.headers.get("content-type"))
+        ):
+            return response
+
+        # Same URL, different bytes depending on Accept-Encoding
+        response.headers.append("Vary", "Accept-Encoding")
+
+        encoding = choose_encoding(request.headers.get("accept-encoding"))
+        if encoding is None:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        if len(body) < self.minimum_size:
+            return self._rebuild(response, body)
+
+        try:
+            compressed = self._rebuild(response, self.compress(body, encoding))
+        except Exception as e:
+            logger.error(f"Response compression failed: {str(e)}")
+            return self._rebuild(response, body)
+
+        compressed.headers["Content-Encoding"] = encoding
+        # The compressed bytes differ from the identity representation
+        etag = compressed.headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            compressed.headers["ETag"] = f"W/{etag}"
+        return compressed
+
+    @staticmethod
+    def _rebuild(response: Response, body: bytes) -> Response:
+        """Copy a streamed response onto a buffered body, keeping repeated headers intact"""
+        rebuilt = Response(content=body, status_code=response.status_code, background=response.background)
+        rebuilt.raw_headers = [
+            (key, value) for key, value in response.raw_headers if key.lower() != b"content-length"
+        ]
+        rebuilt.headers["Content-Length"] = str(len(body))
+        return rebuilt
@@ -24,8 +24,8 @@ class RateLimiter(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
         """Process request with rate limiting"""
         
-        # Skip rate limiting for health checks
-        if request.url.path == "/health":
+        # Skip rate limiting for health checks and metrics scrapes
+        if request.url.path in ("/health", "/metrics"):
             return await call_next(request)
         
         # Get client identifier
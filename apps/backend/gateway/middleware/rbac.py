@@ -3,16 +3,24 @@ Role-Based Access Control (RBAC) middleware and service
 Permission enforcement for API endpoints
 """
 
+import json
 import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from functools import wraps
-from typing import List, Optional, Callable, Set
+from typing import Dict, FrozenSet, Iterable, List, Optional, Callable, Set, Tuple
 from fastapi import HTTPException, status, Request, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 import jwt
 
 from config import settings
-from database import get_db, User, Role
+from database import get_async_db, get_db, User, Role
+
+from src.metrics import record_cache_access
 
 logger = logging.getLogger(__name__)
 
@@ -26,14 +34,91 @@ DEFAULT_PERMISSIONS = {
 }
 
 
+class PermissionRegistry:
+    """
+    Assigns each permission string a bit position so that a set of
+    permissions compiles to a single integer mask
+    """
+
+    WILDCARD = "*"
+    WILDCARD_BIT = 1
+
+    def __init__(self):
+        self._bits = {self.WILDCARD: self.WILDCARD_BIT}
+        self._lock = threading.Lock()
+
+    def register(self, permission: str) -> int:
+        """Get (or allocate) the bit for a permission"""
+        bit = self._bits.get(permission)
+        if bit is not None:
+            return bit
+        with self._lock:
+            bit = self._bits.get(permission)
+            if bit is None:
+                bit = 1 << len(self._bits)
+                self._bits[permission] = bit
+            return bit
+
+    def bit(self, permission: str) -> int:
+        """Get the bit for a permission, or 0 if no role grants it"""
+        return self._bits.get(permission, 0)
+
+    def compile(self, permissions: Iterable[str]) -> int:
+        """Compile a set of permissions into a bitmask"""
+        mask = 0
+        for permission in permissions:
+            mask |= self.register(permission)
+        return mask
+
+
+# Ownership-scoped permissions: only granted for the user's own resources
+OWNERSHIP_PERMISSIONS = {"read_own_data", "write_own_data", "delete_own_data"}
+
+
+class _UserPermissions:
+    """Cached effective permissions for a single user"""
+
+    __slots__ = ("mask", "permissions", "roles", "expires_at")
+
+    def __init__(self, mask: int, permissions: FrozenSet[str], roles: Tuple[str, ...], expires_at: float):
+        self.mask = mask
+        self.permissions = permissions
+        self.roles = roles
+        self.expires_at = expires_at
+
+
 class RBACService:
     """
     Role-Based Access Control service
     Manages permissions and authorization checks
+
+    Role permissions and per-user effective permission sets are cached with
+    a TTL. Each user's permissions are compiled to a bitmask, so a permission
+    check on a warm cache is a single integer AND with no database access.
+    Role changes are broadcast over Redis pub/sub so every gateway replica
+    drops its cached entries.
     """
-    
-    def __init__(self):
-        self.permissions_cache = {}
+
+    def __init__(
+        self,
+        cache_ttl: float = 60.0,
+        max_cached_users: int = 10000,
+        invalidation_channel: str = "rbac:invalidate"
+    ):
+        self.cache_ttl = cache_ttl
+        self.max_cached_users = max_cached_users
+        self.invalidation_channel = invalidation_channel
+        self.registry = PermissionRegistry()
+
+        # role_name -> (permissions, expires_at)
+        self.permissions_cache: Dict[str, Tuple[FrozenSet[str], float]] = {}
+        # user_id -> _UserPermissions (LRU order)
+        self.user_cache: "OrderedDict[str, _UserPermissions]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._redis = None
+        self._pubsub = None
+        self._pubsub_thread = None
     
     def get_role_permissions(self, role_name: str, db: Optional[Session] = None) -> Set[str]:
         """
@@ -47,19 +132,93 @@ class RBACService:
             Set of permission strings
         """
         # Check cache first
-        if role_name in self.permissions_cache:
-            return self.permissions_cache[role_name]
-        
+        cached = self.permissions_cache.get(role_name)
+        if cached and cached[1] > time.monotonic():
+            return set(cached[0])
+
+        permissions = None
+
         # Try to get from database
         if db:
             role = db.query(Role).filter(Role.name == role_name).first()
             if role and role.permissions:
-                permissions = set(role.permissions)
-                self.permissions_cache[role_name] = permissions
-                return permissions
+                permissions = frozenset(role.permissions)
         
         # Fall back to defaults
-        return DEFAULT_PERMISSIONS.get(role_name, set())
+        if permissions is None:
+            if not db:
+                return set(DEFAULT_PERMISSIONS.get(role_name, set()))
+            permissions = frozenset(DEFAULT_PERMISSIONS.get(role_name, set()))
+
+        self.permissions_cache[role_name] = (permissions, time.monotonic() + self.cache_ttl)
+        return set(permissions)
+
+    def _resolve_user(self, user_id: str, db: Optional[Session], user: Optional[User] = None) -> Optional[_UserPermissions]:
+        """
+        Resolve a user's effective permissions, serving from cache when fresh
+
+        Args:
+            user_id: User ID string
+            db: Database session used on a cache miss
+            user: Already-loaded User (avoids the user query on a miss)
+
+        Returns:
+            Cached permission entry, or None if the user does not exist
+        """
+        entry = self._cached_user(user_id)
+        if entry is not None:
+            return entry
+        return self._load_user(user_id, db, user)
+
+    def _cached_user(self, user_id: str) -> Optional[_UserPermissions]:
+        """Fresh cached permission entry for a user, or None on a miss"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self.user_cache.get(user_id)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self.user_cache.move_to_end(user_id)
+                    record_cache_access("rbac_user", True)
+                    return entry
+                del self.user_cache[user_id]
+        record_cache_access("rbac_user", False)
+        return None
+
+    def _load_user(self, user_id: str, db: Optional[Session], user: Optional[User] = None) -> Optional[_UserPermissions]:
+        """Build and cache a user's permission entry from the database"""
+        now = time.monotonic()
+        if user is None:
+            if db is None:
+                return None
+            try:
+                user_uuid = uuid.UUID(user_id)
+            except ValueError:
+                return None
+            user = db.query(User).options(selectinload(User.roles)).filter(User.id == user_uuid).first()
+            if not user:
+                return None
+
+        # Primary role first, then additional roles (many-to-many)
+        role_names = [getattr(user, 'role', 'user') or 'user']
+        if hasattr(user, 'roles') and user.roles:
+            role_names.extend(role.name for role in user.roles if role.name not in role_names)
+
+        permissions = set()
+        for role_name in role_names:
+            permissions.update(self.get_role_permissions(role_name, db))
+
+        entry = _UserPermissions(
+            mask=self.registry.compile(permissions),
+            permissions=frozenset(permissions),
+            roles=tuple(role_names),
+            expires_at=now + self.cache_ttl
+        )
+        with self._lock:
+            self.user_cache[user_id] = entry
+            self.user_cache.move_to_end(user_id)
+            while len(self.user_cache) > self.max_cached_users:
+                self.user_cache.popitem(last=False)
+        return entry
     
     def get_user_permissions(self, user: User, db: Session) -> Set[str]:
         """
@@ -72,18 +231,23 @@ class RBACService:
         Returns:
             Set of all permission strings
         """
-        permissions = set()
-        
-        # Get permissions from user's primary role
-        user_role = getattr(user, 'role', 'user')
-        permissions.update(self.get_role_permissions(user_role, db))
-        
-        # Get permissions from additional roles (many-to-many)
-        if hasattr(user, 'roles') and user.roles:
-            for role in user.roles:
-                permissions.update(self.get_role_permissions(role.name, db))
-        
-        return permissions
+        entry = self._resolve_user(str(user.id), db, user)
+        return set(entry.permissions) if entry else set()
+
+    def _check_mask(self, entry: _UserPermissions, user_id: str, permission: str, resource_owner_id: Optional[str]) -> bool:
+        """Bitmask permission check against a resolved entry"""
+        # Admin has all permissions
+        if entry.mask & PermissionRegistry.WILDCARD_BIT:
+            return True
+
+        bit = self.registry.bit(permission)
+        if not bit or not entry.mask & bit:
+            return False
+
+        # For ownership-based permissions, verify ownership
+        if permission in OWNERSHIP_PERMISSIONS and resource_owner_id and user_id != resource_owner_id:
+            return False
+        return True
     
     def has_permission(
         self,
@@ -104,21 +268,11 @@ class RBACService:
         Returns:
             True if user has permission
         """
-        user_permissions = self.get_user_permissions(user, db)
-        
-        # Admin has all permissions
-        if "*" in user_permissions:
-            return True
-        
-        # Check exact permission match
-        if permission in user_permissions:
-            # For ownership-based permissions, verify ownership
-            if permission in {"read_own_data", "write_own_data", "delete_own_data"}:
-                if resource_owner_id and str(user.id) != resource_owner_id:
-                    return False
-            return True
-        
-        return False
+        user_id = str(user.id)
+        entry = self._resolve_user(user_id, db, user)
+        if entry is None:
+            return False
+        return self._check_mask(entry, user_id, permission, resource_owner_id)
     
     def check_permission(
         self,
@@ -139,15 +293,40 @@ class RBACService:
         Returns:
             True if user has permission
         """
-        import uuid
-        try:
-            user_uuid = uuid.UUID(user_id)
-            user = db.query(User).filter(User.id == user_uuid).first()
-            if not user:
-                return False
-            return self.has_permission(user, permission, db, resource_owner_id)
-        except ValueError:
+        entry = self._resolve_user(str(user_id), db)
+        if entry is None:
             return False
+        return self._check_mask(entry, str(user_id), permission, resource_owner_id)
+    
+    async def check_permission_async(
+        self,
+        user_id: str,
+        permission: str,
+        db: AsyncSession,
+        resource_owner_id: Optional[str] = None
+    ) -> bool:
+        """
+        Check permission by user ID on an async session
+        
+        A warm cache never touches the database; a miss loads the user through
+        `run_sync`, so its queries await the async driver.
+        
+        Args:
+            user_id: User ID string
+            permission: Permission to check
+            db: Async database session
+            resource_owner_id: Optional resource owner ID
+            
+        Returns:
+            True if user has permission
+        """
+        user_id = str(user_id)
+        entry = self._cached_user(user_id)
+        if entry is None:
+            entry = await db.run_sync(lambda session: self._load_user(user_id, session))
+        if entry is None:
+            return False
+        return self._check_mask(entry, user_id, permission, resource_owner_id)
     
     def get_granted_by(self, user: User, permission: str, db: Session) -> Optional[str]:
         """
@@ -161,36 +340,120 @@ class RBACService:
         Returns:
             Role name that grants the permission, or None
         """
-        # Check primary role
-        user_role = getattr(user, 'role', 'user')
-        role_perms = self.get_role_permissions(user_role, db)
-        if "*" in role_perms or permission in role_perms:
-            return user_role
-        
-        # Check additional roles
-        if hasattr(user, 'roles') and user.roles:
-            for role in user.roles:
-                role_perms = self.get_role_permissions(role.name, db)
-                if "*" in role_perms or permission in role_perms:
-                    return role.name
+        entry = self._resolve_user(str(user.id), db, user)
+        if entry is None:
+            return None
+
+        for role_name in entry.roles:
+            role_perms = self.get_role_permissions(role_name, db)
+            if "*" in role_perms or permission in role_perms:
+                return role_name
         
         return None
     
-    def clear_cache(self, role_name: Optional[str] = None):
+    def clear_cache(self, role_name: Optional[str] = None, broadcast: bool = True):
         """
         Clear permissions cache
         
         Args:
             role_name: Specific role to clear, or None to clear all
+            broadcast: Publish the invalidation to other gateway replicas
+        """
+        self._invalidate_roles(role_name)
+        if broadcast:
+            self._publish({"type": "role", "name": role_name})
+
+    def invalidate_user(self, user_id: str, broadcast: bool = True):
+        """
+        Drop a user's cached permissions (e.g. after a role assignment)
+
+        Args:
+            user_id: User ID string
+            broadcast: Publish the invalidation to other gateway replicas
+        """
+        with self._lock:
+            self.user_cache.pop(str(user_id), None)
+        if broadcast:
+            self._publish({"type": "user", "name": str(user_id)})
+
+    def _invalidate_roles(self, role_name: Optional[str] = None):
+        """Drop cached role permissions and every user entry derived from them"""
+        with self._lock:
+            if role_name:
+                self.permissions_cache.pop(role_name, None)
+            else:
+                self.permissions_cache.clear()
+            # Effective user permissions are derived from roles, so any role
+            # change invalidates them; roles change rarely.
+            self.user_cache.clear()
+
+    def _publish(self, message: Dict[str, Optional[str]]):
+        """Broadcast an invalidation message to other replicas"""
+        if self._redis is None:
+            return
+        try:
+            self._redis.publish(self.invalidation_channel, json.dumps(message))
+        except Exception as e:
+            logger.error(f"Failed to publish RBAC invalidation: {e}")
+
+    def _handle_invalidation(self, message: dict):
+        """Apply an invalidation message received from Redis"""
+        try:
+            data = message.get("data")
+            if isinstance(data, bytes):
+                data = data.decode("utf-8")
+            payload = json.loads(data)
+            if payload.get("type") == "user" and payload.get("name"):
+                with self._lock:
+                    self.user_cache.pop(payload["name"], None)
+            else:
+                self._invalidate_roles(payload.get("name"))
+        except Exception as e:
+            logger.error(f"Invalid RBAC invalidation message: {e}")
+
+    def start_invalidation_listener(self, redis_client) -> bool:
+        """
+        Subscribe to cross-replica invalidations on Redis pub/sub
+
+        Args:
+            redis_client: Redis client used for publish and subscribe
+
+        Returns:
+            True if the listener was started
         """
-        if role_name:
-            self.permissions_cache.pop(role_name, None)
-        else:
-            self.permissions_cache.clear()
+        self._redis = redis_client
+        try:
+            self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.invalidation_channel: self._handle_invalidation})
+            self._pubsub_thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+            logger.info(f"RBAC invalidation listener subscribed to {self.invalidation_channel}")
+            return True
+        except Exception as e:
+            # Fall back to TTL expiry only
+            logger.error(f"Failed to start RBAC invalidation listener: {e}")
+            self._pubsub = None
+            return False
+
+    def stop_invalidation_listener(self):
+        """Stop the Redis pub/sub listener"""
+        try:
+            if self._pubsub_thread is not None:
+                self._pubsub_thread.stop()
+            if self._pubsub is not None:
+                self._pubsub.close()
+        except Exception as e:
+            logger.error(f"Failed to stop RBAC invalidation listener: {e}")
+        finally:
+            self._pubsub_thread = None
+            self._pubsub = None
 
 
 # Global RBAC service instance
-rbac_service = RBACService()
+rbac_service = RBACService(
+    cache_ttl=settings.RBAC_CACHE_TTL_SECONDS,
+    max_cached_users=settings.RBAC_USER_CACHE_MAX_SIZE,
+    invalidation_channel=settings.RBAC_INVALIDATION_CHANNEL
+)
 
 
 def get_rbac_service() -> RBACService:
@@ -396,7 +659,7 @@ class PermissionChecker:
     async def __call__(
         self,
         credentials: HTTPAuthorizationCredentials = Depends(HTTPBearer()),
-        db: Session = Depends(get_db)
+        db: AsyncSession = Depends(get_async_db)
     ) -> bool:
         # Decode token
         try:
@@ -420,7 +683,7 @@ class PermissionChecker:
         
         # Check permissions
         for permission in self.required_permissions:
-            if rbac_service.check_permission(user_id, permission, db):
+            if await rbac_service.check_permission_async(user_id, permission, db):
                 return True
         
         raise HTTPException(
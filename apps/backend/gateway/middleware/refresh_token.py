@@ -1,15 +1,28 @@
 """
 Refresh Token service for long-lived authentication sessions
+
+Token lookups are served from Redis when it is available:
+
+    refresh_token:{sha256}          hash of the token record, expiring with the token;
+                                    kept as a tombstone (revoked=1) after revocation
+    refresh_tokens:user:{user_id}   set of the user's token hashes, for logout-all
+
+Postgres stays the durable store: every create/rotate/revoke is written there,
+and a Redis miss falls back to the database and backfills the cache (never
+over an existing entry, so a revocation tombstone always wins).
 """
 
+import asyncio
 import secrets
 import hashlib
 import logging
-from typing import Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 import jwt
 import uuid
+from redis.exceptions import WatchError
 
 from database import RefreshToken, User
 
@@ -27,16 +40,31 @@ class RefreshTokenService:
     REFRESH_TOKEN_EXPIRY_DAYS = 30
     ACCESS_TOKEN_EXPIRY_MINUTES = 15  # Short-lived access tokens
     
-    def __init__(self, jwt_secret: str, jwt_algorithm: str = "HS256"):
+    # Redis layout
+    TOKEN_KEY_PREFIX = "refresh_token:"
+    USER_SET_PREFIX = "refresh_tokens:user:"
+    PRUNE_LOCK_KEY = "refresh_tokens:prune_lock"
+    # Unknown hashes are remembered briefly so replayed junk tokens skip the database
+    NEGATIVE_CACHE_SECONDS = 60
+    
+    # Background pruning
+    PRUNE_INTERVAL_SECONDS = 3600
+    PRUNE_BATCH_SIZE = 1000
+    REVOKED_RETENTION_DAYS = 7
+    
+    def __init__(self, jwt_secret: str, jwt_algorithm: str = "HS256", redis_client=None):
         """
         Initialize refresh token service
         
         Args:
             jwt_secret: Secret key for JWT signing
             jwt_algorithm: JWT algorithm (default: HS256)
+            redis_client: Optional Redis client (decode_responses=True) for the token index
         """
         self.jwt_secret = jwt_secret
         self.jwt_algorithm = jwt_algorithm
+        self.redis_client = redis_client
+        self._prune_task: Optional[asyncio.Task] = None
     
     def generate_refresh_token(self) -> str:
         """
@@ -72,6 +100,125 @@ class RefreshTokenService:
         """
         return self.hash_token(token) == stored_hash
     
+    def _token_key(self, token_hash: str) -> str:
+        return f"{self.TOKEN_KEY_PREFIX}{token_hash}"
+    
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.USER_SET_PREFIX}{user_id}"
+    
+    def _cache_token(self, refresh_token: RefreshToken) -> None:
+        """Write a token record to Redis, expiring with the token"""
+        if self.redis_client is None:
+            return
+        try:
+            pipe = self.redis_client.pipeline()
+            self._queue_token_write(pipe, refresh_token)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Refresh token cache write failed: {str(e)}")
+    
+    def _backfill_token(self, refresh_token: RefreshToken) -> None:
+        """
+        Write a token record read from the database, unless Redis already has the key
+        
+        The database read may predate a concurrent revocation whose tombstone
+        (revoked=1) is already in Redis; WATCH makes the write a no-op then,
+        so a stale backfill can never resurrect a revoked token.
+        """
+        if self.redis_client is None:
+            return
+        key = self._token_key(refresh_token.token_hash)
+        try:
+            with self.redis_client.pipeline() as pipe:
+                pipe.watch(key)
+                if pipe.exists(key):
+                    return
+                pipe.multi()
+                self._queue_token_write(pipe, refresh_token)
+                pipe.execute()
+        except WatchError:
+            # Written (most likely revoked) between our check and the transaction
+            return
+        except Exception as e:
+            logger.warning(f"Refresh token cache write failed: {str(e)}")
+    
+    def _queue_token_write(self, pipe, refresh_token: RefreshToken) -> None:
+        key = self._token_key(refresh_token.token_hash)
+        user_key = self._user_key(str(refresh_token.user_id))
+        created_at = refresh_token.created_at or datetime.utcnow()
+        pipe.hset(key, mapping={
+            "id": str(refresh_token.id),
+            "user_id": str(refresh_token.user_id),
+            "expires_at": refresh_token.expires_at.isoformat(),
+            "created_at": created_at.isoformat(),
+            "device_info": refresh_token.device_info or "",
+            "ip_address": refresh_token.ip_address or "",
+            "revoked": "1" if refresh_token.revoked else "0",
+        })
+        pipe.expireat(key, int(refresh_token.expires_at.replace(tzinfo=timezone.utc).timestamp()))
+        pipe.sadd(user_key, refresh_token.token_hash)
+        pipe.expire(user_key, timedelta(days=self.REFRESH_TOKEN_EXPIRY_DAYS))
+    
+    def _cached_token(self, token_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look a token up in Redis
+        
+        Returns:
+            The cached fields, {} for a known-unknown hash, or None on a miss/error
+        """
+        if self.redis_client is None:
+            return None
+        try:
+            data = self.redis_client.hgetall(self._token_key(token_hash))
+        except Exception as e:
+            logger.warning(f"Refresh token cache read failed: {str(e)}")
+            return None
+        return data or None
+    
+    def _cache_unknown(self, token_hash: str) -> None:
+        """Remember briefly that a hash has no valid token behind it"""
+        if self.redis_client is None:
+            return
+        try:
+            key = self._token_key(token_hash)
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, mapping={"revoked": "1"})
+            pipe.expire(key, self.NEGATIVE_CACHE_SECONDS)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Refresh token cache write failed: {str(e)}")
+    
+    def _cache_revoked(self, token_hashes, user_id: Optional[str] = None) -> None:
+        """Mark tokens revoked in Redis, keeping their tombstones until expiry"""
+        if self.redis_client is None or not token_hashes:
+            return
+        try:
+            pipe = self.redis_client.pipeline()
+            for token_hash in token_hashes:
+                key = self._token_key(token_hash)
+                pipe.hset(key, "revoked", "1")
+                # Live entries keep expiring with the token; a tombstone created here gets a short TTL
+                pipe.expire(key, self.NEGATIVE_CACHE_SECONDS, nx=True)
+                if user_id:
+                    pipe.srem(self._user_key(user_id), token_hash)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Refresh token cache revoke failed: {str(e)}")
+    
+    @staticmethod
+    def _from_cache(token_hash: str, data: Dict[str, Any]) -> RefreshToken:
+        """Build a detached RefreshToken from its cached fields"""
+        return RefreshToken(
+            id=uuid.UUID(data["id"]),
+            user_id=uuid.UUID(data["user_id"]),
+            token_hash=token_hash,
+            expires_at=datetime.fromisoformat(data["expires_at"]),
+            created_at=datetime.fromisoformat(data["created_at"]),
+            revoked=False,
+            device_info=data.get("device_info") or None,
+            ip_address=data.get("ip_address") or None
+        )
+    
     def create_refresh_token(
         self,
         db: Session,
@@ -95,27 +242,35 @@ class RefreshTokenService:
         plain_token = self.generate_refresh_token()
         token_hash = self.hash_token(plain_token)
         
-        # Calculate expiration
-        expires_at = datetime.utcnow() + timedelta(days=self.REFRESH_TOKEN_EXPIRY_DAYS)
-        
-        # Create refresh token record
-        refresh_token = RefreshToken(
-            id=uuid.uuid4(),
-            user_id=uuid.UUID(user_id),
-            token_hash=token_hash,
-            expires_at=expires_at,
-            device_info=device_info,
-            ip_address=ip_address
-        )
+        refresh_token = self._new_token_record(user_id, token_hash, device_info, ip_address)
         
         db.add(refresh_token)
         db.commit()
-        db.refresh(refresh_token)
+        self._cache_token(refresh_token)
         
         logger.info(f"Refresh token created for user: {user_id}")
         
         return refresh_token, plain_token
     
+    def _new_token_record(
+        self,
+        user_id: str,
+        token_hash: str,
+        device_info: Optional[str],
+        ip_address: Optional[str]
+    ) -> RefreshToken:
+        now = datetime.utcnow()
+        return RefreshToken(
+            id=uuid.uuid4(),
+            user_id=uuid.UUID(user_id),
+            token_hash=token_hash,
+            expires_at=now + timedelta(days=self.REFRESH_TOKEN_EXPIRY_DAYS),
+            created_at=now,
+            revoked=False,
+            device_info=device_info,
+            ip_address=ip_address
+        )
+    
     def validate_refresh_token(self, db: Session, token: str) -> Optional[RefreshToken]:
         """
         Validate a refresh token
@@ -132,14 +287,25 @@ class RefreshTokenService:
         
         token_hash = self.hash_token(token)
         
-        # Find token by hash
-        refresh_token = db.query(RefreshToken).filter(
-            RefreshToken.token_hash == token_hash,
-            RefreshToken.revoked == False
-        ).first()
-        
-        if not refresh_token:
-            return None
+        # O(1) lookup in Redis; revoked tokens and unknown hashes leave tombstones
+        cached = self._cached_token(token_hash)
+        if cached is not None:
+            if cached.get("revoked") == "1" or "user_id" not in cached:
+                return None
+            refresh_token = self._from_cache(token_hash, cached)
+        else:
+            # Find token by hash (durable store)
+            refresh_token = db.query(RefreshToken).filter(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.revoked == False
+            ).first()
+            
+            if not refresh_token:
+                self._cache_unknown(token_hash)
+                return None
+            
+            if refresh_token.expires_at >= datetime.utcnow():
+                self._backfill_token(refresh_token)
         
         # Check expiration
         if refresh_token.expires_at < datetime.utcnow():
@@ -173,19 +339,34 @@ class RefreshTokenService:
         if not old_refresh_token:
             return None
         
-        # Revoke old token
-        old_refresh_token.revoked = True
-        old_refresh_token.revoked_at = datetime.utcnow()
+        user_id = str(old_refresh_token.user_id)
+        old_hash = old_refresh_token.token_hash
         
-        # Create new token
-        new_token, plain_token = self.create_refresh_token(
-            db,
-            str(old_refresh_token.user_id),
-            device_info,
-            ip_address
+        # Revoke old token with a conditional UPDATE: of two concurrent rotations
+        # of the same token only one matches a non-revoked row
+        revoked = db.query(RefreshToken).filter(
+            RefreshToken.token_hash == old_hash,
+            RefreshToken.revoked == False
+        ).update(
+            {RefreshToken.revoked: True, RefreshToken.revoked_at: datetime.utcnow()},
+            synchronize_session=False
         )
+        if not revoked:
+            db.rollback()
+            self._cache_revoked([old_hash], user_id)
+            logger.warning(f"Refresh token reuse rejected for user: {user_id}")
+            return None
         
-        logger.info(f"Refresh token rotated for user: {old_refresh_token.user_id}")
+        # Create new token in the same transaction
+        plain_token = self.generate_refresh_token()
+        new_token = self._new_token_record(user_id, self.hash_token(plain_token), device_info, ip_address)
+        db.add(new_token)
+        db.commit()
+        
+        self._cache_revoked([old_hash], user_id)
+        self._cache_token(new_token)
+        
+        logger.info(f"Refresh token rotated for user: {user_id}")
         
         return new_token, plain_token
     
@@ -212,6 +393,7 @@ class RefreshTokenService:
         refresh_token.revoked = True
         refresh_token.revoked_at = datetime.utcnow()
         db.commit()
+        self._cache_revoked([token_hash], str(refresh_token.user_id))
         
         logger.info(f"Refresh token revoked for user: {refresh_token.user_id}")
         
@@ -231,18 +413,24 @@ class RefreshTokenService:
         try:
             user_uuid = uuid.UUID(user_id)
             
-            tokens = db.query(RefreshToken).filter(
+            # Hashes come from the DB too, in case Redis missed a token
+            token_hashes = [
+                row.token_hash for row in db.query(RefreshToken.token_hash).filter(
+                    RefreshToken.user_id == user_uuid,
+                    RefreshToken.revoked == False
+                ).all()
+            ]
+            
+            count = db.query(RefreshToken).filter(
                 RefreshToken.user_id == user_uuid,
                 RefreshToken.revoked == False
-            ).all()
-            
-            count = 0
-            for token in tokens:
-                token.revoked = True
-                token.revoked_at = datetime.utcnow()
-                count += 1
+            ).update(
+                {RefreshToken.revoked: True, RefreshToken.revoked_at: datetime.utcnow()},
+                synchronize_session=False
+            )
             
             db.commit()
+            self._revoke_user_cache(str(user_uuid), token_hashes)
             
             logger.info(f"Revoked {count} refresh tokens for user: {user_id}")
             
@@ -251,6 +439,21 @@ class RefreshTokenService:
         except ValueError:
             return 0
     
+    def _revoke_user_cache(self, user_id: str, token_hashes) -> None:
+        """Tombstone every cached token of a user and drop their index set"""
+        if self.redis_client is None:
+            return
+        try:
+            cached_hashes = self.redis_client.smembers(self._user_key(user_id))
+        except Exception as e:
+            logger.warning(f"Refresh token cache read failed: {str(e)}")
+            cached_hashes = set()
+        self._cache_revoked(set(token_hashes) | set(cached_hashes))
+        try:
+            self.redis_client.delete(self._user_key(user_id))
+        except Exception as e:
+            logger.warning(f"Refresh token cache revoke failed: {str(e)}")
+    
     def get_user_sessions(self, db: Session, user_id: str) -> list:
         """
         Get all active sessions (refresh tokens) for a user
@@ -307,20 +510,109 @@ class RefreshTokenService:
         Returns:
             Number of tokens deleted
         """
-        result = db.query(RefreshToken).filter(
-            RefreshToken.expires_at < datetime.utcnow()
-        ).delete()
+        return self.prune_tokens(db, revoked_retention_days=None)
+    
+    def prune_tokens(
+        self,
+        db: Session,
+        batch_size: Optional[int] = None,
+        revoked_retention_days: Optional[int] = REVOKED_RETENTION_DAYS
+    ) -> int:
+        """
+        Delete expired tokens, and revoked tokens past the retention window, in batches
         
-        db.commit()
+        Small batches keep each DELETE's locks short on a large table.
+        
+        Args:
+            db: Database session
+            batch_size: Rows deleted per statement
+            revoked_retention_days: Keep revoked tokens this long (None keeps them until expiry)
+            
+        Returns:
+            Number of tokens deleted
+        """
+        batch_size = batch_size or self.PRUNE_BATCH_SIZE
+        now = datetime.utcnow()
+        condition = RefreshToken.expires_at < now
+        if revoked_retention_days is not None:
+            condition = or_(
+                condition,
+                and_(
+                    RefreshToken.revoked == True,
+                    RefreshToken.revoked_at < now - timedelta(days=revoked_retention_days)
+                )
+            )
+        
+        total = 0
+        while True:
+            ids = [row.id for row in db.query(RefreshToken.id).filter(condition).limit(batch_size).all()]
+            if not ids:
+                break
+            db.query(RefreshToken).filter(RefreshToken.id.in_(ids)).delete(synchronize_session=False)
+            db.commit()
+            total += len(ids)
+            if len(ids) < batch_size:
+                break
         
-        if result > 0:
-            logger.info(f"Cleaned up {result} expired refresh tokens")
+        if total > 0:
+            logger.info(f"Pruned {total} expired or revoked refresh tokens")
         
-        return result
+        return total
+    
+    def _prune_with_session(self, session_factory, interval: float) -> int:
+        # One replica prunes per interval
+        if self.redis_client is not None:
+            try:
+                if not self.redis_client.set(self.PRUNE_LOCK_KEY, "1", nx=True, ex=max(1, int(interval))):
+                    return 0
+            except Exception as e:
+                logger.warning(f"Refresh token prune lock unavailable: {str(e)}")
+        db = session_factory()
+        try:
+            return self.prune_tokens(db)
+        finally:
+            db.close()
+    
+    async def _run_pruner(self, session_factory, interval: float):
+        """Periodically prune the refresh token table off the event loop"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self._prune_with_session, session_factory, interval)
+            except Exception as e:
+                logger.error(f"Refresh token pruning failed: {str(e)}")
+    
+    def start_pruning(self, session_factory, interval: Optional[float] = None):
+        """
+        Start the background task that prunes expired refresh tokens
+        
+        Args:
+            session_factory: Callable returning a database session
+            interval: Seconds between pruning runs
+        """
+        if self._prune_task is not None and not self._prune_task.done():
+            return
+        self._prune_task = asyncio.get_running_loop().create_task(
+            self._run_pruner(session_factory, interval or self.PRUNE_INTERVAL_SECONDS)
+        )
+    
+    async def stop_pruning(self):
+        """Stop the background pruning task"""
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            try:
+                await self._prune_task
+            except asyncio.CancelledError:
+                pass
+            self._prune_task = None
 
 
 # Factory function to create service with settings
-def create_refresh_token_service(jwt_secret: str, jwt_algorithm: str = "HS256") -> RefreshTokenService:
+def create_refresh_token_service(
+    jwt_secret: str,
+    jwt_algorithm: str = "HS256",
+    redis_client=None
+) -> RefreshTokenService:
     """Create a RefreshTokenService instance"""
-    return RefreshTokenService(jwt_secret, jwt_algorithm)
+    return RefreshTokenService(jwt_secret, jwt_algorithm, redis_client=redis_client)
 
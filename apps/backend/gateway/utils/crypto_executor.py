@@ -0,0 +1,28 @@
+"""
+Process-wide crypto executor for the gateway
+
+The pool lives in the shared `src.crypto_executor` module; this module sizes
+the gateway's instance from its settings.
+"""
+
+from typing import Optional
+
+from src.crypto_executor import CryptoExecutor, CryptoOverloadedError
+
+__all__ = ["CryptoExecutor", "CryptoOverloadedError", "get_crypto_executor"]
+
+
+# Global crypto executor instance
+_crypto_executor: Optional[CryptoExecutor] = None
+
+
+def get_crypto_executor() -> CryptoExecutor:
+    """Get the process-wide crypto executor"""
+    global _crypto_executor
+    if _crypto_executor is None:
+        from config import settings
+        _crypto_executor = CryptoExecutor(
+            max_workers=settings.CRYPTO_MAX_WORKERS,
+            max_pending=settings.CRYPTO_MAX_PENDING
+        )
+    return _crypto_executor
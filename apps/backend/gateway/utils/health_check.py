@@ -4,18 +4,49 @@ Health check utilities for API Gateway
 
 import httpx
 import asyncio
-from typing import Dict, Any
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 class HealthChecker:
-    """Health checker for microservices"""
+    """
+    Health checker for microservices
     
-    def __init__(self, service_urls: Dict[str, str], timeout: int = 5):
+    Besides on-demand checks, the checker can run as a background aggregator:
+    it polls every service on a jittered interval and keeps a status snapshot
+    (with recent latency history) that `/health` and request routing read
+    without making any network calls.
+    """
+    
+    def __init__(
+        self,
+        service_urls: Dict[str, str],
+        timeout: int = 5,
+        interval: float = 10.0,
+        jitter: float = 0.2,
+        failure_threshold: int = 2,
+        history_size: int = 30,
+        dependency_checks: Optional[Dict[str, Callable[[], Any]]] = None
+    ):
         self.service_urls = service_urls
         self.timeout = timeout
         self.http_client = httpx.AsyncClient(timeout=timeout)
+        self.interval = interval
+        self.jitter = jitter
+        self.failure_threshold = failure_threshold
+        self.history_size = history_size
+        # Blocking checks for non-HTTP dependencies (e.g. {"redis": redis_client.ping})
+        self.dependency_checks = dependency_checks or {}
+        
+        self._latency_history: Dict[str, Deque[float]] = {}
+        self._consecutive_failures: Dict[str, int] = {}
+        self._snapshot: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
     
     async def check_service(self, service_name: str, service_url: str) -> Dict[str, Any]:
         """Check health of a single service"""
@@ -55,26 +86,121 @@ class HealthChecker:
             }
     
     async def check_all_services(self) -> Dict[str, Any]:
-        """Check health of all services"""
-        tasks = []
-        for service_name, service_url in self.service_urls.items():
-            task = self.check_service(service_name, service_url)
-            tasks.append((service_name, task))
+        """Check health of all services concurrently"""
+        names = list(self.service_urls)
+        outcomes = await asyncio.gather(
+            *(self.check_service(name, self.service_urls[name]) for name in names),
+            return_exceptions=True
+        )
         
         results = {}
-        for service_name, task in tasks:
-            try:
-                result = await task
-                results[service_name] = result
-            except Exception as e:
-                results[service_name] = {
+        for service_name, result in zip(names, outcomes):
+            if isinstance(result, Exception):
+                result = {
                     "status": "unhealthy",
-                    "error": str(e),
+                    "error": str(result),
                     "response_time": 0
                 }
+            results[service_name] = result
         
         return results
     
+    async def _check_dependency(self, check: Callable[[], Any]) -> Dict[str, Any]:
+        """Run a blocking dependency check off the event loop"""
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.to_thread(check), timeout=self.timeout)
+            return {"status": "healthy", "response_time": time.perf_counter() - started}
+        except Exception as e:
+            return {"status": "unhealthy", "error": str(e) or type(e).__name__, "response_time": time.perf_counter() - started}
+    
+    def _record(self, name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Fold one check result into the rolling state for `name`"""
+        history = self._latency_history.setdefault(name, deque(maxlen=self.history_size))
+        history.append(round(float(result.get("response_time") or 0), 4))
+        
+        if result["status"] == "healthy":
+            self._consecutive_failures[name] = 0
+        else:
+            self._consecutive_failures[name] = self._consecutive_failures.get(name, 0) + 1
+        
+        failures = self._consecutive_failures[name]
+        return {
+            **result,
+            # A single failed probe is not enough to take a service out of rotation
+            "ready": failures < self.failure_threshold,
+            "consecutive_failures": failures,
+            "latency_history": list(history),
+            "last_checked": datetime.utcnow().isoformat()
+        }
+    
+    async def refresh(self) -> Dict[str, Any]:
+        """Probe all services and dependencies once and publish a new snapshot"""
+        service_results, dependency_results = await asyncio.gather(
+            self.check_all_services(),
+            asyncio.gather(*(self._check_dependency(check) for check in self.dependency_checks.values()))
+        )
+        
+        services = {name: self._record(name, result) for name, result in service_results.items()}
+        dependencies = {
+            name: self._record(name, result)
+            for name, result in zip(self.dependency_checks, dependency_results)
+        }
+        
+        # Replace the snapshot in one assignment so readers never see a partial update
+        self._snapshot = {
+            "services": services,
+            "dependencies": dependencies,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+        return self._snapshot
+    
+    def get_snapshot(self) -> Dict[str, Any]:
+        """Latest cached status; empty until the first refresh completes"""
+        return self._snapshot
+    
+    def is_ready(self, service_name: str) -> bool:
+        """
+        Whether requests should be routed to a service.
+        
+        Services that have not been probed yet are treated as ready so routing
+        isn't blocked before the first poll.
+        """
+        status = self._snapshot.get("services", {}).get(service_name)
+        return status is None or status["ready"]
+    
+    def dependency_ready(self, name: str) -> bool:
+        """Whether a dependency check passed (unknown counts as ready)"""
+        status = self._snapshot.get("dependencies", {}).get(name)
+        return status is None or status["ready"]
+    
+    async def _run(self):
+        while True:
+            # Jitter keeps replicas from probing the services in lockstep
+            delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+            await asyncio.sleep(max(0.0, delay))
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Health aggregation failed: {str(e)}")
+    
+    def start(self):
+        """Start polling in the background (call `refresh()` first for an initial snapshot)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop background polling"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
     async def check_service_health(self, service_name: str) -> bool:
         """Check if a specific service is healthy"""
         if service_name not in self.service_urls:
@@ -0,0 +1,96 @@
+"""
+Response payload helpers for the API Gateway
+
+- Fast JSON: responses are rendered with orjson when it is installed, and
+  backend responses are parsed with it, falling back to the stdlib.
+- Slim payloads: routed responses drop heavy sub-objects unless the client
+  asks for them with `?verbose=true`, or picks top-level keys with
+  `?fields=a,b`.
+"""
+
+import json
+import logging
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+    ORJSONResponse = None
+
+logger = logging.getLogger(__name__)
+
+# Default response class for the gateway app
+FastJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+# Query parameters consumed by the gateway, never forwarded to services
+SELECTOR_PARAMS = ("fields", "verbose")
+
+# Sub-objects only serialized with ?verbose=true (or named in ?fields=)
+HEAVY_FIELDS: Dict[str, Tuple[str, ...]] = {
+    # Retrieved KB entries are already folded into "context"; the *_analysis
+    # keys duplicate "deflection" / "code_switching"
+    "cultural_context": ("cultural_context", "matches", "deflection_analysis", "code_switching_analysis"),
+    "emotion_analysis": ("probabilities", "features_used"),
+}
+
+_TRUE_VALUES = {"1", "true", "yes", "on"}
+
+
+def loads(data: bytes) -> Any:
+    """Parse a JSON body"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def parse_selector(query_params) -> Tuple[Optional[FrozenSet[str]], bool]:
+    """
+    Read the `fields` / `verbose` selector from a request's query string
+
+    Args:
+        query_params: Request query parameters
+
+    Returns:
+        (requested top-level fields or None, verbose flag)
+    """
+    raw_fields = query_params.get("fields")
+    fields = None
+    if raw_fields:
+        fields = frozenset(f.strip() for f in raw_fields.split(",") if f.strip()) or None
+    verbose = (query_params.get("verbose") or "").strip().lower() in _TRUE_VALUES
+    return fields, verbose
+
+
+def select_fields(
+    payload: Any,
+    fields: Optional[Iterable[str]] = None,
+    verbose: bool = False,
+    heavy: Iterable[str] = ()
+) -> Any:
+    """
+    Trim a response payload to what the client asked for
+
+    Args:
+        payload: Parsed response body
+        fields: Top-level keys to keep; overrides `verbose`
+        verbose: Keep heavy sub-objects
+        heavy: Keys dropped unless verbose or explicitly requested
+
+    Returns:
+        The trimmed payload (non-dict payloads are returned unchanged)
+    """
+    if not isinstance(payload, dict):
+        return payload
+    if fields:
+        wanted = set(fields)
+        return {key: value for key, value in payload.items() if key in wanted}
+    if verbose:
+        return payload
+    heavy = set(heavy)
+    if not heavy:
+        return payload
+    return {key: value for key, value in payload.items() if key not in heavy}
@@ -0,0 +1,238 @@
+"""
+Voice-session turn orchestration for the API Gateway
+
+A single voice turn touches seven services. Rather than having the client call
+them one after another, `/session/turn` uploads the audio once and the gateway
+runs the calls as a dependency graph: every stage starts as soon as its inputs
+exist, and each result is streamed back as it completes.
+
+    stt ──────┬──> cultural ─────────────┐
+              ├──> dissonance ──┬────────┼──> chat
+    emotion ──┤                 │        │
+              └──> baseline ────┴──> crisis
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# call(service_name, endpoint, method, **httpx_request_kwargs) -> parsed JSON body
+ServiceCall = Callable[..., Awaitable[Dict[str, Any]]]
+
+
+@dataclass
+class TurnStage:
+    """
+    One node of the turn graph
+
+    Args:
+        name: Stage name (also the SSE event name)
+        run: Coroutine function taking the results of finished stages
+        requires: Stages that must succeed before this one can run
+        uses: Stages whose results are used if available; a failed one is passed as None
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+    requires: Tuple[str, ...] = ()
+    uses: Tuple[str, ...] = ()
+
+    @property
+    def depends_on(self) -> Tuple[str, ...]:
+        return self.requires + self.uses
+
+
+@dataclass
+class StageEvent:
+    """Outcome of a stage, emitted as soon as it is known"""
+    stage: str
+    status: str  # "ok", "error" or "skipped"
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        payload = {"stage": self.stage, "status": self.status, "elapsed_ms": self.elapsed_ms}
+        if self.data is not None:
+            payload["data"] = self.data
+        if self.error is not None:
+            payload["error"] = self.error
+        payload.update(self.extra)
+        return payload
+
+
+async def run_stages(stages: Dict[str, TurnStage]) -> AsyncIterator[StageEvent]:
+    """
+    Run a stage graph, yielding each stage's outcome as soon as it completes.
+
+    A stage is started the moment all of its dependencies have finished. If a
+    required dependency failed or was skipped, the stage is skipped too.
+    Pending stages are cancelled if the consumer stops iterating early.
+    """
+    results: Dict[str, Any] = {}
+    outcomes: Dict[str, str] = {}
+    running: Dict[asyncio.Task, Tuple[str, float]] = {}
+    waiting = dict(stages)
+    started = time.perf_counter()
+
+    def elapsed() -> float:
+        return round((time.perf_counter() - started) * 1000, 1)
+
+    async def invoke(stage: TurnStage) -> Dict[str, Any]:
+        inputs = {name: results.get(name) for name in stage.depends_on}
+        return await stage.run(inputs)
+
+    try:
+        while waiting or running:
+            # Start (or skip) every stage whose dependencies are all settled
+            progressed = True
+            while progressed:
+                progressed = False
+                for name, stage in list(waiting.items()):
+                    if not all(dep in outcomes for dep in stage.depends_on):
+                        continue
+                    del waiting[name]
+                    progressed = True
+                    failed = [dep for dep in stage.requires if outcomes[dep] != "ok"]
+                    if failed:
+                        outcomes[name] = "skipped"
+                        yield StageEvent(name, "skipped", error=f"missing input: {', '.join(failed)}", elapsed_ms=elapsed())
+                        continue
+                    running[asyncio.create_task(invoke(stage))] = (name, time.perf_counter())
+
+            if not running:
+                if waiting:
+                    raise ValueError(f"Unsatisfiable stage dependencies: {sorted(waiting)}")
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name, stage_started = running.pop(task)
+                duration = round((time.perf_counter() - stage_started) * 1000, 1)
+                try:
+                    results[name] = task.result()
+                    outcomes[name] = "ok"
+                    yield StageEvent(name, "ok", data=results[name], elapsed_ms=elapsed(), extra={"duration_ms": duration})
+                except Exception as e:
+                    logger.error(f"Session turn stage '{name}' failed: {str(e)}")
+                    outcomes[name] = "error"
+                    yield StageEvent(name, "error", error=str(e) or type(e).__name__, elapsed_ms=elapsed(), extra={"duration_ms": duration})
+    finally:
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+def build_turn_stages(
+    call: ServiceCall,
+    audio: bytes,
+    filename: str,
+    content_type: str,
+    user_id: Optional[str],
+    conversation_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    language: Optional[str] = None
+) -> Dict[str, TurnStage]:
+    """
+    Build the stage graph for one voice turn
+
+    Args:
+        call: Coroutine that performs an authenticated call to a backend service
+        audio: Raw audio upload
+        filename: Upload file name
+        content_type: Upload content type
+        user_id: Authenticated user
+        conversation_id: Optional conversation ID
+        session_id: Optional voice session ID
+        language: Optional language hint for STT
+
+    Returns:
+        Stages keyed by name
+    """
+    async def stt(_: Dict[str, Any]) -> Dict[str, Any]:
+        form = {"accent": "kenyan"}
+        if language:
+            form["language"] = language
+        return await call(
+            "speech_processing", "/transcribe", "POST",
+            files={"audio_file": (filename, audio, content_type)}, data=form
+        )
+
+    async def emotion(_: Dict[str, Any]) -> Dict[str, Any]:
+        params = {k: v for k, v in {"user_id": user_id, "conversation_id": conversation_id}.items() if v}
+        return await call(
+            "emotion_analysis", "/analyze", "POST",
+            files={"file": (filename, audio, content_type)}, params=params
+        )
+
+    async def cultural(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        transcript = inputs["stt"]
+        return await call(
+            "cultural_context", "/context", "GET",
+            params={"query": transcript.get("text", ""), "language": transcript.get("language") or language or "en"}
+        )
+
+    async def dissonance(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await call("dissonance_detector", "/analyze", "POST", json={
+            "transcript": inputs["stt"].get("text", ""),
+            "voice_emotion": _emotion_summary(inputs["emotion"]),
+            "session_id": session_id,
+            "user_id": user_id,
+        })
+
+    async def baseline(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await call("baseline_tracker", "/baseline/update", "POST", json={
+            "user_id": user_id,
+            "session_id": session_id,
+            "emotion_data": _emotion_summary(inputs["emotion"]),
+        })
+
+    async def crisis(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await call("crisis_detection", "/detect", "POST", json={
+            "user_id": user_id,
+            "session_id": session_id,
+            "conversation_id": conversation_id,
+            "transcript": inputs["stt"].get("text", ""),
+            "emotion_data": _emotion_summary(inputs.get("emotion")),
+            "dissonance_data": inputs.get("dissonance"),
+            "baseline_data": inputs.get("baseline"),
+        })
+
+    async def chat(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await call("conversation_engine", "/chat", "POST", json={
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+            "message": inputs["stt"].get("text", ""),
+            "emotion_context": _emotion_summary(inputs.get("emotion")),
+            "dissonance_context": inputs.get("dissonance"),
+            "cultural_context": inputs.get("cultural"),
+        })
+
+    stages = [
+        TurnStage("stt", stt),
+        TurnStage("emotion", emotion),
+        TurnStage("cultural", cultural, requires=("stt",)),
+        TurnStage("dissonance", dissonance, requires=("stt", "emotion")),
+        TurnStage("baseline", baseline, requires=("emotion",)),
+        TurnStage("crisis", crisis, requires=("stt",), uses=("emotion", "dissonance", "baseline")),
+        TurnStage("chat", chat, requires=("stt",), uses=("emotion", "dissonance", "cultural")),
+    ]
+    return {stage.name: stage for stage in stages}
+
+
+def _emotion_summary(result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Reduce an emotion-analysis response to the shape downstream services expect"""
+    if not result:
+        return None
+    return {"emotion": result.get("emotion", "neutral"), "confidence": result.get("confidence", 0.5)}
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
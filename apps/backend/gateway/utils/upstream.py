@@ -0,0 +1,161 @@
+"""
+Upstream call helpers for the API Gateway
+
+- LatencyTracker keeps a rolling latency window per service; its p95 is the
+  hedge delay.
+- hedged_call sends an idempotent request to a second replica when the first
+  has not answered within the hedge delay, and keeps whichever answers first.
+  Only timeouts, transport errors and 5xx responses are retried elsewhere
+  (is_retryable); a 4xx would be the same on every replica.
+- cancel_on_disconnect abandons upstream work as soon as the client goes away.
+"""
+
+import asyncio
+import logging
+import threading
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Non-standard status used by proxies for "client closed request"
+CLIENT_CLOSED_REQUEST = 499
+
+
+class ClientDisconnected(Exception):
+    """The client went away before the upstream call finished"""
+
+
+class LatencyTracker:
+    """Rolling per-service latency samples"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initialize latency tracker
+
+        Args:
+            window: Samples kept per service
+            min_samples: Samples needed before a percentile is reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, service_name: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(service_name)
+            if samples is None:
+                samples = self._samples[service_name] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(self, service_name: str, pct: float) -> Optional[float]:
+        """Latency percentile for a service, or None until enough samples exist"""
+        with self._lock:
+            samples = list(self._samples.get(service_name, ()))
+        if len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+        return ordered[index]
+
+    def hedge_delay(self, service_name: str, floor: float = 0.0) -> Optional[float]:
+        """Delay before hedging: the service's p95, never below `floor`"""
+        p95 = self.percentile(service_name, 95)
+        if p95 is None:
+            return None
+        return max(floor, p95)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether another replica might answer differently: timeouts, transport errors and 5xx"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError))
+
+
+async def hedged_call(
+    attempts: List[Callable[[], Awaitable[T]]],
+    hedge_delay: float,
+    retryable: Optional[Callable[[BaseException], bool]] = None
+) -> T:
+    """
+    Run the first attempt; start the next one each time `hedge_delay` passes
+    without an answer (or as soon as a running attempt fails with a retryable error).
+
+    Only use for idempotent requests. The first successful result wins and the
+    remaining attempts are cancelled; a non-retryable error is raised at once,
+    and if every attempt fails, the last error is raised.
+
+    Args:
+        attempts: Zero-argument coroutine functions, one per replica
+        hedge_delay: Seconds to wait before hedging
+        retryable: Decides whether an error is worth another replica (default: every error)
+
+    Returns:
+        The first successful result
+    """
+    pending: List[asyncio.Task] = []
+    remaining = list(attempts)
+    last_error: Optional[BaseException] = None
+
+    def launch() -> None:
+        pending.append(asyncio.ensure_future(remaining.pop(0)()))
+
+    launch()
+    try:
+        while pending:
+            timeout = hedge_delay if remaining else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                logger.info("Hedging upstream request to another replica")
+                launch()
+                continue
+            for task in done:
+                pending.remove(task)
+                if task.exception() is None:
+                    return task.result()
+                last_error = task.exception()
+                if retryable is not None and not retryable(last_error):
+                    raise last_error
+            if remaining:
+                launch()
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def cancel_on_disconnect(request, awaitable: Awaitable[T], poll_interval: float = 0.1) -> T:
+    """
+    Await upstream work, cancelling it if the client disconnects first
+
+    Args:
+        request: Incoming request (anything with `async is_disconnected()`)
+        awaitable: The upstream call
+        poll_interval: Seconds between disconnect checks
+
+    Returns:
+        The awaitable's result
+
+    Raises:
+        ClientDisconnected: The client went away; the upstream call was cancelled
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_interval)
+            if done:
+                return task.result()
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
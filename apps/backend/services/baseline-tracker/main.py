@@ -12,6 +12,8 @@ import logging
 from datetime import datetime, timezone
 from uuid import UUID
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 from database import get_db, init_db
 from models.baseline_models import (
@@ -59,6 +61,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -19,6 +19,8 @@ from sqlalchemy.orm import sessionmaker, Session
 import jwt
 import uuid
 import os
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -146,6 +148,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 security = HTTPBearer()
 
 
@@ -14,6 +14,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 import json
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 from models.consent_models import ConsentRequest, ConsentResponse, ConsentUpdateRequest
 
@@ -53,6 +55,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 class ConsentManager:
     """Manages user consent records"""
     
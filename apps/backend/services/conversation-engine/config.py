@@ -14,11 +14,18 @@ class Settings(BaseSettings):
     SERVICE_PORT: int = 8000
     DEBUG: bool = False
     
+    # Security
+    JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your-secret-key-here")  # Must match the gateway's signing key
+    JWT_ALGORITHM: str = "HS256"
+    
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = "gpt-4"
     MAX_TOKENS: int = 500
     TEMPERATURE: float = 0.7
+    CONVERSATION_HISTORY_WINDOW: int = 5  # Prior messages fetched, decrypted and sent as prompt context
+    CONTEXT_CACHE_TTL_SECONDS: float = 300.0  # Lifetime of a cached decrypted history (0 disables the cache)
+    CONTEXT_CACHE_MAX_CONVERSATIONS: int = 2048  # Conversations kept in the in-process context cache
     
     # Vector Database
     PINECONE_API_KEY: str = os.getenv("PINECONE_API_KEY", "")
@@ -8,15 +8,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
+from jose import JWTError, jwt
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Any, Optional
 import uuid
 import httpx
 
+from src.deadline import DeadlineExceeded, install_deadline, deadline_event_hooks, with_deadline
+from src.metrics import instrument_app, time_inference
 from config import settings
 from models.conversation_models import ChatRequest, ChatResponse
 from services.gpt_service import GPTService
 from services.encryption_client import EncryptionClient
+from services.context_cache import ConversationContextCache
 from database import get_db
 from repositories.conversation_repository import ConversationRepository
 
@@ -32,7 +37,15 @@ gpt_service = GPTService(
     api_key=settings.OPENAI_API_KEY,
     model=settings.OPENAI_MODEL,
     max_tokens=settings.MAX_TOKENS,
-    temperature=settings.TEMPERATURE
+    temperature=settings.TEMPERATURE,
+    history_window=settings.CONVERSATION_HISTORY_WINDOW
+)
+
+# Decrypted prompt history of active conversations
+context_cache = ConversationContextCache(
+    max_turns=settings.CONVERSATION_HISTORY_WINDOW,
+    ttl_seconds=settings.CONTEXT_CACHE_TTL_SECONDS,
+    max_conversations=settings.CONTEXT_CACHE_MAX_CONVERSATIONS
 )
 
 # Global HTTP + encryption client (created during lifespan)
@@ -46,7 +59,7 @@ async def lifespan(app: FastAPI):
     global http_client, encryption_client
     logger.info("Starting Conversation Engine Service...")
     logger.info("Conversation Engine Service started successfully")
-    http_client = httpx.AsyncClient(timeout=10.0)
+    http_client = httpx.AsyncClient(timeout=10.0, event_hooks=deadline_event_hooks())
     encryption_client = EncryptionClient(settings.ENCRYPTION_SERVICE_URL, http_client=http_client)
     yield
     logger.info("Shutting down Conversation Engine Service...")
@@ -62,6 +75,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -78,10 +97,124 @@ async def health_check():
     return {
         "status": "healthy",
         "service": "conversation-engine",
-        "gpt_configured": bool(settings.OPENAI_API_KEY)
+        "gpt_configured": bool(settings.OPENAI_API_KEY),
+        "context_cache": context_cache.stats()
     }
 
 
+def _user_uuid(user_id: Any) -> uuid.UUID:
+    """User UUID; non-UUID ids (e.g. in tests) map to a stable uuid5"""
+    try:
+        return uuid.UUID(user_id) if isinstance(user_id, str) else user_id
+    except Exception:
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"user:{user_id}")
+
+
+def _conversation_uuid(conversation_id: Any, user_uuid: Optional[uuid.UUID]) -> uuid.UUID:
+    """Conversation UUID; non-UUID client ids map to a stable uuid5 scoped to the user"""
+    try:
+        return uuid.UUID(conversation_id) if isinstance(conversation_id, str) else conversation_id
+    except Exception:
+        if user_uuid is None:
+            raise ValueError(f"user_id is required for non-UUID conversation id '{conversation_id}'")
+        return uuid.uuid5(uuid.NAMESPACE_URL, f"conversation:{user_uuid}:{conversation_id}")
+
+
+def _caller_user_id(credentials: HTTPAuthorizationCredentials) -> str:
+    """User ID from the bearer token issued by the gateway; 401 if it is invalid"""
+    try:
+        payload = jwt.decode(
+            credentials.credentials,
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        payload = {}
+    user_id = payload.get("user_id")
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
+    return str(user_id)
+
+
+def _owned_conversation_uuid(
+    conversation_id: str,
+    credentials: HTTPAuthorizationCredentials,
+    conversation_repo: ConversationRepository
+) -> uuid.UUID:
+    """
+    Resolve a conversation id for the authenticated caller
+    
+    Non-UUID client ids are scoped to the caller. Conversations that do not
+    exist or belong to another user are reported as not found.
+    
+    Args:
+        conversation_id: Conversation ID from the path
+        credentials: Caller's bearer token
+        conversation_repo: Repository bound to the request session
+    
+    Returns:
+        Conversation UUID owned by the caller
+    """
+    user_uuid = _user_uuid(_caller_user_id(credentials))
+    conversation_uuid = _conversation_uuid(conversation_id, user_uuid)
+    conversation = conversation_repo.get_conversation(conversation_uuid)
+    if conversation is None or _user_uuid(conversation.user_id) != user_uuid:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return conversation_uuid
+
+
+async def _conversation_history(
+    conversation_repo: ConversationRepository,
+    conversation_id: uuid.UUID
+) -> tuple[list[dict], Any]:
+    """
+    Prompt history for a conversation
+    
+    Served from the context cache while the cached entry still ends at the
+    newest stored message; otherwise the recent window is read and decrypted
+    concurrently, and cached if every message decrypted.
+    
+    Args:
+        conversation_repo: Repository bound to the request session
+        conversation_id: Conversation ID
+    
+    Returns:
+        (turns in chronological order, ID of the newest stored message they cover)
+    """
+    cached = context_cache.get(conversation_id)
+    if cached is not None:
+        latest_id = conversation_repo.get_latest_message_id(conversation_id)
+        if cached.last_message_id == (str(latest_id) if latest_id is not None else None):
+            return cached.turns, latest_id
+
+    messages = conversation_repo.get_recent_messages(conversation_id, limit=settings.CONVERSATION_HISTORY_WINDOW)
+    last_message_id = messages[-1].id if messages else None
+    history: list[dict] = []
+    complete = not messages
+    if encryption_client and messages:
+        plaintexts = await encryption_client.decrypt_many(
+            ciphertexts=[m.encrypted_content for m in messages],
+            key_id=f"conversation:{conversation_id}",
+        )
+        complete = all(plaintext is not None for plaintext in plaintexts)
+        for m, plaintext in zip(messages, plaintexts):
+            if plaintext is None:
+                logger.warning(f"Skipping undecryptable message {getattr(m, 'id', None)}")
+                continue
+            history.append(
+                {
+                    "role": "assistant" if m.message_type == "ai" else "user",
+                    "content": plaintext,
+                }
+            )
+    if complete:
+        context_cache.put(conversation_id, history, last_message_id)
+    return history, last_message_id
+
+
 @app.post("/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
@@ -105,10 +238,7 @@ async def chat(
         
         conversation_repo = ConversationRepository(db)
         # user_id may be a UUID string in production; tests may use non-UUID strings.
-        try:
-            user_uuid = uuid.UUID(request.user_id) if isinstance(request.user_id, str) else request.user_id
-        except Exception:
-            user_uuid = uuid.uuid5(uuid.NAMESPACE_URL, f"user:{request.user_id}")
+        user_uuid = _user_uuid(request.user_id)
         
         # Get or create conversation
         conversation = None
@@ -116,11 +246,7 @@ async def chat(
         conversation_id_public: str | None = None
         if request.conversation_id:
             conversation_id_public = str(request.conversation_id)
-            try:
-                conversation_id_uuid = uuid.UUID(request.conversation_id) if isinstance(request.conversation_id, str) else request.conversation_id
-            except Exception:
-                # Stable mapping for non-UUID client IDs
-                conversation_id_uuid = uuid.uuid5(uuid.NAMESPACE_URL, f"conversation:{user_uuid}:{request.conversation_id}")
+            conversation_id_uuid = _conversation_uuid(request.conversation_id, user_uuid)
             conversation = conversation_repo.get_conversation(conversation_id_uuid)
             if conversation:
                 conversation_id = conversation.id
@@ -142,41 +268,29 @@ async def chat(
         if conversation_id_public is None:
             conversation_id_public = str(conversation_id)
         
-        # Fetch conversation history from database
+        # Prompt history: cached turns, or the recent window decrypted concurrently
         conversation_history = None
+        history_loaded = False
+        history_last_id = None
         try:
-            messages = conversation_repo.get_conversation_messages(conversation_id)
-            # Build conversation history for GPT (decrypting stored ciphertext)
-            history: list[dict] = []
-            if encryption_client:
-                for m in messages[-10:]:
-                    try:
-                        plaintext = await encryption_client.decrypt_text(
-                            ciphertext=m.encrypted_content,
-                            key_id=f"conversation:{conversation_id}",
-                        )
-                        history.append(
-                            {
-                                "role": "assistant" if m.message_type == "ai" else "user",
-                                "content": plaintext,
-                            }
-                        )
-                    except Exception as e:
-                        logger.warning(f"Failed to decrypt message {getattr(m, 'id', None)}: {e}")
+            history, history_last_id = await _conversation_history(conversation_repo, conversation_id)
+            history_loaded = True
             conversation_history = history or None
         except Exception as e:
             logger.warning(f"Failed to fetch conversation history: {e}")
         
         # Generate response using GPT
-        response_text = await gpt_service.generate_response(
-            user_message=request.message,
-            conversation_history=conversation_history,
-            emotion_context=request.emotion_context,
-            dissonance_context=request.dissonance_context,
-            cultural_context=request.cultural_context
-        )
+        with time_inference("gpt_response"):
+            response_text = await with_deadline(gpt_service.generate_response(
+                user_message=request.message,
+                conversation_history=conversation_history,
+                emotion_context=request.emotion_context,
+                dissonance_context=request.dissonance_context,
+                cultural_context=request.cultural_context
+            ))
         
         # Store user message (encrypted at rest via encryption-service)
+        user_message = None
         try:
             if not encryption_client:
                 raise RuntimeError("Encryption client not initialized")
@@ -184,7 +298,7 @@ async def chat(
                 plaintext=request.message,
                 key_id=f"conversation:{conversation_id}",
             )
-            conversation_repo.create_message(
+            user_message = conversation_repo.create_message(
                 conversation_id=conversation_id,
                 message_type="user",
                 encrypted_content=enc.ciphertext,
@@ -201,6 +315,7 @@ async def chat(
             response_type = "supportive"
         
         # Store AI response (encrypted at rest via encryption-service)
+        ai_message = None
         try:
             if not encryption_client:
                 raise RuntimeError("Encryption client not initialized")
@@ -208,7 +323,7 @@ async def chat(
                 plaintext=response_text,
                 key_id=f"conversation:{conversation_id}",
             )
-            conversation_repo.create_message(
+            ai_message = conversation_repo.create_message(
                 conversation_id=conversation_id,
                 message_type="ai",
                 encrypted_content=enc.ciphertext,
@@ -217,6 +332,20 @@ async def chat(
         except Exception as e:
             logger.error(f"Failed to store AI message: {e}")
         
+        # Roll the cached history forward, or drop it if it no longer matches what is stored
+        if history_loaded and user_message is not None and ai_message is not None:
+            context_cache.append(
+                conversation_id,
+                [
+                    {"role": "user", "content": request.message},
+                    {"role": "assistant", "content": response_text},
+                ],
+                previous_message_id=history_last_id,
+                last_message_id=ai_message.id,
+            )
+        else:
+            context_cache.invalidate(conversation_id)
+        
         response = ChatResponse(
             conversation_id=conversation_id_public,
             message=response_text,
@@ -233,6 +362,8 @@ async def chat(
         logger.info(f"Response generated successfully for conversation: {conversation_id}")
         return response
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error generating response: {str(e)}")
         raise HTTPException(
@@ -241,6 +372,58 @@ async def chat(
         )
 
 
+@app.post("/conversations/{conversation_id}/end")
+async def end_conversation(
+    conversation_id: str,
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Mark one of the caller's conversations as ended and drop its cached context
+    """
+    conversation_repo = ConversationRepository(db)
+    conversation_uuid = _owned_conversation_uuid(conversation_id, credentials, conversation_repo)
+    try:
+        ended = conversation_repo.update_conversation(conversation_uuid, ended_at=datetime.now(timezone.utc))
+    except Exception as e:
+        logger.error(f"Error ending conversation: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to end conversation: {str(e)}"
+        )
+    finally:
+        context_cache.invalidate(conversation_uuid)
+    if not ended:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return {"conversation_id": conversation_id, "ended": True}
+
+
+@app.delete("/conversations/{conversation_id}")
+async def delete_conversation(
+    conversation_id: str,
+    db: Session = Depends(get_db),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Delete one of the caller's conversations with its messages and drop its cached context
+    """
+    conversation_repo = ConversationRepository(db)
+    conversation_uuid = _owned_conversation_uuid(conversation_id, credentials, conversation_repo)
+    try:
+        deleted = conversation_repo.delete_conversation(conversation_uuid)
+    except Exception as e:
+        logger.error(f"Error deleting conversation: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete conversation: {str(e)}"
+        )
+    finally:
+        context_cache.invalidate(conversation_uuid)
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return {"conversation_id": conversation_id, "deleted": True}
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -180,7 +180,78 @@ class ConversationRepository:
             .all()
         )
     
+    def get_recent_messages(
+        self,
+        conversation_id: UUID,
+        limit: int = 5
+    ) -> List[Message]:
+        """
+        Get the newest messages of a conversation
+        
+        Reads newest-first so the (conversation_id, created_at) index bounds the
+        scan to `limit` rows, however long the conversation is.
+        
+        Args:
+            conversation_id: Conversation ID
+            limit: Number of most recent messages
+            
+        Returns:
+            Up to `limit` Message instances in chronological order
+        """
+        if limit <= 0:
+            return []
+        messages = (
+            self.db.query(Message)
+            .filter(Message.conversation_id == conversation_id)
+            .order_by(desc(Message.created_at))
+            .limit(limit)
+            .all()
+        )
+        messages.reverse()
+        return messages
+    
+    def get_latest_message_id(self, conversation_id: UUID) -> Optional[UUID]:
+        """
+        Get the ID of the newest message in a conversation
+        
+        Args:
+            conversation_id: Conversation ID
+            
+        Returns:
+            Message ID, or None if the conversation has no messages
+        """
+        row = (
+            self.db.query(Message.id)
+            .filter(Message.conversation_id == conversation_id)
+            .order_by(desc(Message.created_at))
+            .first()
+        )
+        return row[0] if row else None
+    
     def get_message(self, message_id: UUID) -> Optional[Message]:
         """Get message by ID"""
         return self.db.query(Message).filter(Message.id == message_id).first()
-
+    
+    def delete_conversation(self, conversation_id: UUID) -> bool:
+        """
+        Delete a conversation and all of its messages
+        
+        Args:
+            conversation_id: Conversation ID
+            
+        Returns:
+            True if the conversation existed
+        """
+        conversation = self.get_conversation(conversation_id)
+        if not conversation:
+            return False
+        try:
+            self.db.query(Message).filter(Message.conversation_id == conversation_id).delete(synchronize_session=False)
+            self.db.delete(conversation)
+            self.db.commit()
+            logger.info(f"Deleted conversation {conversation_id}")
+            return True
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error deleting conversation: {e}")
+            raise
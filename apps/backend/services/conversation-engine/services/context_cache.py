@@ -0,0 +1,158 @@
+"""Rolling per-conversation context cache for conversation-engine.
+
+Purpose:
+- Keep the last K decrypted turns of active conversations in process memory,
+  so a steady-state `/chat` turn builds its prompt history without calling
+  the encryption-service.
+
+Design notes:
+- Entries record the id of the newest stored message they include. Callers
+  compare it with the newest message id in the database (one indexed lookup,
+  no decryption) before trusting an entry, so turns written by another
+  replica or worker are never silently missing from the prompt.
+- `append` only extends an entry that still ends where the caller saw it end;
+  otherwise (a concurrent turn got there first) the entry is dropped and the
+  next turn rebuilds it from the database.
+- Plaintext never leaves the process; entries expire after a short TTL and are
+  invalidated when a conversation ends or is deleted.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class ConversationContext:
+    """Decrypted prompt history of one conversation."""
+
+    turns: List[Dict[str, str]] = field(default_factory=list)
+    last_message_id: Optional[str] = None
+
+
+class ConversationContextCache:
+    """Thread-safe in-process LRU of ConversationContext entries with a TTL."""
+
+    def __init__(self, max_turns: int = 5, ttl_seconds: float = 300.0, max_conversations: int = 2048):
+        self.max_turns = max_turns
+        self.ttl_seconds = ttl_seconds
+        self.max_conversations = max_conversations
+        self._entries: "OrderedDict[str, Tuple[float, ConversationContext]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats_counters = {"hits": 0, "misses": 0, "appends": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_turns > 0 and self.ttl_seconds > 0 and self.max_conversations > 0
+
+    def _live(self, key: str) -> Optional[ConversationContext]:
+        """Entry for `key` if present and unexpired (caller holds the lock)."""
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, context = item
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return context
+
+    def _store(self, key: str, context: ConversationContext) -> None:
+        """Insert or refresh an entry (caller holds the lock)."""
+        context.turns = context.turns[-self.max_turns:]
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, context)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_conversations:
+            self._entries.popitem(last=False)
+
+    def get(self, conversation_id: Any) -> Optional[ConversationContext]:
+        """Copy of the cached context, or None on a miss."""
+        key = str(conversation_id)
+        with self._lock:
+            context = self._live(key)
+            if context is None:
+                self.stats_counters["misses"] += 1
+                return None
+            self.stats_counters["hits"] += 1
+            self._entries.move_to_end(key)
+            return ConversationContext(turns=list(context.turns), last_message_id=context.last_message_id)
+
+    def put(self, conversation_id: Any, turns: Sequence[Dict[str, str]], last_message_id: Optional[Any]) -> None:
+        """
+        Cache a conversation's history as read from the database
+
+        Args:
+            conversation_id: Conversation ID
+            turns: Decrypted turns in chronological order (trimmed to the last max_turns)
+            last_message_id: ID of the newest stored message, None for an empty conversation
+        """
+        if not self.enabled:
+            return
+        context = ConversationContext(
+            turns=list(turns),
+            last_message_id=str(last_message_id) if last_message_id is not None else None,
+        )
+        with self._lock:
+            self._store(str(conversation_id), context)
+
+    def append(
+        self,
+        conversation_id: Any,
+        turns: Sequence[Dict[str, str]],
+        previous_message_id: Optional[Any],
+        last_message_id: Any
+    ) -> bool:
+        """
+        Append the turns of a completed exchange to a cached conversation
+
+        Args:
+            conversation_id: Conversation ID
+            turns: New turns in chronological order
+            previous_message_id: Newest message ID the caller saw before storing its turns
+            last_message_id: ID of the newest message now stored
+
+        Returns:
+            True if the entry was extended; False if there was no entry or it
+            no longer ended at `previous_message_id` (the entry is then dropped)
+        """
+        key = str(conversation_id)
+        previous = str(previous_message_id) if previous_message_id is not None else None
+        with self._lock:
+            context = self._live(key)
+            if context is None:
+                return False
+            if context.last_message_id != previous:
+                del self._entries[key]
+                self.stats_counters["invalidations"] += 1
+                return False
+            context.turns.extend(turns)
+            context.last_message_id = str(last_message_id)
+            self._store(key, context)
+            self.stats_counters["appends"] += 1
+            return True
+
+    def invalidate(self, conversation_id: Any) -> bool:
+        """Drop a conversation's entry; True if one was cached."""
+        with self._lock:
+            removed = self._entries.pop(str(conversation_id), None) is not None
+            if removed:
+                self.stats_counters["invalidations"] += 1
+            return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "conversations": len(self._entries),
+            "max_turns": self.max_turns,
+            "ttl_seconds": self.ttl_seconds,
+            **self.stats_counters,
+        }
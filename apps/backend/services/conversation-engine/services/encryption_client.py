@@ -7,16 +7,23 @@ Design notes:
 - Uses encryption-service `/encrypt` and `/decrypt` endpoints (service-managed key).
 - Stores raw ciphertext bytes (decoded from the service's base64) in the DB.
 - Decryption re-encodes bytes back to base64 to match the encryption-service contract.
+- `decrypt_many` issues the `/decrypt` calls concurrently, so history assembly
+  costs one round-trip rather than one per message. (The service's batch
+  endpoints are the password-keyed `/e2e/*` ones, which don't apply here.)
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import logging
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Sequence
 
 import httpx
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class EncryptionResult:
@@ -62,3 +69,21 @@ class EncryptionClient:
         if data is None:
             raise RuntimeError("Decryption service returned empty data")
         return str(data)
+
+    async def decrypt_many(self, *, ciphertexts: Sequence[bytes], key_id: Optional[str] = None) -> List[Optional[str]]:
+        """Decrypt several ciphertexts concurrently.
+
+        Returns plaintexts in input order; an entry is None where that decryption failed.
+        """
+        results = await asyncio.gather(
+            *(self.decrypt_text(ciphertext=ciphertext, key_id=key_id) for ciphertext in ciphertexts),
+            return_exceptions=True,
+        )
+        plaintexts: List[Optional[str]] = []
+        for index, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.warning(f"Failed to decrypt item {index} of {len(results)}: {result}")
+                plaintexts.append(None)
+            else:
+                plaintexts.append(result)
+        return plaintexts
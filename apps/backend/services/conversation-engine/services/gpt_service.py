@@ -17,11 +17,19 @@ logger = logging.getLogger(__name__)
 class GPTService:
     """Service for interacting with OpenAI GPT-4"""
     
-    def __init__(self, api_key: str, model: str = "gpt-4", max_tokens: int = 500, temperature: float = 0.7):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4",
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        history_window: int = 5
+    ):
         self.api_key = api_key
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
+        self.history_window = history_window
         
         # OpenAI library may not be installed in some environments.
         if api_key and openai is not None and hasattr(openai, "api_key"):
@@ -60,8 +68,8 @@ class GPTService:
             messages = [{"role": "system", "content": system_prompt}]
             
             # Add conversation history
-            if conversation_history:
-                for msg in conversation_history[-5:]:  # Last 5 messages for context
+            if conversation_history and self.history_window > 0:
+                for msg in conversation_history[-self.history_window:]:
                     messages.append({
                         "role": msg.get("role", "user"),
                         "content": msg.get("content", "")
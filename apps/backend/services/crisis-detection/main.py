@@ -12,6 +12,8 @@ import logging
 from datetime import datetime
 import uuid
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 from models.crisis_models import (
     CrisisDetectionRequest, CrisisDetectionResponse,
@@ -52,6 +54,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -26,7 +26,38 @@ class Settings(BaseSettings):
     # Knowledge Base Indexing
     AUTO_INDEX_KB: bool = os.getenv("AUTO_INDEX_KB", "true").lower() == "true"
     KB_INDEX_BATCH_SIZE: int = int(os.getenv("KB_INDEX_BATCH_SIZE", "100"))
+    # Entry id -> content hash -> model manifest for Pinecone/Weaviate, so restarts re-embed only changed entries
+    # (defaults to kb_index_manifest.json beside kb.json on the mounted volume, or the service data/ dir)
+    KB_INDEX_MANIFEST_PATH: str = os.getenv("KB_INDEX_MANIFEST_PATH", "")
+    VECTOR_UPSERT_BATCH_SIZE: int = int(os.getenv("VECTOR_UPSERT_BATCH_SIZE", "100"))  # Vectors per upsert request
+    VECTOR_DELETE_BATCH_SIZE: int = int(os.getenv("VECTOR_DELETE_BATCH_SIZE", "1000"))  # Ids per delete request
     USE_RAG: bool = os.getenv("USE_RAG", "true").lower() == "true"
+    # In-memory vector index (used when no vector DB is configured)
+    RAG_INDEX_MODE: str = os.getenv("RAG_INDEX_MODE", "exact")  # exact | ivf | hnsw
+    RAG_INDEX_PATH: str = os.getenv("RAG_INDEX_PATH", "")  # Persist and memory-map the index here
+    # Prebuilt read-only vector store (scripts/setup_vector_db.py --provider local); preferred over Pinecone/Weaviate when set
+    LOCAL_VECTOR_STORE_PATH: str = os.getenv("LOCAL_VECTOR_STORE_PATH", "")
+    
+    # Embedding cache and batching
+    EMBEDDING_CACHE_SIZE: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))  # In-process LRU entries
+    EMBEDDING_CACHE_URL: str = os.getenv("EMBEDDING_CACHE_URL", "")  # redis://... or SQLite file path; empty = in-process only
+    EMBEDDING_CACHE_TTL_SECONDS: int = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))  # Redis tier only
+    EMBEDDING_BATCH_SIZE: int = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))  # Texts per model call in embed_batch
+    EMBEDDING_BATCH_WINDOW_MS: float = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))  # 0 disables micro-batching
+    EMBEDDING_BATCH_MAX: int = int(os.getenv("EMBEDDING_BATCH_MAX", "32"))
+    # /context cache tiers in front of the DB cache
+    CONTEXT_CACHE_MAX_ENTRIES: int = int(os.getenv("CONTEXT_CACHE_MAX_ENTRIES", "2048"))  # In-process LRU size
+    CONTEXT_CACHE_LOCAL_TTL_SECONDS: float = float(os.getenv("CONTEXT_CACHE_LOCAL_TTL_SECONDS", "300"))
+    CONTEXT_CACHE_USE_REDIS: bool = os.getenv("CONTEXT_CACHE_USE_REDIS", "true").lower() == "true"  # Shared tier at REDIS_URL
+    CONTEXT_CACHE_REDIS_TTL_SECONDS: int = int(os.getenv("CONTEXT_CACHE_REDIS_TTL_SECONDS", "3600"))
+    CONTEXT_CACHE_SWEEP_SECONDS: float = float(os.getenv("CONTEXT_CACHE_SWEEP_SECONDS", "900"))  # Expired DB row cleanup; 0 disables
+    # Hybrid BM25 + vector retrieval
+    RETRIEVAL_BUDGET_MS: float = float(os.getenv("RETRIEVAL_BUDGET_MS", "150"))  # Vector results later than this are dropped
+    RETRIEVAL_CANDIDATES: int = int(os.getenv("RETRIEVAL_CANDIDATES", "10"))  # Candidates per ranker before fusion
+    RETRIEVAL_RRF_K: int = int(os.getenv("RETRIEVAL_RRF_K", "60"))
+    CULTURAL_ANALYSIS_MAX_BATCH: int = int(os.getenv("CULTURAL_ANALYSIS_MAX_BATCH", "500"))  # Items per /cultural-analysis/batch call
+    # Seconds between background kb.json / cultural_norms.json change checks (hot reload, 0 disables)
+    KB_RELOAD_CHECK_SECONDS: float = 5.0
     
     # Database
     DATABASE_URL: str = os.getenv(
@@ -4,67 +4,88 @@ Main FastAPI application for cultural context
 """
 
 from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
+import asyncio
 import logging
 from datetime import datetime, timezone
 import os
-import json
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app, record_cache_access
 from config import settings
-from database import get_db
+from database import get_db, get_db_context
 from repositories.cultural_repository import CulturalRepository
+from services.context_cache import ContextCache, LocalTTLCache, context_cache_key
+from services.hybrid_retriever import HybridRetriever
+from services.knowledge_base import KnowledgeBase, get_knowledge_base_manager
+from services.pattern_matcher import PatternMatcher
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 security = HTTPBearer()
 
-KB_DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "kb.json")
-KB_MOUNT_PATH = "/app/data/cultural-knowledge-base/kb.json"
-NORMS_DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "data", "cultural_norms.json")
-NORMS_MOUNT_PATH = "/app/data/cultural-knowledge-base/cultural_norms.json"
 
-
-def _load_kb() -> Dict[str, Any]:
+def _knowledge_base() -> KnowledgeBase:
     """
-    Load cultural knowledge base from either mounted volume path or repo fallback.
+    Current knowledge base snapshot.
 
-    Priority:
-    1) Docker volume mount: /app/data/cultural-knowledge-base/kb.json
-    2) Repo fallback: services/cultural-context/data/kb.json
+    Loaded once and indexed (id map, keyword index, language partitions);
+    reloaded by a background task when kb.json / cultural_norms.json change on
+    disk, or via /admin/reload-kb. Reading it never touches the filesystem.
     """
-    path = KB_MOUNT_PATH if os.path.exists(KB_MOUNT_PATH) else KB_DEFAULT_PATH
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return get_knowledge_base_manager(settings.KB_RELOAD_CHECK_SECONDS).current()
 
 
-def _load_cultural_norms() -> Dict[str, Any]:
-    """
-    Load cultural norms from either mounted volume path or repo fallback.
+# Hot tiers in front of the DB context cache (the DB stays the durable tier)
+_context_cache = ContextCache(
+    local=LocalTTLCache(
+        max_size=settings.CONTEXT_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.CONTEXT_CACHE_LOCAL_TTL_SECONDS
+    ),
+    redis_url=settings.REDIS_URL if settings.CONTEXT_CACHE_USE_REDIS else "",
+    redis_ttl_seconds=settings.CONTEXT_CACHE_REDIS_TTL_SECONDS
+)
 
-    Priority:
-    1) Docker volume mount: /app/data/cultural-knowledge-base/cultural_norms.json
-    2) Repo fallback: services/cultural-context/data/cultural_norms.json
-    
-    Returns:
-        Dictionary containing cultural norms, communication patterns, bias detection rules,
-        local resources, and cultural values. Returns empty dict if file not found.
-    """
-    path = NORMS_MOUNT_PATH if os.path.exists(NORMS_MOUNT_PATH) else NORMS_DEFAULT_PATH
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        logger.warning(f"Cultural norms file not found at {path}, using empty norms")
-        return {}
-    except Exception as e:
-        logger.warning(f"Failed to load cultural norms: {e}, using empty norms")
-        return {}
+# BM25 + vector retrieval fused with RRF
+_retriever = HybridRetriever(
+    budget_ms=settings.RETRIEVAL_BUDGET_MS,
+    depth=settings.RETRIEVAL_CANDIDATES,
+    rrf_k=settings.RETRIEVAL_RRF_K
+)
+
+
+# Fallback word lists, compiled once (used when the analyzers fail to load)
+_FALLBACK_SWAHILI_INDICATORS = [
+    "sawa", "nimechoka", "sijambo", "huzuni", "wasiwasi", "upweke",
+    "asante", "asante sana", "hofu", "pole", "pole sana", "karibu",
+    "mambo", "vipi", "poa", "shida", "hakuna", "hapana", "ndiyo"
+]
+_FALLBACK_ENGLISH_INDICATORS = ["i", "am", "feel", "feeling", "sad", "happy", "tired", "okay", "fine"]
+_FALLBACK_SWAHILI_DEFLECTIONS = {
+    "sawa": "Polite deflection - may indicate not ready to discuss",
+    "sijambo": "Stoic response - may mask deeper feelings",
+    "hakuna shida": "No problem - may minimize concerns",
+    "poa": "Cool/fine - casual deflection"
+}
+_FALLBACK_ENGLISH_DEFLECTIONS = {
+    "i'm fine": "Common deflection",
+    "it's okay": "Minimizing response",
+    "no problem": "Dismissive response",
+    "nothing": "Stoic response"
+}
+_fallback_swahili_matcher = PatternMatcher(_FALLBACK_SWAHILI_INDICATORS)
+_fallback_english_matcher = PatternMatcher(_FALLBACK_ENGLISH_INDICATORS)
+_fallback_deflection_matchers = {
+    "sw": PatternMatcher(_FALLBACK_SWAHILI_DEFLECTIONS),
+    "all": PatternMatcher([*_FALLBACK_ENGLISH_DEFLECTIONS, *_FALLBACK_SWAHILI_DEFLECTIONS]),
+}
 
 
 def _detect_code_switching(text: str) -> Dict[str, Any]:
@@ -85,16 +106,10 @@ def _detect_code_switching(text: str) -> Dict[str, Any]:
         return result
     except Exception as e:
         logger.warning(f"Code-switching analyzer failed, using fallback: {e}")
-        # Fallback to simple detection
+        # Fallback to simple detection (whole words only, one pass per list)
         text_lower = text.lower()
-        swahili_indicators = [
-            "sawa", "nimechoka", "sijambo", "huzuni", "wasiwasi", "upweke",
-            "asante", "asante sana", "hofu", "pole", "pole sana", "karibu",
-            "mambo", "vipi", "poa", "shida", "hakuna", "hapana", "ndiyo"
-        ]
-        swahili_words_found = [word for word in swahili_indicators if word in text_lower]
-        english_indicators = ["i", "am", "feel", "feeling", "sad", "happy", "tired", "okay", "fine"]
-        english_words_found = [word for word in english_indicators if word in text_lower]
+        swahili_words_found = _fallback_swahili_matcher.found(text_lower)
+        english_words_found = _fallback_english_matcher.found(text_lower)
         code_switching_detected = len(swahili_words_found) > 0 and len(english_words_found) > 0
         return {
             "code_switching_detected": code_switching_detected,
@@ -122,93 +137,106 @@ def _detect_deflection(text: str, language: str) -> Dict[str, Any]:
         return result
     except Exception as e:
         logger.warning(f"Deflection detector failed, using fallback: {e}")
-        # Fallback to simple detection
+        # Fallback to simple detection (whole words only, one pass over the text)
         text_lower = text.lower()
-        swahili_deflections = {
-            "sawa": "Polite deflection - may indicate not ready to discuss",
-            "sijambo": "Stoic response - may mask deeper feelings",
-            "hakuna shida": "No problem - may minimize concerns",
-            "poa": "Cool/fine - casual deflection"
-        }
-        english_deflections = {
-            "i'm fine": "Common deflection",
-            "it's okay": "Minimizing response",
-            "no problem": "Dismissive response",
-            "nothing": "Stoic response"
-        }
-        deflection_patterns = swahili_deflections if language == "sw" else english_deflections
-        deflection_patterns.update(swahili_deflections)
+        matcher = _fallback_deflection_matchers["sw" if language == "sw" else "all"]
         detected_deflections = []
-        for pattern, meaning in deflection_patterns.items():
-            if pattern in text_lower:
-                detected_deflections.append({
-                    "pattern": pattern,
-                    "meaning": meaning,
-                    "language": "sw" if pattern in swahili_deflections else "en"
-                })
+        for pattern in matcher.found(text_lower):
+            in_swahili = pattern in _FALLBACK_SWAHILI_DEFLECTIONS
+            detected_deflections.append({
+                "pattern": pattern,
+                "meaning": _FALLBACK_SWAHILI_DEFLECTIONS[pattern] if in_swahili else _FALLBACK_ENGLISH_DEFLECTIONS[pattern],
+                "language": "sw" if in_swahili else "en"
+            })
         return {
             "deflection_detected": len(detected_deflections) > 0,
             "patterns": detected_deflections
         }
 
 
-def _retrieve_entries(kb: Dict[str, Any], query: str, language: str, use_rag: bool = True) -> List[Dict[str, Any]]:
+def _allowed_languages(kb: KnowledgeBase, language: str, code_switching: Dict[str, Any]) -> Set[str]:
     """
-    Retrieve entries using RAG (if available) or keyword-based fallback.
+    Entry languages a query may retrieve.
 
-    Purpose:
-    - Use semantic search via RAG when vector DB is configured.
-    - Fallback to keyword-based retrieval when RAG unavailable.
-    - Includes code-switching and deflection detection.
+    Match language (or language-less entries); allow Swahili entries when the query code-switches.
+
+    Args:
+        kb: Knowledge base snapshot
+        language: Requested language
+        code_switching: The query's _detect_code_switching result
     """
-    # Try RAG first if available
-    if use_rag:
-        try:
-            from services.rag_service import get_rag_service
-            rag_service = get_rag_service()
-            
-            if rag_service.is_available():
-                rag_results = rag_service.search(query, top_k=3, language=language)
-                if rag_results:
-                    # Convert RAG results to entry format
-                    entries = kb.get("entries", []) or []
-                    entry_map = {e.get("id"): e for e in entries}
-                    
-                    retrieved = []
-                    for result in rag_results:
-                        entry_id = result.get("id")
-                        if entry_id in entry_map:
-                            entry = entry_map[entry_id].copy()
-                            entry["rag_score"] = result.get("score", 0)
-                            retrieved.append(entry)
-                    
-                    if retrieved:
-                        logger.info(f"RAG retrieval found {len(retrieved)} entries")
-                        return retrieved
-        except Exception as e:
-            logger.warning(f"RAG retrieval failed, falling back to keyword search: {e}")
-    
-    # Fallback to keyword-based retrieval
-    q = query.lower()
-    entries = kb.get("entries", []) or []
-
-    scored: List[Dict[str, Any]] = []
-    for e in entries:
-        # Match language or allow cross-language matches for code-switching
-        entry_language = e.get("language")
-        if entry_language and entry_language not in (None, "", language):
-            # Still check if it's a Swahili entry when query might have code-switching
-            code_switching_info = _detect_code_switching(query)
-            if not (code_switching_info["code_switching_detected"] and entry_language == "sw"):
-                continue
+    languages = {"", language}
+    if language != "sw" and kb.by_language.get("sw") and code_switching["code_switching_detected"]:
+        languages.add("sw")
+    return languages
+
+
+def _keyword_entries(kb: KnowledgeBase, query: str, languages: Set[str]) -> List[Dict[str, Any]]:
+    """Keyword-based retrieval over the inverted keyword index (substring matches)"""
+    return kb.search_keywords(query, languages, top_k=3)
+
+
+def _vector_service() -> Optional[Any]:
+    """RAG service when a vector backend can serve searches, else None"""
+    try:
+        from services.rag_service import get_rag_service
+        rag_service = get_rag_service()
         
-        keywords = [k.lower() for k in (e.get("keywords") or [])]
-        score = sum(1 for k in keywords if k in q)
-        if score > 0:
-            scored.append({"score": score, "entry": e})
+        if rag_service.is_available():
+            return rag_service
+    except Exception as e:
+        logger.warning(f"RAG service unavailable, using BM25 only: {e}")
+    return None
+
+
+def _retrieve_entries(
+    kb: KnowledgeBase,
+    query: str,
+    language: str,
+    code_switching: Dict[str, Any],
+    use_rag: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve entries with hybrid BM25 + vector search.
 
-    scored.sort(key=lambda x: x["score"], reverse=True)
-    return [s["entry"] for s in scored[:3]]
+    Purpose:
+    - Rank entries with BM25 (Swahili-aware tokens) and, when a vector DB is
+      configured, semantic search; merge both with reciprocal-rank fusion.
+    - Vector results that miss the RETRIEVAL_BUDGET_MS budget are dropped.
+    - The vector search runs unfiltered and fusion applies the same language set
+      as BM25: the index stores language-less entries as "en" and a code-switched
+      query may also retrieve Swahili entries, so a single-language filter would
+      hide entries BM25 accepts.
+    - Fall back to substring keyword matching when neither ranker finds anything.
+    """
+    rag_service = _vector_service() if use_rag else None
+    languages = _allowed_languages(kb, language, code_switching)
+    retrieved = _retriever.retrieve(kb, query, languages, rag_service)
+    if retrieved:
+        return retrieved
+    return _keyword_entries(kb, query, languages)
+
+
+def _retrieve_entries_batch(
+    kb: KnowledgeBase,
+    queries: List[str],
+    language: str,
+    code_switching: List[Dict[str, Any]],
+    use_rag: bool = True
+) -> List[List[Dict[str, Any]]]:
+    """
+    Batch form of _retrieve_entries for queries sharing one language.
+
+    All queries are embedded and vector-searched in one batch under one latency
+    budget; queries with no hybrid hit fall back to keyword retrieval individually.
+    """
+    rag_service = _vector_service() if use_rag and queries else None
+    languages = [_allowed_languages(kb, language, info) for info in code_switching]
+    retrieved = _retriever.retrieve_many(kb, queries, languages, rag_service)
+    return [
+        entries if entries else _keyword_entries(kb, query, query_languages)
+        for query, query_languages, entries in zip(queries, languages, retrieved)
+    ]
 
 
 def _get_cache(context_key: str, db: Session) -> Optional[Dict[str, Any]]:
@@ -216,6 +244,7 @@ def _get_cache(context_key: str, db: Session) -> Optional[Dict[str, Any]]:
     try:
         cultural_repo = CulturalRepository(db)
         cache_entry = cultural_repo.get_cached_context(context_key)
+        record_cache_access("cultural_context", cache_entry is not None)
         if cache_entry:
             return cache_entry.context_data
         return None
@@ -238,10 +267,45 @@ def _set_cache(context_key: str, payload: Dict[str, Any], language: str, db: Ses
     except Exception as e:
         logger.warning(f"Cache write failed: {e}")
 
+def _delete_expired_cache_entries() -> int:
+    """Remove expired rows from the DB context cache."""
+    with get_db_context() as db:
+        return CulturalRepository(db).delete_expired_entries()
+
+
+async def _sweep_expired_cache_entries(interval_seconds: float) -> None:
+    """Background task: purge expired DB cache rows every `interval_seconds`."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(_delete_expired_cache_entries)
+        except Exception as e:
+            logger.warning(f"Context cache sweep failed: {e}")
+
+
+async def _watch_knowledge_base(interval_seconds: float) -> None:
+    """Background task: reload the knowledge base when its files change."""
+    manager = get_knowledge_base_manager(settings.KB_RELOAD_CHECK_SECONDS)
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await run_in_threadpool(manager.reload_if_changed)
+        except Exception as e:
+            logger.warning(f"Knowledge base reload check failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Cultural Context Service...")
     
+    sweeper = None
+    if settings.CONTEXT_CACHE_SWEEP_SECONDS > 0:
+        sweeper = asyncio.create_task(_sweep_expired_cache_entries(settings.CONTEXT_CACHE_SWEEP_SECONDS))
+    
+    kb_watcher = None
+    if settings.KB_RELOAD_CHECK_SECONDS > 0:
+        kb_watcher = asyncio.create_task(_watch_knowledge_base(settings.KB_RELOAD_CHECK_SECONDS))
+    
     # Initialize RAG service and index knowledge base on startup
     if settings.AUTO_INDEX_KB:
         try:
@@ -264,8 +328,7 @@ async def lifespan(app: FastAPI):
             
             # Load and index knowledge base
             try:
-                kb = _load_kb()
-                kb_entries = kb.get("entries", [])
+                kb_entries = list(_knowledge_base().entries)
                 
                 if kb_entries:
                     logger.info(f"Indexing {len(kb_entries)} knowledge base entries...")
@@ -288,11 +351,17 @@ async def lifespan(app: FastAPI):
             logger.info("Service will continue with keyword-based search fallback")
     else:
         logger.info("Auto-indexing disabled (AUTO_INDEX_KB=false)")
+        _knowledge_base()
     
     yield
     
     logger.info("Shutting down Cultural Context Service...")
     
+    if sweeper is not None:
+        sweeper.cancel()
+    if kb_watcher is not None:
+        kb_watcher.cancel()
+    
     # Cleanup vector DB connections
     try:
         from services.rag_service import get_rag_service
@@ -310,6 +379,12 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="Cultural Context Service", version="1.0.0", lifespan=lifespan)
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -357,22 +432,49 @@ async def get_cultural_context(
     if not q:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="query is required")
 
-    context_key = f"{language}:{q.lower()}"
-    cached = _get_cache(context_key, db)
-    if cached:
-        cached["source"] = "db_cache"
-        cached["timestamp"] = datetime.now(timezone.utc).isoformat()
-        return cached
+    # Keyed by snapshot version: a KB reload (hot or admin) misses every tier
+    kb = _knowledge_base()
+    context_key = context_cache_key(language, q, kb.version)
+
+    async def load_context():
+        cached = await run_in_threadpool(_get_cache, context_key, db)
+        if cached:
+            return cached, "db_cache"
+        payload = await _build_context_payload(kb, q, language)
+        await run_in_threadpool(_set_cache, context_key, payload, language, db)
+        return payload, None
+
+    payload, source = await _context_cache.get_or_load(context_key, load_context)
+    record_cache_access("cultural_context_hot", source in ("memory_cache", "redis_cache"))
+    if source:
+        # Cached payloads are shared between requests: copy before stamping
+        payload = {**payload, "source": source, "timestamp": datetime.now(timezone.utc).isoformat()}
+    return payload
 
-    kb = _load_kb()
-    cultural_norms = _load_cultural_norms()
-    
+
+async def _build_context_payload(kb: KnowledgeBase, q: str, language: str) -> Dict[str, Any]:
+    """Build the /context payload for a query from a knowledge base snapshot (no caching)"""
     # Check if RAG should be used (default: True if available)
     use_rag = os.getenv("USE_RAG", "true").lower() == "true"
-    retrieved = _retrieve_entries(kb, q, language, use_rag=use_rag)
+    # Off the event loop: query embedding may wait on the model, and concurrent
+    # misses are coalesced into one batch by the embedding service
+    # Detected once per query; retrieval and the payload both use it
+    code_switching = _detect_code_switching(q)
+    retrieved = await run_in_threadpool(_retrieve_entries, kb, q, language, code_switching, use_rag=use_rag)
+    return _compose_context_payload(kb, q, language, retrieved, code_switching)
+
+
+def _compose_context_payload(
+    kb: KnowledgeBase,
+    q: str,
+    language: str,
+    retrieved: List[Dict[str, Any]],
+    code_switching_info: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Assemble the /context payload from already-retrieved entries and the query's code-switching result"""
+    cultural_norms = kb.norms
     
-    # Detect code-switching and deflection
-    code_switching_info = _detect_code_switching(q)
+    # Detect deflection (code-switching was detected before retrieval)
     deflection_info = _detect_deflection(q, language)
 
     # Build context lines, enriched with cultural norms if available
@@ -464,7 +566,6 @@ async def get_cultural_context(
     else:
         payload["cultural_norms_loaded"] = False
 
-    _set_cache(context_key, payload, language, db)
     return payload
 
 
@@ -479,7 +580,8 @@ async def check_bias(
     
     try:
         from services.bias_detector import get_bias_detector
-        detector = get_bias_detector()
+        # Rules recompile when the knowledge base snapshot (and its norms) is reloaded
+        detector = get_bias_detector(_knowledge_base().norms)
         assessment = detector.assess_overall_sensitivity(text)
         return assessment
     except Exception as e:
@@ -498,11 +600,15 @@ async def index_knowledge_base_endpoint(
     """
     Manually trigger knowledge base re-indexing.
     
+    Incremental by default: only entries whose content or embedding model
+    changed are re-embedded, and entries removed from kb.json are deleted.
+    
     Args:
-        clear_existing: If True, clear existing vectors before re-indexing
+        clear_existing: If True, clear existing vectors and re-embed every entry
         
     Returns:
-        Dictionary with indexing results
+        Dictionary with indexing results, including the diff
+        (added / changed / unchanged / removed)
     """
     try:
         from services.rag_service import get_rag_service
@@ -531,8 +637,7 @@ async def index_knowledge_base_endpoint(
         
         # Load and index knowledge base
         try:
-            kb = _load_kb()
-            kb_entries = kb.get("entries", [])
+            kb_entries = list(_knowledge_base().entries)
             
             if not kb_entries:
                 return {
@@ -543,7 +648,9 @@ async def index_knowledge_base_endpoint(
                 }
             
             logger.info(f"Indexing {len(kb_entries)} knowledge base entries...")
-            indexed_count = rag_service.index_knowledge_base(kb_entries)
+            # Incremental: only new/changed entries are embedded, removed ones deleted
+            diff = await run_in_threadpool(rag_service.sync_knowledge_base, kb_entries, full=clear_existing)
+            indexed_count = diff["indexed_count"]
             
             # Get index stats
             stats = rag_service.get_index_stats()
@@ -554,6 +661,7 @@ async def index_knowledge_base_endpoint(
                 "indexed_count": indexed_count,
                 "total_entries": len(kb_entries),
                 "vector_db_type": rag_service.vector_db_type,
+                "diff": diff,
                 "stats": stats
             }
             
@@ -573,6 +681,35 @@ async def index_knowledge_base_endpoint(
         )
 
 
+@app.post("/admin/reload-kb")
+async def reload_knowledge_base(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Reload kb.json and cultural_norms.json now instead of waiting for the mtime check.
+    
+    The new snapshot replaces the old one atomically; if the files fail to
+    parse, the current snapshot stays in service. Vectors are not touched
+    (use /index-kb to re-embed).
+    """
+    try:
+        manager = get_knowledge_base_manager(settings.KB_RELOAD_CHECK_SECONDS)
+        reloaded = manager.reload()
+        if reloaded:
+            # Keys carry the snapshot version, so old entries are unreachable; free them now
+            _context_cache.clear()
+        return {
+            "success": reloaded,
+            "stats": manager.current().stats()
+        }
+    except Exception as e:
+        logger.error(f"Failed to reload knowledge base: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reload knowledge base: {str(e)}"
+        )
+
+
 # Add request models
 class CulturalAnalysisRequest(BaseModel):
     text: str
@@ -580,6 +717,156 @@ class CulturalAnalysisRequest(BaseModel):
     emotion: Optional[str] = None
     voice_features: Optional[Dict[str, Any]] = None
 
+def _analyze_context(
+    request: CulturalAnalysisRequest,
+    context_response: Dict[str, Any],
+    cultural_norms: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Risk factors, guidance and response adaptations for one analyzed text.
+    
+    Args:
+        request: The text with its language, emotion and voice features
+        context_response: /context payload for the text
+        cultural_norms: Loaded cultural norms (may be empty)
+        
+    Returns:
+        Comprehensive cultural analysis for conversation engine
+    """
+    # Enhanced analysis with voice features
+    analysis = {
+        "text": request.text,
+        "language": request.language,
+        "emotion": request.emotion,
+        "cultural_context": context_response,
+        "risk_factors": [],
+        "conversation_guidance": {},
+        "response_adaptations": []
+    }
+    
+    # Analyze deflection patterns with severity assessment
+    deflection_info = context_response.get("deflection_analysis", {})
+    if deflection_info.get("deflection_detected"):
+        patterns = deflection_info.get("patterns", [])
+        high_risk_patterns = [p for p in patterns if p.get("severity") == "high"]
+        medium_risk_patterns = [p for p in patterns if p.get("severity") == "medium"]
+        critical_risk_patterns = [p for p in patterns if p.get("severity") == "critical"]
+        
+        if critical_risk_patterns:
+            analysis["risk_factors"].append({
+                "type": "critical_risk_deflection",
+                "patterns": critical_risk_patterns,
+                "recommendation": "CRISIS INTERVENTION REQUIRED: Suicide ideation or severe hopelessness detected. Assess safety immediately."
+            })
+        
+        if high_risk_patterns:
+            analysis["risk_factors"].append({
+                "type": "high_risk_deflection",
+                "patterns": high_risk_patterns,
+                "recommendation": "Gentle probing needed, possible crisis risk"
+            })
+        
+        if medium_risk_patterns:
+            analysis["risk_factors"].append({
+                "type": "medium_risk_deflection", 
+                "patterns": medium_risk_patterns,
+                "recommendation": "Supportive exploration recommended"
+            })
+    
+    # Analyze code-switching with emotional correlation
+    code_switching_info = context_response.get("code_switching_analysis", {})
+    if code_switching_info.get("code_switching_detected"):
+        intensity = code_switching_info.get("intensity", "low")
+        analysis["conversation_guidance"]["code_switching"] = {
+            "detected": True,
+            "intensity": intensity,
+            "recommendation": f"Code-switching indicates {intensity} emotional intensity. Consider mirroring language preference."
+        }
+    
+    # Voice-text contradiction analysis
+    if request.voice_features and request.emotion:
+        contradiction_detected = False
+        contradiction_details = []
+        
+        # Check for common contradictions
+        if request.emotion in ["sad", "depressed"] and any(word in request.text.lower() for word in ["fine", "okay", "sawa", "poa"]):
+            contradiction_detected = True
+            contradiction_details.append({
+                "type": "sad_voice_positive_words",
+                "description": "Voice indicates sadness but words suggest being okay",
+                "severity_multiplier": 1.5
+            })
+        
+        if request.emotion in ["anxious", "stressed"] and any(word in request.text.lower() for word in ["normal", "kawaida", "fine"]):
+            contradiction_detected = True
+            contradiction_details.append({
+                "type": "anxious_voice_normal_words",
+                "description": "Voice indicates anxiety but words suggest normalcy",
+                "severity_multiplier": 1.3
+            })
+            contradiction_detected = True
+            contradiction_details.append({
+                "type": "anxious_voice_normal_words",
+                "description": "Voice indicates anxiety but words suggest normalcy",
+                "severity_multiplier": 1.3
+            })
+        
+        if contradiction_detected:
+            analysis["risk_factors"].append({
+                "type": "voice_text_contradiction",
+                "details": contradiction_details,
+                "recommendation": "Voice and words don't match - gentle exploration of true feelings needed"
+            })
+    
+    # Generate conversation guidance
+    # Response adaptation suggestions
+    if request.language == "sw" or code_switching_info.get("code_switching_detected"):
+        analysis["response_adaptations"].append({
+            "type": "language_preference",
+            "suggestion": "Consider incorporating Swahili phrases or acknowledging code-switching"
+        })
+    
+    if deflection_info.get("deflection_detected"):
+        patterns = deflection_info.get("patterns", [])
+        for pattern in patterns:
+            probe_suggestions = pattern.get("probe_suggestions", [])
+            if probe_suggestions:
+                analysis["response_adaptations"].append({
+                    "type": "deflection_response",
+                    "pattern": pattern.get("pattern"),
+                    "suggestions": probe_suggestions[:2]  # Top 2 suggestions
+                })
+    
+    # Cultural sensitivity guidance
+    if cultural_norms:
+        values = cultural_norms.get("cultural_values", {})
+        if "privacy_and_family_reputation" in values:
+            analysis["conversation_guidance"]["privacy"] = {
+                "importance": "high",
+                "recommendation": "Emphasize confidentiality and frame help-seeking as protecting family"
+            }
+        
+        if "spiritual_and_religious_beliefs" in values:
+            analysis["conversation_guidance"]["spirituality"] = {
+                "importance": "high", 
+                "recommendation": "Respect spiritual beliefs and integrate them into support"
+            }
+    
+    # Overall risk assessment
+    risk_level = "low"
+    if any(rf["type"] == "critical_risk_deflection" for rf in analysis["risk_factors"]):
+        risk_level = "critical"
+    elif any(rf["type"] == "high_risk_deflection" for rf in analysis["risk_factors"]):
+        risk_level = "high"
+    elif any(rf["type"] in ["medium_risk_deflection", "voice_text_contradiction"] for rf in analysis["risk_factors"]):
+        risk_level = "medium"
+    
+    analysis["overall_risk_level"] = risk_level
+    analysis["timestamp"] = datetime.now(timezone.utc).isoformat()
+    
+    return analysis
+
+
 @app.post("/cultural-analysis")
 async def analyze_cultural_patterns(
     request: CulturalAnalysisRequest,
@@ -611,148 +898,109 @@ async def analyze_cultural_patterns(
             credentials=credentials
         )
         
-        # Enhanced analysis with voice features
-        analysis = {
-            "text": request.text,
-            "language": request.language,
-            "emotion": request.emotion,
-            "cultural_context": context_response,
-            "risk_factors": [],
-            "conversation_guidance": {},
-            "response_adaptations": []
-        }
-        
-        # Analyze deflection patterns with severity assessment
-        deflection_info = context_response.get("deflection_analysis", {})
-        if deflection_info.get("deflection_detected"):
-            patterns = deflection_info.get("patterns", [])
-            high_risk_patterns = [p for p in patterns if p.get("severity") == "high"]
-            medium_risk_patterns = [p for p in patterns if p.get("severity") == "medium"]
-            critical_risk_patterns = [p for p in patterns if p.get("severity") == "critical"]
-            
-            if critical_risk_patterns:
-                analysis["risk_factors"].append({
-                    "type": "critical_risk_deflection",
-                    "patterns": critical_risk_patterns,
-                    "recommendation": "CRISIS INTERVENTION REQUIRED: Suicide ideation or severe hopelessness detected. Assess safety immediately."
-                })
-            
-            if high_risk_patterns:
-                analysis["risk_factors"].append({
-                    "type": "high_risk_deflection",
-                    "patterns": high_risk_patterns,
-                    "recommendation": "Gentle probing needed, possible crisis risk"
-                })
-            
-            if medium_risk_patterns:
-                analysis["risk_factors"].append({
-                    "type": "medium_risk_deflection", 
-                    "patterns": medium_risk_patterns,
-                    "recommendation": "Supportive exploration recommended"
-                })
-        
-        # Analyze code-switching with emotional correlation
-        code_switching_info = context_response.get("code_switching_analysis", {})
-        if code_switching_info.get("code_switching_detected"):
-            intensity = code_switching_info.get("intensity", "low")
-            analysis["conversation_guidance"]["code_switching"] = {
-                "detected": True,
-                "intensity": intensity,
-                "recommendation": f"Code-switching indicates {intensity} emotional intensity. Consider mirroring language preference."
-            }
-        
-        # Voice-text contradiction analysis
-        if request.voice_features and request.emotion:
-            contradiction_detected = False
-            contradiction_details = []
-            
-            # Check for common contradictions
-            if request.emotion in ["sad", "depressed"] and any(word in request.text.lower() for word in ["fine", "okay", "sawa", "poa"]):
-                contradiction_detected = True
-                contradiction_details.append({
-                    "type": "sad_voice_positive_words",
-                    "description": "Voice indicates sadness but words suggest being okay",
-                    "severity_multiplier": 1.5
-                })
-            
-            if request.emotion in ["anxious", "stressed"] and any(word in request.text.lower() for word in ["normal", "kawaida", "fine"]):
-                contradiction_detected = True
-                contradiction_details.append({
-                    "type": "anxious_voice_normal_words",
-                    "description": "Voice indicates anxiety but words suggest normalcy",
-                    "severity_multiplier": 1.3
-                })
-                contradiction_detected = True
-                contradiction_details.append({
-                    "type": "anxious_voice_normal_words",
-                    "description": "Voice indicates anxiety but words suggest normalcy",
-                    "severity_multiplier": 1.3
-                })
-            
-            if contradiction_detected:
-                analysis["risk_factors"].append({
-                    "type": "voice_text_contradiction",
-                    "details": contradiction_details,
-                    "recommendation": "Voice and words don't match - gentle exploration of true feelings needed"
-                })
-        
-        # Generate conversation guidance
-        cultural_norms = _load_cultural_norms()
+        return _analyze_context(request, context_response, _knowledge_base().norms)
         
-        # Response adaptation suggestions
-        if request.language == "sw" or code_switching_info.get("code_switching_detected"):
-            analysis["response_adaptations"].append({
-                "type": "language_preference",
-                "suggestion": "Consider incorporating Swahili phrases or acknowledging code-switching"
-            })
-        
-        if deflection_info.get("deflection_detected"):
-            patterns = deflection_info.get("patterns", [])
-            for pattern in patterns:
-                probe_suggestions = pattern.get("probe_suggestions", [])
-                if probe_suggestions:
-                    analysis["response_adaptations"].append({
-                        "type": "deflection_response",
-                        "pattern": pattern.get("pattern"),
-                        "suggestions": probe_suggestions[:2]  # Top 2 suggestions
-                    })
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Cultural analysis failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Cultural analysis failed: {str(e)}"
+        )
+
+
+class CulturalAnalysisBatchRequest(BaseModel):
+    items: List[CulturalAnalysisRequest]
+
+
+def _build_context_payloads(
+    kb: KnowledgeBase,
+    queries: List[str],
+    language: str,
+    use_rag: bool
+) -> List[Dict[str, Any]]:
+    """/context payloads for queries sharing one language, retrieved as a batch"""
+    code_switching = [_detect_code_switching(q) for q in queries]
+    retrieved = _retrieve_entries_batch(kb, queries, language, code_switching, use_rag=use_rag)
+    return [
+        _compose_context_payload(kb, q, language, entries, info)
+        for q, entries, info in zip(queries, retrieved, code_switching)
+    ]
+
+
+@app.post("/cultural-analysis/batch")
+async def analyze_cultural_patterns_batch(
+    request: CulturalAnalysisBatchRequest,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """
+    Cultural analysis for many texts in one call (overnight pattern pipeline, sync replays).
+    
+    Texts with the same context cache key are analyzed once. Uncached texts are
+    embedded in one batch and scored in one vector pass per language; pattern
+    detection runs once per distinct text. The in-process/Redis context cache is
+    read and filled, the DB cache is not (a replay would otherwise mean one
+    upsert per transcript).
+    
+    Returns:
+        {"results": [...], "count", "unique_texts", "timestamp"}; results follow
+        the input order, and items with empty text get {"error": "text is required"}
+    """
+    items = request.items
+    if len(items) > settings.CULTURAL_ANALYSIS_MAX_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.CULTURAL_ANALYSIS_MAX_BATCH} items per batch"
+        )
+    
+    try:
+        kb = _knowledge_base()
+        use_rag = os.getenv("USE_RAG", "true").lower() == "true"
         
-        # Cultural sensitivity guidance
-        if cultural_norms:
-            values = cultural_norms.get("cultural_values", {})
-            if "privacy_and_family_reputation" in values:
-                analysis["conversation_guidance"]["privacy"] = {
-                    "importance": "high",
-                    "recommendation": "Emphasize confidentiality and frame help-seeking as protecting family"
-                }
-            
-            if "spiritual_and_religious_beliefs" in values:
-                analysis["conversation_guidance"]["spirituality"] = {
-                    "importance": "high", 
-                    "recommendation": "Respect spiritual beliefs and integrate them into support"
-                }
+        keys = [
+            context_cache_key(item.language, item.text, kb.version) if item.text and item.text.strip() else None
+            for item in items
+        ]
+        unique: Dict[str, CulturalAnalysisRequest] = {}
+        for key, item in zip(keys, items):
+            if key is not None and key not in unique:
+                unique[key] = item
         
-        # Overall risk assessment
-        risk_level = "low"
-        if any(rf["type"] == "critical_risk_deflection" for rf in analysis["risk_factors"]):
-            risk_level = "critical"
-        elif any(rf["type"] == "high_risk_deflection" for rf in analysis["risk_factors"]):
-            risk_level = "high"
-        elif any(rf["type"] in ["medium_risk_deflection", "voice_text_contradiction"] for rf in analysis["risk_factors"]):
-            risk_level = "medium"
+        contexts: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, List[str]] = {}
+        for key, item in unique.items():
+            cached, source = await _context_cache.get(key)
+            if cached is not None:
+                contexts[key] = {**cached, "source": source}
+            else:
+                pending.setdefault(item.language, []).append(key)
         
-        analysis["overall_risk_level"] = risk_level
-        analysis["timestamp"] = datetime.now(timezone.utc).isoformat()
+        for language, language_keys in pending.items():
+            queries = [unique[key].text.strip() for key in language_keys]
+            payloads = await run_in_threadpool(_build_context_payloads, kb, queries, language, use_rag)
+            for key, payload in zip(language_keys, payloads):
+                await _context_cache.set(key, payload)
+                contexts[key] = payload
         
-        return analysis
+        results = [
+            _analyze_context(item, contexts[key], kb.norms) if key is not None else {"error": "text is required"}
+            for key, item in zip(keys, items)
+        ]
+        return {
+            "results": results,
+            "count": len(results),
+            "unique_texts": len(unique),
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Cultural analysis failed: {e}")
+        logger.error(f"Batch cultural analysis failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Cultural analysis failed: {str(e)}"
+            detail=f"Batch cultural analysis failed: {str(e)}"
         )
 
 
@@ -42,7 +42,8 @@ class CulturalRepository:
         if not cache_entry:
             return None
         
-        # Check if expired
+        # Check if expired (rows are removed by the delete_expired_entries sweeper,
+        # so reads never write)
         if cache_entry.expires_at:
             expires_at = cache_entry.expires_at
             now = datetime.now(timezone.utc)
@@ -50,9 +51,6 @@ class CulturalRepository:
             if getattr(expires_at, "tzinfo", None) is None:
                 expires_at = expires_at.replace(tzinfo=timezone.utc)
             if expires_at < now:
-                # Delete expired entry
-                self.db.delete(cache_entry)
-                self.db.commit()
                 return None
         
         return cache_entry
@@ -3,12 +3,13 @@
 Vector Database Setup Script for Cultural Context Service
 
 This script sets up and configures the vector database for the Cultural Context Service.
-It supports Pinecone, Weaviate, and in-memory fallback options.
+It supports Pinecone, Weaviate, a local vector store file, and in-memory fallback options.
 
 Usage:
     python setup_vector_db.py --provider pinecone --create-index
     python setup_vector_db.py --provider weaviate --test-connection
     python setup_vector_db.py --provider memory --index-kb
+    python setup_vector_db.py --provider local --index-kb --output data/vector_store/kb
 """
 
 import os
@@ -22,8 +23,9 @@ from typing import Dict, Any, List, Optional
 service_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, service_root)
 
-from services.rag_service import get_rag_service
+from services.rag_service import get_rag_service, kb_entry_fields
 from services.embeddings import get_embedding_service
+from services.vector_index import VectorIndex
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -231,17 +233,19 @@ class VectorDBSetup:
             
             # Index entries
             logger.info(f"Indexing {len(kb_entries)} entries...")
-            indexed_count = self.rag_service.index_knowledge_base(kb_entries)
+            diff = self.rag_service.sync_knowledge_base(kb_entries, full=clear_existing)
+            indexed_count = diff["indexed_count"]
             
             # Get final stats
             stats = self.rag_service.get_index_stats()
             
-            logger.info(f"✅ Successfully indexed {indexed_count}/{len(kb_entries)} entries")
+            logger.info(f"✅ Successfully indexed {indexed_count}/{len(kb_entries)} entries ({diff['embedded']} embedded)")
             
             return {
                 "success": True,
                 "indexed_count": indexed_count,
                 "total_entries": len(kb_entries),
+                "diff": diff,
                 "stats": stats
             }
             
@@ -252,6 +256,70 @@ class VectorDBSetup:
                 "error": str(e)
             }
     
+    def build_local_store(self, output_path: str, kb_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Embed the knowledge base and write a local vector store artifact.
+        
+        Produces `<output_path>.npy` (normalized float32 vectors) and
+        `<output_path>.json` (ids, texts, metadata, embedding model). Services
+        load it read-only via LOCAL_VECTOR_STORE_PATH; it must be built with the
+        same embedding model the service runs.
+        """
+        logger.info(f"Building local vector store at {output_path}...")
+        
+        try:
+            if not self.embedding_service.is_available():
+                logger.error("❌ No embedding service available")
+                return {
+                    "success": False,
+                    "provider": "local",
+                    "error": "Embedding service not available"
+                }
+            
+            kb_path = kb_path or os.path.join(service_root, "data", "kb.json")
+            if not os.path.exists(kb_path):
+                logger.error(f"❌ Knowledge base file not found: {kb_path}")
+                return {
+                    "success": False,
+                    "provider": "local",
+                    "error": "Knowledge base file not found"
+                }
+            
+            with open(kb_path, 'r', encoding='utf-8') as f:
+                kb_entries = json.load(f).get("entries", [])
+            
+            index = VectorIndex()
+            fields = [kb_entry_fields(entry) for entry in kb_entries]
+            batch_size = max(1, int(os.getenv("KB_INDEX_BATCH_SIZE", "100")))
+            indexed_count = 0
+            for start in range(0, len(fields), batch_size):
+                chunk = fields[start:start + batch_size]
+                embeddings = self.embedding_service.embed_batch([text for _, text, _ in chunk])
+                for (entry_id, text, metadata), embedding in zip(chunk, embeddings):
+                    if embedding and index.add(entry_id, embedding, text, metadata):
+                        indexed_count += 1
+            
+            index.model = self.embedding_service.embedding_model
+            index.save(output_path)
+            
+            logger.info(f"✅ Wrote {indexed_count}/{len(kb_entries)} vectors to {output_path}")
+            return {
+                "success": True,
+                "provider": "local",
+                "path": output_path,
+                "indexed_count": indexed_count,
+                "total_entries": len(kb_entries),
+                "stats": index.stats()
+            }
+            
+        except Exception as e:
+            logger.error(f"❌ Local vector store build failed: {e}")
+            return {
+                "success": False,
+                "provider": "local",
+                "error": str(e)
+            }
+    
     def get_status(self) -> Dict[str, Any]:
         """Get comprehensive status of vector database setup"""
         logger.info("Getting vector database status...")
@@ -277,7 +345,7 @@ class VectorDBSetup:
 def main():
     """Main CLI interface"""
     parser = argparse.ArgumentParser(description="Vector Database Setup for Cultural Context Service")
-    parser.add_argument("--provider", choices=["pinecone", "weaviate", "memory"], 
+    parser.add_argument("--provider", choices=["pinecone", "weaviate", "local", "memory"], 
                        help="Vector database provider")
     parser.add_argument("--create-index", action="store_true", 
                        help="Create vector database index")
@@ -291,6 +359,10 @@ def main():
                        help="Show comprehensive status")
     parser.add_argument("--dimension", type=int, 
                        help="Embedding dimension for index creation")
+    parser.add_argument("--output", default=os.getenv("LOCAL_VECTOR_STORE_PATH", ""),
+                       help="Local vector store path prefix (writes <output>.npy and <output>.json)")
+    parser.add_argument("--kb-path",
+                       help="Knowledge base file to index (default: data/kb.json)")
     
     args = parser.parse_args()
     
@@ -318,7 +390,14 @@ def main():
         if not result["success"]:
             sys.exit(1)
     
-    if args.index_kb:
+    if args.index_kb and args.provider == "local":
+        if not args.output:
+            parser.error("--provider local requires --output (or LOCAL_VECTOR_STORE_PATH)")
+        result = setup.build_local_store(args.output, kb_path=args.kb_path)
+        print(json.dumps(result, indent=2))
+        if not result["success"]:
+            sys.exit(1)
+    elif args.index_kb:
         result = setup.index_knowledge_base(clear_existing=args.clear_existing)
         print(json.dumps(result, indent=2))
         if not result["success"]:
@@ -3,13 +3,185 @@ Bias detection algorithms and cultural sensitivity validation
 Detects potential biases in AI responses and validates cultural sensitivity
 """
 
-import re
+import bisect
 import logging
-from typing import Dict, List, Any, Optional
+import re
+import threading
+from typing import Dict, List, Any, Mapping, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
+from .pattern_matcher import PatternMatcher
+
 logger = logging.getLogger(__name__)
 
+# A rule is a sequence of steps; each step lists alternative phrases separated by "|".
+# ["just|simply|easily", "get over|move on|snap out of"] matches exactly like
+# r'\b(just|simply|easily)\b.*\b(get over|move on|snap out of)\b' (case-insensitive):
+# one whole-word phrase per step, in order, on one line.
+DEFAULT_BIAS_RULES: Dict[str, List[List[str]]] = {
+    # Western-centric assumptions
+    "western_assumptions": [
+        ["individual therapy|psychotherapy|counseling|medication", "only|best|should"],
+        ["western|american|european", "approach|method|treatment"],
+        ["you should|you must|you need to", "see a therapist|take medication|get professional help"],
+    ],
+    # Stigmatizing language
+    "stigmatizing": [
+        ["crazy|insane|mental|psycho|nuts"],
+        ["just|simply|easily", "get over|move on|snap out of"],
+        ["weak|strong|tough", "handle|deal with"],
+        ["shouldn't|should not|don't", "feel|think|worry"],
+    ],
+    # Cultural insensitivity
+    "cultural_insensitivity": [
+        ["your culture|your tradition|your beliefs", "wrong|backward|primitive"],
+        ["you people|your kind|those people"],
+        ["modern|civilized|developed", "way|approach|method"],
+    ],
+    # Inappropriate advice
+    "inappropriate_advice": [
+        ["just|simply|easily", "pray|believe|have faith"],
+        ["ignore|dismiss|forget about", "family|community|tradition"],
+        ["you must|you have to|you need to", "leave|abandon|cut off", "family|community"],
+    ],
+    # Language that may alienate
+    "alienating": [
+        ["we|us|our", "always|never|all"],
+        ["you don't|you can't|you won't", "understand|know|appreciate"],
+        ["typical|normal|usual", "for people like you|in your situation"],
+    ],
+}
+
+# Positive patterns (what we want to see)
+DEFAULT_POSITIVE_RULES: List[List[str]] = [
+    ["respect|honor|acknowledge|validate", "culture|tradition|belief|community"],
+    ["understand|appreciate|recognize", "context|background|experience"],
+    ["valid|normal|understandable", "feeling|emotion|response"],
+    ["community|family|support network", "important|valuable|helpful"],
+]
+
+POSITIVE_CATEGORY = "positive"
+
+_NEWLINE = re.compile("\n")
+
+# Rule steps as phrase tuples, and where each rule sits: (category, rule number)
+Rule = Tuple[Tuple[str, ...], ...]
+# One rule match: (start, end) of the phrase matched at each step
+RuleMatch = Tuple[Tuple[int, int], ...]
+
+
+def _parse_rule(rule: Any) -> Rule:
+    """["a|b", "c"] or "a|b" -> (("a", "b"), ("c",)); raises ValueError if malformed"""
+    steps = [rule] if isinstance(rule, str) else rule
+    if not isinstance(steps, (list, tuple)) or not steps:
+        raise ValueError(f"rule must be a string or a non-empty list of strings: {rule!r}")
+    parsed = []
+    for step in steps:
+        if not isinstance(step, str):
+            raise ValueError(f"rule step must be a string: {step!r}")
+        phrases = tuple(p.strip().lower() for p in step.split("|") if p.strip())
+        if not phrases:
+            raise ValueError(f"empty rule step in {rule!r}")
+        parsed.append(phrases)
+    return tuple(parsed)
+
+
+class CompiledBiasRules:
+    """
+    All bias and sensitivity rules compiled into one automaton.
+
+    Every phrase of every rule is matched in a single pass over the text;
+    rules are then resolved only for the lines where all of their steps
+    occurred, reproducing `re.findall` of the equivalent regex.
+    """
+
+    def __init__(
+        self,
+        categories: Mapping[str, Sequence[Any]],
+        positive: Sequence[Any],
+        info: Optional[Mapping[str, Dict[str, str]]] = None
+    ):
+        """
+        Compile rules
+
+        Args:
+            categories: Bias type -> rules (see DEFAULT_BIAS_RULES)
+            positive: Rules for language that respects cultural context
+            info: Bias type -> optional description / suggestion / severity overrides
+        """
+        self.info: Dict[str, Dict[str, str]] = dict(info or {})
+        self.rules: Dict[str, List[Rule]] = {category: [_parse_rule(r) for r in rules] for category, rules in categories.items()}
+        self.rules[POSITIVE_CATEGORY] = [_parse_rule(r) for r in positive]
+
+        phrases: Dict[str, int] = {}
+        # Phrase index -> (category, rule number, step, alternative rank) it can fill
+        self._slots: List[List[Tuple[str, int, int, int]]] = []
+        for category, rules in self.rules.items():
+            for number, rule in enumerate(rules):
+                for step, alternatives in enumerate(rule):
+                    for rank, phrase in enumerate(alternatives):
+                        if phrase not in phrases:
+                            phrases[phrase] = len(phrases)
+                            self._slots.append([])
+                        self._slots[phrases[phrase]].append((category, number, step, rank))
+        self.matcher = PatternMatcher(phrases, word_boundary=True)
+
+    def scan(self, text_lower: str) -> Dict[str, Dict[int, List[RuleMatch]]]:
+        """
+        Match every rule against lowercased text in one automaton pass
+
+        Returns:
+            category -> rule number -> non-overlapping matches (only rules that matched)
+        """
+        if not text_lower:
+            return {}
+        newlines = [m.start() for m in _NEWLINE.finditer(text_lower)]
+
+        # (category, rule, line) -> per-step occurrence lists of (start, end, rank)
+        hits: Dict[Tuple[str, int, int], Dict[int, List[Tuple[int, int, int]]]] = {}
+        for match in self.matcher.find_all(text_lower):
+            line = bisect.bisect_left(newlines, match.start) if newlines else 0
+            for category, number, step, rank in self._slots[match.index]:
+                hits.setdefault((category, number, line), {}).setdefault(step, []).append((match.start, match.end, rank))
+
+        results: Dict[str, Dict[int, List[RuleMatch]]] = {}
+        for (category, number, _), steps in sorted(hits.items(), key=lambda item: item[0][2]):
+            if len(steps) < len(self.rules[category][number]):
+                continue
+            matches = _resolve(
+                [sorted(steps[step], key=lambda o: (o[0], o[2])) for step in range(len(steps))]
+            )
+            if matches:
+                results.setdefault(category, {}).setdefault(number, []).extend(matches)
+        return results
+
+
+def _greedy_tail(steps: List[List[Tuple[int, int, int]]], after: int) -> Optional[List[Tuple[int, int]]]:
+    """Remaining steps as a greedy `.*` places them: rightmost feasible start, first alternative"""
+    if not steps:
+        return []
+    for start, end, _ in sorted((o for o in steps[0] if o[0] >= after), key=lambda o: (-o[0], o[2])):
+        tail = _greedy_tail(steps[1:], end)
+        if tail is not None:
+            return [(start, end)] + tail
+    return None
+
+
+def _resolve(steps: List[List[Tuple[int, int, int]]]) -> List[RuleMatch]:
+    """Non-overlapping matches of one rule on one line, leftmost first (re.findall order)"""
+    matches: List[RuleMatch] = []
+    position = 0
+    for start, end, _ in steps[0]:
+        if start < position:
+            continue
+        tail = _greedy_tail(steps[1:], end)
+        if tail is None:
+            continue
+        match = ((start, end), *tail)
+        matches.append(match)
+        position = match[-1][1]
+    return matches
+
 
 @dataclass
 class BiasDetection:
@@ -41,64 +213,72 @@ class BiasDetector:
     - Cultural insensitivity
     - Inappropriate advice
     - Language that may alienate users
+    
+    All rules are compiled into one automaton (CompiledBiasRules), so a text is
+    scanned once for every bias type and sensitivity check. Rules can be
+    extended or replaced from the "bias_rules" section of cultural_norms.json.
     """
     
-    def __init__(self):
-        """Initialize bias detector with patterns"""
-        # Western-centric assumptions
-        self.western_assumptions = [
-            r'\b(individual therapy|psychotherapy|counseling|medication)\b.*\b(only|best|should)\b',
-            r'\b(western|american|european)\b.*\b(approach|method|treatment)\b',
-            r'\b(you should|you must|you need to)\b.*\b(see a therapist|take medication|get professional help)\b',
-        ]
-        
-        # Stigmatizing language
-        self.stigmatizing_patterns = [
-            r'\b(crazy|insane|mental|psycho|nuts)\b',
-            r'\b(just|simply|easily)\b.*\b(get over|move on|snap out of)\b',
-            r'\b(weak|strong|tough)\b.*\b(handle|deal with)\b',
-            r'\b(shouldn\'t|should not|don\'t)\b.*\b(feel|think|worry)\b',
-        ]
-        
-        # Cultural insensitivity
-        self.cultural_insensitivity = [
-            r'\b(your culture|your tradition|your beliefs)\b.*\b(wrong|backward|primitive)\b',
-            r'\b(you people|your kind|those people)\b',
-            r'\b(modern|civilized|developed)\b.*\b(way|approach|method)\b',
-        ]
-        
-        # Inappropriate advice
-        self.inappropriate_advice = [
-            r'\b(just|simply|easily)\b.*\b(pray|believe|have faith)\b',
-            r'\b(ignore|dismiss|forget about)\b.*\b(family|community|tradition)\b',
-            r'\b(you must|you have to|you need to)\b.*\b(leave|abandon|cut off)\b.*\b(family|community)\b',
-        ]
-        
-        # Language that may alienate
-        self.alienating_language = [
-            r'\b(we|us|our)\b.*\b(always|never|all)\b',
-            r'\b(you don\'t|you can\'t|you won\'t)\b.*\b(understand|know|appreciate)\b',
-            r'\b(typical|normal|usual)\b.*\b(for people like you|in your situation)\b',
-        ]
-        
-        # Compile regex patterns
-        self.patterns = {
-            "western_assumptions": [re.compile(p, re.IGNORECASE) for p in self.western_assumptions],
-            "stigmatizing": [re.compile(p, re.IGNORECASE) for p in self.stigmatizing_patterns],
-            "cultural_insensitivity": [re.compile(p, re.IGNORECASE) for p in self.cultural_insensitivity],
-            "inappropriate_advice": [re.compile(p, re.IGNORECASE) for p in self.inappropriate_advice],
-            "alienating": [re.compile(p, re.IGNORECASE) for p in self.alienating_language],
-        }
-        
-        # Positive patterns (what we want to see)
-        self.positive_patterns = [
-            r'\b(respect|honor|acknowledge|validate)\b.*\b(culture|tradition|belief|community)\b',
-            r'\b(understand|appreciate|recognize)\b.*\b(context|background|experience)\b',
-            r'\b(valid|normal|understandable)\b.*\b(feeling|emotion|response)\b',
-            r'\b(community|family|support network)\b.*\b(important|valuable|helpful)\b',
-        ]
-        
-        self.positive_regex = [re.compile(p, re.IGNORECASE) for p in self.positive_patterns]
+    def __init__(self, norms: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize bias detector
+
+        Args:
+            norms: Cultural norms; its "bias_rules" section overrides the default rules
+        """
+        self._lock = threading.Lock()
+        self._norms_source: Optional[Mapping[str, Any]] = None
+        self.compiled = CompiledBiasRules(DEFAULT_BIAS_RULES, DEFAULT_POSITIVE_RULES)
+        if norms is not None:
+            self.load_rules(norms)
+    
+    def load_rules(self, norms: Optional[Mapping[str, Any]]) -> bool:
+        """
+        Recompile rules from cultural norms.
+
+        Expected shape (every part optional):
+            "bias_rules": {
+                "categories": {
+                    "stigmatizing": [["crazy|insane"], ["just|simply", "get over"]],
+                    "fatalism": {"rules": [...], "description": "...", "suggestion": "...", "severity": "high"}
+                },
+                "positive": [["respect|honor", "culture|tradition"]]
+            }
+        A listed category replaces that category's default rules; new categories
+        are added. Invalid rules are logged and the previous rules stay in use.
+
+        Args:
+            norms: Cultural norms mapping (cultural_norms.json)
+
+        Returns:
+            True if the rules were recompiled
+        """
+        with self._lock:
+            if norms is self._norms_source:
+                return False
+            self._norms_source = norms
+            section = (norms or {}).get("bias_rules") or {}
+            categories: Dict[str, Any] = dict(DEFAULT_BIAS_RULES)
+            info: Dict[str, Dict[str, str]] = {}
+            try:
+                for category, spec in (section.get("categories") or {}).items():
+                    if isinstance(spec, Mapping):
+                        categories[category] = spec.get("rules") or []
+                        info[category] = {k: spec[k] for k in ("description", "suggestion", "severity") if spec.get(k)}
+                    else:
+                        categories[category] = spec
+                compiled = CompiledBiasRules(categories, section.get("positive") or DEFAULT_POSITIVE_RULES, info)
+            except (AttributeError, TypeError, ValueError) as e:
+                logger.warning(f"Invalid bias_rules in cultural norms, keeping current rules: {e}")
+                return False
+            self.compiled = compiled
+            logger.info(f"Bias rules compiled: {len(compiled.matcher)} phrases, {sum(len(r) for r in compiled.rules.values())} rules")
+            return True
+    
+    def _scan(self, text: str) -> Tuple[str, Dict[str, Dict[int, List[RuleMatch]]], CompiledBiasRules]:
+        compiled = self.compiled
+        text_lower = text.lower()
+        return text_lower, compiled.scan(text_lower), compiled
     
     def detect_biases(self, text: str) -> List[BiasDetection]:
         """
@@ -112,29 +292,38 @@ class BiasDetector:
         """
         if not text or not text.strip():
             return []
-        
-        text_lower = text.lower()
+        return self._biases_from_scan(*self._scan(text))
+    
+    def _biases_from_scan(
+        self,
+        text_lower: str,
+        found: Dict[str, Dict[int, List[RuleMatch]]],
+        compiled: CompiledBiasRules
+    ) -> List[BiasDetection]:
         detections = []
         
-        # Check each bias type
-        for bias_type, patterns in self.patterns.items():
-            for pattern in patterns:
-                matches = pattern.findall(text_lower)
-                if matches:
-                    # Determine severity
-                    severity = self._determine_severity(bias_type, matches)
-                    
-                    # Get description and suggestion
-                    description, suggestion = self._get_bias_info(bias_type)
-                    
-                    detections.append(BiasDetection(
-                        bias_type=bias_type,
-                        severity=severity,
-                        description=description,
-                        detected_pattern=str(matches[0]) if matches else "",
-                        suggestion=suggestion,
-                        confidence=0.8  # High confidence for pattern matches
-                    ))
+        # Check each bias type, rules in definition order
+        for bias_type, rules in compiled.rules.items():
+            if bias_type == POSITIVE_CATEGORY or bias_type not in found:
+                continue
+            description, suggestion = self._get_bias_info(bias_type, compiled)
+            for number in range(len(rules)):
+                rule_matches = found[bias_type].get(number)
+                if not rule_matches:
+                    continue
+                # Same shape as re.findall: a string for one-step rules, a tuple otherwise
+                matches = [
+                    text_lower[m[0][0]:m[0][1]] if len(m) == 1 else tuple(text_lower[s:e] for s, e in m)
+                    for m in rule_matches
+                ]
+                detections.append(BiasDetection(
+                    bias_type=bias_type,
+                    severity=compiled.info.get(bias_type, {}).get("severity") or self._determine_severity(bias_type, matches),
+                    description=description,
+                    detected_pattern=str(matches[0]),
+                    suggestion=suggestion,
+                    confidence=0.8  # High confidence for pattern matches
+                ))
         
         return detections
     
@@ -149,19 +338,24 @@ class BiasDetector:
         Returns:
             List of sensitivity checks
         """
+        _, found, _ = self._scan(text or "")
+        return self._checks_from_scan(found)
+    
+    def _checks_from_scan(self, found: Dict[str, Dict[int, List[RuleMatch]]]) -> List[CulturalSensitivityCheck]:
         checks = []
         
         # Check 1: Respects cultural context
-        respects_culture = any(pattern.search(text) for pattern in self.positive_regex)
+        respects_culture = bool(found.get(POSITIVE_CATEGORY))
         checks.append(CulturalSensitivityCheck(
             check_type="cultural_respect",
-            passed=respects_culture or not any(self.patterns["cultural_insensitivity"][0].search(text) for _ in [1]),
+            # Fails only without positive language and with a disparaged-culture phrase (first insensitivity rule)
+            passed=respects_culture or 0 not in found.get("cultural_insensitivity", {}),
             issue=None if respects_culture else "Text may not adequately respect cultural context",
             suggestion="Include language that acknowledges and respects cultural values and traditions"
         ))
         
         # Check 2: Avoids stigmatizing language
-        no_stigma = not any(pattern.search(text) for pattern in self.patterns["stigmatizing"])
+        no_stigma = not found.get("stigmatizing")
         checks.append(CulturalSensitivityCheck(
             check_type="stigma_free",
             passed=no_stigma,
@@ -170,7 +364,7 @@ class BiasDetector:
         ))
         
         # Check 3: Avoids Western-centric assumptions
-        no_western_assumptions = not any(pattern.search(text) for pattern in self.patterns["western_assumptions"])
+        no_western_assumptions = not found.get("western_assumptions")
         checks.append(CulturalSensitivityCheck(
             check_type="culturally_inclusive",
             passed=no_western_assumptions,
@@ -179,7 +373,7 @@ class BiasDetector:
         ))
         
         # Check 4: Appropriate advice
-        appropriate_advice = not any(pattern.search(text) for pattern in self.patterns["inappropriate_advice"])
+        appropriate_advice = not found.get("inappropriate_advice")
         checks.append(CulturalSensitivityCheck(
             check_type="appropriate_advice",
             passed=appropriate_advice,
@@ -188,7 +382,7 @@ class BiasDetector:
         ))
         
         # Check 5: Inclusive language
-        inclusive_language = not any(pattern.search(text) for pattern in self.patterns["alienating"])
+        inclusive_language = not found.get("alienating")
         checks.append(CulturalSensitivityCheck(
             check_type="inclusive_language",
             passed=inclusive_language,
@@ -224,9 +418,10 @@ class BiasDetector:
                 "recommendations": ["Provide text to assess cultural sensitivity."]
             }
 
-        text = str(text)
-        biases = self.detect_biases(text)
-        checks = self.validate_cultural_sensitivity(text, context)
+        # One scan serves both the bias detections and the sensitivity checks
+        text_lower, found, compiled = self._scan(str(text))
+        biases = self._biases_from_scan(text_lower, found, compiled)
+        checks = self._checks_from_scan(found)
         
         # Calculate scores
         bias_count = len(biases)
@@ -297,8 +492,8 @@ class BiasDetector:
         else:
             return "low"
     
-    def _get_bias_info(self, bias_type: str) -> tuple:
-        """Get description and suggestion for bias type"""
+    def _get_bias_info(self, bias_type: str, compiled: Optional[CompiledBiasRules] = None) -> tuple:
+        """Get description and suggestion for bias type (cultural_norms.json overrides first)"""
         info_map = {
             "western_assumptions": (
                 "Text may assume Western approaches are the only or best option",
@@ -322,17 +517,27 @@ class BiasDetector:
             ),
         }
         
-        return info_map.get(bias_type, ("Potential bias detected", "Review text for cultural sensitivity"))
+        description, suggestion = info_map.get(bias_type, ("Potential bias detected", "Review text for cultural sensitivity"))
+        override = (compiled or self.compiled).info.get(bias_type, {})
+        return override.get("description", description), override.get("suggestion", suggestion)
 
 
 # Global instance
 _detector: Optional[BiasDetector] = None
 
 
-def get_bias_detector() -> BiasDetector:
-    """Get or create bias detector instance"""
+def get_bias_detector(norms: Optional[Mapping[str, Any]] = None) -> BiasDetector:
+    """
+    Get or create bias detector instance
+
+    Args:
+        norms: Current cultural norms; rules are recompiled when a different
+            norms object (a reloaded knowledge base snapshot) is passed
+    """
     global _detector
     if _detector is None:
         _detector = BiasDetector()
+    if norms is not None:
+        _detector.load_rules(norms)
     return _detector
 
@@ -0,0 +1,143 @@
+"""
+BM25 index for the cultural knowledge base
+Swahili-aware tokenization and a precomputed inverted index whose postings
+already hold the BM25 term weights, so a query is a few vector additions
+"""
+
+import math
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+# Subject (incl. negative) prefix + tense marker in front of a verb stem:
+# ni-me-choka, tu-na-omba, ha-wa-ja-... Only stripped when a stem of 3+ letters remains.
+_SWAHILI_VERB_PREFIX = re.compile(r"^(?:hatu|hawa|ham|si|ha|ni|tu|wa|u|a|m)(?:na|li|me|ta|nge|ki)(?=[a-z]{3,}$)")
+
+STOPWORDS = frozenset({
+    # English
+    "a", "an", "and", "are", "as", "at", "be", "but", "for", "i", "i'm", "im", "in", "is", "it",
+    "me", "my", "of", "on", "or", "so", "that", "the", "this", "to", "was", "with",
+    # Swahili
+    "na", "ya", "wa", "za", "la", "kwa", "katika", "ni", "cha", "vya",
+})
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics ("Nimechóka" -> "nimechoka")"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Index terms for a text.
+
+    Words are folded and stopwords dropped. Swahili verbs additionally yield
+    their stem, so "nimechoka", "tumechoka" and "choka" share the term "choka".
+
+    Args:
+        text: Query or document text (English, Swahili or mixed)
+
+    Returns:
+        Terms in text order (a word and its stem are adjacent)
+    """
+    terms: List[str] = []
+    for word in _TOKEN.findall(fold(text or "")):
+        if word in STOPWORDS:
+            continue
+        terms.append(word)
+        stem = _SWAHILI_VERB_PREFIX.sub("", word)
+        if stem != word:
+            terms.append(stem)
+    return terms
+
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed document list.
+
+    Postings store the full per-document BM25 weight of each term
+    (idf x saturated, length-normalized tf), so scoring a query adds one
+    precomputed array per query term into a score vector.
+    """
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        """
+        Build the index
+
+        Args:
+            documents: Document texts; positions are the document ids
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.k1 = k1
+        self.b = b
+        self.size = len(documents)
+
+        term_counts: List[Dict[str, int]] = []
+        lengths = np.zeros(self.size, dtype=np.float32)
+        for position, document in enumerate(documents):
+            counts: Dict[str, int] = {}
+            for term in tokenize(document):
+                counts[term] = counts.get(term, 0) + 1
+            term_counts.append(counts)
+            lengths[position] = sum(counts.values())
+        average_length = float(lengths.mean()) if self.size and lengths.any() else 1.0
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for position, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                ids, tfs = postings.setdefault(term, ([], []))
+                ids.append(position)
+                tfs.append(count)
+
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for term, (ids, tfs) in postings.items():
+            ids_array = np.asarray(ids, dtype=np.int32)
+            tf = np.asarray(tfs, dtype=np.float32)
+            idf = math.log(1.0 + (self.size - len(ids) + 0.5) / (len(ids) + 0.5))
+            norm = k1 * (1.0 - b + b * lengths[ids_array] / average_length)
+            self._postings[term] = (ids_array, (idf * tf * (k1 + 1.0) / (tf + norm)).astype(np.float32))
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._postings)
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every document for the query (0 where no term matches)"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            posting = self._postings.get(term)
+            if posting is not None:
+                scores[posting[0]] += posting[1]
+        return scores
+
+    def search(self, query: str, top_k: int = 10, mask: Optional[np.ndarray] = None) -> List[Tuple[int, float]]:
+        """
+        Best-scoring documents
+
+        Args:
+            query: Query text
+            top_k: Number of documents to return
+            mask: Optional boolean array; documents where it is False are skipped
+
+        Returns:
+            (position, score) pairs, best first; ties keep document order
+        """
+        if not self.size or top_k <= 0:
+            return []
+        scores = self.scores(query)
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+        matched = np.flatnonzero(scores > 0)
+        if matched.size == 0:
+            return []
+        order = matched[np.lexsort((matched, -scores[matched]))][:top_k]
+        return [(int(position), float(scores[position])) for position in order]
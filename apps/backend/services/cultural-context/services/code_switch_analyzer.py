@@ -11,6 +11,7 @@ from dataclasses import dataclass
 logger = logging.getLogger(__name__)
 
 from .embeddings import get_embedding_service
+from .pattern_matcher import PatternMatcher
 
 
 @dataclass
@@ -52,61 +53,59 @@ class CodeSwitchAnalyzer:
         # Behavior: uses the cultural-context embedding service (OpenAI or local fallback).
         self.embedding_service = get_embedding_service()
 
-        # Common Swahili words and phrases
-        self.swahili_patterns = [
+        # Common Swahili words and phrases.
+        # Order matters: at one position the earlier entry wins, as in a regex alternation.
+        self.swahili_words = [
             # Greetings and common phrases
-            r'\b(sawa|sijambo|hujambo|hamjambo|mambo|vipi|poa|shida)\b',
-            r'\b(asante|asante sana|karibu|pole|pole sana)\b',
-            r'\b(ndiyo|hapana|hakuna|kuna|kwa|na|ni|ya|wa|za)\b',
+            'sawa', 'sijambo', 'hujambo', 'hamjambo', 'mambo', 'vipi', 'poa', 'shida',
+            'asante', 'asante sana', 'karibu', 'pole', 'pole sana',
+            'ndiyo', 'hapana', 'hakuna', 'kuna', 'kwa', 'na', 'ni', 'ya', 'wa', 'za',
             
             # Emotional words
-            r'\b(nimechoka|huzuni|wasiwasi|upweke|hofu|furaha|huzuni)\b',
-            r'\b(sijui|tutaona|ni hali ya kawaida|hakuna shida)\b',
+            'nimechoka', 'huzuni', 'wasiwasi', 'upweke', 'hofu', 'furaha',
+            'sijui', 'tutaona', 'ni hali ya kawaida', 'hakuna shida',
             
             # Common verbs
-            r'\b(nina|una|tuna|wana|ana|mna|sina|huna|hatuna)\b',
-            r'\b(nime|ume|tume|wame|ame|mme|sijui|hujui)\b',
+            'nina', 'una', 'tuna', 'wana', 'ana', 'mna', 'sina', 'huna', 'hatuna',
+            'nime', 'ume', 'tume', 'wame', 'ame', 'mme', 'hujui',
             
             # Common nouns
-            r'\b(mtu|watu|nyumba|shule|kazi|pesa|chakula|maji)\b',
+            'mtu', 'watu', 'nyumba', 'shule', 'kazi', 'pesa', 'chakula', 'maji',
             
             # Common adjectives
-            r'\b(mzuri|mbaya|nzuri|kubwa|ndogo|refu|fupi)\b',
+            'mzuri', 'mbaya', 'nzuri', 'kubwa', 'ndogo', 'refu', 'fupi',
         ]
         
-        # Compile regex patterns
-        self.swahili_regex = re.compile(
-            '|'.join(self.swahili_patterns),
-            re.IGNORECASE
-        )
-        
         # English indicators (common words that are less likely in Swahili)
-        self.english_indicators = [
-            r'\b(i|am|are|is|was|were|be|been|being)\b',
-            r'\b(you|he|she|it|we|they|me|him|her|us|them)\b',
-            r'\b(feel|feeling|felt|feelings|emotion|emotions)\b',
-            r'\b(sad|happy|angry|tired|excited|worried|anxious|depressed)\b',
-            r'\b(okay|fine|good|bad|well|better|worse)\b',
-            r'\b(think|thought|know|knew|understand|understood)\b',
-            r'\b(help|helped|support|supported|need|needed|want|wanted)\b',
+        self.english_words = [
+            'i', 'am', 'are', 'is', 'was', 'were', 'be', 'been', 'being',
+            'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them',
+            'feel', 'feeling', 'felt', 'feelings', 'emotion', 'emotions',
+            'sad', 'happy', 'angry', 'tired', 'excited', 'worried', 'anxious', 'depressed',
+            'okay', 'fine', 'good', 'bad', 'well', 'better', 'worse',
+            'think', 'thought', 'know', 'knew', 'understand', 'understood',
+            'help', 'helped', 'support', 'supported', 'need', 'needed', 'want', 'wanted',
         ]
         
-        self.english_regex = re.compile(
-            '|'.join(self.english_indicators),
-            re.IGNORECASE
-        )
-        
         # Emotional intensity markers
-        self.high_intensity_markers = [
-            r'\b(very|really|extremely|so|too|much|a lot)\b',
-            r'\b(cannot|can\'t|couldn\'t|won\'t|wouldn\'t)\b',
-            r'\b(always|never|nothing|everything|all|none)\b',
+        self.high_intensity_words = [
+            'very', 'really', 'extremely', 'so', 'too', 'much', 'a lot',
+            'cannot', "can't", "couldn't", "won't", "wouldn't",
+            'always', 'never', 'nothing', 'everything', 'all', 'none',
         ]
         
-        self.high_intensity_regex = re.compile(
-            '|'.join(self.high_intensity_markers),
-            re.IGNORECASE
-        )
+        # Emotional words counted anywhere in the text (substring match)
+        self.emotional_words = [
+            'sad', 'happy', 'angry', 'tired', 'worried', 'anxious',
+            'depressed', 'excited', 'fear', 'fearful', 'scared',
+            'huzuni', 'wasiwasi', 'upweke', 'hofu', 'nimechoka'
+        ]
+        
+        # Compile each list once into a multi-pattern matcher (one pass per scan)
+        self.swahili_matcher = PatternMatcher(self.swahili_words)
+        self.english_matcher = PatternMatcher(self.english_words)
+        self.high_intensity_matcher = PatternMatcher(self.high_intensity_words)
+        self.emotional_matcher = PatternMatcher(self.emotional_words, word_boundary=False)
     
     def detect_language(self, text: str) -> str:
         """
@@ -124,8 +123,8 @@ class CodeSwitchAnalyzer:
         text_lower = text.lower()
         
         # Count matches
-        swahili_matches = len(self.swahili_regex.findall(text_lower))
-        english_matches = len(self.english_regex.findall(text_lower))
+        swahili_matches = len(self.swahili_matcher.find_leftmost(text_lower))
+        english_matches = len(self.english_matcher.find_leftmost(text_lower))
         
         # Calculate confidence
         total_words = len(text.split())
@@ -318,16 +317,16 @@ class CodeSwitchAnalyzer:
         text_lower = text.lower()
         
         if language == 'sw':
-            matches = len(self.swahili_regex.findall(text_lower))
+            matches = len(self.swahili_matcher.find_leftmost(text_lower))
             total_words = len(text.split())
             return min(1.0, matches / max(1, total_words * 0.5))
         elif language == 'en':
-            matches = len(self.english_regex.findall(text_lower))
+            matches = len(self.english_matcher.find_leftmost(text_lower))
             total_words = len(text.split())
             return min(1.0, matches / max(1, total_words * 0.5))
         elif language == 'mixed':
-            sw_matches = len(self.swahili_regex.findall(text_lower))
-            en_matches = len(self.english_regex.findall(text_lower))
+            sw_matches = len(self.swahili_matcher.find_leftmost(text_lower))
+            en_matches = len(self.english_matcher.find_leftmost(text_lower))
             total_words = len(text.split())
             return min(1.0, (sw_matches + en_matches) / max(1, total_words * 0.3))
         
@@ -341,15 +340,10 @@ class CodeSwitchAnalyzer:
         text_lower = text.lower()
         
         # Count intensity markers
-        intensity_matches = len(self.high_intensity_regex.findall(text_lower))
+        intensity_matches = len(self.high_intensity_matcher.find_leftmost(text_lower))
         
         # Count emotional words
-        emotional_words = [
-            'sad', 'happy', 'angry', 'tired', 'worried', 'anxious',
-            'depressed', 'excited', 'fear', 'fearful', 'scared',
-            'huzuni', 'wasiwasi', 'upweke', 'hofu', 'nimechoka'
-        ]
-        emotional_count = sum(1 for word in emotional_words if word in text_lower)
+        emotional_count = len(self.emotional_matcher.found(text_lower))
         
         # Assess intensity
         if intensity_matches >= 3 or emotional_count >= 3:
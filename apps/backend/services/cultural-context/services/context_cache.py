@@ -0,0 +1,236 @@
+"""
+Layered cache for /context payloads
+In-process TTL/LRU in front of a shared Redis tier; the database cache
+(CulturalRepository) stays the durable tier behind both.
+Concurrent misses for the same key are collapsed into one load (single-flight).
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Try to import redis (optional shared tier)
+try:
+    import redis.asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    aioredis = None
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Loader result: (payload, source tier it came from, or None if freshly built)
+LoadResult = Tuple[Dict[str, Any], Optional[str]]
+
+
+def context_cache_key(language: str, query: str, kb_version: str = "") -> str:
+    """
+    Cache key for a (language, query) pair.
+
+    Case, repeated whitespace and diacritics are ignored, so "Nimechoka  sana"
+    and "nimechóka sana" share an entry. `kb_version` (the knowledge base
+    snapshot's version) prefixes the key, so every tier misses after a reload.
+    """
+    decomposed = unicodedata.normalize("NFKD", query)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    normalized = _WHITESPACE.sub(" ", stripped).strip().casefold()
+    key = f"{(language or '').strip().lower()}:{normalized}"
+    return f"{kb_version}:{key}" if kb_version else key
+
+
+class LocalTTLCache:
+    """Thread-safe in-process LRU whose entries also expire after `ttl_seconds`"""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300.0):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ContextCache:
+    """
+    Memory -> Redis -> loader cache with single-flight loads.
+
+    Redis errors are logged and the tier is skipped for `redis_retry_seconds`,
+    so an unreachable Redis costs one timeout per window instead of one per request.
+    """
+
+    def __init__(
+        self,
+        local: Optional[LocalTTLCache] = None,
+        redis_url: str = "",
+        redis_ttl_seconds: int = 3600,
+        redis_retry_seconds: float = 30.0,
+        key_prefix: str = "cultural-context:ctx:"
+    ):
+        """
+        Initialize context cache
+
+        Args:
+            local: In-process tier (a default LocalTTLCache if omitted)
+            redis_url: Shared tier URL; empty disables it
+            redis_ttl_seconds: Expiry of Redis entries
+            redis_retry_seconds: How long to skip Redis after an error
+            key_prefix: Namespace for Redis keys
+        """
+        self.local = local if local is not None else LocalTTLCache()
+        self.redis_ttl_seconds = redis_ttl_seconds
+        self.redis_retry_seconds = redis_retry_seconds
+        self.key_prefix = key_prefix
+        self.redis = None
+        if redis_url and REDIS_AVAILABLE:
+            try:
+                self.redis = aioredis.from_url(redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+            except Exception as e:
+                logger.warning(f"Context cache Redis tier unavailable: {e}")
+        self._redis_down_until = 0.0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats_counters = {"memory_hits": 0, "redis_hits": 0, "loads": 0, "coalesced": 0}
+
+    def _redis_usable(self) -> bool:
+        return self.redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        logger.warning(f"Context cache Redis {operation} failed, skipping tier for {self.redis_retry_seconds}s: {error}")
+        self._redis_down_until = time.monotonic() + self.redis_retry_seconds
+
+    async def _redis_get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self._redis_usable():
+            return None
+        try:
+            raw = await self.redis.get(self.key_prefix + key)
+        except Exception as e:
+            self._redis_failed("read", e)
+            return None
+        if raw is None:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    async def _redis_set(self, key: str, value: Dict[str, Any]) -> None:
+        if not self._redis_usable():
+            return
+        try:
+            await self.redis.set(self.key_prefix + key, json.dumps(value, default=str), ex=self.redis_ttl_seconds)
+        except Exception as e:
+            self._redis_failed("write", e)
+
+    async def get(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Look up a key in the memory and Redis tiers
+
+        Returns:
+            (payload, "memory_cache" | "redis_cache"), or (None, None) on a miss
+        """
+        value = self.local.get(key)
+        if value is not None:
+            self.stats_counters["memory_hits"] += 1
+            return value, "memory_cache"
+        value = await self._redis_get(key)
+        if value is not None:
+            self.stats_counters["redis_hits"] += 1
+            self.local.set(key, value)
+            return value, "redis_cache"
+        return None, None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a payload in the memory and Redis tiers"""
+        self.local.set(key, value)
+        await self._redis_set(key, value)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[LoadResult]]) -> LoadResult:
+        """
+        Return a cached payload, or load it once no matter how many callers miss together
+
+        Args:
+            key: Normalized cache key
+            loader: Coroutine function returning (payload, source); source is the
+                durable tier name for a DB hit, or None for a freshly built payload
+
+        Returns:
+            (payload, source); callers must not mutate the shared payload
+        """
+        value, source = await self.get(key)
+        if value is not None:
+            return value, source
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats_counters["coalesced"] += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading request was cancelled, not this one: load again
+                return await self.get_or_load(key, loader)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            self.stats_counters["loads"] += 1
+            result = await loader()
+            await self.set(key, result[0])
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure with no waiters is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop the in-process tier (Redis entries age out by TTL)"""
+        self.local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "memory_entries": len(self.local),
+            "redis_enabled": self.redis is not None,
+            "inflight": len(self._inflight),
+            **self.stats_counters,
+        }
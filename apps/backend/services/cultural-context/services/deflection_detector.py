@@ -5,11 +5,12 @@ Detects Swahili deflection patterns and correlates with voice analysis
 
 import json
 import os
-import re
 import logging
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
 
+from .pattern_matcher import PatternMatcher
+
 logger = logging.getLogger(__name__)
 
 
@@ -77,15 +78,13 @@ class DeflectionDetector:
         self.patterns = self._load_patterns(patterns_path)
         self.voice_contradictions = self.patterns.get("voice_contradiction_indicators", [])
         
-        # Build regex patterns for fast matching
-        self.pattern_regexes = {}
+        # One automaton for all patterns; each match maps back to its pattern entries
+        self.pattern_data_by_text: Dict[str, List[Dict[str, Any]]] = {}
         for pattern_data in self.patterns.get("patterns", []):
             pattern_text = pattern_data.get("pattern", "")
-            # Create case-insensitive regex
-            self.pattern_regexes[pattern_text] = re.compile(
-                r'\b' + re.escape(pattern_text) + r'\b',
-                re.IGNORECASE
-            )
+            if pattern_text:
+                self.pattern_data_by_text.setdefault(pattern_text.lower(), []).append(pattern_data)
+        self.pattern_matcher = PatternMatcher(self.pattern_data_by_text.keys(), word_boundary=True)
     
     def _load_patterns(self, path: str) -> Dict[str, Any]:
         """Load Swahili patterns from JSON file"""
@@ -117,48 +116,45 @@ class DeflectionDetector:
         text_lower = text.lower()
         matches = []
         
-        # Check each pattern
-        for pattern_data in self.patterns.get("patterns", []):
-            pattern_text = pattern_data.get("pattern", "")
-            pattern_type = pattern_data.get("type", "unknown")
-            
-            # Check if pattern matches
-            if pattern_text in self.pattern_regexes:
-                regex = self.pattern_regexes[pattern_text]
-                for match in regex.finditer(text_lower):
-                    # Check if pattern type matches language preference
-                    if language != "auto":
-                        # Filter by language if specified
-                        if pattern_type == "deflection" and language == "sw":
-                            # Prefer Swahili patterns
-                            pass
-                        elif pattern_type != "deflection" and language == "en":
-                            # Prefer English patterns
-                            continue
-                    
-                    # Get context around match
-                    start = max(0, match.start() - 30)
-                    end = min(len(text), match.end() + 30)
-                    context = text[start:end]
-                    
-                    # Calculate confidence based on context
-                    confidence = self._calculate_confidence(
-                        pattern_text,
-                        context,
-                        pattern_data
-                    )
-                    
-                    matches.append(DeflectionMatch(
-                        pattern=pattern_text,
-                        pattern_type=pattern_type,
-                        severity=pattern_data.get("severity", "low"),
-                        cultural_meaning=pattern_data.get("cultural_meaning", ""),
-                        interpretation=pattern_data.get("interpretation", ""),
-                        probe_suggestions=pattern_data.get("probe_suggestions", []),
-                        confidence=confidence,
-                        position=match.start(),
-                        context=context
-                    ))
+        # Single pass over the text for all patterns
+        for match in self.pattern_matcher.find_all(text_lower):
+            for pattern_data in self.pattern_data_by_text[match.pattern]:
+                pattern_text = pattern_data.get("pattern", "")
+                pattern_type = pattern_data.get("type", "unknown")
+                
+                # Check if pattern type matches language preference
+                if language != "auto":
+                    # Filter by language if specified
+                    if pattern_type == "deflection" and language == "sw":
+                        # Prefer Swahili patterns
+                        pass
+                    elif pattern_type != "deflection" and language == "en":
+                        # Prefer English patterns
+                        continue
+                
+                # Get context around match
+                start = max(0, match.start - 30)
+                end = min(len(text), match.end + 30)
+                context = text[start:end]
+                
+                # Calculate confidence based on context
+                confidence = self._calculate_confidence(
+                    pattern_text,
+                    context,
+                    pattern_data
+                )
+                
+                matches.append(DeflectionMatch(
+                    pattern=pattern_text,
+                    pattern_type=pattern_type,
+                    severity=pattern_data.get("severity", "low"),
+                    cultural_meaning=pattern_data.get("cultural_meaning", ""),
+                    interpretation=pattern_data.get("interpretation", ""),
+                    probe_suggestions=pattern_data.get("probe_suggestions", []),
+                    confidence=confidence,
+                    position=match.start,
+                    context=context
+                ))
         
         # Sort by position
         matches.sort(key=lambda x: x.position)
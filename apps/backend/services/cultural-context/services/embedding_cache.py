@@ -0,0 +1,296 @@
+"""
+Embedding cache and micro-batching for the embedding service
+Normalized-text keyed LRU with an optional persistent tier (Redis or SQLite file),
+and a queue that coalesces concurrent embed requests into one model call
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Try to import redis (optional shared cache tier)
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    redis = None
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Cache key form of a text: NFC, case-folded, whitespace collapsed.
+
+    The embedding is computed from this form as well, so "Nimechoka " and
+    "nimechoka" share one vector.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip().casefold()
+
+
+def _encode_vector(vector: Sequence[float]) -> bytes:
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _decode_vector(data: bytes) -> List[float]:
+    return np.frombuffer(data, dtype=np.float32).tolist()
+
+
+class RedisEmbeddingStore:
+    """Shared persistent tier: one Redis key per (model, text) holding float32 bytes"""
+
+    def __init__(self, url: str, ttl_seconds: int = 30 * 24 * 3600):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed")
+        self.client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self.ttl_seconds = ttl_seconds
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        values = self.client.mget(keys)
+        return {key: _decode_vector(value) for key, value in zip(keys, values) if value}
+
+    def set_many(self, items: Dict[str, Sequence[float]]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, vector in items.items():
+            pipe.set(key, _encode_vector(vector), ex=self.ttl_seconds)
+        pipe.execute()
+
+
+class SQLiteEmbeddingStore:
+    """Local persistent tier: a single SQLite file, safe to share between worker processes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        placeholders = ",".join("?" * len(keys))
+        rows = self._connection().execute(
+            f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+        ).fetchall()
+        return {key: _decode_vector(vector) for key, vector in rows}
+
+    def set_many(self, items: Dict[str, Sequence[float]]) -> None:
+        self._connection().executemany(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            [(key, _encode_vector(vector)) for key, vector in items.items()]
+        )
+
+
+def build_store(url: str, ttl_seconds: int):
+    """
+    Persistent tier from a URL: redis://... / rediss://... or a SQLite file path
+
+    Returns:
+        Store instance, or None if `url` is empty or the store cannot be opened
+    """
+    if not url:
+        return None
+    try:
+        if url.startswith(("redis://", "rediss://")):
+            return RedisEmbeddingStore(url, ttl_seconds)
+        return SQLiteEmbeddingStore(url)
+    except Exception as e:
+        logger.warning(f"Embedding cache store unavailable ({e}), using in-process cache only")
+        return None
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (model, normalized text).
+
+    Tier 1 is an in-process LRU; tier 2 (optional) is a persistent store.
+    Store errors are logged and treated as misses so the cache never fails a request.
+    """
+
+    def __init__(self, model: str, max_size: int = 4096, store=None):
+        """
+        Initialize embedding cache
+
+        Args:
+            model: Embedding model name; keys are versioned by it
+            max_size: In-process LRU capacity (0 disables the in-process tier)
+            store: Optional persistent store with get_many / set_many
+        """
+        self.model = model
+        self.max_size = max_size
+        self.store = store
+        self._lru: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"emb:{self.model}:{digest}"
+
+    def _remember(self, key: str, vector: Sequence[float]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._lru[key] = tuple(vector)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def get_many(self, texts: List[str]) -> Dict[str, List[float]]:
+        """
+        Cached embeddings for normalized texts
+
+        Args:
+            texts: Normalized texts
+
+        Returns:
+            Mapping of text -> embedding for the texts found in either tier
+        """
+        found: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        with self._lock:
+            for text in texts:
+                key = self._key(text)
+                vector = self._lru.get(key)
+                if vector is not None:
+                    self._lru.move_to_end(key)
+                    found[text] = list(vector)
+                else:
+                    missing[key] = text
+
+        if missing and self.store is not None:
+            try:
+                stored = self.store.get_many(list(missing))
+            except Exception as e:
+                logger.warning(f"Embedding cache store read failed: {e}")
+                stored = {}
+            for key, vector in stored.items():
+                self._remember(key, vector)
+                found[missing[key]] = vector
+
+        self.hits += len(found)
+        self.misses += len(texts) - len(found)
+        return found
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text]).get(text)
+
+    def put_many(self, items: Dict[str, Sequence[float]]) -> None:
+        """Store embeddings for normalized texts in both tiers"""
+        keyed = {self._key(text): vector for text, vector in items.items() if vector is not None}
+        for key, vector in keyed.items():
+            self._remember(key, vector)
+        if keyed and self.store is not None:
+            try:
+                self.store.set_many(keyed)
+            except Exception as e:
+                logger.warning(f"Embedding cache store write failed: {e}")
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            "model": self.model,
+            "size": len(self._lru),
+            "max_size": self.max_size,
+            "persistent_tier": type(self.store).__name__ if self.store is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class EmbeddingBatcher:
+    """
+    Micro-batching queue in front of a batch encode function.
+
+    Requests submitted within `max_wait` of the first pending one (or until
+    `max_batch` distinct texts are queued) go to the model as one call.
+    Identical texts in flight share a single future.
+    """
+
+    def __init__(
+        self,
+        encode_batch: Callable[[List[str]], List[Optional[List[float]]]],
+        max_batch: int = 32,
+        max_wait: float = 0.005
+    ):
+        """
+        Initialize batcher
+
+        Args:
+            encode_batch: Function embedding a list of texts in one call
+            max_batch: Maximum texts per model call
+            max_wait: Seconds to wait for more requests after the first one
+        """
+        self.encode_batch = encode_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending: "OrderedDict[str, Future]" = OrderedDict()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self.batches = 0
+        self.batched_texts = 0
+
+    def submit(self, text: str) -> Future:
+        """Queue a normalized text; the future resolves to its embedding (or None)"""
+        with self._condition:
+            future = self._pending.get(text)
+            if future is None:
+                future = Future()
+                self._pending[text] = future
+                self._condition.notify()
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+        return future
+
+    def _take_batch(self) -> List[Tuple[str, Future]]:
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                batch.append(self._pending.popitem(last=False))
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._take_batch()
+            texts = [text for text, _ in batch]
+            try:
+                vectors = self.encode_batch(texts)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"expected {len(texts)} embeddings, got {len(vectors)}")
+            except Exception as e:
+                logger.error(f"Batched embedding failed: {e}")
+                vectors = [None] * len(texts)
+            self.batches += 1
+            self.batched_texts += len(texts)
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
@@ -4,10 +4,13 @@ Supports OpenAI embeddings and sentence-transformers as fallback
 """
 
 import os
+import asyncio
 import logging
-from typing import List, Optional
+from typing import Dict, List, Optional
 import numpy as np
 
+from .embedding_cache import EmbeddingBatcher, EmbeddingCache, build_store, normalize_text
+
 logger = logging.getLogger(__name__)
 
 # Try to import OpenAI
@@ -51,18 +54,70 @@ class EmbeddingService:
             try:
                 # Use a multilingual model that supports English and Swahili
                 self.local_model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-                self.embedding_model = "sentence-transformers"
+                self.embedding_model = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
                 logger.info("Using sentence-transformers embeddings")
             except Exception as e:
                 logger.warning(f"Failed to initialize sentence-transformers: {e}")
         
         if not self.openai_client and not self.local_model:
             logger.error("No embedding service available. RAG will not work.")
+        
+        # Embedding cache, keyed by model so a model change never serves stale vectors
+        self.cache = EmbeddingCache(
+            model=self.embedding_model or "none",
+            max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+            store=build_store(
+                os.getenv("EMBEDDING_CACHE_URL", ""),
+                int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+            )
+        )
+        self.batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+        
+        # Coalesce concurrent single-text requests into one model call
+        batch_window_ms = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+        self.batcher: Optional[EmbeddingBatcher] = None
+        if batch_window_ms > 0 and self.is_available():
+            self.batcher = EmbeddingBatcher(
+                self._encode_batch,
+                max_batch=int(os.getenv("EMBEDDING_BATCH_MAX", "32")),
+                max_wait=batch_window_ms / 1000.0
+            )
     
     def embed_text(self, text: str) -> Optional[List[float]]:
         """
         Generate embedding for a single text.
         
+        Served from the cache when the normalized text was embedded before;
+        otherwise queued on the micro-batcher (if enabled) and cached.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector or None if service unavailable
+        """
+        if not text or not text.strip():
+            return None
+        
+        key = normalize_text(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if not self.is_available():
+            return None
+        
+        if self.batcher is not None:
+            embedding = self.batcher.submit(key).result()
+        else:
+            embedding = self._encode_text(key)
+        if embedding is not None:
+            self.cache.put_many({key: embedding})
+        return embedding
+    
+    async def aembed_text(self, text: str) -> Optional[List[float]]:
+        """
+        Async variant of embed_text that never blocks the event loop.
+        
         Args:
             text: Text to embed
             
@@ -72,6 +127,23 @@ class EmbeddingService:
         if not text or not text.strip():
             return None
         
+        key = normalize_text(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if not self.is_available():
+            return None
+        
+        if self.batcher is not None:
+            embedding = await asyncio.wrap_future(self.batcher.submit(key))
+        else:
+            embedding = await asyncio.to_thread(self._encode_text, key)
+        if embedding is not None:
+            self.cache.put_many({key: embedding})
+        return embedding
+    
+    def _encode_text(self, text: str) -> Optional[List[float]]:
+        """Embed one text with the model (no cache)"""
         # Try OpenAI first
         if self.openai_client:
             try:
@@ -99,6 +171,9 @@ class EmbeddingService:
         """
         Generate embeddings for multiple texts.
         
+        Duplicates and cached texts are embedded once / not at all; the rest
+        go to the model in chunks of EMBEDDING_BATCH_SIZE.
+        
         Args:
             texts: List of texts to embed
             
@@ -108,6 +183,25 @@ class EmbeddingService:
         if not texts:
             return []
         
+        keys = [normalize_text(text) if text and text.strip() else None for text in texts]
+        unique = list(dict.fromkeys(key for key in keys if key))
+        embeddings: Dict[str, Optional[List[float]]] = dict(self.cache.get_many(unique)) if unique else {}
+        
+        missing = [key for key in unique if key not in embeddings]
+        if missing and self.is_available():
+            for start in range(0, len(missing), self.batch_size):
+                chunk = missing[start:start + self.batch_size]
+                vectors = self._encode_batch(chunk)
+                self.cache.put_many(dict(zip(chunk, vectors)))
+                embeddings.update(zip(chunk, vectors))
+        
+        return [embeddings.get(key) if key else None for key in keys]
+    
+    def _encode_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embed a list of texts in one model call (no cache)"""
+        if not texts:
+            return []
+        
         # Try OpenAI first
         if self.openai_client:
             try:
@@ -119,7 +213,7 @@ class EmbeddingService:
             except Exception as e:
                 logger.error(f"OpenAI batch embedding failed: {e}")
                 # Fall through to individual embeddings
-                return [self.embed_text(text) for text in texts]
+                return [self._encode_text(text) for text in texts]
         
         # Fallback to sentence-transformers
         if self.local_model:
@@ -128,7 +222,7 @@ class EmbeddingService:
                 return [emb.tolist() for emb in embeddings]
             except Exception as e:
                 logger.error(f"Sentence-transformers batch embedding failed: {e}")
-                return [self.embed_text(text) for text in texts]
+                return [self._encode_text(text) for text in texts]
         
         return [None] * len(texts)
     
@@ -0,0 +1,178 @@
+"""
+Hybrid retrieval for cultural context
+BM25 over the knowledge base and vector search over its embeddings,
+merged with reciprocal-rank fusion under a latency budget
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .knowledge_base import KnowledgeBase
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """
+    Merge ranked lists by reciprocal rank: score(d) = sum over lists of 1 / (k + rank).
+
+    Rank-based, so BM25 and cosine scores never need to be put on one scale.
+
+    Args:
+        rankings: Ranked lists of document ids (best first)
+        k: Damping constant; larger values flatten the head of each list
+
+    Returns:
+        (document id, fused score) pairs, best first; ties keep first-seen order
+    """
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            scores[doc] = scores.get(doc, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+class HybridRetriever:
+    """
+    BM25 + vector retrieval fused with RRF.
+
+    The vector search runs on a worker thread while BM25 runs on the caller's;
+    whatever the vector side has not returned when the budget runs out is
+    dropped and the request is answered from BM25 alone. The abandoned search
+    still finishes in the background, so its query embedding lands in the
+    embedding cache for the next request.
+    """
+
+    def __init__(self, budget_ms: float = 150.0, depth: int = 10, rrf_k: int = 60, max_workers: int = 4):
+        """
+        Initialize hybrid retriever
+
+        Args:
+            budget_ms: Time allowed for one retrieval (a whole batch for retrieve_many)
+            depth: Candidates taken from each ranker before fusion
+            rrf_k: Reciprocal-rank fusion constant
+            max_workers: Threads for concurrent vector searches
+        """
+        self.budget_seconds = budget_ms / 1000.0
+        self.depth = depth
+        self.rrf_k = rrf_k
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hybrid-vector")
+        self.stats_counters = {"queries": 0, "vector_timeouts": 0, "vector_errors": 0}
+
+    def _wait(self, future, deadline: float) -> Optional[Any]:
+        """Result of a vector search, or None if it failed or missed the deadline"""
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            self.stats_counters["vector_timeouts"] += 1
+            logger.warning(f"Vector search exceeded the {self.budget_seconds * 1000:.0f}ms budget, using BM25 only")
+        except Exception as e:
+            self.stats_counters["vector_errors"] += 1
+            logger.warning(f"Vector search failed, using BM25 only: {e}")
+        return None
+
+    def _fuse(
+        self,
+        kb: KnowledgeBase,
+        bm25_results: List[Tuple[int, float]],
+        vector_results: Optional[List[Dict[str, Any]]],
+        languages: Set[str],
+        top_k: int
+    ) -> List[Dict[str, Any]]:
+        vector_scores: Dict[int, float] = {}
+        for result in vector_results or []:
+            position = kb.position_by_id.get(result.get("id"))
+            if position is not None and kb.languages[position] in languages and position not in vector_scores:
+                vector_scores[position] = result.get("score", 0)
+        bm25_scores = dict(bm25_results)
+
+        fused = reciprocal_rank_fusion(
+            [[position for position, _ in bm25_results], list(vector_scores)], k=self.rrf_k
+        )
+        retrieved = []
+        for position, score in fused[:top_k]:
+            entry = kb.entries[position].copy()
+            entry["retrieval_score"] = round(score, 6)
+            if position in bm25_scores:
+                entry["bm25_score"] = round(bm25_scores[position], 4)
+            if position in vector_scores:
+                entry["rag_score"] = vector_scores[position]
+            retrieved.append(entry)
+        return retrieved
+
+    def retrieve(
+        self,
+        kb: KnowledgeBase,
+        query: str,
+        languages: Iterable[str],
+        rag_service: Optional[Any] = None,
+        vector_language: Optional[str] = None,
+        top_k: int = 3
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve entries for one query
+
+        Args:
+            kb: Knowledge base snapshot
+            query: Query text
+            languages: Entry languages to accept ("" matches entries without a language)
+            rag_service: Vector search backend; None for BM25 only
+            vector_language: Language filter passed to the vector search
+            top_k: Number of entries to return
+
+        Returns:
+            Copies of the fused entries, best first, annotated with
+            retrieval_score and the bm25_score / rag_score that contributed
+        """
+        deadline = time.monotonic() + self.budget_seconds
+        self.stats_counters["queries"] += 1
+        future = None
+        if rag_service is not None:
+            future = self._executor.submit(rag_service.search, query, top_k=self.depth, language=vector_language)
+
+        allowed = set(languages)
+        bm25_results = kb.search_bm25(query, allowed, top_k=self.depth)
+        vector_results = self._wait(future, deadline) if future is not None else None
+        return self._fuse(kb, bm25_results, vector_results, allowed, top_k)
+
+    def retrieve_many(
+        self,
+        kb: KnowledgeBase,
+        queries: List[str],
+        languages: List[Iterable[str]],
+        rag_service: Optional[Any] = None,
+        vector_language: Optional[str] = None,
+        top_k: int = 3
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batch form of retrieve: one batched vector search for all queries, one budget for the batch
+
+        Args:
+            kb: Knowledge base snapshot
+            queries: Query texts
+            languages: Accepted entry languages, per query
+            rag_service: Vector search backend (must provide search_many); None for BM25 only
+            vector_language: Language filter passed to the vector search
+            top_k: Number of entries per query
+
+        Returns:
+            Fused entries per query, in input order
+        """
+        deadline = time.monotonic() + self.budget_seconds
+        self.stats_counters["queries"] += len(queries)
+        future = None
+        if rag_service is not None and queries:
+            future = self._executor.submit(rag_service.search_many, queries, top_k=self.depth, language=vector_language)
+
+        allowed = [set(query_languages) for query_languages in languages]
+        bm25_results = [kb.search_bm25(query, query_allowed, top_k=self.depth) for query, query_allowed in zip(queries, allowed)]
+        vector_results = (self._wait(future, deadline) if future is not None else None) or [None] * len(queries)
+        return [
+            self._fuse(kb, bm25, vector, query_allowed, top_k)
+            for bm25, vector, query_allowed in zip(bm25_results, vector_results, allowed)
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"budget_ms": self.budget_seconds * 1000, "depth": self.depth, "rrf_k": self.rrf_k, **self.stats_counters}
@@ -0,0 +1,139 @@
+"""
+Knowledge base index manifest
+Records, per indexed entry, the hash of the text and metadata it was embedded
+from and the embedding model used, so re-indexing only touches what changed
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str, metadata: Dict[str, Any]) -> str:
+    """Stable hash of what an entry is indexed from (text and vector metadata)"""
+    payload = json.dumps({"text": text, "metadata": metadata}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IndexDiff:
+    """Entry ids grouped by what re-indexing has to do with them"""
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def pending(self) -> List[str]:
+        """Entries that need embedding"""
+        return self.added + self.changed
+
+    def summary(self, sample: int = 20) -> Dict[str, Any]:
+        """Counts plus up to `sample` ids per group"""
+        return {
+            name: {"count": len(ids), "ids": ids[:sample]}
+            for name, ids in (
+                ("added", self.added), ("changed", self.changed),
+                ("unchanged", self.unchanged), ("removed", self.removed)
+            )
+        }
+
+
+class IndexManifest:
+    """
+    entry id -> {"hash", "model"} for one vector store.
+
+    `target` names the store (e.g. "pinecone:cultural-context"); a manifest
+    file written for another target is ignored, so pointing the service at a
+    new index triggers a full build instead of trusting stale records.
+    """
+
+    def __init__(self, target: str, path: str = ""):
+        """
+        Initialize an empty manifest
+
+        Args:
+            target: Vector store the manifest describes
+            path: JSON file to persist to; empty keeps the manifest in memory only
+        """
+        self.target = target
+        self.path = path
+        self.entries: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def load(cls, target: str, path: str = "") -> "IndexManifest":
+        """Manifest from `path`, or an empty one if missing, unreadable or for another target"""
+        manifest = cls(target, path)
+        if not path or not os.path.exists(path):
+            return manifest
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index manifest {path}: {e}")
+            return manifest
+        if data.get("target") != target:
+            logger.warning(f"Index manifest {path} is for '{data.get('target')}', not '{target}'; ignoring it")
+            return manifest
+        manifest.entries = {
+            entry_id: record for entry_id, record in (data.get("entries") or {}).items()
+            if isinstance(record, dict)
+        }
+        return manifest
+
+    def save(self) -> bool:
+        """Write the manifest atomically; no-op without a path"""
+        if not self.path:
+            return False
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(f"{self.path}.tmp", "w", encoding="utf-8") as f:
+                json.dump({"target": self.target, "entries": self.entries}, f)
+            os.replace(f"{self.path}.tmp", self.path)
+            return True
+        except OSError as e:
+            logger.error(f"Failed to save index manifest to {self.path}: {e}")
+            return False
+
+    def diff(self, hashes: Dict[str, str], model: Optional[str]) -> IndexDiff:
+        """
+        Compare the current knowledge base with what is indexed
+
+        Args:
+            hashes: entry id -> content_hash for every entry in the knowledge base
+            model: Embedding model that would be used now
+
+        Returns:
+            IndexDiff; an entry embedded with another model counts as changed
+        """
+        diff = IndexDiff()
+        for entry_id, digest in hashes.items():
+            record = self.entries.get(entry_id)
+            if record is None:
+                diff.added.append(entry_id)
+            elif record.get("hash") != digest or record.get("model") != model:
+                diff.changed.append(entry_id)
+            else:
+                diff.unchanged.append(entry_id)
+        diff.removed = [entry_id for entry_id in self.entries if entry_id not in hashes]
+        return diff
+
+    def record(self, entry_id: str, digest: str, model: Optional[str]) -> None:
+        self.entries[entry_id] = {"hash": digest, "model": model}
+
+    def forget(self, entry_ids: Iterable[str]) -> None:
+        for entry_id in entry_ids:
+            self.entries.pop(entry_id, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,281 @@
+"""
+Knowledge base manager
+Loads the cultural knowledge base and norms once into indexed, read-only snapshots
+and swaps in a fresh snapshot when the files change
+"""
+
+import hashlib
+import json
+import os
+import logging
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .bm25_index import BM25Index
+from .pattern_matcher import PatternMatcher
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+MOUNT_DIR = "/app/data/cultural-knowledge-base"
+
+# Mounted volume first, repo copy as fallback
+KB_PATHS = (os.path.join(MOUNT_DIR, "kb.json"), os.path.join(DATA_DIR, "kb.json"))
+NORMS_PATHS = (os.path.join(MOUNT_DIR, "cultural_norms.json"), os.path.join(DATA_DIR, "cultural_norms.json"))
+
+# (path, mtime_ns, size) per file; None when the file is missing
+FileSignature = Optional[Tuple[str, int, int]]
+
+
+def _resolve(paths: Sequence[str]) -> str:
+    """First existing path, or the last (fallback) path when none exist"""
+    for path in paths:
+        if os.path.exists(path):
+            return path
+    return paths[-1]
+
+
+def _signature(paths: Sequence[str]) -> FileSignature:
+    path = _resolve(paths)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def _bm25_document(entry: Dict[str, Any]) -> str:
+    """Text indexed for BM25: title and content, with keywords counted twice"""
+    keywords = " ".join(k for k in (entry.get("keywords") or []) if isinstance(k, str))
+    parts = (entry.get("title"), entry.get("content"), keywords, keywords)
+    return " ".join(part for part in parts if isinstance(part, str) and part)
+
+
+def _content_version(kb: Dict[str, Any], norms: Dict[str, Any]) -> str:
+    """Short hash of the loaded content; identical files give the same version on every replica"""
+    payload = json.dumps({"kb": kb, "norms": norms}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+
+def _read_json(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class KnowledgeBase:
+    """
+    Read-only, indexed snapshot of the knowledge base and cultural norms.
+
+    Built once per (re)load; request handlers share it without locking.
+    Entry dicts are shared as well, so callers copy before modifying one.
+    """
+
+    def __init__(self, kb: Dict[str, Any], norms: Dict[str, Any], signature: Tuple[FileSignature, FileSignature] = (None, None)):
+        entries = tuple(e for e in (kb.get("entries") or []) if isinstance(e, dict))
+        self.entries: Tuple[Dict[str, Any], ...] = entries
+        self.norms: Mapping[str, Any] = MappingProxyType(norms or {})
+        self.signature = signature
+        self.version = _content_version(kb, norms or {})
+        self.loaded_at = time.time()
+
+        by_id: Dict[str, Dict[str, Any]] = {}
+        position_by_id: Dict[str, int] = {}
+        keyword_index: Dict[str, List[int]] = {}
+        by_language: Dict[str, List[int]] = {}
+        languages: List[str] = []
+
+        for position, entry in enumerate(entries):
+            entry_id = entry.get("id")
+            if entry_id is not None:
+                by_id.setdefault(entry_id, entry)
+                position_by_id.setdefault(entry_id, position)
+
+            language = entry.get("language") or ""
+            languages.append(language)
+            by_language.setdefault(language, []).append(position)
+
+            lowered = tuple(k.lower() for k in (entry.get("keywords") or []) if isinstance(k, str) and k)
+            for keyword in lowered:
+                # Repeated keywords keep counting once each, as the per-entry scan did
+                keyword_index.setdefault(keyword, []).append(position)
+
+        self.by_id: Mapping[str, Dict[str, Any]] = MappingProxyType(by_id)
+        self.position_by_id: Mapping[str, int] = MappingProxyType(position_by_id)
+        self.keyword_index: Mapping[str, Tuple[int, ...]] = MappingProxyType({k: tuple(v) for k, v in keyword_index.items()})
+        self.by_language: Mapping[str, Tuple[int, ...]] = MappingProxyType({k: tuple(v) for k, v in by_language.items()})
+        self.languages: Tuple[str, ...] = tuple(languages)
+        # Keywords keep substring semantics ("choka" matches "nimechoka"), as the per-entry scan did
+        self.keyword_matcher = PatternMatcher(self.keyword_index.keys(), word_boundary=False)
+        self.bm25 = BM25Index([_bm25_document(entry) for entry in entries])
+        self._language_array = np.asarray(languages, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(entry_id)
+
+    def keyword_scores(self, text_lower: str) -> Dict[int, int]:
+        """Entry position -> number of its keywords found in `text_lower` (one pass over the text)"""
+        scores: Dict[int, int] = {}
+        for keyword in self.keyword_matcher.found(text_lower):
+            for position in self.keyword_index[keyword]:
+                scores[position] = scores.get(position, 0) + 1
+        return scores
+
+    def search_keywords(self, query: str, languages: Iterable[str], top_k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Keyword retrieval over the inverted index
+
+        Args:
+            query: Query text
+            languages: Entry languages to accept ("" matches entries without a language)
+            top_k: Number of entries to return
+
+        Returns:
+            Matching entries, best score first (ties keep knowledge base order)
+        """
+        allowed = set(languages)
+        scores = self.keyword_scores(query.lower())
+        ranked = sorted(
+            (position for position in scores if self.languages[position] in allowed),
+            key=lambda position: (-scores[position], position)
+        )
+        return [self.entries[position] for position in ranked[:top_k]]
+
+    def search_bm25(self, query: str, languages: Iterable[str], top_k: int = 10) -> List[Tuple[int, float]]:
+        """
+        BM25 retrieval over entry title, content and keywords
+
+        Args:
+            query: Query text
+            languages: Entry languages to accept ("" matches entries without a language)
+            top_k: Number of entries to return
+
+        Returns:
+            (entry position, score) pairs, best first
+        """
+        allowed = set(languages)
+        mask = None
+        if not allowed.issuperset(self.by_language):
+            mask = np.isin(self._language_array, list(allowed))
+        return self.bm25.search(query, top_k=top_k, mask=mask)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "keywords": len(self.keyword_index),
+            "bm25_terms": self.bm25.vocabulary_size,
+            "languages": {language or "unspecified": len(positions) for language, positions in self.by_language.items()},
+            "kb_path": self.signature[0][0] if self.signature[0] else None,
+            "norms_loaded": bool(self.norms),
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class KnowledgeBaseManager:
+    """
+    Owns the current KnowledgeBase snapshot.
+
+    - `current()` is the request-path accessor: a plain reference read of the
+      live snapshot (the first call loads it if startup has not).
+    - `reload_if_changed()` stats the files and reloads if their mtime/size
+      changed; the service calls it from a background task every
+      `check_interval` seconds, off the event loop.
+    - A reload builds the complete new snapshot first and then swaps one
+      reference, so readers see either the old or the new KB, never a mix.
+    - A file that fails to parse keeps the previous snapshot in service.
+    """
+
+    def __init__(
+        self,
+        kb_paths: Sequence[str] = KB_PATHS,
+        norms_paths: Sequence[str] = NORMS_PATHS,
+        check_interval: float = 5.0
+    ):
+        """
+        Initialize knowledge base manager
+
+        Args:
+            kb_paths: Candidate kb.json paths, in priority order
+            norms_paths: Candidate cultural_norms.json paths, in priority order
+            check_interval: Seconds between background file change checks (0 disables them)
+        """
+        self.kb_paths = tuple(kb_paths)
+        self.norms_paths = tuple(norms_paths)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._kb: Optional[KnowledgeBase] = None
+
+    def current(self) -> KnowledgeBase:
+        """Current snapshot, loading it on first use"""
+        kb = self._kb
+        if kb is None:
+            self.reload_if_changed()
+            kb = self._kb
+        return kb
+
+    def _signatures(self) -> Tuple[FileSignature, FileSignature]:
+        return (_signature(self.kb_paths), _signature(self.norms_paths))
+
+    def reload_if_changed(self) -> bool:
+        """Reload when the files' signatures differ from the live snapshot's"""
+        signature = self._signatures()
+        if self._kb is not None and self._kb.signature == signature:
+            return False
+        return self._reload(signature, force=False)
+
+    def reload(self) -> bool:
+        """Reload unconditionally (admin endpoint)"""
+        return self._reload(self._signatures(), force=True)
+
+    def _reload(self, signature: Tuple[FileSignature, FileSignature], force: bool) -> bool:
+        with self._lock:
+            # Another request may have reloaded while this one waited for the lock
+            if not force and self._kb is not None and self._kb.signature == signature:
+                return False
+            try:
+                kb = self._build(signature)
+            except Exception as e:
+                logger.error(f"Knowledge base reload failed, keeping current snapshot: {e}")
+                if self._kb is None:
+                    self._kb = KnowledgeBase({}, {}, signature)
+                return False
+            self._kb = kb
+            logger.info(f"Knowledge base loaded: {len(kb)} entries, {len(kb.keyword_index)} keywords")
+            return True
+
+    def _build(self, signature: Tuple[FileSignature, FileSignature]) -> KnowledgeBase:
+        kb_signature, norms_signature = signature
+        if kb_signature is None:
+            logger.warning(f"Knowledge base file not found at any of {list(self.kb_paths)}; serving an empty knowledge base")
+            kb = {}
+        else:
+            kb = _read_json(kb_signature[0])
+
+        norms: Dict[str, Any] = {}
+        if norms_signature is None:
+            logger.warning(f"Cultural norms file not found at any of {list(self.norms_paths)}, using empty norms")
+        else:
+            try:
+                norms = _read_json(norms_signature[0])
+            except Exception as e:
+                logger.warning(f"Failed to load cultural norms: {e}, using empty norms")
+        return KnowledgeBase(kb, norms, signature)
+
+
+# Global instance
+_manager: Optional[KnowledgeBaseManager] = None
+
+
+def get_knowledge_base_manager(check_interval: Optional[float] = None) -> KnowledgeBaseManager:
+    """Get or create knowledge base manager instance"""
+    global _manager
+    if _manager is None:
+        _manager = KnowledgeBaseManager(check_interval=5.0 if check_interval is None else check_interval)
+    return _manager
@@ -0,0 +1,186 @@
+"""
+Multi-pattern matcher
+Aho-Corasick automaton that finds every occurrence of a fixed set of phrases
+in one linear pass over the text, with optional regex-style word boundaries
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+
+@dataclass(frozen=True)
+class PatternMatch:
+    """Represents one occurrence of a pattern in the scanned text"""
+    pattern: str
+    index: int  # Position of the pattern in the order it was added
+    start: int
+    end: int
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same notion of a word character as the `\w` / `\b` regex classes
+    return ch.isalnum() or ch == "_"
+
+
+class PatternMatcher:
+    """
+    Compiled multi-pattern matcher.
+
+    Patterns are lowercased once at build time; callers pass lowercased text.
+    Scanning costs O(len(text) + matches) no matter how many patterns there are.
+
+    With `word_boundary=True` a match must satisfy `\\b` at both ends exactly as
+    `re.compile(r'\\b' + re.escape(pattern) + r'\\b')` would; otherwise any
+    substring occurrence counts (the semantics of `pattern in text`).
+    """
+
+    def __init__(self, patterns: Iterable[str], word_boundary: bool = True):
+        """
+        Build the automaton
+
+        Args:
+            patterns: Phrases to match; duplicates and empty strings are ignored
+            word_boundary: Require word boundaries around each match
+        """
+        self.word_boundary = word_boundary
+        self.patterns: List[str] = []
+
+        # Trie: goto[state] maps a character to the next state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Patterns ending at each state, longest first (own pattern, then via fail links)
+        self._output: List[Tuple[int, ...]] = [()]
+
+        seen = set()
+        for pattern in patterns:
+            if not isinstance(pattern, str):
+                continue
+            pattern = pattern.lower()
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            self._add(pattern, len(self.patterns))
+            self.patterns.append(pattern)
+
+        self._link()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _add(self, pattern: str, index: int) -> None:
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = (index,)
+
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue: List[int] = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def _scan(self, text: str) -> List[PatternMatch]:
+        """All occurrences (including overlapping ones) that satisfy the boundary rule"""
+        goto, fail, output, patterns = self._goto, self._fail, self._output, self.patterns
+        word_boundary = self.word_boundary
+        length = len(text)
+        found: List[PatternMatch] = []
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+            end = position + 1
+            for index in output[state]:
+                pattern = patterns[index]
+                start = end - len(pattern)
+                if word_boundary:
+                    before = start > 0 and _is_word_char(text[start - 1])
+                    after = end < length and _is_word_char(text[end])
+                    if before == _is_word_char(pattern[0]) or after == _is_word_char(pattern[-1]):
+                        continue
+                found.append(PatternMatch(pattern, index, start, end))
+        return found
+
+    def find_all(self, text: str) -> List[PatternMatch]:
+        """
+        Every pattern's occurrences, as if each pattern were searched on its own
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Matches ordered by start position (ties in pattern order); occurrences
+            of one pattern never overlap each other, different patterns may
+        """
+        if not text or not self.patterns:
+            return []
+        matches = sorted(self._scan(text), key=lambda m: (m.start, m.index))
+        last_end: Dict[int, int] = {}
+        result = []
+        for match in matches:
+            if match.start < last_end.get(match.index, 0):
+                continue
+            last_end[match.index] = match.end
+            result.append(match)
+        return result
+
+    def find_leftmost(self, text: str) -> List[PatternMatch]:
+        """
+        Non-overlapping matches with regex alternation semantics
+
+        Equivalent to `re.findall('|'.join(patterns), text)`: the leftmost match
+        wins and, among matches starting at the same position, the pattern added
+        first wins.
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Non-overlapping matches ordered by start position
+        """
+        if not text or not self.patterns:
+            return []
+        result = []
+        end = 0
+        for match in sorted(self._scan(text), key=lambda m: (m.start, m.index)):
+            if match.start < end:
+                continue
+            result.append(match)
+            end = match.end
+        return result
+
+    def found(self, text: str) -> List[str]:
+        """
+        Distinct patterns present in the text, in pattern order
+
+        Args:
+            text: Lowercased text to scan
+
+        Returns:
+            Patterns that occur at least once
+        """
+        if not text or not self.patterns:
+            return []
+        indexes = {match.index for match in self._scan(text)}
+        return [self.patterns[index] for index in sorted(indexes)]
+
@@ -1,14 +1,20 @@
 """
 RAG (Retrieval-Augmented Generation) service for cultural context
-Supports both vector database (Pinecone/Weaviate) and in-memory fallback
+Supports vector databases (Pinecone/Weaviate), a prebuilt local vector store
+file, and an in-memory fallback
 """
 
+import hashlib
 import os
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from typing import List, Dict, Any, Optional, Set, Tuple
 import json
 
 from .embeddings import get_embedding_service
+from .index_manifest import IndexDiff, IndexManifest, content_hash
+from .knowledge_base import DATA_DIR, MOUNT_DIR
+from .vector_index import VectorIndex
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +46,40 @@ except ImportError:
     Property = None
     DataType = None
 
+# Vector DB request sizes for batched writes (Pinecone recommends at most 100 vectors per upsert)
+UPSERT_BATCH_SIZE = int(os.getenv("VECTOR_UPSERT_BATCH_SIZE", "100"))
+DELETE_BATCH_SIZE = int(os.getenv("VECTOR_DELETE_BATCH_SIZE", "1000"))
+
+# (entry id, text, metadata, embedding)
+EmbeddedEntry = Tuple[str, str, Dict[str, Any], List[float]]
+
+
+def kb_entry_fields(entry: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any]]:
+    """
+    The (id, text, metadata) a knowledge base entry is indexed under.
+    
+    Args:
+        entry: Knowledge base entry from kb.json
+        
+    Returns:
+        Entry id, indexed text and vector metadata (keywords, language, region)
+    """
+    # Entries without an id get one derived from their content: stable across
+    # processes (unlike hash()), so the manifest diff still recognizes them
+    entry_id = entry.get("id") or hashlib.sha256(entry.get("content", "").encode("utf-8")).hexdigest()
+    metadata = {
+        "keywords": entry.get("keywords", []),
+        "language": entry.get("language", "en"),
+        "region": entry.get("region", "east_africa")
+    }
+    return entry_id, entry.get("content", ""), metadata
+
+
+def default_manifest_path() -> str:
+    """Index manifest beside kb.json on the mounted volume (the service data/ dir outside Docker)"""
+    directory = MOUNT_DIR if os.path.isdir(MOUNT_DIR) else DATA_DIR
+    return os.path.join(directory, "kb_index_manifest.json")
+
 
 class RAGService:
     """Service for semantic search and RAG"""
@@ -51,11 +91,20 @@ class RAGService:
         self.pinecone_index = None
         self.weaviate_client = None
         self.embedding_service = get_embedding_service()
-        self.in_memory_vectors: Dict[str, List[float]] = {}
+        self.index_mode = os.getenv("RAG_INDEX_MODE", "exact")
+        self.index_path = os.getenv("RAG_INDEX_PATH", "")
+        self.local_store_path = os.getenv("LOCAL_VECTOR_STORE_PATH", "")
+        self.manifest_path = os.getenv("KB_INDEX_MANIFEST_PATH") or default_manifest_path()
+        self._manifest: Optional[IndexManifest] = None
+        self.in_memory_vectors = VectorIndex(mode=self.index_mode)
+        
+        # A prebuilt local store needs no network and wins when configured
+        if self.local_store_path:
+            self._load_local_store()
         
         # Try Pinecone first (modern API - no environment needed)
         pinecone_api_key = os.getenv("PINECONE_API_KEY")
-        if PINECONE_AVAILABLE and pinecone_api_key:
+        if PINECONE_AVAILABLE and pinecone_api_key and not self.vector_db_type:
             try:
                 self.pinecone_client = Pinecone(api_key=pinecone_api_key)
                 index_name = os.getenv("PINECONE_INDEX_NAME", "cultural-context")
@@ -100,6 +149,70 @@ class RAGService:
         if not self.vector_db_type:
             self.vector_db_type = "memory"
             logger.info("Using in-memory vector storage (fallback)")
+            self._load_memory_index()
+    
+    def _load_local_store(self):
+        """
+        Memory-map the read-only vector store built by scripts/setup_vector_db.py.
+        
+        The vectors are mapped with mmap_mode="r", so every worker process on the
+        host shares one copy through the page cache and startup embeds nothing.
+        """
+        if not os.path.exists(f"{self.local_store_path}.npy"):
+            logger.warning(f"Local vector store not found at {self.local_store_path}; build it with scripts/setup_vector_db.py --provider local --index-kb")
+            return
+        try:
+            index = VectorIndex.load(self.local_store_path, mode=self.index_mode)
+        except Exception as e:
+            logger.warning(f"Failed to load local vector store: {e}")
+            return
+        if index.model != self._embedding_model_name():
+            logger.warning(
+                f"Local vector store was built with '{index.model}', "
+                f"current embedding model is '{self._embedding_model_name()}'; not using it"
+            )
+            return
+        self.in_memory_vectors = index
+        self.vector_db_type = "local"
+        logger.info(f"Using local vector store {self.local_store_path} ({len(index)} vectors)")
+    
+    def _embedding_model_name(self) -> Optional[str]:
+        model = getattr(self.embedding_service, "embedding_model", None)
+        return model if isinstance(model, str) else None
+    
+    def _load_memory_index(self):
+        """Reuse a persisted in-memory index (memory-mapped) if it was built with the current embedding model"""
+        if not self.index_path or not os.path.exists(f"{self.index_path}.npy"):
+            return
+        try:
+            index = VectorIndex.load(self.index_path, mode=self.index_mode)
+            if index.model != self._embedding_model_name():
+                logger.warning(
+                    f"Persisted vector index was built with '{index.model}', "
+                    f"current embedding model is '{self._embedding_model_name()}'; re-indexing"
+                )
+                return
+            self.in_memory_vectors = index
+            logger.info(f"Loaded {len(index)} vectors from {self.index_path}")
+        except Exception as e:
+            logger.warning(f"Failed to load persisted vector index: {e}")
+    
+    def save_memory_index(self) -> bool:
+        """
+        Persist the in-memory index to RAG_INDEX_PATH.
+        
+        Returns:
+            True if saved
+        """
+        if self.vector_db_type != "memory" or not self.index_path:
+            return False
+        try:
+            self.in_memory_vectors.model = self._embedding_model_name()
+            self.in_memory_vectors.save(self.index_path)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save vector index to {self.index_path}: {e}")
+            return False
     
     def _ensure_weaviate_schema(self):
         """Ensure Weaviate schema exists for CulturalContext class"""
@@ -207,11 +320,11 @@ class RAGService:
                 except:
                     return {"vector_db_type": "weaviate", "total_vector_count": 0}
             
-            elif self.vector_db_type == "memory":
-                return {
-                    "vector_db_type": "memory",
-                    "total_vector_count": len(self.in_memory_vectors)
-                }
+            elif self.vector_db_type in ("memory", "local"):
+                stats = {"vector_db_type": self.vector_db_type, **self.in_memory_vectors.stats()}
+                if self.vector_db_type == "local":
+                    stats["path"] = self.local_store_path
+                return stats
         except Exception as e:
             logger.error(f"Failed to get index stats: {e}")
         
@@ -231,18 +344,24 @@ class RAGService:
             if self.vector_db_type == "pinecone" and self.pinecone_index:
                 self.pinecone_index.delete(delete_all=True, namespace=namespace)
                 logger.info(f"Cleared Pinecone index namespace '{namespace}'")
+                self._reset_manifest()
                 return True
             
             elif self.vector_db_type == "weaviate" and self.weaviate_client:
                 collection = self.weaviate_client.collections.get("CulturalContext")
                 collection.data.delete_many(where=None)  # Delete all
                 logger.info("Cleared Weaviate collection")
+                self._reset_manifest()
                 return True
             
             elif self.vector_db_type == "memory":
                 self.in_memory_vectors.clear()
                 logger.info("Cleared in-memory vectors")
                 return True
+            
+            elif self.vector_db_type == "local":
+                logger.warning("Local vector store is read-only; rebuild it with scripts/setup_vector_db.py")
+                return False
                 
         except Exception as e:
             logger.error(f"Failed to clear index: {e}")
@@ -274,7 +393,7 @@ class RAGService:
                 # Try to check if client is ready
                 status["connected"] = self.weaviate_client.is_ready()
             
-            elif self.vector_db_type == "memory":
+            elif self.vector_db_type in ("memory", "local"):
                 status["connected"] = True
                 status["vector_count"] = len(self.in_memory_vectors)
         except Exception as e:
@@ -298,49 +417,123 @@ class RAGService:
             logger.warning("Embedding service not available, cannot index")
             return False
         
+        # Unchanged entries in a persisted in-memory index keep their vectors
+        if self.vector_db_type == "memory" and text and self.in_memory_vectors.is_current(entry_id, text, metadata):
+            return True
+        
         embedding = self.embedding_service.embed_text(text)
         if not embedding:
             return False
         
-        try:
-            if self.vector_db_type == "pinecone" and self.pinecone_index:
-                # Modern Pinecone API uses upsert with list of tuples
-                self.pinecone_index.upsert(
-                    vectors=[(entry_id, embedding, metadata)],
-                    namespace=""  # Default namespace
-                )
-                return True
-            
-            elif self.vector_db_type == "weaviate" and self.weaviate_client:
-                # Weaviate v4 uses collections API
-                collection = self.weaviate_client.collections.get("CulturalContext")
-                collection.data.insert(
-                    properties={
-                        "text": text,
-                        "keywords": metadata.get("keywords", []),
-                        "language": metadata.get("language", "en"),
-                        "region": metadata.get("region", "east_africa")
-                    },
-                    vector=embedding,
-                    uuid=entry_id
-                )
-                return True
-            
-            elif self.vector_db_type == "memory":
-                self.in_memory_vectors[entry_id] = {
-                    "embedding": embedding,
-                    "text": text,
-                    "metadata": metadata
-                }
-                return True
+        return self._store_embedding(entry_id, text, metadata, embedding)
+    
+    def _store_embedding(self, entry_id: str, text: str, metadata: Dict[str, Any], embedding: List[float]) -> bool:
+        """Write one embedded entry to the active vector store"""
+        return entry_id in self._store_embeddings([(entry_id, text, metadata, embedding)])
+    
+    def _store_embeddings(self, items: List[EmbeddedEntry], replace: Optional[Set[str]] = None) -> List[str]:
+        """
+        Write embedded entries to the active vector store in batched requests
+        
+        Args:
+            items: Entries to write
+            replace: Ids that already exist in the store (Weaviate deletes them before inserting)
             
-        except Exception as e:
-            logger.error(f"Failed to index entry {entry_id}: {e}")
-            return False
+        Returns:
+            Ids that were stored
+        """
+        stored: List[str] = []
+        for start in range(0, len(items), UPSERT_BATCH_SIZE):
+            chunk = items[start:start + UPSERT_BATCH_SIZE]
+            try:
+                if self.vector_db_type == "pinecone" and self.pinecone_index:
+                    # Modern Pinecone API uses upsert with list of tuples
+                    self.pinecone_index.upsert(
+                        vectors=[(entry_id, embedding, metadata) for entry_id, _, metadata, embedding in chunk],
+                        namespace=""  # Default namespace
+                    )
+                    stored.extend(entry_id for entry_id, _, _, _ in chunk)
+                
+                elif self.vector_db_type == "weaviate" and self.weaviate_client:
+                    # Weaviate v4 uses collections API; insert_many is one batch request
+                    from weaviate.classes.data import DataObject
+                    from weaviate.classes.query import Filter
+                    collection = self.weaviate_client.collections.get("CulturalContext")
+                    existing = [entry_id for entry_id, _, _, _ in chunk if replace and entry_id in replace]
+                    if existing:
+                        collection.data.delete_many(where=Filter.by_id().contains_any(existing))
+                    result = collection.data.insert_many([
+                        DataObject(
+                            properties={
+                                "text": text,
+                                "keywords": metadata.get("keywords", []),
+                                "language": metadata.get("language", "en"),
+                                "region": metadata.get("region", "east_africa")
+                            },
+                            vector=embedding,
+                            uuid=entry_id
+                        )
+                        for entry_id, text, metadata, embedding in chunk
+                    ])
+                    errors = getattr(result, "errors", None) or {}
+                    for i, (entry_id, _, _, _) in enumerate(chunk):
+                        if i in errors:
+                            logger.error(f"Failed to index entry {entry_id}: {errors[i]}")
+                        else:
+                            stored.append(entry_id)
+                
+                elif self.vector_db_type == "memory":
+                    stored.extend(
+                        entry_id for entry_id, text, metadata, embedding in chunk
+                        if self.in_memory_vectors.add(entry_id, embedding, text, metadata)
+                    )
+                
+                elif self.vector_db_type == "local":
+                    logger.warning(f"Local vector store is read-only; not indexing {len(chunk)} entries")
+                    
+            except Exception as e:
+                logger.error(f"Failed to index entries {chunk[0][0]}..{chunk[-1][0]}: {e}")
         
-        return False
+        return stored
     
-    def search(self, query: str, top_k: int = 3, language: Optional[str] = None) -> List[Dict[str, Any]]:
+    def _delete_entries(self, entry_ids: List[str]) -> List[str]:
+        """
+        Delete entries from the active vector store in batched requests
+        
+        Returns:
+            Ids that were deleted (or were already absent)
+        """
+        deleted: List[str] = []
+        for start in range(0, len(entry_ids), DELETE_BATCH_SIZE):
+            chunk = entry_ids[start:start + DELETE_BATCH_SIZE]
+            try:
+                if self.vector_db_type == "pinecone" and self.pinecone_index:
+                    self.pinecone_index.delete(ids=chunk, namespace="")
+                    deleted.extend(chunk)
+                
+                elif self.vector_db_type == "weaviate" and self.weaviate_client:
+                    from weaviate.classes.query import Filter
+                    collection = self.weaviate_client.collections.get("CulturalContext")
+                    collection.data.delete_many(where=Filter.by_id().contains_any(chunk))
+                    deleted.extend(chunk)
+                
+                elif self.vector_db_type == "memory":
+                    for entry_id in chunk:
+                        self.in_memory_vectors.remove(entry_id)
+                    deleted.extend(chunk)
+                    
+            except Exception as e:
+                logger.error(f"Failed to delete entries {chunk[0]}..{chunk[-1]}: {e}")
+        
+        return deleted
+    
+    def search(
+        self,
+        query: str,
+        top_k: int = 3,
+        language: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search for relevant cultural context entries.
         
@@ -348,6 +541,7 @@ class RAGService:
             query: Search query
             top_k: Number of results to return
             language: Optional language filter
+            region: Optional region filter
             
         Returns:
             List of relevant entries with scores
@@ -360,15 +554,78 @@ class RAGService:
         if not query_embedding:
             return []
         
+        return self._search_embedding(query_embedding, top_k=top_k, language=language, region=region)
+    
+    def search_many(
+        self,
+        queries: List[str],
+        top_k: int = 3,
+        language: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries with one embedding batch.
+        
+        The in-memory / local index scores all queries in one matrix product;
+        Pinecone / Weaviate are queried once per embedding.
+        
+        Args:
+            queries: Search queries
+            top_k: Number of results per query
+            language: Optional language filter
+            region: Optional region filter
+            
+        Returns:
+            One result list per query, in input order (empty where embedding failed)
+        """
+        if not queries:
+            return []
+        if not self.embedding_service.is_available():
+            logger.warning("Embedding service not available, falling back to keyword search")
+            return [[] for _ in queries]
+        
+        embeddings = self.embedding_service.embed_batch(queries)
+        embedded = [i for i, embedding in enumerate(embeddings) if embedding]
+        results: List[List[Dict[str, Any]]] = [[] for _ in queries]
+        if not embedded:
+            return results
+        
+        if self.vector_db_type in ("memory", "local"):
+            try:
+                found = self.in_memory_vectors.search_many(
+                    [embeddings[i] for i in embedded], top_k=top_k, language=language, region=region
+                )
+            except Exception as e:
+                logger.error(f"Vector search failed: {e}")
+                return results
+            for i, matches in zip(embedded, found):
+                results[i] = matches
+        else:
+            for i in embedded:
+                results[i] = self._search_embedding(embeddings[i], top_k=top_k, language=language, region=region)
+        return results
+    
+    def _search_embedding(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        language: Optional[str],
+        region: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Nearest entries to an already-computed query embedding"""
         try:
             if self.vector_db_type == "pinecone" and self.pinecone_index:
                 # Modern Pinecone API
-                filter_dict = {"language": {"$eq": language}} if language else None
+                filter_dict = {}
+                if language:
+                    filter_dict["language"] = {"$eq": language}
+                if region:
+                    filter_dict["region"] = {"$eq": region}
                 results = self.pinecone_index.query(
                     vector=query_embedding,
                     top_k=top_k,
                     include_metadata=True,
-                    filter=filter_dict,
+                    filter=filter_dict or None,
                     namespace=""  # Default namespace
                 )
                 return [
@@ -386,8 +643,13 @@ class RAGService:
                 
                 collection = self.weaviate_client.collections.get("CulturalContext")
                 
-                # Build filter if language specified
-                where_filter = Filter.by_property("language").equal(language) if language else None
+                # Build filter if language / region specified
+                filters = []
+                if language:
+                    filters.append(Filter.by_property("language").equal(language))
+                if region:
+                    filters.append(Filter.by_property("region").equal(region))
+                where_filter = Filter.all_of(filters) if len(filters) > 1 else (filters[0] if filters else None)
                 
                 # Query with near vector
                 response = collection.query.near_vector(
@@ -410,28 +672,9 @@ class RAGService:
                     for obj in response.objects
                 ]
             
-            elif self.vector_db_type == "memory":
-                # Calculate similarity for all entries
-                scored_entries = []
-                for entry_id, entry_data in self.in_memory_vectors.items():
-                    # Filter by language if specified
-                    if language and entry_data["metadata"].get("language") != language:
-                        continue
-                    
-                    similarity = self.embedding_service.cosine_similarity(
-                        query_embedding,
-                        entry_data["embedding"]
-                    )
-                    scored_entries.append({
-                        "id": entry_id,
-                        "score": similarity,
-                        "metadata": entry_data["metadata"],
-                        "text": entry_data["text"]
-                    })
-                
-                # Sort by score and return top_k
-                scored_entries.sort(key=lambda x: x["score"], reverse=True)
-                return scored_entries[:top_k]
+            elif self.vector_db_type in ("memory", "local"):
+                # One matrix-vector product over the pre-normalized index
+                return self.in_memory_vectors.search(query_embedding, top_k=top_k, language=language, region=region)
         
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
@@ -441,29 +684,153 @@ class RAGService:
     
     def index_knowledge_base(self, kb_entries: List[Dict[str, Any]]) -> int:
         """
-        Index all entries from knowledge base.
+        Index all entries from knowledge base (incrementally, see sync_knowledge_base).
         
         Args:
             kb_entries: List of knowledge base entries
             
         Returns:
-            Number of entries successfully indexed
+            Number of entries indexed and current
         """
-        indexed_count = 0
-        for entry in kb_entries:
-            entry_id = entry.get("id", str(hash(entry.get("content", ""))))
-            text = entry.get("content", "")
-            metadata = {
-                "keywords": entry.get("keywords", []),
-                "language": entry.get("language", "en"),
-                "region": entry.get("region", "east_africa")
-            }
+        return self.sync_knowledge_base(kb_entries)["indexed_count"]
+    
+    def _manifest_target(self) -> str:
+        if self.vector_db_type == "pinecone":
+            return f"pinecone:{os.getenv('PINECONE_INDEX_NAME', 'cultural-context')}"
+        if self.vector_db_type == "weaviate":
+            return f"weaviate:{os.getenv('WEAVIATE_URL', '')}"
+        return self.vector_db_type or "unknown"
+    
+    def _get_manifest(self) -> IndexManifest:
+        """Manifest for the active vector DB (loaded from the manifest path on first use)"""
+        target = self._manifest_target()
+        if self._manifest is None or self._manifest.target != target:
+            self._manifest = IndexManifest.load(target, self.manifest_path)
+        return self._manifest
+    
+    def _reset_manifest(self) -> None:
+        manifest = self._get_manifest()
+        manifest.clear()
+        manifest.save()
+    
+    def _diff(self, fields: Dict[str, Tuple[str, Dict[str, Any]]], hashes: Dict[str, str], model: Optional[str]) -> IndexDiff:
+        """What changed since the last indexing run"""
+        if self.vector_db_type != "memory":
+            return self._get_manifest().diff(hashes, model)
+        
+        # The in-memory index stores each entry's text and metadata (and is only
+        # loaded if built with the current model), so it is its own manifest
+        diff = IndexDiff()
+        for entry_id, (text, metadata) in fields.items():
+            if entry_id not in self.in_memory_vectors:
+                diff.added.append(entry_id)
+            elif text and self.in_memory_vectors.is_current(entry_id, text, metadata):
+                diff.unchanged.append(entry_id)
+            else:
+                diff.changed.append(entry_id)
+        diff.removed = [entry_id for entry_id in self.in_memory_vectors if entry_id not in fields]
+        return diff
+    
+    def sync_knowledge_base(self, kb_entries: List[Dict[str, Any]], full: bool = False) -> Dict[str, Any]:
+        """
+        Bring the vector store in line with the knowledge base.
+        
+        Only new and changed entries are embedded (in KB_INDEX_BATCH_SIZE chunks) and
+        written (batched upserts); entries no longer in the knowledge base are
+        deleted in batches. Pinecone/Weaviate runs compare against a manifest of
+        entry id -> content hash -> embedding model, persisted at
+        KB_INDEX_MANIFEST_PATH (by default beside kb.json) so restarts only
+        touch what changed; the in-memory index compares against its own
+        stored text and metadata.
+        
+        Args:
+            kb_entries: List of knowledge base entries
+            full: Re-embed every entry regardless of the manifest
             
-            if self.index_entry(entry_id, text, metadata):
-                indexed_count += 1
+        Returns:
+            Diff summary: added / changed / unchanged / removed (counts and sample ids),
+            indexed_count (entries now current), embedded, failed, model, elapsed_ms
+        """
+        started = time.perf_counter()
+        model = self._embedding_model_name()
+        
+        if self.vector_db_type == "local":
+            current = self._check_local_store(kb_entries)
+            return {"indexed_count": current, "embedded": 0, "failed": len(kb_entries) - current,
+                    "model": model, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+        
+        if not self.embedding_service.is_available():
+            logger.warning("Embedding service not available, cannot index")
+            return {"indexed_count": 0, "embedded": 0, "failed": len(kb_entries),
+                    "model": model, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+        
+        fields: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        for entry in kb_entries:
+            entry_id, text, metadata = kb_entry_fields(entry)
+            fields[entry_id] = (text, metadata)
+        hashes = {entry_id: content_hash(text, metadata) for entry_id, (text, metadata) in fields.items()}
+        
+        diff = self._diff(fields, hashes, model)
+        if full:
+            diff = IndexDiff(added=diff.added, changed=diff.changed + diff.unchanged, removed=diff.removed)
+        # The in-memory index needs no separate manifest
+        manifest = self._get_manifest() if self.vector_db_type != "memory" else None
         
-        logger.info(f"Indexed {indexed_count}/{len(kb_entries)} entries")
-        return indexed_count
+        if diff.removed:
+            deleted = self._delete_entries(diff.removed)
+            if manifest is not None:
+                manifest.forget(deleted)
+        
+        # Embed in chunks (one model/API call per chunk) and write each chunk as one batch
+        batch_size = max(1, int(os.getenv("KB_INDEX_BATCH_SIZE", "100")))
+        pending_ids = set(diff.pending)
+        pending = [entry_id for entry_id in fields if entry_id in pending_ids]  # Knowledge base order
+        # Weaviate rejects inserts over existing ids; without a manifest entry any id may exist
+        replace = set(pending)
+        stored_count = 0
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            embeddings = self.embedding_service.embed_batch([fields[entry_id][0] for entry_id in chunk])
+            items = [
+                (entry_id, fields[entry_id][0], fields[entry_id][1], embedding)
+                for entry_id, embedding in zip(chunk, embeddings) if embedding
+            ]
+            for entry_id in self._store_embeddings(items, replace):
+                if manifest is not None:
+                    manifest.record(entry_id, hashes[entry_id], model)
+                stored_count += 1
+        if manifest is not None:
+            manifest.save()
+        
+        indexed_count = len(diff.unchanged) + stored_count
+        summary = {
+            **diff.summary(),
+            "indexed_count": indexed_count,
+            "embedded": stored_count,
+            "failed": len(pending) - stored_count,
+            "model": model,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+        logger.info(
+            f"Indexed {indexed_count}/{len(fields)} entries: {len(diff.added)} added, {len(diff.changed)} changed, "
+            f"{len(diff.unchanged)} unchanged, {len(diff.removed)} removed, {summary['failed']} failed"
+        )
+        if self.vector_db_type == "memory" and self.index_path and (pending or diff.removed):
+            self.save_memory_index()
+        return summary
+    
+    def _check_local_store(self, kb_entries: List[Dict[str, Any]]) -> int:
+        """Count entries the read-only local store already holds; nothing is embedded"""
+        current = sum(
+            1 for entry in kb_entries
+            if self.in_memory_vectors.is_current(*kb_entry_fields(entry))
+        )
+        if current < len(kb_entries):
+            logger.warning(
+                f"Local vector store is missing or outdated for {len(kb_entries) - current} entries; "
+                "rebuild it with scripts/setup_vector_db.py --provider local --index-kb"
+            )
+        return current
     
     def is_available(self) -> bool:
         """Check if RAG service is available"""
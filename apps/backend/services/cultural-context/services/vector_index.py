@@ -0,0 +1,497 @@
+"""
+In-memory vector index for the RAG fallback
+Pre-normalized float32 embeddings in one contiguous matrix, exact top-k with a
+single matrix-vector product, optional IVF / HNSW modes and memory-mapped persistence
+"""
+
+import json
+import os
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Try to import hnswlib (optional graph index for large corpora)
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+    hnswlib = None
+
+INDEX_MODES = ("exact", "ivf", "hnsw")
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index over knowledge base embeddings.
+
+    - Rows are L2-normalized on insert, so a dot product is the cosine score.
+    - Entry languages and regions are stored as small integer codes next to
+      the matrix; a language/region filter is one vectorized comparison.
+    - `exact` mode scores every row and selects top-k with `argpartition`.
+      `ivf` (k-means lists, numpy only) and `hnsw` (requires hnswlib) only
+      kick in at `min_ann_size` rows; below that exact search is cheaper.
+    - `save()` writes the matrix as `.npy` plus a JSON sidecar; `load()`
+      memory-maps the matrix read-only, copying it only if it is modified.
+
+    Supports `in`, `len()` and `clear()` so it can stand in for the old
+    `{entry_id: {...}}` dict.
+    """
+
+    def __init__(
+        self,
+        mode: str = "exact",
+        min_ann_size: int = 2048,
+        ivf_lists: Optional[int] = None,
+        ivf_probes: int = 8,
+        hnsw_ef: int = 64
+    ):
+        """
+        Initialize vector index
+
+        Args:
+            mode: "exact", "ivf" or "hnsw"
+            min_ann_size: Row count from which the approximate modes are used
+            ivf_lists: Number of IVF lists (default: sqrt of the row count)
+            ivf_probes: IVF lists scanned per query
+            hnsw_ef: HNSW query-time candidate list size
+        """
+        if mode not in INDEX_MODES:
+            raise ValueError(f"Unknown vector index mode '{mode}', expected one of {INDEX_MODES}")
+        if mode == "hnsw" and not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib not available, vector index will use exact search")
+            mode = "exact"
+
+        self.mode = mode
+        self.min_ann_size = min_ann_size
+        self.ivf_lists = ivf_lists
+        self.ivf_probes = ivf_probes
+        self.hnsw_ef = hnsw_ef
+        self.model: Optional[str] = None
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._matrix: Optional[np.ndarray] = None
+        self._languages = np.zeros(0, dtype=np.int32)
+        self._regions = np.zeros(0, dtype=np.int32)
+        self._size = 0
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._language_codes: Dict[Optional[str], int] = {}
+        self._region_codes: Dict[Optional[str], int] = {}
+        self._invalidate_ann()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ids))
+
+    @property
+    def dimension(self) -> Optional[int]:
+        return None if self._matrix is None else self._matrix.shape[1]
+
+    @staticmethod
+    def _code(codes: Dict[Optional[str], int], value: Optional[str]) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = len(codes)
+            codes[value] = code
+        return code
+
+    def _language_code(self, language: Optional[str]) -> int:
+        return self._code(self._language_codes, language)
+
+    def _region_code(self, region: Optional[str]) -> int:
+        return self._code(self._region_codes, region)
+
+    def _reserve(self, rows: int, dimension: int) -> None:
+        """Grow capacity geometrically; also turns a read-only memmap into a private copy"""
+        if self._matrix is None:
+            capacity = max(rows, 64)
+            self._matrix = np.zeros((capacity, dimension), dtype=np.float32)
+            self._languages = np.zeros(capacity, dtype=np.int32)
+            self._regions = np.zeros(capacity, dtype=np.int32)
+            return
+        if rows <= self._matrix.shape[0] and self._matrix.flags.writeable:
+            return
+        capacity = max(rows, self._matrix.shape[0] * 2 if rows > self._matrix.shape[0] else self._matrix.shape[0])
+        matrix = np.zeros((capacity, dimension), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        languages = np.zeros(capacity, dtype=np.int32)
+        languages[:self._size] = self._languages[:self._size]
+        regions = np.zeros(capacity, dtype=np.int32)
+        regions[:self._size] = self._regions[:self._size]
+        self._matrix, self._languages, self._regions = matrix, languages, regions
+
+    def add(self, entry_id: str, embedding: List[float], text: str, metadata: Dict[str, Any]) -> bool:
+        """
+        Insert or replace an entry
+
+        Args:
+            entry_id: Entry identifier
+            embedding: Raw embedding (normalized here)
+            text: Indexed text
+            metadata: Entry metadata (language and region used for filtering)
+
+        Returns:
+            True if stored
+        """
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if self._matrix is not None and vector.shape[0] != self._matrix.shape[1]:
+            logger.error(f"Embedding dimension {vector.shape[0]} does not match index dimension {self._matrix.shape[1]}")
+            return False
+
+        position = self._positions.get(entry_id)
+        is_new = position is None
+        if is_new:
+            position = self._size
+            self._reserve(self._size + 1, vector.shape[0])
+            self._size += 1
+            self._ids.append(entry_id)
+            self._texts.append(text)
+            self._metadata.append(metadata)
+            self._positions[entry_id] = position
+        else:
+            self._reserve(self._size, vector.shape[0])
+            self._texts[position] = text
+            self._metadata[position] = metadata
+
+        self._matrix[position] = _normalize(vector)
+        self._languages[position] = self._language_code(metadata.get("language"))
+        self._regions[position] = self._region_code(metadata.get("region"))
+        self._ann_add(position, is_new)
+        return True
+
+    def remove(self, entry_id: str) -> bool:
+        """Delete an entry (the last row moves into its slot)"""
+        position = self._positions.pop(entry_id, None)
+        if position is None:
+            return False
+        last = self._size - 1
+        self._reserve(self._size, self._matrix.shape[1])
+        if position != last:
+            self._matrix[position] = self._matrix[last]
+            self._languages[position] = self._languages[last]
+            self._regions[position] = self._regions[last]
+            self._ids[position] = self._ids[last]
+            self._texts[position] = self._texts[last]
+            self._metadata[position] = self._metadata[last]
+            self._positions[self._ids[position]] = position
+        self._ids.pop()
+        self._texts.pop()
+        self._metadata.pop()
+        self._size = last
+        self._invalidate_ann()
+        return True
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        """Stored entry as {"embedding", "text", "metadata"} (embedding is normalized)"""
+        position = self._positions.get(entry_id)
+        if position is None:
+            return None
+        return {
+            "embedding": self._matrix[position].tolist(),
+            "text": self._texts[position],
+            "metadata": self._metadata[position]
+        }
+
+    def is_current(self, entry_id: str, text: str, metadata: Dict[str, Any]) -> bool:
+        """True if the entry is stored with exactly this text and metadata"""
+        position = self._positions.get(entry_id)
+        return position is not None and self._texts[position] == text and self._metadata[position] == metadata
+
+    def _filter_rows(self, language: Optional[str], region: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Row mask for a language/region filter
+
+        Returns:
+            None when there is no filter, else a boolean mask over the stored rows
+            (all False if a requested value was never indexed)
+        """
+        if not language and not region:
+            return None
+        mask = np.ones(self._size, dtype=bool)
+        for value, codes, column in (
+            (language, self._language_codes, self._languages),
+            (region, self._region_codes, self._regions),
+        ):
+            if not value:
+                continue
+            code = codes.get(value)
+            if code is None:
+                return np.zeros(self._size, dtype=bool)
+            mask &= column[:self._size] == code
+        return mask
+
+    def search(
+        self,
+        query_embedding: List[float],
+        top_k: int = 3,
+        language: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k entries by cosine similarity
+
+        Args:
+            query_embedding: Raw query embedding
+            top_k: Number of results to return
+            language: Only return entries whose metadata language equals this
+            region: Only return entries whose metadata region equals this
+
+        Returns:
+            List of {"id", "score", "metadata", "text"}, best first
+        """
+        if self._size == 0 or top_k <= 0:
+            return []
+        query = _normalize(np.asarray(query_embedding, dtype=np.float32).reshape(-1))
+        if query.shape[0] != self._matrix.shape[1]:
+            logger.error(f"Query dimension {query.shape[0]} does not match index dimension {self._matrix.shape[1]}")
+            return []
+
+        mask = self._filter_rows(language, region)
+        if mask is not None and not mask.any():
+            return []
+
+        candidates = self._ann_candidates(query, top_k, mask)
+        if candidates is None:
+            # Exact: one matrix-vector product over the (filtered) rows
+            if mask is None:
+                candidates = np.arange(self._size)
+                scores = self._matrix[:self._size] @ query
+            else:
+                candidates = np.flatnonzero(mask)
+                scores = self._matrix[candidates] @ query
+        else:
+            scores = self._matrix[candidates] @ query
+
+        return self._results(candidates, scores, top_k)
+
+    def search_many(
+        self,
+        query_embeddings: List[List[float]],
+        top_k: int = 3,
+        language: Optional[str] = None,
+        region: Optional[str] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k entries for several queries at once
+
+        In exact mode (or below `min_ann_size`) all queries are scored with one
+        matrix-matrix product; approximate modes answer them one by one.
+
+        Args:
+            query_embeddings: Raw query embeddings, all of the index dimension
+            top_k: Number of results per query
+            language: Only return entries whose metadata language equals this
+            region: Only return entries whose metadata region equals this
+
+        Returns:
+            One result list per query, in input order (same shape as `search`)
+        """
+        if not query_embeddings:
+            return []
+        if self._size == 0 or top_k <= 0:
+            return [[] for _ in query_embeddings]
+        if self._ann_ready():
+            return [self.search(query, top_k=top_k, language=language, region=region) for query in query_embeddings]
+
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim != 2 or queries.shape[1] != self._matrix.shape[1]:
+            logger.error(f"Query batch shape {queries.shape} does not match index dimension {self._matrix.shape[1]}")
+            return [[] for _ in query_embeddings]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1.0)
+
+        mask = self._filter_rows(language, region)
+        candidates = np.arange(self._size) if mask is None else np.flatnonzero(mask)
+        if candidates.size == 0:
+            return [[] for _ in query_embeddings]
+
+        scores = queries @ self._matrix[candidates].T
+        return [self._results(candidates, row, top_k) for row in scores]
+
+    def _results(self, candidates: np.ndarray, scores: np.ndarray, top_k: int) -> List[Dict[str, Any]]:
+        """Best `top_k` of the scored candidate rows as result dicts"""
+        if candidates.size == 0:
+            return []
+        k = min(top_k, candidates.size)
+        if k < candidates.size:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(candidates.size)
+        # Best score first; equal scores keep insertion order
+        order = top[np.lexsort((candidates[top], -scores[top]))]
+
+        return [
+            {
+                "id": self._ids[candidates[i]],
+                "score": float(scores[i]),
+                "metadata": self._metadata[candidates[i]],
+                "text": self._texts[candidates[i]]
+            }
+            for i in order
+        ]
+
+    def _invalidate_ann(self) -> None:
+        self._centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._hnsw = None
+
+    def _ann_ready(self) -> bool:
+        if self.mode == "exact" or self._size < self.min_ann_size:
+            return False
+        if self.mode == "ivf" and self._centroids is None:
+            self._build_ivf()
+        elif self.mode == "hnsw" and self._hnsw is None:
+            self._build_hnsw()
+        return True
+
+    def _ann_add(self, position: int, is_new: bool) -> None:
+        """Keep a built ANN structure current: new rows are inserted, replaced rows force a rebuild"""
+        if self._centroids is None and self._hnsw is None:
+            return
+        if not is_new:
+            self._invalidate_ann()
+        elif self._centroids is not None:
+            self._lists[int(np.argmax(self._centroids @ self._matrix[position]))].append(position)
+        else:
+            if self._size > self._hnsw.get_max_elements():
+                self._hnsw.resize_index(self._size * 2)
+            self._hnsw.add_items(self._matrix[position:position + 1], np.array([position]))
+
+    def _build_ivf(self, iterations: int = 10) -> None:
+        """Spherical k-means over the rows; each row is listed under its nearest centroid"""
+        data = self._matrix[:self._size]
+        lists = self.ivf_lists or max(1, int(np.sqrt(self._size)))
+        rng = np.random.default_rng(0)
+        centroids = data[rng.choice(self._size, size=min(lists, self._size), replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(data @ centroids.T, axis=1)
+            for c in range(centroids.shape[0]):
+                members = data[assignment == c]
+                if len(members):
+                    centroids[c] = _normalize(members.mean(axis=0))
+        assignment = np.argmax(data @ centroids.T, axis=1)
+        self._centroids = centroids
+        self._lists = [np.flatnonzero(assignment == c).tolist() for c in range(centroids.shape[0])]
+        logger.info(f"Built IVF vector index: {self._size} rows, {centroids.shape[0]} lists")
+
+    def _build_hnsw(self) -> None:
+        index = hnswlib.Index(space="ip", dim=self._matrix.shape[1])
+        index.init_index(max_elements=max(self._size * 2, 1024), ef_construction=200, M=16)
+        index.add_items(self._matrix[:self._size], np.arange(self._size))
+        index.set_ef(self.hnsw_ef)
+        self._hnsw = index
+        logger.info(f"Built HNSW vector index: {self._size} rows")
+
+    def _ann_candidates(self, query: np.ndarray, top_k: int, mask: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Candidate row positions from the approximate structure, or None for exact search"""
+        if not self._ann_ready():
+            return None
+        if self.mode == "ivf":
+            probes = min(self.ivf_probes, len(self._lists))
+            nearest = np.argpartition(-(self._centroids @ query), probes - 1)[:probes]
+            candidates = np.fromiter(
+                (p for c in nearest for p in self._lists[c]), dtype=np.int64
+            )
+            if mask is not None:
+                candidates = candidates[mask[candidates]]
+            return candidates
+
+        k = min(top_k, self._size)
+        filter_fn = None if mask is None else (lambda label: bool(mask[label]))
+        try:
+            labels, _ = self._hnsw.knn_query(query, k=k, filter=filter_fn)
+        except RuntimeError:
+            # Fewer than k rows pass the filter
+            return None
+        return labels[0].astype(np.int64)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to `<path>.npy` (vectors) and `<path>.json` (ids, texts, metadata)
+
+        Both files are written to temporary names and renamed into place.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        dimension = self.dimension or 0
+        matrix = self._matrix[:self._size] if self._matrix is not None else np.zeros((0, dimension), dtype=np.float32)
+        sidecar = {
+            "model": self.model,
+            "dimension": dimension,
+            "ids": self._ids,
+            "texts": self._texts,
+            "metadata": self._metadata,
+        }
+
+        with open(f"{path}.npy.tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=np.float32))
+        with open(f"{path}.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(sidecar, f)
+        os.replace(f"{path}.npy.tmp", f"{path}.npy")
+        os.replace(f"{path}.json.tmp", f"{path}.json")
+        logger.info(f"Saved vector index ({self._size} rows) to {path}")
+
+    @classmethod
+    def load(cls, path: str, **kwargs: Any) -> "VectorIndex":
+        """
+        Memory-map an index written by `save()`
+
+        Args:
+            path: Path prefix passed to `save()`
+            **kwargs: Constructor options (mode, min_ann_size, ...)
+
+        Returns:
+            VectorIndex backed by a read-only memmap of the vectors
+        """
+        with open(f"{path}.json", "r", encoding="utf-8") as f:
+            sidecar = json.load(f)
+        matrix = np.load(f"{path}.npy", mmap_mode="r")
+        if matrix.shape[0] != len(sidecar["ids"]):
+            raise ValueError(f"Vector index at {path} is inconsistent: {matrix.shape[0]} vectors, {len(sidecar['ids'])} ids")
+
+        index = cls(**kwargs)
+        index.model = sidecar.get("model")
+        index._matrix = matrix
+        index._size = matrix.shape[0]
+        index._ids = list(sidecar["ids"])
+        index._texts = list(sidecar["texts"])
+        index._metadata = list(sidecar["metadata"])
+        index._positions = {entry_id: i for i, entry_id in enumerate(index._ids)}
+        index._languages = np.array(
+            [index._language_code(metadata.get("language")) for metadata in index._metadata], dtype=np.int32
+        )
+        index._regions = np.array(
+            [index._region_code(metadata.get("region")) for metadata in index._metadata], dtype=np.int32
+        )
+        logger.info(f"Loaded vector index ({index._size} rows) from {path}")
+        return index
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "total_vector_count": self._size,
+            "dimension": self.dimension or 0,
+            "languages": sorted(language or "unspecified" for language in self._language_codes),
+            "regions": sorted(region or "unspecified" for region in self._region_codes),
+            "memory_mapped": isinstance(self._matrix, np.memmap),
+            "model": self.model,
+        }
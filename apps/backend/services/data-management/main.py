@@ -20,6 +20,8 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 import jwt
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 from models import (
     DeletionRequest, DeletionResponse, DeletionStatusResponse,
@@ -82,6 +84,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 # Security
 security = HTTPBearer()
 
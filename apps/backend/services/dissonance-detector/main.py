@@ -10,6 +10,8 @@ from contextlib import asynccontextmanager
 import logging
 from datetime import datetime, timezone
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 from models.dissonance_models import DissonanceRequest, DissonanceResponse, SentimentResult, DissonanceDetails
 from services.sentiment_analyzer import SentimentAnalyzer
@@ -55,6 +57,12 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 # CORS middleware - Configure appropriately for production
 debug_mode = getattr(settings, 'DEBUG', False)
 cors_origins = ["*"] if debug_mode else [
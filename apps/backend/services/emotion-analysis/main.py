@@ -32,6 +32,8 @@ except ImportError:
     EmotionDetector = None
     AudioProcessor = None
 
+from src.deadline import DeadlineExceeded, install_deadline, check_deadline
+from src.metrics import instrument_app, time_inference
 from config import settings
 from database import get_db
 from repositories.emotion_repository import EmotionRepository
@@ -75,6 +77,12 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="Emotion Analysis Service", version="1.0.0", lifespan=lifespan)
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -138,7 +146,9 @@ async def analyze_emotion(
             # - Target: <200ms wall-clock for ~2s @ 16kHz on a typical dev laptop (excluding model download).
             t0 = time.perf_counter()
             processed_audio = audio_processor.preprocess_audio(audio_bytes)
-            result = await emotion_detector.detect_emotion(processed_audio)
+            check_deadline()
+            with time_inference("emotion_detector"):
+                result = await emotion_detector.detect_emotion(processed_audio)
             elapsed_ms = (time.perf_counter() - t0) * 1000.0
             logger.info(f"Local emotion pipeline time: {elapsed_ms:.1f}ms (bytes={len(audio_bytes)})")
 
@@ -203,6 +213,8 @@ async def analyze_emotion(
             features_used=features_used
         )
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error analyzing emotion: {str(e)}")
         raise HTTPException(
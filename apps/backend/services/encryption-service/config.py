@@ -18,6 +18,10 @@ class Settings(BaseSettings):
     KEY_ROTATION_INTERVAL: int = 90  # days
     ENCRYPTION_ALGORITHM: str = "AES-256"
     
+    # Key derivation worker pool (PBKDF2 is CPU-bound, keep it off the event loop)
+    KDF_MAX_WORKERS: int = int(os.getenv("KDF_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+    KDF_MAX_PENDING: int = 64
+    
     # Security
     ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "admin-token-here")
     KEY_BACKUP_LOCATION: str = "/app/keys/backup/"
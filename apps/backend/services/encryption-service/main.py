@@ -15,6 +15,9 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import json
 
+from src.crypto_executor import CryptoExecutor, CryptoOverloadedError
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 from models.encryption_models import (
     EncryptionRequest, DecryptionRequest, KeyRotationRequest,
@@ -31,6 +34,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 class EncryptionManager:
     """Manages encryption keys and operations"""
     
@@ -230,6 +239,20 @@ class EncryptionManager:
 
 # Initialize encryption manager
 encryption_manager = EncryptionManager()
+kdf_pool = CryptoExecutor(max_workers=settings.KDF_MAX_WORKERS, max_pending=settings.KDF_MAX_PENDING, name="kdf")
+
+
+async def derive_user_key(user_id: str, password: str) -> bytes:
+    """Derive a user key on the KDF pool instead of the event loop; 503 when the pool is saturated"""
+    try:
+        return await kdf_pool.run(encryption_manager.generate_user_key, user_id, password)
+    except CryptoOverloadedError as e:
+        logger.warning("Key derivation pool saturated, rejecting request")
+        raise HTTPException(
+            status_code=503,
+            detail="Key derivation busy, please retry",
+            headers={"Retry-After": str(e.retry_after)}
+        )
 
 @app.get("/health")
 async def health_check():
@@ -334,13 +357,15 @@ async def rotate_key(request: KeyRotationRequest):
 async def generate_user_key(user_id: str, password: str):
     """Generate user-specific encryption key"""
     try:
-        key = encryption_manager.generate_user_key(user_id, password)
+        key = await derive_user_key(user_id, password)
         
         return {
             "success": True,
             "key": base64.b64encode(key).decode('utf-8')
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"User key generation request failed: {str(e)}")
         raise HTTPException(status_code=500, detail="User key generation request failed")
@@ -351,7 +376,8 @@ async def get_key_info():
     return {
         "algorithm": "AES-256",
         "key_rotation_schedule": encryption_manager.key_rotation_schedule,
-        "key_file_exists": os.path.exists(settings.MASTER_KEY_FILE)
+        "key_file_exists": os.path.exists(settings.MASTER_KEY_FILE),
+        "kdf_pool": kdf_pool.get_stats()
     }
 
 
@@ -507,7 +533,7 @@ async def encrypt_message(
     """
     try:
         # Generate user key from password
-        user_key = encryption_manager.generate_user_key(user_id, password)
+        user_key = await derive_user_key(user_id, password)
         
         # Encrypt message
         result = message_encryption_manager.encrypt_message(
@@ -522,6 +548,8 @@ async def encrypt_message(
             "result": result
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"E2E message encryption failed: {str(e)}")
         raise HTTPException(status_code=500, detail="E2E message encryption failed")
@@ -540,7 +568,7 @@ async def decrypt_message(
     """
     try:
         # Generate user key from password
-        user_key = encryption_manager.generate_user_key(user_id, password)
+        user_key = await derive_user_key(user_id, password)
         
         # Decrypt message
         envelope = message_encryption_manager.decrypt_message(
@@ -556,6 +584,8 @@ async def decrypt_message(
             "conversation_id": envelope.get("conversation_id")
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"E2E message decryption failed: {str(e)}")
         raise HTTPException(status_code=500, detail="E2E message decryption failed")
@@ -565,7 +595,7 @@ async def decrypt_message(
 async def batch_encrypt_messages(request: BatchEncryptRequest):
     """Encrypt multiple messages at once"""
     try:
-        user_key = encryption_manager.generate_user_key(request.user_id, request.password)
+        user_key = await derive_user_key(request.user_id, request.password)
         
         results = []
         for message in request.messages:
@@ -583,6 +613,8 @@ async def batch_encrypt_messages(request: BatchEncryptRequest):
             "results": results
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch encryption failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Batch encryption failed")
@@ -592,7 +624,7 @@ async def batch_encrypt_messages(request: BatchEncryptRequest):
 async def batch_decrypt_messages(request: BatchDecryptRequest):
     """Decrypt multiple messages at once"""
     try:
-        user_key = encryption_manager.generate_user_key(request.user_id, request.password)
+        user_key = await derive_user_key(request.user_id, request.password)
         
         results = []
         for encrypted_content in request.encrypted_contents:
@@ -613,6 +645,8 @@ async def batch_decrypt_messages(request: BatchDecryptRequest):
             "results": results
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Batch decryption failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Batch decryption failed")
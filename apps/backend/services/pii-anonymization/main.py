@@ -12,6 +12,8 @@ from fastapi import FastAPI, HTTPException, Depends, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings, PII_PATTERNS
 from models import (
     AnonymizeRequest, AnonymizeResponse,
@@ -32,6 +34,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 # Security
 security = HTTPBearer()
 
@@ -16,6 +16,8 @@ import uuid
 
 import jwt
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 from database import get_db
 
@@ -64,6 +66,12 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="Safety Moderation Service", version="1.0.0", lifespan=lifespan)
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
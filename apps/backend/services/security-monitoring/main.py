@@ -20,6 +20,8 @@ import redis
 import jwt
 import uuid
 
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 from config import settings
 
 # Configure logging
@@ -101,6 +103,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 # Security
 security = HTTPBearer()
 
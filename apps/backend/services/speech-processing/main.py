@@ -15,6 +15,8 @@ import tempfile
 import os
 from datetime import datetime
 
+from src.deadline import DeadlineExceeded, install_deadline, check_deadline
+from src.metrics import instrument_app, time_inference
 from config import settings
 from services.stt_service import STTService
 from services.language_detector import LanguageDetector
@@ -36,6 +38,12 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
@@ -103,13 +111,15 @@ async def transcribe_audio(
         else:
             confidence = 1.0
         
-        # Transcribe audio
-        transcription_result = await stt_service.transcribe(
-            audio=processed_audio,
-            language=language,
-            accent=accent,
-            enable_emotion_detection=enable_emotion_detection
-        )
+        # Transcribe audio (skip the model entirely if the caller already gave up)
+        check_deadline()
+        with time_inference(f"stt_{stt_service.current_provider}"):
+            transcription_result = await stt_service.transcribe(
+                audio=processed_audio,
+                language=language,
+                accent=accent,
+                enable_emotion_detection=enable_emotion_detection
+            )
         
         return STTResponse(
             text=transcription_result.text,
@@ -128,6 +138,8 @@ async def transcribe_audio(
             }
         )
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Transcription failed: {str(e)}")
         raise HTTPException(
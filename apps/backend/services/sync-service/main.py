@@ -20,6 +20,8 @@ from sqlalchemy.orm import sessionmaker
 from workers.sync_tasks import process_sync_operation
 from services.validator import get_data_validator
 from services.conflict_resolver import get_conflict_resolver
+from src.deadline import install_deadline
+from src.metrics import instrument_app
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -92,6 +94,12 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="Sync Service", version="1.0.0", lifespan=lifespan)
 
+# Honor the caller's X-Deadline-Ms budget
+install_deadline(app)
+
+# Prometheus metrics (/metrics)
+instrument_app(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
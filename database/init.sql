@@ -69,6 +69,7 @@ CREATE INDEX idx_conversations_emotion_summary ON conversations USING GIN (emoti
 -- Indexes for messages
 CREATE INDEX idx_messages_conversation_id ON messages(conversation_id);
 CREATE INDEX idx_messages_created_at ON messages(created_at);
+CREATE INDEX idx_messages_conversation_created_at ON messages(conversation_id, created_at DESC);
 CREATE INDEX idx_messages_type ON messages(message_type);
 CREATE INDEX idx_messages_emotion_data ON messages USING GIN (emotion_data);
 
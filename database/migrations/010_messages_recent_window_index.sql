@@ -0,0 +1,7 @@
+-- Migration 010: Recent-message window index
+-- Conversation-engine reads the newest N messages of a conversation on every
+-- /chat turn (ORDER BY created_at DESC LIMIT N); this index serves that read
+-- without sorting the whole conversation
+
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_created_at
+    ON messages(conversation_id, created_at DESC);
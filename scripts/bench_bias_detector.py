@@ -0,0 +1,148 @@
+"""
+Bias check throughput benchmark (cultural-context).
+
+Purpose:
+- Show the cost of `/bias-check` (`BiasDetector.assess_overall_sensitivity`)
+  on long AI responses. The old path ran detect_biases and
+  validate_cultural_sensitivity separately; each looped over every rule
+  regex, and the `.*` gaps made each regex backtrack across whole lines.
+  The compiled path matches every rule phrase in one automaton pass and
+  resolves only the rules whose phrases occurred.
+- Report ms per response and MB/s for both paths at several response sizes.
+
+Usage:
+  python ResonaAI/scripts/bench_bias_detector.py
+
+Environment:
+  BENCH_ROUNDS      Repetitions per size (default 20)
+  BENCH_SIZES       Comma-separated response sizes in characters (default 1000,10000,50000)
+  BENCH_LINE_CHARS  Average characters per line; long single-line responses are the worst case for the regexes (default 400)
+
+Notes:
+- Responses are synthetic counselling text with a few biased phrases mixed in.
+- The legacy path is the previous regex implementation, inlined here so the
+  comparison keeps working after the service changes.
+- Both paths are checked to produce the same assessment before timing.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "backend", "services", "cultural-context"))
+
+from services.bias_detector import DEFAULT_BIAS_RULES, DEFAULT_POSITIVE_RULES, BiasDetector  # noqa: E402
+
+SENTENCES = [
+    "It sounds like the last few weeks have been really heavy for you.",
+    "Many people in your community talk to family or a trusted elder first.",
+    "Your feelings are valid and it is understandable to feel tired.",
+    "Would it help to talk about what a normal day looks like right now?",
+    "Sometimes prayer and church community are an important source of strength.",
+    "We can take this one step at a time, at a pace that feels right for you.",
+    "I respect the role your culture and traditions play in how you cope.",
+    "If things feel overwhelming, a counsellor or a local support group can help.",
+]
+BIASED = [
+    "You should just get over it and move on.",
+    "Honestly, you must see a therapist, that is the best approach.",
+    "Your tradition is backward when it comes to mental health.",
+    "You people always make things harder than they are.",
+    "You need to cut off your family if they stress you.",
+]
+
+
+def _regex(rule: List[str]) -> re.Pattern:
+    return re.compile(r".*".join(r"\b(" + step.replace("'", "\\'") + r")\b" for step in rule), re.IGNORECASE)
+
+
+class LegacyBiasDetector(BiasDetector):
+    """The pre-compilation implementation: one regex per rule, one pass per rule and method"""
+
+    def __init__(self):
+        super().__init__()
+        self.patterns = {c: [_regex(r) for r in rules] for c, rules in DEFAULT_BIAS_RULES.items()}
+        self.positive_regex = [_regex(r) for r in DEFAULT_POSITIVE_RULES]
+
+    def assess(self, text: str) -> Dict[str, Any]:
+        text_lower = text.lower()
+        detections = []
+        for bias_type, patterns in self.patterns.items():
+            for pattern in patterns:
+                matches = pattern.findall(text_lower)
+                if matches:
+                    detections.append((bias_type, self._determine_severity(bias_type, matches), str(matches[0])))
+        respects = any(p.search(text) for p in self.positive_regex)
+        checks = [
+            respects or not self.patterns["cultural_insensitivity"][0].search(text),
+            not any(p.search(text) for p in self.patterns["stigmatizing"]),
+            not any(p.search(text) for p in self.patterns["western_assumptions"]),
+            not any(p.search(text) for p in self.patterns["inappropriate_advice"]),
+            not any(p.search(text) for p in self.patterns["alienating"]),
+        ]
+        return {"biases": detections, "checks": checks}
+
+
+def _compiled_summary(detector: BiasDetector, text: str) -> Dict[str, Any]:
+    assessment = detector.assess_overall_sensitivity(text)
+    return {
+        "biases": [(b.bias_type, b.severity, b.detected_pattern) for b in detector.detect_biases(text)],
+        "checks": [c["passed"] for c in assessment["sensitivity_checks"]],
+    }
+
+
+def _response(size: int, line_chars: int, rng: random.Random) -> str:
+    parts: List[str] = []
+    length = line = 0
+    while length < size:
+        sentence = rng.choice(BIASED) if rng.random() < 0.05 else rng.choice(SENTENCES)
+        line += len(sentence) + 1
+        separator = "\n" if line >= line_chars else " "
+        if separator == "\n":
+            line = 0
+        parts.append(sentence + separator)
+        length += len(sentence) + 1
+    return "".join(parts)[:size]
+
+
+def _time(fn, text: str, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        fn(text)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    rounds = int(os.getenv("BENCH_ROUNDS", "20"))
+    sizes = [int(s) for s in os.getenv("BENCH_SIZES", "1000,10000,50000").split(",")]
+    line_chars = int(os.getenv("BENCH_LINE_CHARS", "400"))
+
+    legacy = LegacyBiasDetector()
+    compiled = BiasDetector()
+    rng = random.Random(5)
+
+    print(f"rounds={rounds} line_chars={line_chars}")
+    print(f"{'chars':>7} {'legacy ms':>10} {'compiled ms':>12} {'legacy MB/s':>12} {'compiled MB/s':>14} {'speedup':>8}")
+    for size in sizes:
+        text = _response(size, line_chars, rng)
+        if legacy.assess(text) != _compiled_summary(compiled, text):
+            raise SystemExit(f"Legacy and compiled detectors disagree at {size} chars")
+        legacy_ms = _time(legacy.assess, text, rounds)
+        compiled_ms = _time(compiled.assess_overall_sensitivity, text, rounds)
+        mb = size / 1e6
+        print(
+            f"{size:>7} {legacy_ms:>10.3f} {compiled_ms:>12.3f} {mb / (legacy_ms / 1000):>12.2f} "
+            f"{mb / (compiled_ms / 1000):>14.2f} {legacy_ms / max(compiled_ms, 1e-9):>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
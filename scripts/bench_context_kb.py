@@ -0,0 +1,132 @@
+"""
+Knowledge base load/lookup benchmark (cultural-context).
+
+Purpose:
+- Show the per-request cost of the knowledge-base work behind a `/context`
+  cache miss: the old path re-read kb.json and cultural_norms.json and
+  scanned every entry's keywords on each request; the new path serves a
+  preloaded, indexed snapshot from `KnowledgeBaseManager`.
+- Report mean and p95 latency per request for both paths.
+
+Usage:
+  python ResonaAI/scripts/bench_context_kb.py
+
+Environment:
+  BENCH_ITERATIONS   Requests per path (default 500)
+  BENCH_KB_ENTRIES   Synthetic knowledge base size (default 2000)
+  BENCH_KEYWORDS     Keywords per entry (default 6)
+
+Notes:
+- Runs offline against a synthetic kb.json written to a temp directory; the
+  RAG path and Redis/Postgres caching are out of scope.
+- The snapshot path includes the manager's change check (`check_interval=0`
+  stats the files on every request, the worst case).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "backend", "services", "cultural-context"))
+
+from services.knowledge_base import KnowledgeBaseManager  # noqa: E402
+
+WORDS = [
+    "nimechoka", "sawa", "familia", "kazi", "pesa", "shule", "stress", "tired", "family", "work",
+    "money", "school", "church", "msongo", "huzuni", "upweke", "lonely", "sad", "pressure", "shame",
+]
+QUERIES = [
+    "nimechoka na kazi, I am so tired",
+    "Family pressure about money and school",
+    "niko sawa tu, just lonely lately",
+    "msongo wa mawazo at work",
+]
+
+
+def _synthetic_kb(entries: int, keywords: int) -> Dict[str, Any]:
+    rng = random.Random(7)
+    return {
+        "entries": [
+            {
+                "id": f"kb_{i:05d}",
+                "language": rng.choice(["sw", "en", ""]),
+                "keywords": [f"{rng.choice(WORDS)}{rng.randint(0, 40) or ''}" for _ in range(keywords)],
+                "content": "Cultural guidance " * 20,
+            }
+            for i in range(entries)
+        ]
+    }
+
+
+def _legacy_lookup(kb_path: str, norms_path: str, query: str, language: str) -> List[Dict[str, Any]]:
+    """What `/context` did per cache miss before the snapshot"""
+    with open(kb_path, "r", encoding="utf-8") as f:
+        kb = json.load(f)
+    with open(norms_path, "r", encoding="utf-8") as f:
+        json.load(f)
+    q = query.lower()
+    scored = []
+    for entry in kb.get("entries", []):
+        if entry.get("language") and entry.get("language") != language:
+            continue
+        score = sum(1 for k in entry.get("keywords", []) if k.lower() in q)
+        if score > 0:
+            scored.append((score, entry))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return [e for _, e in scored[:3]]
+
+
+def _timed(fn: Callable[[str], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    for i in range(iterations):
+        query = QUERIES[i % len(QUERIES)]
+        started = time.perf_counter()
+        fn(query)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def main() -> None:
+    iterations = int(os.getenv("BENCH_ITERATIONS", "500"))
+    entries = int(os.getenv("BENCH_KB_ENTRIES", "2000"))
+    keywords = int(os.getenv("BENCH_KEYWORDS", "6"))
+
+    workdir = tempfile.mkdtemp(prefix="bench_context_kb_")
+    kb_path = os.path.join(workdir, "kb.json")
+    norms_path = os.path.join(workdir, "cultural_norms.json")
+    with open(kb_path, "w", encoding="utf-8") as f:
+        json.dump(_synthetic_kb(entries, keywords), f)
+    with open(norms_path, "w", encoding="utf-8") as f:
+        json.dump({"cultural_values": {f"value_{i}": {"description": "x" * 200} for i in range(50)}}, f)
+
+    manager = KnowledgeBaseManager([kb_path], [norms_path], check_interval=0)
+    manager.current()
+
+    legacy = _timed(lambda q: _legacy_lookup(kb_path, norms_path, q, "sw"), iterations)
+    snapshot = _timed(lambda q: manager.current().search_keywords(q, {"", "sw"}), iterations)
+
+    # Both paths must agree on what they retrieve
+    for query in QUERIES:
+        assert [e["id"] for e in _legacy_lookup(kb_path, norms_path, query, "sw")] == \
+            [e["id"] for e in manager.current().search_keywords(query, {"", "sw"})]
+
+    print(f"entries={entries} keywords/entry={keywords} iterations={iterations}")
+    print(f"{'path':<10} {'mean ms':>9} {'p95 ms':>9}")
+    print(f"{'legacy':<10} {legacy['mean_ms']:>9} {legacy['p95_ms']:>9}")
+    print(f"{'snapshot':<10} {snapshot['mean_ms']:>9} {snapshot['p95_ms']:>9}")
+    print(f"speedup x{legacy['mean_ms'] / max(snapshot['mean_ms'], 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Batch cultural analysis benchmark (cultural-context).
+
+Purpose:
+- Show the per-item cost of analyzing N transcripts one request at a time
+  versus through `/cultural-analysis/batch` at batch sizes 1, 10 and 100.
+- The single path embeds each text, scores it against the vector index and
+  runs the pattern detectors; the batch path dedupes texts, embeds them in
+  one call, scores them with one matrix product (`RAGService.search_many`)
+  and runs the detectors once per distinct text.
+
+Usage:
+  python ResonaAI/scripts/bench_cultural_batch.py
+
+Environment:
+  BENCH_ROUNDS        Repetitions per batch size (default 5)
+  BENCH_KB_ENTRIES    Synthetic indexed entries (default 2000)
+  BENCH_DIMENSION     Embedding dimension (default 384)
+  BENCH_MODEL_CALL_MS Fixed cost of one synthetic model call (default 8)
+  BENCH_MODEL_TEXT_MS Added cost per text in a synthetic model call (default 0.5)
+  BENCH_REAL_MODEL    1 = use the configured sentence-transformers model instead
+
+Notes:
+- Runs offline with the in-memory vector index. Unless BENCH_REAL_MODEL=1,
+  embeddings come from a deterministic hash encoder that sleeps for the
+  configured per-call and per-text cost. A transformer's fixed cost per
+  forward pass is what batching amortizes.
+- The embedding cache is disabled so both paths pay for every distinct text.
+- Batches repeat about a third of their texts, the way replays of one user's
+  transcripts do.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+os.environ["EMBEDDING_CACHE_SIZE"] = "0"
+os.environ.setdefault("EMBEDDING_BATCH_WINDOW_MS", "0")
+os.environ.pop("PINECONE_API_KEY", None)
+os.environ.pop("WEAVIATE_URL", None)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "backend", "services", "cultural-context"))
+
+from services.code_switch_analyzer import get_code_switch_analyzer  # noqa: E402
+from services.deflection_detector import get_deflection_detector  # noqa: E402
+from services.rag_service import RAGService  # noqa: E402
+
+PHRASES = [
+    "nimechoka sana", "sawa tu", "I am so tired", "family pressure", "hakuna shida",
+    "sijambo", "money problems at work", "niko sawa", "I feel lonely", "msongo wa mawazo",
+    "school fees", "church community", "huzuni", "I'm fine", "pole sana",
+]
+
+
+class SyntheticEncoder:
+    """Deterministic stand-in for SentenceTransformer.encode with a per-call cost"""
+
+    def __init__(self, dimension: int, call_ms: float, text_ms: float):
+        self.dimension = dimension
+        self.call_seconds = call_ms / 1000.0
+        self.text_seconds = text_ms / 1000.0
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        return np.random.default_rng(seed).normal(size=self.dimension).astype(np.float32)
+
+    def encode(self, texts: Any, convert_to_numpy: bool = True) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        time.sleep(self.call_seconds + self.text_seconds * len(batch))
+        vectors = np.stack([self._vector(text) for text in batch])
+        return vectors[0] if single else vectors
+
+
+def _transcripts(count: int, rng: random.Random) -> List[str]:
+    distinct = [
+        f"{rng.choice(PHRASES)}, {rng.choice(PHRASES)} {i}"
+        for i in range(max(1, count - count // 3))
+    ]
+    return distinct + [rng.choice(distinct) for _ in range(count - len(distinct))]
+
+
+def _detect(text: str, language: str) -> Dict[str, Any]:
+    return {
+        "code_switching": get_code_switch_analyzer().analyze(text),
+        "deflection": get_deflection_detector().analyze(text, language),
+    }
+
+
+def _single_path(rag: RAGService, texts: List[str]) -> None:
+    for text in texts:
+        rag.search(text, top_k=3, language="sw")
+        _detect(text, "sw")
+
+
+def _batch_path(rag: RAGService, texts: List[str]) -> None:
+    unique = list(dict.fromkeys(texts))
+    rag.search_many(unique, top_k=3, language="sw")
+    for text in unique:
+        _detect(text, "sw")
+
+
+def main() -> None:
+    rounds = int(os.getenv("BENCH_ROUNDS", "5"))
+    entries = int(os.getenv("BENCH_KB_ENTRIES", "2000"))
+    dimension = int(os.getenv("BENCH_DIMENSION", "384"))
+
+    rag = RAGService()
+    if os.getenv("BENCH_REAL_MODEL") != "1":
+        rag.embedding_service.local_model = SyntheticEncoder(
+            dimension,
+            float(os.getenv("BENCH_MODEL_CALL_MS", "8")),
+            float(os.getenv("BENCH_MODEL_TEXT_MS", "0.5")),
+        )
+        rag.embedding_service.embedding_model = "synthetic"
+    if not rag.embedding_service.is_available():
+        raise SystemExit("No embedding model available (set BENCH_REAL_MODEL=0 for the synthetic encoder)")
+
+    rng = np.random.default_rng(3)
+    for i in range(entries):
+        rag.in_memory_vectors.add(
+            f"kb_{i:05d}", rng.normal(size=dimension).tolist(), "Cultural guidance",
+            {"language": "sw" if i % 2 else "en"}
+        )
+
+    # Warm the detectors' pattern automata
+    _detect("sawa tu", "sw")
+
+    text_rng = random.Random(11)
+    print(f"entries={entries} dimension={dimension} rounds={rounds}")
+    print(f"{'batch':>6} {'single ms/item':>15} {'batch ms/item':>14} {'speedup':>8}")
+    for size in (1, 10, 100):
+        single_samples, batch_samples = [], []
+        for _ in range(rounds):
+            texts = _transcripts(size, text_rng)
+            started = time.perf_counter()
+            _single_path(rag, texts)
+            single_samples.append((time.perf_counter() - started) / size)
+            started = time.perf_counter()
+            _batch_path(rag, texts)
+            batch_samples.append((time.perf_counter() - started) / size)
+        single_ms = statistics.median(single_samples) * 1000
+        batch_ms = statistics.median(batch_samples) * 1000
+        print(f"{size:>6} {single_ms:>15.3f} {batch_ms:>14.3f} {single_ms / max(batch_ms, 1e-9):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+"""
+Gateway load test with local service stand-ins (API Gateway).
+
+Purpose:
+- Measure gateway throughput and latency without Docker or network access:
+  the real gateway app is driven in-process, every SERVICE_URLS backend is
+  replaced by a stand-in with configurable latency and payload size, Redis
+  is fakeredis and the database is a local SQLite file.
+- Drives mixed traffic (login, refresh, chat, emotion upload, ui-config
+  polling) and reports RPS, p50/p95/p99 per scenario and time spent in each
+  middleware layer.
+
+Usage:
+  python ResonaAI/scripts/bench_gateway_load.py
+
+Environment:
+  LOADTEST_DURATION        Seconds of traffic (default 10)
+  LOADTEST_CONCURRENCY     Concurrent clients (default 20)
+  LOADTEST_USERS           Virtual users (default 20)
+  LOADTEST_MIX             Scenario weights (default login:1,refresh:1,chat:4,emotion:2,ui_config:6)
+  LOADTEST_LATENCY_MS      Stand-in service latency (default 20)
+  LOADTEST_JITTER_MS       Uniform latency jitter added on top (default 10)
+  LOADTEST_PAYLOAD_BYTES   Padding added to every stand-in response (default 512)
+  LOADTEST_AUDIO_BYTES     Size of the uploaded audio clip (default 32000)
+  LOADTEST_SEED            Random seed (default 7)
+  LOADTEST_OUTPUT          Optional path for a JSON report (CI artifact)
+  LOADTEST_LOG_LEVEL       Gateway log level during the run (default CRITICAL)
+
+Notes:
+- Requires fakeredis (dev dependency); nothing else beyond the gateway's own
+  requirements. No ports are opened.
+- Middleware "self" time is inclusive time minus the next layer's inclusive
+  time, averaged over all requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from unittest import mock
+
+import httpx
+from fastapi import FastAPI, Request
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+GATEWAY_DIR = os.path.join(REPO_ROOT, "apps", "backend", "gateway")
+
+PASSWORD = "LoadTest!2345"
+DEFAULT_MIX = "login:1,refresh:1,chat:4,emotion:2,ui_config:6"
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50_ms": round(_percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+def parse_mix(raw: str) -> Dict[str, float]:
+    """Parse "name:weight,..." into a weight table"""
+    mix = {}
+    for part in raw.split(","):
+        name, _, weight = part.strip().partition(":")
+        if name:
+            mix[name] = float(weight or 1)
+    return mix
+
+
+# ---------------------------------------------------------------------------
+# Service stand-ins
+# ---------------------------------------------------------------------------
+
+def build_standin_app(latency_ms: float, jitter_ms: float, payload_bytes: int, seed: int = 0):
+    """
+    One ASGI app answering for every backend service
+
+    The target service is taken from the Host header (e.g. emotion-analysis:8000),
+    so the gateway's SERVICE_URLS work unchanged.
+    """
+    rng = random.Random(seed)
+    padding = "x" * payload_bytes
+    app = FastAPI()
+    app.state.calls = Counter()
+
+    responses = {
+        "speech-processing": lambda: {"text": "nimechoka sana", "language": "sw", "confidence": 0.92},
+        "emotion-analysis": lambda: {
+            "emotion": "sad", "confidence": 0.81,
+            "probabilities": {"sad": 0.81, "neutral": 0.12, "fear": 0.07},
+            "timestamp": datetime.now(timezone.utc).isoformat(), "features_used": ["mfcc", "pitch"],
+        },
+        "conversation-engine": lambda: {"response": "Pole sana. Tell me more about what is tiring you.", "conversation_id": str(uuid.uuid4())},
+        "cultural-context": lambda: {"context": "fatigue idioms", "language": "sw", "cultural_context": []},
+    }
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
+    async def handle(path: str, request: Request):
+        service = request.headers.get("host", "").split(":")[0]
+        app.state.calls[service] += 1
+        await request.body()
+        await asyncio.sleep((latency_ms + rng.uniform(0, jitter_ms)) / 1000.0)
+        body = responses.get(service, lambda: {"status": "ok"})()
+        body["padding"] = padding
+        return body
+
+    return app
+
+
+# ---------------------------------------------------------------------------
+# Middleware timing
+# ---------------------------------------------------------------------------
+
+class LayerTimes:
+    """Inclusive time per middleware layer, outermost first"""
+
+    def __init__(self):
+        self.order: List[str] = []
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def report(self) -> List[Dict[str, Any]]:
+        rows = []
+        for i, name in enumerate(self.order):
+            samples = self.samples.get(name, [])
+            inclusive = sum(samples) / len(samples) if samples else 0.0
+            inner = self.order[i + 1] if i + 1 < len(self.order) else None
+            inner_samples = self.samples.get(inner, []) if inner else []
+            inner_avg = sum(inner_samples) / len(inner_samples) if inner_samples else 0.0
+            rows.append({
+                "layer": name,
+                "calls": len(samples),
+                "inclusive_avg_ms": round(inclusive * 1000, 3),
+                "self_avg_ms": round(max(0.0, inclusive - inner_avg) * 1000, 3),
+            })
+        return rows
+
+
+class _TimedLayer:
+    """ASGI wrapper recording the inclusive time of one middleware"""
+
+    def __init__(self, app, inner_cls=None, inner_options=None, layer_name="", layer_times=None):
+        self.app = inner_cls(app, **inner_options) if inner_cls is not None else app
+        self.layer_name = layer_name
+        self.layer_times = layer_times
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.layer_times.samples[self.layer_name].append(time.perf_counter() - started)
+
+
+def instrument_middleware(app, layer_times: LayerTimes) -> None:
+    """Wrap every user middleware (and the router) in a timing layer; call before the first request"""
+    from starlette.middleware import Middleware
+
+    wrapped = []
+    for middleware in app.user_middleware:
+        cls, options = middleware.cls, middleware.options
+        name = getattr(options.get("dispatch"), "__name__", None) or cls.__name__
+        layer_times.order.append(name)
+        wrapped.append(Middleware(
+            _TimedLayer, inner_cls=cls, inner_options=options, layer_name=name, layer_times=layer_times
+        ))
+    layer_times.order.append("router+endpoint")
+    wrapped.append(Middleware(_TimedLayer, layer_name="router+endpoint", layer_times=layer_times))
+    app.user_middleware = wrapped
+    app.middleware_stack = None
+
+
+# ---------------------------------------------------------------------------
+# Environment setup
+# ---------------------------------------------------------------------------
+
+def _register_sqlite_types() -> None:
+    """Render the gateway's Postgres column types on SQLite"""
+    from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
+    from sqlalchemy.ext.compiler import compiles
+
+    @compiles(UUID, "sqlite")
+    def _uuid(type_, compiler, **kw):
+        return "CHAR(32)"
+
+    @compiles(JSONB, "sqlite")
+    def _jsonb(type_, compiler, **kw):
+        return "JSON"
+
+    @compiles(ARRAY, "sqlite")
+    def _array(type_, compiler, **kw):
+        return "JSON"
+
+
+def load_gateway(workdir: str):
+    """
+    Import the gateway with fakeredis, a SQLite database and debug migrations off
+
+    Returns:
+        (gateway main module, list of setup warnings)
+    """
+    import fakeredis
+    import redis
+
+    warnings: List[str] = []
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'gateway.db')}")
+    os.environ.setdefault("AUDIT_SPOOL_PATH", os.path.join(workdir, "audit_spool.jsonl"))
+    os.environ["DEBUG"] = "false"
+
+    server = fakeredis.FakeServer()
+
+    def fake_redis(*args, **kwargs):
+        return fakeredis.FakeRedis(server=server, decode_responses=kwargs.get("decode_responses", False))
+
+    # Gateway modules plus the shared `src` package it imports
+    for path in (REPO_ROOT, GATEWAY_DIR):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    # The gateway builds its Redis client at import time
+    with mock.patch.object(redis, "Redis", fake_redis):
+        import main as gateway
+
+    _register_sqlite_types()
+    from database import Base, get_engine
+    try:
+        Base.metadata.create_all(get_engine())
+    except Exception as e:
+        warnings.append(f"schema creation failed: {e}")
+
+    from sqlalchemy.orm import configure_mappers
+    try:
+        configure_mappers()
+    except Exception as e:
+        warnings.append(f"ORM mappers failed to configure, DB-backed scenarios will error: {e}")
+
+    return gateway, warnings
+
+
+@dataclass
+class VirtualUser:
+    email: str
+    user_id: str
+    access_token: str
+    refresh_token: Optional[str] = None
+    ui_etag: Optional[str] = None
+
+
+def seed_users(gateway, count: int, warnings: List[str]) -> List[VirtualUser]:
+    """Create users in the database (when possible) and mint access tokens for them"""
+    import jwt
+
+    from auth_service import create_user
+    from database import get_sessionmaker
+
+    settings = gateway.settings
+    users = []
+    db = get_sessionmaker()()
+    try:
+        for i in range(count):
+            email = f"loadtest{i}@example.com"
+            user_id = str(uuid.uuid4())
+            try:
+                user = create_user(db, email, PASSWORD, consent_version="1.0")
+                user_id = str(user.id)
+            except Exception as e:
+                db.rollback()
+                if i == 0:
+                    warnings.append(f"user seeding failed, login will return errors: {e}")
+            token = jwt.encode(
+                {"user_id": user_id, "email": email, "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+                settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM
+            )
+            users.append(VirtualUser(email=email, user_id=user_id, access_token=token))
+    finally:
+        db.close()
+    return users
+
+
+# ---------------------------------------------------------------------------
+# Traffic
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Results:
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+
+
+async def _scenario(name: str, client: httpx.AsyncClient, user: VirtualUser, audio: bytes) -> httpx.Response:
+    auth = {"Authorization": f"Bearer {user.access_token}"}
+    if name == "login":
+        return await client.post("/auth/login", json={"email": user.email, "password": PASSWORD})
+    if name == "refresh":
+        response = await client.post(
+            "/auth/refresh", json={"refresh_token": user.refresh_token or "unknown-token"}, headers=auth
+        )
+        if response.status_code == 200:
+            user.refresh_token = response.json().get("refresh_token")
+        return response
+    if name == "chat":
+        return await client.post("/conversation/chat", json={
+            "message": "nimechoka sana", "user_id": user.user_id, "conversation_id": None
+        }, headers=auth)
+    if name == "emotion":
+        return await client.post(
+            "/emotion/analyze", files={"file": ("clip.wav", audio, "audio/wav")}, headers=auth
+        )
+    if name == "ui_config":
+        headers = dict(auth)
+        if user.ui_etag:
+            headers["If-None-Match"] = user.ui_etag
+        response = await client.get("/api/ui-config", headers=headers)
+        user.ui_etag = response.headers.get("etag") or user.ui_etag
+        return response
+    raise ValueError(f"Unknown scenario: {name}")
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    users: List[VirtualUser],
+    mix: Dict[str, float],
+    duration: float,
+    concurrency: int,
+    audio: bytes,
+    seed: int
+) -> Results:
+    """Closed-loop traffic: each client issues its next request as soon as the previous one returns"""
+    results = Results()
+    names, weights = list(mix), list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            user = rng.choice(users)
+            started = time.perf_counter()
+            try:
+                response = await _scenario(name, client, user, audio)
+                status_label = str(response.status_code)
+            except Exception as e:
+                status_label = type(e).__name__
+            results.latencies[name].append(time.perf_counter() - started)
+            results.statuses[name][status_label] += 1
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return results
+
+
+async def run(
+    duration: float = 10.0,
+    concurrency: int = 20,
+    user_count: int = 20,
+    mix: Optional[Dict[str, float]] = None,
+    latency_ms: float = 20.0,
+    jitter_ms: float = 10.0,
+    payload_bytes: int = 512,
+    audio_bytes: int = 32000,
+    seed: int = 7,
+    workdir: Optional[str] = None
+) -> Dict[str, Any]:
+    """Run the load test and return the report"""
+    workdir = workdir or tempfile.mkdtemp(prefix="gateway-loadtest-")
+    gateway, warnings = load_gateway(workdir)
+
+    standins = build_standin_app(latency_ms, jitter_ms, payload_bytes, seed)
+    standin_transport = httpx.ASGITransport(app=standins)
+    gateway.http_client = httpx.AsyncClient(transport=standin_transport, timeout=30.0)
+    gateway.health_checker.http_client = httpx.AsyncClient(transport=standin_transport, timeout=5.0)
+
+    layer_times = LayerTimes()
+    instrument_middleware(gateway.app, layer_times)
+
+    users = seed_users(gateway, user_count, warnings)
+    audio = bytes(random.Random(seed).getrandbits(8) for _ in range(audio_bytes))
+
+    async with gateway.app.router.lifespan_context(gateway.app):
+        # Exclude setup traffic (health probes) from the layer timings
+        layer_times.samples.clear()
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=gateway.app, client=("10.0.0.1", 5000)),
+            base_url="http://localhost"
+        ) as client:
+            started = time.perf_counter()
+            results = await drive(client, users, mix or parse_mix(DEFAULT_MIX), duration, concurrency, audio, seed)
+            elapsed = time.perf_counter() - started
+
+    total = sum(len(v) for v in results.latencies.values())
+    all_latencies = [s for v in results.latencies.values() for s in v]
+    return {
+        "config": {
+            "duration_s": duration, "concurrency": concurrency, "users": user_count,
+            "latency_ms": latency_ms, "jitter_ms": jitter_ms, "payload_bytes": payload_bytes,
+        },
+        "warnings": warnings,
+        "requests": total,
+        "rps": round(total / elapsed, 1) if elapsed else 0.0,
+        "overall": _summary(all_latencies),
+        "scenarios": {
+            name: {**_summary(samples), "statuses": dict(results.statuses[name])}
+            for name, samples in sorted(results.latencies.items())
+        },
+        "middleware": layer_times.report(),
+        "backend_calls": dict(standins.state.calls),
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    for warning in report["warnings"]:
+        print(f"WARNING: {warning}")
+    print(f"\n{report['requests']} requests, {report['rps']} req/s, overall {report['overall']}")
+    print(f"\n{'scenario':<12}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}  statuses")
+    for name, row in report["scenarios"].items():
+        print(f"{name:<12}{row['count']:>7}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}  {row['statuses']}")
+    print(f"\n{'middleware (outermost first)':<32}{'calls':>7}{'incl ms':>10}{'self ms':>10}")
+    for row in report["middleware"]:
+        print(f"{row['layer']:<32}{row['calls']:>7}{row['inclusive_avg_ms']:>10}{row['self_avg_ms']:>10}")
+
+
+def main() -> None:
+    logging.basicConfig(level=os.getenv("LOADTEST_LOG_LEVEL", "CRITICAL"), force=True)
+    report = asyncio.run(run(
+        duration=float(os.getenv("LOADTEST_DURATION", "10")),
+        concurrency=int(os.getenv("LOADTEST_CONCURRENCY", "20")),
+        user_count=int(os.getenv("LOADTEST_USERS", "20")),
+        mix=parse_mix(os.getenv("LOADTEST_MIX", DEFAULT_MIX)),
+        latency_ms=float(os.getenv("LOADTEST_LATENCY_MS", "20")),
+        jitter_ms=float(os.getenv("LOADTEST_JITTER_MS", "10")),
+        payload_bytes=int(os.getenv("LOADTEST_PAYLOAD_BYTES", "512")),
+        audio_bytes=int(os.getenv("LOADTEST_AUDIO_BYTES", "32000")),
+        seed=int(os.getenv("LOADTEST_SEED", "7")),
+    ))
+    _print_report(report)
+    output = os.getenv("LOADTEST_OUTPUT")
+    if output:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Login storm benchmark (API Gateway).
+
+Purpose:
+- Fire a burst of concurrent logins and, at the same time, probe an unrelated
+  endpoint to show how much password hashing affects the rest of the gateway.
+- Reports p50/p99 latency for the probe and the login status breakdown
+  (200 / 401 / 503 shed by admission control).
+
+Usage:
+  python ResonaAI/scripts/bench_login_storm.py
+
+Environment:
+  BENCH_BASE_URL       Gateway URL (default http://localhost:8000)
+  BENCH_EMAIL          Login email (default smoke_test@example.com)
+  BENCH_PASSWORD       Login password (default password123)
+  BENCH_LOGINS         Total login requests (default 200)
+  BENCH_CONCURRENCY    Concurrent login requests (default 50)
+  BENCH_PROBE_PATH     Unrelated endpoint to probe (default /health)
+  BENCH_PROBE_INTERVAL Seconds between probes (default 0.05)
+
+Notes:
+- Requires the stack running locally with the benchmark user registered
+  (run smoke_test.py once first).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Dict, List
+
+import httpx
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(samples),
+        "p50_ms": round(_percentile(samples, 50) * 1000, 1),
+        "p99_ms": round(_percentile(samples, 99) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1) if samples else 0.0,
+    }
+
+
+async def _probe(client: httpx.AsyncClient, path: str, interval: float, stop: asyncio.Event) -> List[float]:
+    latencies: List[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            await client.get(path)
+            latencies.append(time.perf_counter() - started)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _login_storm(client: httpx.AsyncClient, total: int, concurrency: int, email: str, password: str) -> Counter:
+    statuses: Counter = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_login() -> None:
+        async with semaphore:
+            try:
+                r = await client.post("/auth/login", json={"email": email, "password": password})
+                statuses[r.status_code] += 1
+            except httpx.HTTPError:
+                statuses["error"] += 1
+
+    await asyncio.gather(*(one_login() for _ in range(total)))
+    return statuses
+
+
+async def run() -> int:
+    base_url = os.getenv("BENCH_BASE_URL", "http://localhost:8000").rstrip("/")
+    email = os.getenv("BENCH_EMAIL", "smoke_test@example.com")
+    password = os.getenv("BENCH_PASSWORD", "password123")
+    total = int(os.getenv("BENCH_LOGINS", "200"))
+    concurrency = int(os.getenv("BENCH_CONCURRENCY", "50"))
+    probe_path = os.getenv("BENCH_PROBE_PATH", "/health")
+    probe_interval = float(os.getenv("BENCH_PROBE_INTERVAL", "0.05"))
+
+    limits = httpx.Limits(max_connections=concurrency + 10)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+        # Baseline: probe latency with no login load
+        stop = asyncio.Event()
+        baseline_task = asyncio.create_task(_probe(client, probe_path, probe_interval, stop))
+        await asyncio.sleep(2.0)
+        stop.set()
+        baseline = await baseline_task
+
+        # Under load: probe while the login storm runs
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(_probe(client, probe_path, probe_interval, stop))
+        started = time.perf_counter()
+        statuses = await _login_storm(client, total, concurrency, email, password)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        under_load = await probe_task
+
+    print(f"\n== Login storm: {total} logins, concurrency {concurrency}, {elapsed:.1f}s ==")
+    print(f"login statuses: {dict(statuses)}")
+    print(f"logins/s:       {total / elapsed:.1f}")
+    print(f"\n== {probe_path} latency ==")
+    print(f"baseline:   {_summary(baseline)}")
+    print(f"under load: {_summary(under_load)}")
+    return 0
+
+
+def main() -> int:
+    return asyncio.run(run())
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+"""
+Payload size and serialization benchmark (API Gateway).
+
+Purpose:
+- Show bytes-on-wire for representative gateway responses in full (verbose)
+  and slim form, uncompressed and with gzip / brotli.
+- Compare JSON serialization CPU time for the stdlib encoder and orjson.
+
+Usage:
+  python ResonaAI/scripts/bench_payloads.py
+
+Environment:
+  BENCH_ITERATIONS   Serialization iterations per payload (default 2000)
+  BENCH_KB_ENTRIES   Retrieved KB entries in the cultural context payload (default 5)
+  BENCH_GZIP_LEVEL   gzip level (default 6, matches COMPRESSION_GZIP_LEVEL)
+  BENCH_BR_QUALITY   brotli quality (default 4, matches COMPRESSION_BROTLI_QUALITY)
+
+Notes:
+- Runs offline; payload shapes mirror the cultural-context /context,
+  emotion-analysis /analyze and /session/turn responses.
+- Slim payloads use the same HEAVY_FIELDS table the gateway applies.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "backend", "gateway"))
+
+from utils.payload import HEAVY_FIELDS, select_fields  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _kb_entry(i: int) -> Dict[str, Any]:
+    return {
+        "id": f"kb_{i:03d}",
+        "content": (
+            "In many East African communities, emotional distress is often expressed indirectly. "
+            "Phrases such as 'nimechoka' (I am tired) or 'niko sawa' (I am fine) may mask deeper "
+            "feelings. Family reputation and privacy shape how and when people seek help. "
+        ) * 3,
+        "keywords": ["nimechoka", "niko sawa", "family", "privacy", "stigma"],
+    }
+
+
+def cultural_context_payload(entries: int) -> Dict[str, Any]:
+    retrieved = [_kb_entry(i) for i in range(entries)]
+    deflection = {
+        "deflection_detected": True,
+        "patterns": [{"phrase": "niko sawa", "cultural_meaning": "minimizing distress", "confidence": 0.8}],
+    }
+    code_switching = {"code_switching_detected": True, "intensity": "medium", "switches": 3}
+    return {
+        "cultural_context": retrieved,
+        "context": "\n\n".join(e["content"] for e in retrieved),
+        "language": "sw",
+        "query": "nimechoka sana lakini niko sawa",
+        "source": "local_kb_retrieval",
+        "matches": [{"id": e["id"], "keywords": e["keywords"]} for e in retrieved],
+        "deflection_analysis": deflection,
+        "code_switching_analysis": code_switching,
+        "code_switching": code_switching,
+        "deflection": deflection,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "cultural_norms_loaded": True,
+        "cultural_norms_version": "1.0",
+    }
+
+
+def emotion_payload() -> Dict[str, Any]:
+    return {
+        "emotion": "sad",
+        "confidence": 0.81,
+        "probabilities": {e: round(1 / 7, 6) for e in ["neutral", "happy", "sad", "angry", "fear", "surprise", "disgust"]},
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "features_used": ["mfcc", "pitch", "energy", "spectral_centroid", "zcr", "wav2vec2"],
+    }
+
+
+def session_turn_payload(entries: int) -> Dict[str, Any]:
+    return {
+        "stages": [
+            {"stage": "stt", "status": "ok", "data": {"text": "nimechoka sana", "language": "sw"}},
+            {"stage": "emotion", "status": "ok", "data": emotion_payload()},
+            {"stage": "cultural", "status": "ok", "data": cultural_context_payload(entries)},
+            {"stage": "chat", "status": "ok", "data": {"response": "Pole sana, tell me more."}},
+        ],
+        "reply": {"response": "Pole sana, tell me more."},
+    }
+
+
+def _time(fn: Callable[[], bytes], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def _sizes(body: bytes, gzip_level: int, br_quality: int) -> Dict[str, Any]:
+    sizes = {"raw": len(body), "gzip": len(gzip.compress(body, compresslevel=gzip_level))}
+    sizes["br"] = len(brotli.compress(body, quality=br_quality)) if brotli else None
+    return sizes
+
+
+def main() -> None:
+    iterations = int(os.getenv("BENCH_ITERATIONS", "2000"))
+    entries = int(os.getenv("BENCH_KB_ENTRIES", "5"))
+    gzip_level = int(os.getenv("BENCH_GZIP_LEVEL", "6"))
+    br_quality = int(os.getenv("BENCH_BR_QUALITY", "4"))
+
+    payloads = {
+        "cultural_context": (cultural_context_payload(entries), HEAVY_FIELDS["cultural_context"]),
+        "emotion_analysis": (emotion_payload(), HEAVY_FIELDS["emotion_analysis"]),
+        "session_turn": (session_turn_payload(entries), ()),
+    }
+
+    print("Bytes on wire")
+    print(f"{'payload':<18}{'variant':<9}{'raw':>9}{'gzip':>9}{'br':>9}")
+    for name, (payload, heavy) in payloads.items():
+        variants = {"verbose": payload}
+        if heavy:
+            variants["slim"] = select_fields(payload, verbose=False, heavy=heavy)
+        for variant, body in variants.items():
+            sizes = _sizes(json.dumps(body).encode(), gzip_level, br_quality)
+            br = sizes["br"] if sizes["br"] is not None else "n/a"
+            print(f"{name:<18}{variant:<9}{sizes['raw']:>9}{sizes['gzip']:>9}{br:>9}")
+
+    print()
+    print(f"Serialization CPU (us per call, {iterations} iterations)")
+    print(f"{'payload':<18}{'json':>9}{'orjson':>9}{'gzip':>9}{'br':>9}")
+    for name, (payload, _) in payloads.items():
+        body = json.dumps(payload).encode()
+        stdlib_us = _time(lambda: json.dumps(payload).encode(), iterations)
+        orjson_us = _time(lambda: orjson.dumps(payload), iterations) if orjson else None
+        gzip_us = _time(lambda: gzip.compress(body, compresslevel=gzip_level), iterations)
+        br_us = _time(lambda: brotli.compress(body, quality=br_quality), iterations) if brotli else None
+        print(
+            f"{name:<18}{stdlib_us:>9.1f}"
+            f"{(f'{orjson_us:.1f}' if orjson_us is not None else 'n/a'):>9}"
+            f"{gzip_us:>9.1f}"
+            f"{(f'{br_us:.1f}' if br_us is not None else 'n/a'):>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Offline retrieval evaluation (cultural-context).
+
+Purpose:
+- Report recall@3 and per-query latency of the retrieval strategies on a
+  small labelled sw/en fixture:
+  keyword  substring keyword matching (the pre-hybrid fallback)
+  bm25     BM25 with Swahili-aware tokens
+  vector   embedding search alone
+  hybrid   BM25 + vector merged with reciprocal-rank fusion (the /context path)
+
+Usage:
+  python ResonaAI/scripts/eval_cultural_retrieval.py [fixture.json]
+
+Environment:
+  EVAL_ROUNDS             Timed repetitions per query (default 20)
+  RETRIEVAL_BUDGET_MS     Hybrid latency budget (default 150)
+
+Notes:
+- The fixture defaults to tests/services/cultural-context/fixtures/retrieval_relevance.json.
+- vector and hybrid need an embedding model (sentence-transformers or
+  OPENAI_API_KEY); without one they are skipped and hybrid equals bm25.
+- Entries are embedded into the in-memory index before timing, so vector
+  latency is query embedding + search.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Set
+
+os.environ.pop("PINECONE_API_KEY", None)
+os.environ.pop("WEAVIATE_URL", None)
+os.environ.pop("LOCAL_VECTOR_STORE_PATH", None)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "apps", "backend", "services", "cultural-context"))
+
+from services.code_switch_analyzer import get_code_switch_analyzer  # noqa: E402
+from services.hybrid_retriever import HybridRetriever  # noqa: E402
+from services.knowledge_base import KnowledgeBase  # noqa: E402
+from services.rag_service import RAGService  # noqa: E402
+
+DEFAULT_FIXTURE = os.path.join(
+    os.path.dirname(__file__), "..", "tests", "services", "cultural-context", "fixtures", "retrieval_relevance.json"
+)
+
+
+def _allowed_languages(kb: KnowledgeBase, query: str, language: str) -> Set[str]:
+    """Same language rule as main._allowed_languages"""
+    languages = {"", language}
+    if language != "sw" and kb.by_language.get("sw"):
+        if get_code_switch_analyzer().analyze(query).get("code_switching_detected"):
+            languages.add("sw")
+    return languages
+
+
+def _recall_at_3(retrieved: List[Dict[str, Any]], relevant: List[str]) -> float:
+    top = {entry.get("id") for entry in retrieved[:3]}
+    return len(top & set(relevant)) / len(relevant)
+
+
+def evaluate(
+    name: str,
+    queries: List[Dict[str, Any]],
+    retrieve: Callable[[str, str], List[Dict[str, Any]]],
+    rounds: int
+) -> None:
+    recalls, latencies, misses = [], [], []
+    for item in queries:
+        retrieved = retrieve(item["query"], item["language"])
+        recall = _recall_at_3(retrieved, item["relevant"])
+        recalls.append(recall)
+        if recall == 0:
+            misses.append(item["query"])
+        for _ in range(rounds):
+            started = time.perf_counter()
+            retrieve(item["query"], item["language"])
+            latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"{name:>8} {statistics.mean(recalls):>9.3f} "
+        f"{statistics.median(latencies):>10.3f} {p95:>8.3f}"
+    )
+    for query in misses:
+        print(f"{'':>8}   miss: {query}")
+
+
+def main() -> None:
+    fixture_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURE
+    with open(fixture_path, "r", encoding="utf-8") as f:
+        fixture = json.load(f)
+    rounds = int(os.getenv("EVAL_ROUNDS", "20"))
+
+    kb = KnowledgeBase({"entries": fixture["entries"]}, {})
+    queries = fixture["queries"]
+    retriever = HybridRetriever(budget_ms=float(os.getenv("RETRIEVAL_BUDGET_MS", "150")))
+
+    rag = RAGService()
+    if rag.is_available():
+        rag.index_knowledge_base(list(kb.entries))
+    else:
+        rag = None
+
+    strategies: Dict[str, Callable[[str, str], List[Dict[str, Any]]]] = {
+        "keyword": lambda q, lang: kb.search_keywords(q, _allowed_languages(kb, q, lang), top_k=3),
+        "bm25": lambda q, lang: retriever.retrieve(kb, q, _allowed_languages(kb, q, lang)),
+    }
+    if rag is not None:
+        strategies["vector"] = lambda q, lang: [
+            kb.get(r["id"]) for r in rag.search(q, top_k=3, language=lang) if kb.get(r["id"])
+        ]
+        strategies["hybrid"] = lambda q, lang: retriever.retrieve(
+            kb, q, _allowed_languages(kb, q, lang), rag, vector_language=lang
+        )
+    else:
+        print("No embedding model available: skipping vector and hybrid")
+
+    print(f"entries={len(kb)} queries={len(queries)} rounds={rounds}")
+    print(f"{'strategy':>8} {'recall@3':>9} {'median ms':>10} {'p95 ms':>8}")
+    for name, retrieve in strategies.items():
+        evaluate(name, queries, retrieve, rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Bounded worker pool for CPU-bound password hashing and key derivation
+
+Shared by the gateway (bcrypt / PBKDF2 password checks) and encryption-service
+(PBKDF2 user key derivation). bcrypt and PBKDF2 each take 100-300 ms of CPU per call. Running them inline in
+an async endpoint blocks the event loop for every other request on the worker,
+so they are dispatched to a small dedicated thread pool instead (both release
+the GIL while hashing). Admission control caps the number of jobs waiting for
+a worker so a login storm is shed with 503s instead of queueing unboundedly.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CryptoOverloadedError(Exception):
+    """Raised when the crypto pool already has too many jobs in flight"""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Crypto worker pool is saturated")
+        self.retry_after = retry_after
+
+
+def _percentile(samples: Deque[float], pct: float) -> float:
+    """Nearest-rank percentile of a sample window (0.0 when empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class CryptoExecutor:
+    """Runs blocking crypto functions on a bounded thread pool"""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        sample_size: int = 1000,
+        name: str = "crypto"
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._queue_wait: Deque[float] = deque(maxlen=sample_size)
+        self._run_time: Deque[float] = deque(maxlen=sample_size)
+        self.stats = {"submitted": 0, "completed": 0, "rejected": 0, "failed": 0}
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.name
+                    )
+        return self._executor
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def _admit(self):
+        with self._lock:
+            # Jobs beyond the worker count are queued; cap how deep that queue can get.
+            if self._in_flight >= self.max_workers + self.max_pending:
+                self.stats["rejected"] += 1
+                raise CryptoOverloadedError()
+            self._in_flight += 1
+            self.stats["submitted"] += 1
+
+    def _release(self, failed: bool):
+        with self._lock:
+            self._in_flight -= 1
+            self.stats["failed" if failed else "completed"] += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run `fn(*args)` on the crypto pool.
+
+        Args:
+            fn: Blocking function to execute
+            *args: Positional arguments for `fn`
+
+        Returns:
+            Whatever `fn` returns
+
+        Raises:
+            CryptoOverloadedError: If the pool is saturated
+        """
+        self._admit()
+        submitted_at = time.perf_counter()
+
+        def timed_call():
+            started_at = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                finished_at = time.perf_counter()
+                self._queue_wait.append(started_at - submitted_at)
+                self._run_time.append(finished_at - started_at)
+
+        failed = True
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), timed_call)
+            failed = False
+            return result
+        finally:
+            self._release(failed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool counters plus queue-wait / run-time percentiles in milliseconds"""
+        queue_wait = deque(self._queue_wait)
+        run_time = deque(self._run_time)
+        return {
+            **self.stats,
+            "in_flight": self._in_flight,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "queue_wait_ms": {
+                "p50": round(_percentile(queue_wait, 50) * 1000, 2),
+                "p99": round(_percentile(queue_wait, 99) * 1000, 2),
+            },
+            "run_time_ms": {
+                "p50": round(_percentile(run_time, 50) * 1000, 2),
+                "p99": round(_percentile(run_time, 99) * 1000, 2),
+            },
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
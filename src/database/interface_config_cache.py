@@ -0,0 +1,181 @@
+"""
+Interface Config Cache
+
+Caches the metadata of each user's current interface config (version, salt,
+generation time and the ETag derived from them) so that clients polling for
+updates can be answered without touching the database. The encrypted config
+blob itself is not cached; it is only loaded when the client's ETag is stale.
+
+The cache is shared through Redis when a client is configured (or REDIS_URL
+is set), so that the overnight builder's `store_interface_config` invalidates
+entries for every gateway replica. Without Redis it falls back to an
+in-process TTL map.
+"""
+
+from typing import Optional, Dict, Any
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from ..metrics import record_cache_access
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "interface_config:"
+DEFAULT_TTL_SECONDS = 3600
+
+
+def make_etag(config_id: Optional[str], version: Optional[str], salt: Optional[str]) -> str:
+    """Build a strong ETag for a config version (the salt is part of the client payload)"""
+    digest = hashlib.sha256(f"{config_id}:{version}:{salt}".encode("utf-8")).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluate an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class InterfaceConfigCache:
+    """
+    Cache of current interface config metadata keyed by user ID
+
+    Entries are dicts with `config_id`, `version`, `generated_at`, `salt` and
+    `etag`, or `{"version": None}` for users that have no config yet.
+    """
+
+    def __init__(self, redis_client=None, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.redis = redis_client
+        self.ttl_seconds = ttl_seconds
+        self._local: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, user_id) -> str:
+        # Normalize so UUID objects and differently-cased strings share an entry
+        try:
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            pass
+        return f"{KEY_PREFIX}{user_id}"
+
+    def get(self, user_id) -> Optional[Dict[str, Any]]:
+        """
+        Get cached metadata for a user
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Metadata dict, or None on a cache miss
+        """
+        value = self._read(self._key(user_id))
+        record_cache_access("interface_config", value is not None)
+        return value
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(key)
+                return json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning(f"Interface config cache read failed: {str(e)}")
+                return None
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._local[key]
+                return None
+            return value
+
+    def set(self, user_id, metadata: Dict[str, Any]) -> None:
+        """Store metadata for a user"""
+        key = self._key(user_id)
+        if self.redis is not None:
+            try:
+                self.redis.setex(key, self.ttl_seconds, json.dumps(metadata))
+            except Exception as e:
+                logger.warning(f"Interface config cache write failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._local[key] = (metadata, time.monotonic() + self.ttl_seconds)
+
+    def invalidate(self, user_id) -> None:
+        """Drop the cached entry for a user (call after storing a new config)"""
+        key = self._key(user_id)
+        if self.redis is not None:
+            try:
+                self.redis.delete(key)
+            except Exception as e:
+                logger.error(f"Interface config cache invalidation failed: {str(e)}")
+            return
+
+        with self._lock:
+            self._local.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all in-process entries (Redis entries expire by TTL)"""
+        with self._lock:
+            self._local.clear()
+
+
+def build_metadata(config, salt: Optional[str]) -> Dict[str, Any]:
+    """
+    Build cache metadata from an InterfaceConfig row
+
+    Args:
+        config: InterfaceConfig record, or None if the user has no config
+        salt: User's encryption salt
+
+    Returns:
+        Metadata dict suitable for InterfaceConfigCache.set
+    """
+    if config is None:
+        return {"version": None, "generated_at": None, "etag": make_etag(None, None, None)}
+
+    config_id = str(config.config_id) if config.config_id else None
+    return {
+        "config_id": config_id,
+        "version": config.version,
+        "generated_at": config.generated_at.isoformat() if config.generated_at else None,
+        "salt": salt,
+        "etag": make_etag(config_id, config.version, salt),
+    }
+
+
+# Global cache instance
+_interface_config_cache: Optional[InterfaceConfigCache] = None
+
+
+def configure_interface_config_cache(redis_client=None, ttl_seconds: int = DEFAULT_TTL_SECONDS) -> InterfaceConfigCache:
+    """Install the process-wide cache (the gateway passes its Redis client)"""
+    global _interface_config_cache
+    _interface_config_cache = InterfaceConfigCache(redis_client, ttl_seconds)
+    return _interface_config_cache
+
+
+def get_interface_config_cache() -> InterfaceConfigCache:
+    """Get the process-wide cache, connecting to REDIS_URL when set"""
+    global _interface_config_cache
+    if _interface_config_cache is None:
+        redis_client = None
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url:
+            try:
+                import redis
+                redis_client = redis.Redis.from_url(redis_url, decode_responses=True)
+            except Exception as e:
+                logger.warning(f"Interface config cache falling back to in-process: {str(e)}")
+        _interface_config_cache = InterfaceConfigCache(redis_client)
+    return _interface_config_cache
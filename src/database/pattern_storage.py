@@ -15,6 +15,7 @@ from .models import (
     InterfaceConfig, InterfaceChange, RiskAlert,
     PatternHistory
 )
+from .interface_config_cache import get_interface_config_cache
 from ..pattern_analysis.pattern_aggregator import AggregatedPatterns
 
 class PatternStorageService:
@@ -508,6 +509,9 @@ class PatternStorageService:
         self.db.commit()
         self.db.refresh(config_record)
 
+        # Polling clients hold the old version's ETag; drop it so they see the new config
+        get_interface_config_cache().invalidate(user_id)
+
         return config_record
 
     async def store_interface_changes(
@@ -0,0 +1,202 @@
+"""Request deadline propagation for the gateway and backend services.
+
+Purpose:
+- Carry the client's remaining time budget from the gateway to every backend
+  so nobody keeps working on a request the client has already given up on.
+
+Protocol:
+- `X-Deadline-Ms` holds the milliseconds left when the request was sent
+  (a relative budget, so replicas need no clock sync). Each hop converts it
+  to a local monotonic deadline and re-sends what is left on outbound calls.
+
+Usage:
+    from src.deadline import install_deadline, deadline_event_hooks
+    install_deadline(app)                                    # read the header, 504 when exceeded
+    client = httpx.AsyncClient(event_hooks=deadline_event_hooks())  # forward it
+
+Notes:
+- With no header and no default the request has no deadline and every
+  helper is a no-op.
+- Database statements check the deadline before they run; on Postgres the
+  remaining budget is also applied as `statement_timeout` once per transaction.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "X-Deadline-Ms"
+
+# Budget kept back on each hop for the response to travel back
+HOP_MARGIN_SECONDS = 0.05
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+_sqlalchemy_instrumented = False
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out"""
+
+
+def set_deadline(seconds: Optional[float]) -> contextvars.Token:
+    """Start a deadline `seconds` from now for the current context (None clears it)"""
+    value = None if seconds is None else time.monotonic() + seconds
+    return _deadline.set(value)
+
+
+def reset_deadline(token: contextvars.Token) -> None:
+    _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline, or None when there is no deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline() -> None:
+    """Raise DeadlineExceeded if the budget is spent (call before starting expensive work)"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+
+
+def timeout_for(default: Optional[float]) -> Optional[float]:
+    """Timeout for an outbound call: the smaller of `default` and the remaining budget"""
+    left = remaining()
+    if left is None:
+        return default
+    check_deadline()
+    return left if default is None else min(default, left)
+
+
+def parse_deadline_header(value: Optional[str]) -> Optional[float]:
+    """Convert an `X-Deadline-Ms` value to seconds (None when absent or malformed)"""
+    if not value:
+        return None
+    try:
+        return int(value) / 1000.0
+    except ValueError:
+        return None
+
+
+def deadline_headers() -> Dict[str, str]:
+    """Header forwarding the remaining budget to the next hop"""
+    left = remaining()
+    if left is None:
+        return {}
+    return {DEADLINE_HEADER: str(max(0, int((left - HOP_MARGIN_SECONDS) * 1000)))}
+
+
+async def _apply_deadline(request) -> None:
+    """httpx request hook: forward the budget and cap the call's timeouts to it"""
+    left = remaining()
+    if left is None:
+        return
+    check_deadline()
+    request.headers.update(deadline_headers())
+    timeouts = dict(request.extensions.get("timeout") or {})
+    for phase in ("connect", "read", "write", "pool"):
+        current = timeouts.get(phase)
+        timeouts[phase] = left if current is None else min(current, left)
+    request.extensions["timeout"] = timeouts
+
+
+def deadline_event_hooks() -> Dict[str, Any]:
+    """Event hooks for an httpx.AsyncClient so every call honors the request deadline"""
+    return {"request": [_apply_deadline]}
+
+
+async def with_deadline(awaitable):
+    """Await something, giving up with DeadlineExceeded when the budget runs out"""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    check_deadline()
+    try:
+        return await asyncio.wait_for(awaitable, timeout=left)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded("request deadline exceeded")
+
+
+def instrument_sqlalchemy_deadline() -> None:
+    """Make every SQL statement in this process honor the request deadline (idempotent)"""
+    global _sqlalchemy_instrumented
+    if _sqlalchemy_instrumented:
+        return
+
+    try:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+    except ImportError:  # pragma: no cover - service without a database
+        return
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        left = remaining()
+        if left is None:
+            return
+        if left <= 0:
+            raise DeadlineExceeded("request deadline exceeded before query")
+        if conn.dialect.name == "postgresql" and not conn.info.get("_deadline_statement_timeout"):
+            # SET LOCAL lasts until the transaction ends, so pooled connections are not affected
+            cursor.execute(f"SET LOCAL statement_timeout = {max(1, int(left * 1000))}")
+            conn.info["_deadline_statement_timeout"] = True
+
+    def _clear(conn):
+        conn.info.pop("_deadline_statement_timeout", None)
+
+    event.listen(Engine, "commit", _clear)
+    event.listen(Engine, "rollback", _clear)
+    _sqlalchemy_instrumented = True
+
+
+def install_deadline(
+    app,
+    default_timeout: Optional[float] = None,
+    max_timeout: Optional[float] = None
+) -> None:
+    """
+    Read `X-Deadline-Ms` on every request and enforce it.
+
+    Args:
+        app: FastAPI application
+        default_timeout: Budget for requests without the header (None: no deadline)
+        max_timeout: Upper bound on client-supplied budgets
+    """
+    from fastapi import Request
+    from fastapi.responses import JSONResponse
+
+    instrument_sqlalchemy_deadline()
+
+    def _exceeded() -> JSONResponse:
+        return JSONResponse(status_code=504, content={"detail": "Request deadline exceeded"})
+
+    @app.middleware("http")
+    async def deadline_middleware(request: Request, call_next):
+        budget = parse_deadline_header(request.headers.get(DEADLINE_HEADER))
+        if budget is None:
+            budget = default_timeout
+        elif max_timeout is not None:
+            budget = min(budget, max_timeout)
+        if budget is None:
+            return await call_next(request)
+        if budget <= 0:
+            return _exceeded()
+
+        token = set_deadline(budget)
+        try:
+            return await with_deadline(call_next(request))
+        except DeadlineExceeded:
+            logger.warning(f"Deadline exceeded for {request.method} {request.url.path}")
+            return _exceeded()
+        finally:
+            reset_deadline(token)
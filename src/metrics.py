@@ -0,0 +1,213 @@
+"""Shared Prometheus instrumentation for the gateway and backend services.
+
+Purpose:
+- Give every FastAPI service the same request, upstream, database, cache and
+  model-inference metrics, exported on `/metrics` for `monitoring/prometheus.yml`.
+
+Usage:
+    from src.metrics import instrument_app
+    instrument_app(app)
+
+Notes:
+- Metrics carry no service label; Prometheus adds `job` per scrape target.
+- Request latency is labelled by route template (e.g. `/baseline/{user_id}`),
+  never by raw path, to keep label cardinality bounded.
+- When `prometheus_client` is not installed every helper is a no-op and
+  `/metrics` returns 503, so services keep working without it.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+    )
+except ImportError:  # pragma: no cover - optional dependency
+    Counter = Gauge = Histogram = None
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    generate_latest = None
+
+PROMETHEUS_AVAILABLE = Histogram is not None
+
+# Buckets tuned for API latencies (5 ms .. 30 s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Buckets for DB statements (0.5 ms .. 5 s)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+class _NoopMetric:
+    """Stand-in used when prometheus_client is unavailable"""
+
+    def labels(self, *args, **kwargs) -> "_NoopMetric":
+        return self
+
+    def observe(self, *args, **kwargs) -> None:
+        pass
+
+    def inc(self, *args, **kwargs) -> None:
+        pass
+
+    def dec(self, *args, **kwargs) -> None:
+        pass
+
+
+def _metric(kind, name: str, documentation: str, labels, **kwargs):
+    if kind is None:
+        return _NoopMetric()
+    return kind(name, documentation, labels, **kwargs)
+
+
+HTTP_REQUEST_DURATION = _metric(
+    Histogram, "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = _metric(
+    Gauge, "http_requests_in_progress", "HTTP requests currently being served", ["method"],
+)
+UPSTREAM_REQUEST_DURATION = _metric(
+    Histogram, "upstream_request_duration_seconds", "Latency of calls to backend services",
+    ["upstream", "outcome"], buckets=LATENCY_BUCKETS,
+)
+DB_QUERY_DURATION = _metric(
+    Histogram, "db_query_duration_seconds", "SQL statement execution time",
+    ["operation"], buckets=DB_BUCKETS,
+)
+CACHE_REQUESTS = _metric(
+    Counter, "cache_requests_total", "Cache lookups by outcome (hit ratio = hit / total)",
+    ["cache", "result"],
+)
+MODEL_INFERENCE_DURATION = _metric(
+    Histogram, "model_inference_duration_seconds", "Model inference time",
+    ["model"], buckets=LATENCY_BUCKETS,
+)
+
+_sqlalchemy_instrumented = False
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Count one lookup against a named cache"""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+def record_upstream(upstream: str, outcome: str, seconds: float) -> None:
+    """Record one call to a backend service (outcome: ok, error, timeout, ...)"""
+    UPSTREAM_REQUEST_DURATION.labels(upstream=upstream, outcome=outcome).observe(seconds)
+
+
+@contextmanager
+def time_upstream(upstream: str) -> Iterator[None]:
+    """Time a block that calls a backend service; failures are labelled by exception type (timeout/cancelled/error)"""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        yield
+    except Exception as e:
+        name = type(e).__name__
+        if "Timeout" in name or "Deadline" in name:
+            outcome = "timeout"
+        elif "Disconnect" in name:
+            outcome = "cancelled"
+        else:
+            outcome = "error"
+        raise
+    except BaseException:
+        # Task cancellation (client went away, losing hedge)
+        outcome = "cancelled"
+        raise
+    finally:
+        record_upstream(upstream, outcome, time.perf_counter() - started)
+
+
+@contextmanager
+def time_inference(model: str) -> Iterator[None]:
+    """Time a model inference block"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        MODEL_INFERENCE_DURATION.labels(model=model).observe(time.perf_counter() - started)
+
+
+def instrument_sqlalchemy() -> None:
+    """Time every SQL statement on every engine in this process (idempotent)"""
+    global _sqlalchemy_instrumented
+    if _sqlalchemy_instrumented:
+        return
+
+    try:
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+    except ImportError:  # pragma: no cover - service without a database
+        return
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_query_started", []).append(time.perf_counter())
+
+    @event.listens_for(Engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("_query_started")
+        if not started:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+        DB_QUERY_DURATION.labels(operation=operation).observe(time.perf_counter() - started.pop())
+
+    _sqlalchemy_instrumented = True
+
+
+def _route_template(request) -> Optional[str]:
+    route = request.scope.get("route")
+    return getattr(route, "path", None)
+
+
+def instrument_app(app, metrics_path: str = "/metrics") -> None:
+    """
+    Add request metrics middleware, SQL timing and a `/metrics` endpoint to a FastAPI app.
+
+    Args:
+        app: FastAPI application (call before the app starts serving)
+        metrics_path: Path to expose metrics on
+    """
+    from fastapi import Request
+    from fastapi.responses import Response
+
+    instrument_sqlalchemy()
+
+    @app.middleware("http")
+    async def prometheus_middleware(request: Request, call_next):
+        if request.url.path == metrics_path:
+            return await call_next(request)
+
+        method = request.method
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        started = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            in_progress.dec()
+            # Unmatched paths (404s, scanners) share one label value
+            route = _route_template(request) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(method=method, route=route, status=str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+    @app.get(metrics_path, include_in_schema=False)
+    async def metrics_endpoint():
+        if generate_latest is None:
+            return Response("prometheus_client not installed\n", status_code=503, media_type="text/plain")
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,97 @@
+"""
+Tests for the interface config metadata cache and ETag helpers
+"""
+
+import pytest
+import json
+import uuid
+from datetime import datetime
+from unittest.mock import Mock
+
+from src.database.interface_config_cache import (
+    InterfaceConfigCache, build_metadata, etag_matches, make_etag
+)
+
+
+@pytest.fixture
+def config():
+    row = Mock()
+    row.config_id = uuid.uuid4()
+    row.version = "3"
+    row.generated_at = datetime(2024, 1, 1, 2, 0, 0)
+    return row
+
+
+class TestETags:
+    """Test ETag construction and If-None-Match evaluation"""
+
+    def test_etag_changes_with_version_and_salt(self):
+        base = make_etag("c1", "1", "salt")
+
+        assert make_etag("c1", "1", "salt") == base
+        assert make_etag("c1", "2", "salt") != base
+        assert make_etag("c1", "1", "other") != base
+        assert base.startswith('"') and base.endswith('"')
+
+    def test_if_none_match(self):
+        etag = make_etag("c1", "1", "salt")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"stale", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches('"stale"', etag)
+        assert not etag_matches(None, etag)
+
+    def test_build_metadata(self, config):
+        metadata = build_metadata(config, "salt")
+
+        assert metadata["version"] == "3"
+        assert metadata["salt"] == "salt"
+        assert metadata["generated_at"] == "2024-01-01T02:00:00"
+        assert metadata["etag"] == make_etag(str(config.config_id), "3", "salt")
+        assert build_metadata(None, None)["version"] is None
+
+
+class TestInterfaceConfigCache:
+    """Test local and Redis-backed cache behaviour"""
+
+    def test_local_set_get_invalidate(self, config):
+        cache = InterfaceConfigCache()
+        user_id = uuid.uuid4()
+        metadata = build_metadata(config, "salt")
+
+        cache.set(str(user_id), metadata)
+        assert cache.get(user_id) == metadata
+        assert cache.get(str(user_id).upper()) == metadata
+
+        cache.invalidate(user_id)
+        assert cache.get(str(user_id)) is None
+
+    def test_local_entries_expire(self, config):
+        cache = InterfaceConfigCache(ttl_seconds=0)
+        cache.set("user", build_metadata(config, None))
+
+        assert cache.get("user") is None
+
+    def test_redis_backend(self, config):
+        store = {}
+        redis_client = Mock()
+        redis_client.get.side_effect = store.get
+        redis_client.setex.side_effect = lambda key, ttl, value: store.__setitem__(key, value)
+        redis_client.delete.side_effect = lambda key: store.pop(key, None)
+        cache = InterfaceConfigCache(redis_client, ttl_seconds=60)
+        user_id = str(uuid.uuid4())
+        metadata = build_metadata(config, "salt")
+
+        cache.set(user_id, metadata)
+        assert json.loads(store[f"interface_config:{user_id}"]) == metadata
+        assert cache.get(user_id) == metadata
+
+        cache.invalidate(user_id)
+        assert cache.get(user_id) is None
+
+    def test_redis_errors_are_cache_misses(self):
+        redis_client = Mock()
+        redis_client.get.side_effect = ConnectionError("redis down")
+
+        assert InterfaceConfigCache(redis_client).get("user") is None
@@ -0,0 +1,158 @@
+"""
+Unit tests for API key validation and the verified-key cache
+"""
+
+import json
+import pytest
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+
+def _load_gateway_module(name, relative_path):
+    """Load a gateway module by path so other services' modules can't shadow it"""
+    import importlib.util
+    gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(gateway_dir, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestAPIKeyCache:
+    """Test APIKeyService validation, caching and batched last-used writes"""
+
+    @pytest.fixture
+    def api_key_module(self):
+        _load_gateway_module("config", "config.py")
+        _load_gateway_module("database", "database.py")
+        return _load_gateway_module("gateway_api_key_auth", os.path.join("middleware", "api_key_auth.py"))
+
+    @pytest.fixture
+    def service(self, api_key_module):
+        return api_key_module.APIKeyService()
+
+    @pytest.fixture
+    def plain_key(self):
+        return "k" * 43
+
+    @pytest.fixture
+    def stored_key(self, service, plain_key):
+        key = Mock()
+        key.id = uuid.uuid4()
+        key.user_id = uuid.uuid4()
+        key.name = "emotion-analysis"
+        key.key_prefix = plain_key[:8]
+        key.key_hash = service.hash_key(plain_key)
+        key.permissions = ["write_logs"]
+        key.rate_limit = 100
+        key.expires_at = None
+        return key
+
+    def _db(self, result):
+        db = Mock()
+        db.query.return_value.filter.return_value.first.return_value = result
+        return db
+
+    def test_valid_key_is_cached(self, service, plain_key, stored_key):
+        db = self._db(stored_key)
+
+        first = service.validate_api_key(db, plain_key)
+        second = service.validate_api_key(db, plain_key)
+
+        assert first.id == stored_key.id
+        assert first.permissions == ("write_logs",)
+        assert second is first
+        assert db.query.call_count == 1
+        db.commit.assert_not_called()
+
+    def test_unknown_key_is_negatively_cached(self, service):
+        db = self._db(None)
+
+        assert service.validate_api_key(db, "x" * 43) is None
+        assert service.validate_api_key(db, "x" * 43) is None
+        assert db.query.call_count == 1
+
+    def test_expired_key_rejected(self, service, plain_key, stored_key):
+        stored_key.expires_at = datetime.utcnow() - timedelta(days=1)
+
+        assert service.validate_api_key(self._db(stored_key), plain_key) is None
+
+    def test_short_key_rejected_without_query(self, service):
+        db = self._db(None)
+
+        assert service.validate_api_key(db, "short") is None
+        db.query.assert_not_called()
+
+    def test_revoke_invalidates_cache(self, service, plain_key, stored_key):
+        db = self._db(stored_key)
+        service.validate_api_key(db, plain_key)
+
+        service.get_api_key_by_id = Mock(return_value=stored_key)
+        assert service.revoke_api_key(db, str(stored_key.id)) is True
+
+        db.query.return_value.filter.return_value.first.return_value = None
+        assert service.validate_api_key(db, plain_key) is None
+        assert db.query.call_count == 2
+
+    def test_update_invalidates_cache(self, service, plain_key, stored_key):
+        db = self._db(stored_key)
+        service.validate_api_key(db, plain_key)
+
+        stored_key.revoked = False
+        service.get_api_key_by_id = Mock(return_value=stored_key)
+        service.update_api_key(db, str(stored_key.id), rate_limit=5)
+
+        assert service.validate_api_key(db, plain_key).rate_limit == 5
+        assert db.query.call_count == 2
+
+    def test_revoke_is_broadcast_to_other_replicas(self, service, plain_key, stored_key):
+        redis_client = Mock()
+        service.start_invalidation_listener(redis_client)
+        service.get_api_key_by_id = Mock(return_value=stored_key)
+
+        # The revoking replica need not have the key cached itself
+        assert service.revoke_api_key(self._db(stored_key), str(stored_key.id)) is True
+
+        redis_client.publish.assert_called_once_with(
+            service.invalidation_channel, json.dumps({"type": "api_key", "name": stored_key.key_hash})
+        )
+        service.stop_invalidation_listener()
+
+    def test_remote_revocation_drops_cached_key(self, api_key_module, plain_key, stored_key):
+        replica = api_key_module.APIKeyService()
+        db = self._db(stored_key)
+        replica.validate_api_key(db, plain_key)
+
+        replica._handle_invalidation({"data": json.dumps({"type": "api_key", "name": stored_key.key_hash}).encode()})
+
+        db.query.return_value.filter.return_value.first.return_value = None
+        assert replica.validate_api_key(db, plain_key) is None
+        assert db.query.call_count == 2
+
+    def test_last_used_is_flushed_in_one_statement(self, service, plain_key, stored_key):
+        db = self._db(stored_key)
+        for _ in range(10):
+            service.validate_api_key(db, plain_key)
+
+        flush_db = Mock()
+        assert service.flush_last_used(flush_db) == 1
+        flush_db.execute.assert_called_once()
+        rows = flush_db.execute.call_args[0][1]
+        assert rows[0]["id"] == stored_key.id
+        assert service.flush_last_used(flush_db) == 0
+
+    def test_failed_flush_requeues(self, service, plain_key, stored_key):
+        service.validate_api_key(self._db(stored_key), plain_key)
+
+        flush_db = Mock()
+        flush_db.execute.side_effect = RuntimeError("db down")
+        assert service.flush_last_used(flush_db) == 0
+
+        assert service.flush_last_used(Mock()) == 1
@@ -0,0 +1,211 @@
+"""
+Unit tests for the batched audit log writer
+"""
+
+import pytest
+import sys
+import os
+import json
+import asyncio
+from unittest.mock import Mock
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+
+class FakeSessionFactory:
+    """Session factory that records bulk inserts instead of hitting a database"""
+
+    def __init__(self, fail: bool = False, bad_user_ids=()):
+        self.fail = fail
+        self.bad_user_ids = set(bad_user_ids)
+        self.batches = []
+
+    def __call__(self):
+        session = Mock()
+
+        def execute(statement, rows):
+            if self.fail:
+                raise RuntimeError("database unavailable")
+            if any(str(row["user_id"]) in self.bad_user_ids for row in rows):
+                from sqlalchemy.exc import IntegrityError
+                raise IntegrityError("INSERT INTO audit_logs", rows, Exception("user_id violates foreign key"))
+            self.batches.append(list(rows))
+
+        session.execute.side_effect = execute
+        return session
+
+
+class TestAuditWriter:
+    """Test AuditWriter batching, overflow spooling and shutdown drain"""
+
+    @pytest.fixture
+    def audit_module(self):
+        """Load the gateway audit module against the gateway database models"""
+        import importlib.util
+        gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+        for mod_name in ["config", "database"]:
+            spec = importlib.util.spec_from_file_location(mod_name, os.path.join(gateway_dir, f"{mod_name}.py"))
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[mod_name] = module
+            spec.loader.exec_module(module)
+
+        spec = importlib.util.spec_from_file_location("gateway_audit", os.path.join(gateway_dir, "middleware", "audit.py"))
+        audit = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(audit)
+        return audit
+
+    def _logger(self, audit_module, writer):
+        return audit_module.AuditLogger(db_session_factory=Mock(), writer=writer)
+
+    async def test_events_are_flushed_in_batches(self, audit_module, tmp_path):
+        factory = FakeSessionFactory()
+        writer = audit_module.AuditWriter(
+            factory, batch_size=10, flush_interval=60, spool_path=str(tmp_path / "spool.jsonl")
+        )
+        writer.start()
+        audit_logger = self._logger(audit_module, writer)
+
+        for i in range(25):
+            audit_logger.log_event("data_access", f"GET /users/{i}")
+
+        await writer.stop()
+
+        assert [len(batch) for batch in factory.batches] == [10, 10, 5]
+        assert writer.stats["written"] == 25
+        audit_logger.db_session_factory.assert_not_called()
+
+    async def test_full_batch_wakes_writer_before_interval(self, audit_module):
+        factory = FakeSessionFactory()
+        writer = audit_module.AuditWriter(factory, batch_size=5, flush_interval=60)
+        writer.start()
+
+        for i in range(5):
+            self._logger(audit_module, writer).log_event("data_access", f"GET /x/{i}")
+
+        for _ in range(50):
+            if factory.batches:
+                break
+            await asyncio.sleep(0.01)
+
+        assert len(factory.batches) == 1
+        await writer.stop()
+
+    async def test_overflow_is_spooled_and_replayed(self, audit_module, tmp_path):
+        spool_path = tmp_path / "spool.jsonl"
+        factory = FakeSessionFactory()
+        writer = audit_module.AuditWriter(
+            factory, batch_size=100, flush_interval=60, max_queue_size=3, spool_path=str(spool_path)
+        )
+        writer.start()
+        audit_logger = self._logger(audit_module, writer)
+
+        for i in range(5):
+            audit_logger.log_event("data_access", f"GET /users/{i}")
+
+        assert len(spool_path.read_text().splitlines()) == 2
+
+        await writer.stop()
+
+        written = [row["event_action"] for batch in factory.batches for row in batch]
+        assert sorted(written) == sorted(f"GET /users/{i}" for i in range(5))
+        assert not spool_path.exists()
+
+    async def test_failed_batch_is_spooled_on_shutdown(self, audit_module, tmp_path):
+        spool_path = tmp_path / "spool.jsonl"
+        writer = audit_module.AuditWriter(
+            FakeSessionFactory(fail=True), batch_size=10, flush_interval=60, spool_path=str(spool_path)
+        )
+        writer.start()
+        self._logger(audit_module, writer).log_event("user_login", "POST /auth/login")
+
+        await writer.stop()
+
+        entries = [json.loads(line) for line in spool_path.read_text().splitlines()]
+        assert [e["event_action"] for e in entries] == ["POST /auth/login"]
+
+    async def test_torn_spool_line_is_quarantined(self, audit_module, tmp_path):
+        spool_path = tmp_path / "spool.jsonl"
+        failing = audit_module.AuditWriter(
+            FakeSessionFactory(fail=True), batch_size=10, flush_interval=60, spool_path=str(spool_path)
+        )
+        failing.start()
+        audit_logger = self._logger(audit_module, failing)
+        audit_logger.log_event("data_access", "GET /users/1")
+        audit_logger.log_event("data_access", "GET /users/2")
+        await failing.stop()
+        first, second = spool_path.read_text().splitlines()
+
+        # A crash mid-replay left a torn line behind; newer events were spooled since.
+        torn = second[:len(second) // 2]
+        replay_path = tmp_path / "spool.jsonl.replay"
+        replay_path.write_text(f"{first}\n{torn}\n")
+        spool_path.write_text(f"{second}\n")
+
+        factory = FakeSessionFactory()
+        writer = audit_module.AuditWriter(factory, batch_size=10, flush_interval=60, spool_path=str(spool_path))
+
+        assert await writer.flush() == 1
+        assert await writer.flush() == 1
+
+        written = [row["event_action"] for batch in factory.batches for row in batch]
+        assert written == ["GET /users/1", "GET /users/2"]
+        assert not replay_path.exists()
+        assert not spool_path.exists()
+        assert (tmp_path / "spool.jsonl.rejected").read_text() == f"{torn}\n"
+        assert writer.stats["rejected"] == 1
+
+    async def test_rows_that_cannot_insert_are_rejected_individually(self, audit_module, tmp_path):
+        import uuid
+        spool_path = tmp_path / "spool.jsonl"
+        deleted_user = str(uuid.uuid4())
+        factory = FakeSessionFactory(bad_user_ids={deleted_user})
+        writer = audit_module.AuditWriter(factory, batch_size=10, flush_interval=60, spool_path=str(spool_path))
+        writer.start()
+        audit_logger = self._logger(audit_module, writer)
+
+        audit_logger.log_event("data_access", "GET /users/1")
+        audit_logger.log_event("data_access", "GET /users/2", user_id=deleted_user)
+        audit_logger.log_event("data_access", "GET /users/3", user_id="not-a-uuid")
+        audit_logger.log_event("data_access", "GET /users/4")
+        await writer.stop()
+
+        written = [row["event_action"] for batch in factory.batches for row in batch]
+        assert written == ["GET /users/1", "GET /users/4"]
+        assert not spool_path.exists()
+        rejected = [json.loads(line) for line in (tmp_path / "spool.jsonl.rejected").read_text().splitlines()]
+        assert sorted(r["entry"]["event_action"] for r in rejected) == ["GET /users/2", "GET /users/3"]
+        assert all(r["error"] for r in rejected)
+        assert writer.stats["rejected"] == 2
+
+    async def test_bad_spooled_row_does_not_block_replay(self, audit_module, tmp_path):
+        import uuid
+        spool_path = tmp_path / "spool.jsonl"
+        deleted_user = str(uuid.uuid4())
+        failing = audit_module.AuditWriter(
+            FakeSessionFactory(fail=True), batch_size=2, flush_interval=60, spool_path=str(spool_path)
+        )
+        failing.start()
+        audit_logger = self._logger(audit_module, failing)
+        audit_logger.log_event("data_access", "GET /users/1", user_id=deleted_user)
+        for i in range(2, 6):
+            audit_logger.log_event("data_access", f"GET /users/{i}")
+        await failing.stop()
+
+        factory = FakeSessionFactory(bad_user_ids={deleted_user})
+        writer = audit_module.AuditWriter(factory, batch_size=2, flush_interval=60, spool_path=str(spool_path))
+
+        assert await writer.flush() == 4
+        written = [row["event_action"] for batch in factory.batches for row in batch]
+        assert written == [f"GET /users/{i}" for i in range(2, 6)]
+        assert not spool_path.exists()
+        assert writer.stats["rejected"] == 1
+
+    def test_falls_back_to_inline_write_when_not_running(self, audit_module):
+        writer = audit_module.AuditWriter(FakeSessionFactory())
+        audit_logger = self._logger(audit_module, writer)
+        audit_logger._store_to_database = Mock()
+
+        audit_logger.log_event("user_login", "POST /auth/login")
+
+        audit_logger._store_to_database.assert_called_once()
@@ -75,7 +75,7 @@ class TestAuthEndpoints:
     def test_login_invalid_credentials(self, client, mock_db_session):
         """Test login with invalid credentials"""
         with patch('main.get_db', return_value=mock_db_session), \
-             patch('main.authenticate_user', return_value=None):
+             patch('main.authenticate_user_async', new_callable=AsyncMock, return_value=None):
             
             response = client.post(
                 "/auth/login",
@@ -91,7 +91,7 @@ class TestAuthEndpoints:
         fake_user.email = "test@example.com"
 
         with patch('main.get_db', return_value=mock_db_session), \
-             patch('main.authenticate_user', return_value=fake_user), \
+             patch('main.authenticate_user_async', new_callable=AsyncMock, return_value=fake_user), \
              patch('main.settings') as mock_settings:
 
             mock_settings.JWT_SECRET_KEY = "test-secret-key"
@@ -135,7 +135,7 @@ class TestAuthEndpoints:
     def test_register_invalid_email(self, client, mock_db_session):
         """Test registration with invalid email"""
         with patch('main.get_db', return_value=mock_db_session), \
-             patch('main.create_user', side_effect=ValueError("Invalid email format")):
+             patch('main.create_user_async', new_callable=AsyncMock, side_effect=ValueError("Invalid email format")):
             
             response = client.post("/auth/register", json={
                 "email": "invalid-email",
@@ -148,7 +148,7 @@ class TestAuthEndpoints:
     def test_register_duplicate_email(self, client, mock_db_session):
         """Test registration with duplicate email"""
         with patch('main.get_db', return_value=mock_db_session), \
-             patch('main.create_user', side_effect=ValueError("User with this email already exists")):
+             patch('main.create_user_async', new_callable=AsyncMock, side_effect=ValueError("User with this email already exists")):
             
             response = client.post("/auth/register", json={
                 "email": "existing@example.com",
@@ -165,7 +165,7 @@ class TestAuthEndpoints:
         fake_user.email = "newuser@example.com"
 
         with patch('main.get_db', return_value=mock_db_session), \
-             patch('main.create_user', return_value=fake_user), \
+             patch('main.create_user_async', new_callable=AsyncMock, return_value=fake_user), \
              patch('main.get_email_service') as mock_email, \
              patch('main.settings') as mock_settings:
 
@@ -0,0 +1,144 @@
+"""
+Unit tests for response compression and payload slimming
+"""
+
+import pytest
+import sys
+import os
+import gzip
+import json
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+
+def _load_gateway_module(name, relative_path):
+    """Load a gateway module by path so other services' modules can't shadow it"""
+    import importlib.util
+    gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(gateway_dir, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+compression = _load_gateway_module("gateway_compression", os.path.join("middleware", "compression.py"))
+payload = _load_gateway_module("gateway_payload", os.path.join("utils", "payload.py"))
+
+LARGE = {"context": "nimechoka sana " * 200}
+
+
+class TestCompressionMiddleware:
+    """Test content-coding negotiation and the size threshold"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI(default_response_class=payload.FastJSONResponse)
+        app.add_middleware(compression.CompressionMiddleware, minimum_size=1024)
+
+        @app.get("/large")
+        async def large(response: Response):
+            response.headers["ETag"] = '"abc"'
+            return LARGE
+
+        @app.get("/small")
+        async def small():
+            return {"status": "ok"}
+
+        @app.get("/stream")
+        async def stream():
+            async def events():
+                yield "event: stt\ndata: {}\n\n" * 100
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        return TestClient(app)
+
+    def test_choose_encoding(self):
+        assert compression.choose_encoding("gzip, deflate, br", brotli_available=True) == "br"
+        assert compression.choose_encoding("gzip, deflate, br", brotli_available=False) == "gzip"
+        assert compression.choose_encoding("br;q=0.5, gzip;q=0.8", brotli_available=True) == "gzip"
+        assert compression.choose_encoding("gzip;q=0, identity") is None
+        assert compression.choose_encoding("*", brotli_available=False) == "gzip"
+        assert compression.choose_encoding(None) is None
+
+    def test_large_json_is_gzipped(self, client):
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.headers["etag"] == 'W/"abc"'
+        assert int(response.headers["content-length"]) < len(json.dumps(LARGE))
+        assert response.json() == LARGE
+
+    def test_large_json_is_brotli_encoded(self, client):
+        pytest.importorskip("brotli")
+
+        response = client.get("/large", headers={"Accept-Encoding": "br, gzip"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.json() == LARGE
+
+    def test_small_and_identity_responses_are_untouched(self, client):
+        small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+        identity = client.get("/large", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in small.headers
+        assert small.json() == {"status": "ok"}
+        assert "content-encoding" not in identity.headers
+        assert identity.headers["etag"] == '"abc"'
+
+    def test_event_streams_are_not_buffered(self, client):
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text.startswith("event: stt")
+
+    def test_compress_round_trip(self):
+        middleware = compression.CompressionMiddleware(FastAPI(), gzip_level=1)
+        body = json.dumps(LARGE).encode()
+
+        assert gzip.decompress(middleware.compress(body, "gzip")) == body
+
+
+class TestPayloadSelection:
+    """Test fields/verbose selection of routed payloads"""
+
+    CULTURAL = {
+        "context": "guidance",
+        "language": "sw",
+        "cultural_context": [{"id": "kb_1", "content": "long entry"}],
+        "matches": [{"id": "kb_1"}],
+        "deflection": {"deflection_detected": False},
+        "deflection_analysis": {"deflection_detected": False},
+    }
+
+    def test_heavy_fields_dropped_by_default(self):
+        heavy = payload.HEAVY_FIELDS["cultural_context"]
+
+        slim = payload.select_fields(self.CULTURAL, heavy=heavy)
+
+        assert set(slim) == {"context", "language", "deflection"}
+        assert payload.select_fields(self.CULTURAL, verbose=True, heavy=heavy) == self.CULTURAL
+
+    def test_fields_selects_top_level_keys(self):
+        selected = payload.select_fields(self.CULTURAL, fields={"context", "matches"}, heavy=("matches",))
+
+        assert selected == {"context": "guidance", "matches": [{"id": "kb_1"}]}
+        assert payload.select_fields(["not", "a", "dict"], fields={"context"}) == ["not", "a", "dict"]
+
+    def test_parse_selector(self):
+        assert payload.parse_selector({"fields": "context, language,", "verbose": "true"}) == (
+            frozenset({"context", "language"}), True
+        )
+        assert payload.parse_selector({}) == (None, False)
+        assert payload.parse_selector({"verbose": "0"}) == (None, False)
+
+    def test_loads_matches_stdlib(self):
+        body = json.dumps(self.CULTURAL).encode()
+
+        assert payload.loads(body) == self.CULTURAL
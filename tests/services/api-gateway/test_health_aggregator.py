@@ -0,0 +1,117 @@
+"""
+Unit tests for the background health aggregator
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+
+def _load_gateway_module(name, relative_path):
+    """Load a gateway module by path so other services' modules can't shadow it"""
+    import importlib.util
+    gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(gateway_dir, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _healthy(response_time=0.01):
+    return {"status": "healthy", "response_time": response_time, "details": {}}
+
+
+def _unhealthy():
+    return {"status": "unhealthy", "error": "connection_failed", "response_time": 0}
+
+
+class TestHealthAggregator:
+    """Test HealthChecker snapshots, readiness and background polling"""
+
+    @pytest.fixture
+    def health_module(self):
+        return _load_gateway_module("gateway_health_check", os.path.join("utils", "health_check.py"))
+
+    @pytest.fixture
+    def checker(self, health_module):
+        return health_module.HealthChecker(
+            {"emotion_analysis": "http://emotion", "crisis_detection": "http://crisis"},
+            interval=0.01,
+            failure_threshold=2,
+            history_size=3
+        )
+
+    async def test_snapshot_served_without_probing(self, checker):
+        checker.check_service = AsyncMock(return_value=_healthy())
+
+        await checker.refresh()
+        calls = checker.check_service.await_count
+        for _ in range(100):
+            snapshot = checker.get_snapshot()
+
+        assert checker.check_service.await_count == calls
+        assert snapshot["services"]["emotion_analysis"]["ready"] is True
+        assert snapshot["services"]["emotion_analysis"]["latency_history"] == [0.01]
+
+    async def test_latency_history_is_bounded(self, checker):
+        checker.check_service = AsyncMock(return_value=_healthy())
+
+        for _ in range(5):
+            await checker.refresh()
+
+        history = checker.get_snapshot()["services"]["crisis_detection"]["latency_history"]
+        assert len(history) == 3
+
+    async def test_service_marked_unready_after_threshold(self, checker):
+        checker.check_service = AsyncMock(return_value=_unhealthy())
+
+        await checker.refresh()
+        assert checker.is_ready("emotion_analysis") is True
+
+        await checker.refresh()
+        assert checker.is_ready("emotion_analysis") is False
+
+        checker.check_service = AsyncMock(return_value=_healthy())
+        await checker.refresh()
+        assert checker.is_ready("emotion_analysis") is True
+
+    def test_unknown_service_is_ready_before_first_poll(self, checker):
+        assert checker.is_ready("emotion_analysis") is True
+        assert checker.dependency_ready("redis") is True
+
+    async def test_dependency_checks(self, health_module):
+        ping = Mock(side_effect=ConnectionError("redis down"))
+        checker = health_module.HealthChecker({}, failure_threshold=1, dependency_checks={"redis": ping})
+
+        await checker.refresh()
+
+        assert checker.dependency_ready("redis") is False
+        assert "redis down" in checker.get_snapshot()["dependencies"]["redis"]["error"]
+
+    async def test_checks_run_concurrently(self, checker):
+        async def slow_check(name, url):
+            await asyncio.sleep(0.1)
+            return _healthy()
+
+        checker.check_service = slow_check
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        await checker.check_all_services()
+
+        assert loop.time() - started < 0.18
+
+    async def test_background_polling(self, checker):
+        checker.check_service = AsyncMock(return_value=_healthy())
+
+        checker.start()
+        await asyncio.sleep(0.1)
+        await checker.stop()
+
+        assert checker.check_service.await_count >= 4
+        assert checker.get_snapshot()["updated_at"]
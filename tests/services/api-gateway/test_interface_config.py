@@ -0,0 +1,103 @@
+"""
+Unit tests for the gateway interface config endpoints' cache handling
+"""
+
+import pytest
+import sys
+import os
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from fastapi.testclient import TestClient
+import jwt
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+USER_ID = "5f0c6a52-8d4e-4a53-9a57-2c1f4d6b7e10"
+CACHED = {"config_id": "c1", "version": "3", "generated_at": None, "salt": "salt", "etag": '"cached-etag"'}
+
+
+class TestInterfaceConfigCache:
+    """Test that cached interface config metadata is never served for a missing user"""
+
+    @pytest.fixture
+    def client(self):
+        """Create test client with mocked dependencies and a warm cache entry"""
+        # Other services' top-level modules (main, config, database, ...) must not shadow the gateway's
+        gateway_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+        sys.path.insert(0, gateway_dir)
+        for mod_name in list(sys.modules.keys()):
+            if mod_name in ["main", "config", "database", "auth_service"] or mod_name.split(".")[0] in ["middleware", "utils"]:
+                del sys.modules[mod_name]
+
+        with patch.dict(os.environ, {
+            "JWT_SECRET_KEY": "test-secret-key",
+            "JWT_ALGORITHM": "HS256",
+            "REDIS_HOST": "localhost",
+            "REDIS_PORT": "6379",
+        }), patch("redis.Redis") as mock_redis_cls, patch("httpx.AsyncClient") as mock_httpx_cls:
+            mock_redis = Mock()
+            mock_pipe = Mock()
+            mock_pipe.execute.return_value = [None, 0, None, None]
+            mock_redis.pipeline.return_value = mock_pipe
+            mock_redis.zcount.return_value = 0
+            mock_redis_cls.return_value = mock_redis
+
+            mock_http = AsyncMock()
+            mock_http.aclose = AsyncMock()
+            mock_httpx_cls.return_value = mock_http
+
+            from main import app
+            from database import get_async_db, get_db
+            from src.database.interface_config_cache import configure_interface_config_cache
+
+            cache = configure_interface_config_cache()
+            cache.set(USER_ID, CACHED)
+            app.dependency_overrides[get_db] = lambda: MagicMock()
+            app.dependency_overrides[get_async_db] = lambda: MagicMock()
+            # TrustedHostMiddleware only admits configured hosts
+            yield TestClient(app, base_url="http://localhost")
+            app.dependency_overrides.clear()
+            cache.clear()
+        sys.path.remove(gateway_dir)
+
+    def _headers(self, **extra):
+        token = jwt.encode({"user_id": USER_ID}, "test-secret-key", algorithm="HS256")
+        return {"Authorization": f"Bearer {token}", **extra}
+
+    def test_version_requires_existing_user(self, client):
+        """A cached entry does not answer for a deleted user"""
+        with patch("main.get_user_by_id", return_value=None):
+            response = client.get(
+                f"/users/{USER_ID}/interface/version",
+                headers=self._headers(**{"If-None-Match": CACHED["etag"]})
+            )
+
+        assert response.status_code == 404
+
+    def test_version_served_from_cache_for_existing_user(self, client):
+        """An existing user still gets a 304 straight from the cache"""
+        with patch("main.get_user_by_id", return_value=Mock()), \
+             patch("main._query_current_interface_config") as mock_query:
+            response = client.get(
+                f"/users/{USER_ID}/interface/version",
+                headers=self._headers(**{"If-None-Match": CACHED["etag"]})
+            )
+
+        assert response.status_code == 304
+        mock_query.assert_not_called()
+
+    def test_current_requires_existing_user(self, client):
+        with patch("main.get_user_by_id", return_value=None):
+            response = client.get(
+                f"/users/{USER_ID}/interface/current",
+                headers=self._headers(**{"If-None-Match": CACHED["etag"]})
+            )
+
+        assert response.status_code == 404
+
+    def test_ui_config_requires_existing_user(self, client):
+        with patch("main.get_user_by_id_async", new_callable=AsyncMock, return_value=None):
+            response = client.get("/api/ui-config", headers=self._headers(**{"If-None-Match": CACHED["etag"]}))
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "no_config"
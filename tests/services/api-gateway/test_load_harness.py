@@ -0,0 +1,82 @@
+"""
+Tests for the offline gateway load-test harness
+"""
+
+import pytest
+import sys
+import os
+import json
+import subprocess
+
+SCRIPT = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'scripts', 'bench_gateway_load.py')
+
+
+def _load_harness():
+    """Load the harness module by path"""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location("bench_gateway_load", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["bench_gateway_load"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestLoadHarness:
+    """Test harness helpers and an end-to-end smoke run"""
+
+    @pytest.fixture
+    def harness(self):
+        return _load_harness()
+
+    def test_parse_mix(self, harness):
+        assert harness.parse_mix("login:1, chat:4,ui_config") == {"login": 1.0, "chat": 4.0, "ui_config": 1.0}
+
+    def test_layer_self_time(self, harness):
+        times = harness.LayerTimes()
+        times.order = ["outer", "inner", "router+endpoint"]
+        times.samples.update({"outer": [0.010, 0.012], "inner": [0.008, 0.008], "router+endpoint": [0.005, 0.005]})
+
+        rows = {row["layer"]: row for row in times.report()}
+
+        assert rows["outer"]["self_avg_ms"] == pytest.approx(3.0)
+        assert rows["inner"]["self_avg_ms"] == pytest.approx(3.0)
+        assert rows["router+endpoint"]["self_avg_ms"] == pytest.approx(5.0)
+
+    async def test_standins_answer_by_host(self, harness):
+        import httpx
+
+        app = harness.build_standin_app(latency_ms=0, jitter_ms=0, payload_bytes=16)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport) as client:
+            emotion = await client.post("http://emotion-analysis:8000/analyze", content=b"RIFF")
+            chat = await client.post("http://conversation-engine:8000/chat", json={"message": "hi"})
+
+        assert emotion.json()["emotion"] == "sad"
+        assert emotion.json()["padding"] == "x" * 16
+        assert "response" in chat.json()
+        assert app.state.calls == {"emotion-analysis": 1, "conversation-engine": 1}
+
+    @pytest.mark.slow
+    def test_offline_smoke_run(self, tmp_path):
+        pytest.importorskip("fakeredis")
+        output = tmp_path / "report.json"
+        env = dict(
+            os.environ,
+            LOADTEST_DURATION="1",
+            LOADTEST_CONCURRENCY="4",
+            LOADTEST_USERS="1",
+            LOADTEST_MIX="chat:1,emotion:1",
+            LOADTEST_LATENCY_MS="1",
+            LOADTEST_JITTER_MS="0",
+            LOADTEST_OUTPUT=str(output),
+            DATABASE_URL=f"sqlite:///{tmp_path / 'gateway.db'}",
+        )
+
+        subprocess.run([sys.executable, SCRIPT], env=env, check=True, capture_output=True, timeout=300)
+        report = json.loads(output.read_text())
+
+        assert report["requests"] > 0
+        assert report["scenarios"]["chat"]["statuses"].get("200", 0) > 0
+        assert report["backend_calls"]["conversation-engine"] > 0
+        assert report["middleware"][-1]["layer"] == "router+endpoint"
+        assert all(row["calls"] == report["requests"] for row in report["middleware"])
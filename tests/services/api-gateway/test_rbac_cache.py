@@ -0,0 +1,139 @@
+"""
+Unit tests for cached RBAC permission resolution
+"""
+
+import pytest
+import sys
+import os
+import json
+import uuid
+from unittest.mock import Mock
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+
+def _load_gateway_module(name, relative_path):
+    """Load a gateway module by path so other services' modules can't shadow it"""
+    import importlib.util
+    gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(gateway_dir, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestRBACCache:
+    """Test RBACService caching, bitmask checks and invalidation"""
+
+    @pytest.fixture
+    def rbac_module(self):
+        _load_gateway_module("config", "config.py")
+        _load_gateway_module("database", "database.py")
+        module = _load_gateway_module("gateway_rbac", os.path.join("middleware", "rbac.py"))
+        # Loader options need fully configured mappers; the session is mocked anyway.
+        module.selectinload = Mock()
+        return module
+
+    @pytest.fixture
+    def user(self):
+        user = Mock()
+        user.id = uuid.uuid4()
+        user.role = "counselor"
+        user.roles = []
+        return user
+
+    @pytest.fixture
+    def db(self, user):
+        """Session whose user lookups return `user` and role lookups find nothing"""
+        db = Mock()
+        query = db.query.return_value
+        query.options.return_value.filter.return_value.first.return_value = user
+        query.filter.return_value.first.return_value = None
+        return db
+
+    def test_permission_check_uses_cache_after_first_lookup(self, rbac_module, db, user):
+        rbac = rbac_module.RBACService(cache_ttl=60)
+
+        assert rbac.check_permission(str(user.id), "crisis_intervention", db) is True
+        queries = db.query.call_count
+
+        for _ in range(100):
+            assert rbac.check_permission(str(user.id), "crisis_intervention", db) is True
+            assert rbac.check_permission(str(user.id), "manage_roles", db) is False
+
+        assert db.query.call_count == queries
+
+    def test_admin_wildcard(self, rbac_module, db, user):
+        user.role = "admin"
+        rbac = rbac_module.RBACService()
+
+        assert rbac.check_permission(str(user.id), "anything_at_all", db) is True
+
+    def test_ownership_permissions(self, rbac_module, db, user):
+        user.role = "user"
+        rbac = rbac_module.RBACService()
+
+        assert rbac.has_permission(user, "read_own_data", db, str(user.id)) is True
+        assert rbac.has_permission(user, "read_own_data", db, str(uuid.uuid4())) is False
+
+    def test_additional_roles_are_merged(self, rbac_module, db, user):
+        extra = Mock()
+        extra.name = "system"
+        user.role = "user"
+        user.roles = [extra]
+        rbac = rbac_module.RBACService()
+
+        assert rbac.get_user_permissions(user, db) >= {"read_own_data", "write_logs"}
+        assert rbac.get_granted_by(user, "write_logs", db) == "system"
+
+    def test_ttl_expiry_reloads(self, rbac_module, db, user):
+        rbac = rbac_module.RBACService(cache_ttl=0)
+
+        rbac.check_permission(str(user.id), "crisis_intervention", db)
+        queries = db.query.call_count
+        rbac.check_permission(str(user.id), "crisis_intervention", db)
+
+        assert db.query.call_count > queries
+
+    def test_user_cache_is_bounded(self, rbac_module, db):
+        rbac = rbac_module.RBACService(max_cached_users=2)
+        for _ in range(5):
+            rbac.check_permission(str(uuid.uuid4()), "read_own_data", db)
+
+        assert len(rbac.user_cache) == 2
+
+    def test_clear_cache_publishes_invalidation(self, rbac_module, db, user):
+        redis_client = Mock()
+        rbac = rbac_module.RBACService(invalidation_channel="rbac:test")
+        rbac.start_invalidation_listener(redis_client)
+
+        rbac.check_permission(str(user.id), "crisis_intervention", db)
+        rbac.clear_cache("counselor")
+
+        assert rbac.user_cache == {}
+        redis_client.publish.assert_called_once_with(
+            "rbac:test", json.dumps({"type": "role", "name": "counselor"})
+        )
+        rbac.stop_invalidation_listener()
+
+    def test_remote_invalidation_drops_entries(self, rbac_module, db, user):
+        rbac = rbac_module.RBACService()
+        rbac.check_permission(str(user.id), "crisis_intervention", db)
+
+        rbac._handle_invalidation({"data": json.dumps({"type": "user", "name": str(user.id)})})
+        assert str(user.id) not in rbac.user_cache
+
+        rbac.check_permission(str(user.id), "crisis_intervention", db)
+        rbac._handle_invalidation({"data": json.dumps({"type": "role", "name": None}).encode()})
+        assert rbac.user_cache == {}
+        assert rbac.permissions_cache == {}
+
+    def test_unknown_user(self, rbac_module):
+        db = Mock()
+        db.query.return_value.options.return_value.filter.return_value.first.return_value = None
+        rbac = rbac_module.RBACService()
+
+        assert rbac.check_permission(str(uuid.uuid4()), "read_own_data", db) is False
+        assert rbac.check_permission("not-a-uuid", "read_own_data", db) is False
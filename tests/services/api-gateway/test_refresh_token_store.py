@@ -0,0 +1,177 @@
+"""
+Unit tests for the Redis-indexed refresh token store
+"""
+
+import pytest
+import sys
+import os
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from sqlalchemy import column
+
+fakeredis = pytest.importorskip("fakeredis")
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+
+def _load_gateway_module(name, relative_path):
+    """Load a gateway module by path so other services' modules can't shadow it"""
+    import importlib.util
+    gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(gateway_dir, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeRefreshToken:
+    """Unmapped stand-in for the RefreshToken model"""
+    id = column("id")
+    user_id = column("user_id")
+    token_hash = column("token_hash")
+    expires_at = column("expires_at")
+    revoked = column("revoked")
+    revoked_at = column("revoked_at")
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class TestRefreshTokenStore:
+    """Test Redis lookups, DB fallback, rotation races and pruning"""
+
+    @pytest.fixture
+    def module(self):
+        _load_gateway_module("config", "config.py")
+        _load_gateway_module("database", "database.py")
+        module = _load_gateway_module("gateway_refresh_token", os.path.join("middleware", "refresh_token.py"))
+        module.RefreshToken = FakeRefreshToken
+        return module
+
+    @pytest.fixture
+    def db(self):
+        db = Mock()
+        db.query.return_value.filter.return_value.first.return_value = None
+        db.query.return_value.filter.return_value.update.return_value = 1
+        return db
+
+    @pytest.fixture
+    def redis_client(self):
+        return fakeredis.FakeRedis(decode_responses=True)
+
+    @pytest.fixture
+    def service(self, module, redis_client):
+        return module.create_refresh_token_service("secret", redis_client=redis_client)
+
+    @pytest.fixture
+    def user_id(self):
+        return str(uuid.uuid4())
+
+    def _stored(self, service, user_id, token, **overrides):
+        fields = dict(
+            id=uuid.uuid4(), user_id=uuid.UUID(user_id), token_hash=service.hash_token(token),
+            expires_at=datetime.utcnow() + timedelta(days=1), created_at=datetime.utcnow(),
+            revoked=False, device_info=None, ip_address=None
+        )
+        fields.update(overrides)
+        return FakeRefreshToken(**fields)
+
+    def test_validate_served_from_redis(self, service, db, redis_client, user_id):
+        record, token = service.create_refresh_token(db, user_id, "iPhone", "10.0.0.1")
+
+        validated = service.validate_refresh_token(db, token)
+
+        assert validated.id == record.id
+        assert str(validated.user_id) == user_id
+        assert validated.device_info == "iPhone"
+        db.query.assert_not_called()
+        assert redis_client.ttl(f"refresh_token:{record.token_hash}") > 0
+        assert redis_client.smembers(f"refresh_tokens:user:{user_id}") == {record.token_hash}
+
+    def test_redis_miss_falls_back_to_db_and_backfills(self, service, db, user_id):
+        stored = self._stored(service, user_id, "legacy-token")
+        db.query.return_value.filter.return_value.first.return_value = stored
+
+        assert service.validate_refresh_token(db, "legacy-token").id == stored.id
+        assert service.validate_refresh_token(db, "legacy-token").id == stored.id
+        assert db.query.call_count == 1
+
+    def test_backfill_does_not_overwrite_revocation(self, service, db, redis_client, user_id):
+        stored = self._stored(service, user_id, "legacy-token")
+        db.query.return_value.filter.return_value.first.return_value = stored
+        key = f"refresh_token:{stored.token_hash}"
+        # This request missed Redis and read the row just before another replica revoked it
+        service._cached_token = Mock(return_value=None)
+        service._cache_revoked([stored.token_hash], user_id)
+
+        service.validate_refresh_token(db, "legacy-token")
+
+        assert redis_client.hgetall(key) == {"revoked": "1"}
+        assert 0 < redis_client.ttl(key) <= 60
+
+    def test_unknown_tokens_are_negatively_cached(self, service, db, redis_client):
+        assert service.validate_refresh_token(db, "not-a-token") is None
+        assert service.validate_refresh_token(db, "not-a-token") is None
+
+        assert db.query.call_count == 1
+        assert 0 < redis_client.ttl(f"refresh_token:{service.hash_token('not-a-token')}") <= 60
+
+    def test_rotation_revokes_old_token(self, service, db, user_id):
+        _, token = service.create_refresh_token(db, user_id)
+
+        new_record, new_token = service.rotate_refresh_token(db, token)
+
+        assert service.validate_refresh_token(db, token) is None
+        assert service.validate_refresh_token(db, new_token).id == new_record.id
+        assert service.rotate_refresh_token(db, token) is None
+        # One conditional UPDATE, no SELECTs on the hot path
+        assert db.query.call_count == 1
+
+    def test_lost_rotation_race_is_rejected(self, service, db, user_id):
+        _, token = service.create_refresh_token(db, user_id)
+        # Another replica already revoked the row
+        db.query.return_value.filter.return_value.update.return_value = 0
+
+        assert service.rotate_refresh_token(db, token) is None
+        db.rollback.assert_called_once()
+        assert service.validate_refresh_token(db, token) is None
+
+    def test_revoke_all_user_tokens(self, service, db, user_id):
+        tokens = [service.create_refresh_token(db, user_id)[1] for _ in range(3)]
+        other_user_token = service.create_refresh_token(db, str(uuid.uuid4()))[1]
+        db.query.return_value.filter.return_value.all.return_value = []
+        db.query.return_value.filter.return_value.update.return_value = 3
+
+        assert service.revoke_all_user_tokens(db, user_id) == 3
+        assert all(service.validate_refresh_token(db, t) is None for t in tokens)
+        assert service.validate_refresh_token(db, other_user_token) is not None
+
+    def test_prune_tokens_in_batches(self, service, db):
+        batches = [[Mock(id=uuid.uuid4()) for _ in range(n)] for n in (2, 2, 1)]
+        db.query.return_value.filter.return_value.limit.return_value.all.side_effect = batches
+
+        assert service.prune_tokens(db, batch_size=2) == 5
+        assert db.query.return_value.filter.return_value.delete.call_count == 3
+        assert db.commit.call_count == 3
+
+    def test_prune_lock_allows_one_replica(self, service, db, redis_client):
+        db.query.return_value.filter.return_value.limit.return_value.all.return_value = []
+
+        service._prune_with_session(lambda: db, 60)
+        service._prune_with_session(lambda: db, 60)
+
+        assert redis_client.get(service.PRUNE_LOCK_KEY) == "1"
+        assert db.query.return_value.filter.return_value.limit.call_count == 1
+
+    def test_works_without_redis(self, module, db, user_id):
+        service = module.RefreshTokenService("secret")
+        stored = self._stored(service, user_id, "token")
+        db.query.return_value.filter.return_value.first.return_value = stored
+
+        assert service.validate_refresh_token(db, "token") is stored
+        assert service.validate_refresh_token(db, "token") is stored
+        assert db.query.call_count == 2
@@ -0,0 +1,140 @@
+"""
+Unit tests for voice-session turn orchestration
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+import json
+
+# Add services to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway'))
+
+
+def _load_gateway_module(name, relative_path):
+    """Load a gateway module by path so other services' modules can't shadow it"""
+    import importlib.util
+    gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(gateway_dir, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+SERVICE_RESPONSES = {
+    "speech_processing": {"text": "nimechoka sana", "language": "sw"},
+    "emotion_analysis": {"emotion": "sad", "confidence": 0.8},
+    "cultural_context": {"context": "fatigue idioms"},
+    "dissonance_detector": {"dissonance_level": "low"},
+    "baseline_tracker": {"deviation": False},
+    "crisis_detection": {"risk_level": "low"},
+    "conversation_engine": {"response": "Pole sana, tell me more."},
+}
+
+
+class FakeServices:
+    """Records backend calls and answers after a per-service delay"""
+
+    def __init__(self, delays=None, failures=()):
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.calls = {}
+
+    async def __call__(self, service_name, endpoint, method="POST", **kwargs):
+        self.calls[service_name] = kwargs
+        await asyncio.sleep(self.delays.get(service_name, 0.01))
+        if service_name in self.failures:
+            raise RuntimeError(f"{service_name} down")
+        return SERVICE_RESPONSES[service_name]
+
+
+class TestSessionTurn:
+    """Test stage graph execution for /session/turn"""
+
+    @pytest.fixture
+    def turn_module(self):
+        return _load_gateway_module("gateway_session_turn", os.path.join("utils", "session_turn.py"))
+
+    def _stages(self, turn_module, services):
+        return turn_module.build_turn_stages(
+            services, b"RIFF", "turn.wav", "audio/wav",
+            user_id="user-1", conversation_id="conv-1", session_id="sess-1"
+        )
+
+    async def _collect(self, turn_module, stages):
+        return [event async for event in turn_module.run_stages(stages)]
+
+    async def test_all_stages_complete_with_chat_reply(self, turn_module):
+        services = FakeServices()
+
+        events = await self._collect(turn_module, self._stages(turn_module, services))
+
+        statuses = {e.stage: e.status for e in events}
+        assert statuses == {name: "ok" for name in
+                            ["stt", "emotion", "cultural", "dissonance", "baseline", "crisis", "chat"]}
+        chat_request = services.calls["conversation_engine"]["json"]
+        assert chat_request["message"] == "nimechoka sana"
+        assert chat_request["emotion_context"] == {"emotion": "sad", "confidence": 0.8}
+        assert chat_request["cultural_context"] == {"context": "fatigue idioms"}
+        assert services.calls["cultural_context"]["params"]["language"] == "sw"
+
+    async def test_independent_stages_run_concurrently(self, turn_module):
+        delay = 0.1
+        services = FakeServices(delays={name: delay for name in SERVICE_RESPONSES})
+        loop = asyncio.get_running_loop()
+
+        started = loop.time()
+        await self._collect(turn_module, self._stages(turn_module, services))
+        elapsed = loop.time() - started
+
+        # Critical path is stt/emotion -> dissonance/baseline -> crisis/chat = 3 hops
+        assert elapsed < delay * 4.5
+
+    async def test_results_stream_in_completion_order(self, turn_module):
+        services = FakeServices(delays={"emotion_analysis": 0.2, "speech_processing": 0.01})
+
+        events = await self._collect(turn_module, self._stages(turn_module, services))
+        order = [e.stage for e in events]
+
+        assert order[0] == "stt"
+        assert order.index("cultural") < order.index("emotion")
+
+    async def test_optional_failure_does_not_block_chat(self, turn_module):
+        services = FakeServices(failures={"emotion_analysis"})
+
+        events = {e.stage: e for e in await self._collect(turn_module, self._stages(turn_module, services))}
+
+        assert events["emotion"].status == "error"
+        assert events["dissonance"].status == "skipped"
+        assert events["baseline"].status == "skipped"
+        assert events["chat"].status == "ok"
+        assert services.calls["conversation_engine"]["json"]["emotion_context"] is None
+
+    async def test_stt_failure_skips_dependents(self, turn_module):
+        services = FakeServices(failures={"speech_processing"})
+
+        events = {e.stage: e.status for e in await self._collect(turn_module, self._stages(turn_module, services))}
+
+        assert events["chat"] == "skipped"
+        assert events["crisis"] == "skipped"
+        assert events["baseline"] == "ok"
+
+    async def test_closing_stream_cancels_pending_stages(self, turn_module):
+        services = FakeServices(delays={"emotion_analysis": 5})
+        stream = turn_module.run_stages(self._stages(turn_module, services))
+
+        first = await stream.__anext__()
+        await stream.aclose()
+
+        assert first.stage == "stt"
+        assert "conversation_engine" not in services.calls
+
+    def test_format_sse(self, turn_module):
+        message = turn_module.format_sse("chat", {"stage": "chat", "status": "ok"})
+
+        event, data, blank = message.split("\n", 2)
+        assert event == "event: chat"
+        assert json.loads(data[len("data: "):]) == {"stage": "chat", "status": "ok"}
+        assert message.endswith("\n\n")
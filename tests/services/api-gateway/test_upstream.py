@@ -0,0 +1,155 @@
+"""
+Unit tests for gateway upstream helpers (hedging, latency tracking, disconnects)
+"""
+
+import pytest
+import sys
+import os
+import asyncio
+import httpx
+
+
+def _load_gateway_module(name, relative_path):
+    """Load a gateway module by path so other services' modules can't shadow it"""
+    import importlib.util
+    gateway_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'gateway')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(gateway_dir, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeRequest:
+    """Request stand-in whose client disconnects after a number of polls"""
+
+    def __init__(self, disconnect_after=None):
+        self.disconnect_after = disconnect_after
+        self.polls = 0
+
+    async def is_disconnected(self):
+        self.polls += 1
+        return self.disconnect_after is not None and self.polls >= self.disconnect_after
+
+
+class TestUpstream:
+    """Test hedged calls, the latency tracker and cancel-on-disconnect"""
+
+    @pytest.fixture
+    def upstream(self):
+        return _load_gateway_module("gateway_upstream", os.path.join("utils", "upstream.py"))
+
+    def test_tracker_needs_samples(self, upstream):
+        tracker = upstream.LatencyTracker(min_samples=5)
+        for _ in range(4):
+            tracker.record("emotion_analysis", 0.1)
+
+        assert tracker.hedge_delay("emotion_analysis") is None
+
+        tracker.record("emotion_analysis", 0.1)
+        assert tracker.hedge_delay("emotion_analysis") == pytest.approx(0.1)
+        assert tracker.hedge_delay("emotion_analysis", floor=0.5) == 0.5
+
+    def test_tracker_p95(self, upstream):
+        tracker = upstream.LatencyTracker(min_samples=1)
+        for ms in range(1, 101):
+            tracker.record("cultural_context", ms / 1000.0)
+
+        assert tracker.percentile("cultural_context", 95) == pytest.approx(0.095)
+
+    async def test_fast_primary_is_not_hedged(self, upstream):
+        calls = []
+
+        async def attempt(name, delay):
+            calls.append(name)
+            await asyncio.sleep(delay)
+            return name
+
+        result = await upstream.hedged_call(
+            [lambda: attempt("primary", 0), lambda: attempt("replica", 0)], hedge_delay=0.2
+        )
+
+        assert result == "primary"
+        assert calls == ["primary"]
+
+    async def test_slow_primary_is_hedged_and_cancelled(self, upstream):
+        cancelled = []
+
+        async def attempt(name, delay):
+            try:
+                await asyncio.sleep(delay)
+                return name
+            except asyncio.CancelledError:
+                cancelled.append(name)
+                raise
+
+        result = await upstream.hedged_call(
+            [lambda: attempt("primary", 5), lambda: attempt("replica", 0.01)], hedge_delay=0.02
+        )
+
+        assert result == "replica"
+        assert cancelled == ["primary"]
+
+    async def test_failed_primary_hedges_immediately(self, upstream):
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def succeed():
+            return "replica"
+
+        assert await upstream.hedged_call([fail, succeed], hedge_delay=10) == "replica"
+
+        with pytest.raises(RuntimeError):
+            await upstream.hedged_call([fail, fail], hedge_delay=10)
+
+    async def test_client_errors_are_not_hedged(self, upstream):
+        calls = []
+
+        def status_error(code):
+            request = httpx.Request("GET", "http://primary/context")
+            return httpx.HTTPStatusError("error", request=request, response=httpx.Response(code, request=request))
+
+        async def attempt(name, error=None):
+            calls.append(name)
+            if error is not None:
+                raise error
+            return name
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await upstream.hedged_call(
+                [lambda: attempt("primary", status_error(404)), lambda: attempt("replica")],
+                hedge_delay=10, retryable=upstream.is_retryable
+            )
+        assert calls == ["primary"]
+
+        calls.clear()
+        assert await upstream.hedged_call(
+            [lambda: attempt("primary", status_error(503)), lambda: attempt("replica")],
+            hedge_delay=10, retryable=upstream.is_retryable
+        ) == "replica"
+        assert await upstream.hedged_call(
+            [lambda: attempt("primary", httpx.ConnectTimeout("slow")), lambda: attempt("replica")],
+            hedge_delay=10, retryable=upstream.is_retryable
+        ) == "replica"
+
+    async def test_disconnect_cancels_upstream(self, upstream):
+        cancelled = asyncio.Event()
+
+        async def slow_call():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(upstream.ClientDisconnected):
+            await upstream.cancel_on_disconnect(FakeRequest(disconnect_after=2), slow_call(), poll_interval=0.01)
+
+        assert cancelled.is_set()
+
+    async def test_connected_client_gets_result(self, upstream):
+        async def call():
+            await asyncio.sleep(0.02)
+            return {"ok": True}
+
+        assert await upstream.cancel_on_disconnect(FakeRequest(), call(), poll_interval=0.005) == {"ok": True}
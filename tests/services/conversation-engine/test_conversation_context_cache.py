@@ -0,0 +1,120 @@
+"""
+Unit tests for the conversation context cache
+"""
+
+import importlib.util
+import pytest
+import sys
+import os
+from unittest.mock import patch
+
+# Load the cache by path: a `services` package import here would shadow the
+# other services' `services` packages for the rest of the session
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'conversation-engine'
+    )
+)
+_spec = importlib.util.spec_from_file_location(
+    "conversation_engine_context_cache",
+    os.path.join(service_dir, 'services', 'context_cache.py')
+)
+context_cache = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = context_cache
+_spec.loader.exec_module(context_cache)
+ConversationContextCache = context_cache.ConversationContextCache
+
+
+def _turn(role, content):
+    return {"role": role, "content": content}
+
+
+class TestConversationContextCache:
+    """Test rolling history, staleness checks and expiry"""
+
+    def test_put_and_get(self):
+        cache = ConversationContextCache(max_turns=3)
+        cache.put("c1", [_turn("user", "a"), _turn("assistant", "b")], last_message_id="m2")
+
+        cached = cache.get("c1")
+
+        assert cached.turns == [_turn("user", "a"), _turn("assistant", "b")]
+        assert cached.last_message_id == "m2"
+        assert cache.get("c2") is None
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_get_returns_a_copy(self):
+        cache = ConversationContextCache()
+        cache.put("c1", [_turn("user", "a")], last_message_id="m1")
+
+        cache.get("c1").turns.append(_turn("user", "mutated"))
+
+        assert cache.get("c1").turns == [_turn("user", "a")]
+
+    def test_append_rolls_the_window(self):
+        cache = ConversationContextCache(max_turns=3)
+        cache.put("c1", [_turn("user", "a"), _turn("assistant", "b")], last_message_id="m2")
+
+        appended = cache.append(
+            "c1", [_turn("user", "c"), _turn("assistant", "d")], previous_message_id="m2", last_message_id="m4"
+        )
+
+        cached = cache.get("c1")
+        assert appended is True
+        assert [t["content"] for t in cached.turns] == ["b", "c", "d"]
+        assert cached.last_message_id == "m4"
+
+    def test_append_to_empty_conversation(self):
+        cache = ConversationContextCache()
+        cache.put("c1", [], last_message_id=None)
+
+        assert cache.append("c1", [_turn("user", "hi")], previous_message_id=None, last_message_id="m1")
+        assert cache.get("c1").turns == [_turn("user", "hi")]
+
+    def test_append_after_a_concurrent_turn_drops_the_entry(self):
+        cache = ConversationContextCache()
+        cache.put("c1", [_turn("user", "a")], last_message_id="m3")
+
+        appended = cache.append("c1", [_turn("user", "b")], previous_message_id="m1", last_message_id="m4")
+
+        assert appended is False
+        assert cache.get("c1") is None
+
+    def test_append_without_entry_is_a_no_op(self):
+        cache = ConversationContextCache()
+
+        assert cache.append("c1", [_turn("user", "a")], previous_message_id=None, last_message_id="m1") is False
+        assert cache.get("c1") is None
+
+    def test_entries_expire(self):
+        cache = ConversationContextCache(ttl_seconds=10)
+        with patch.object(context_cache.time, "monotonic", return_value=100.0):
+            cache.put("c1", [_turn("user", "a")], last_message_id="m1")
+        with patch.object(context_cache.time, "monotonic", return_value=111.0):
+            assert cache.get("c1") is None
+
+    def test_invalidate_and_lru_bound(self):
+        cache = ConversationContextCache(max_conversations=2)
+        for cid in ("c1", "c2", "c3"):
+            cache.put(cid, [], last_message_id=None)
+
+        assert cache.get("c1") is None
+        assert cache.invalidate("c2") is True
+        assert cache.invalidate("c2") is False
+        assert len(cache) == 1
+
+    def test_uuid_and_string_ids_share_entries(self):
+        import uuid
+        cid = uuid.uuid4()
+        cache = ConversationContextCache()
+        cache.put(cid, [], last_message_id=None)
+
+        assert cache.get(str(cid)) is not None
+
+    @pytest.mark.parametrize("kwargs", [{"max_turns": 0}, {"ttl_seconds": 0}])
+    def test_disabled(self, kwargs):
+        cache = ConversationContextCache(**kwargs)
+        cache.put("c1", [], last_message_id=None)
+
+        assert cache.get("c1") is None
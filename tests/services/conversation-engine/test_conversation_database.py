@@ -6,6 +6,7 @@ import pytest
 import sys
 import os
 from uuid import uuid4
+from datetime import datetime, timedelta, timezone
 
 # Add service directory to path
 service_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'apps', 'backend', 'services', 'conversation-engine'))
@@ -123,6 +124,51 @@ class TestConversationRepository:
         assert messages[0].message_type == "user"
         assert messages[1].message_type == "ai"
     
+    def test_get_recent_messages(self, test_db, test_user_id):
+        """Test retrieving the newest messages in chronological order"""
+        repo = ConversationRepository(test_db)
+        conversation = repo.create_conversation(user_id=test_user_id)
+        base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        for i in range(7):
+            message = repo.create_message(
+                conversation_id=conversation.id,
+                message_type="user" if i % 2 == 0 else "ai",
+                encrypted_content=f"message {i}".encode()
+            )
+            message.created_at = base + timedelta(minutes=i)
+        test_db.commit()
+        
+        messages = repo.get_recent_messages(conversation.id, limit=3)
+        
+        assert [m.encrypted_content for m in messages] == [b"message 4", b"message 5", b"message 6"]
+        assert repo.get_recent_messages(conversation.id, limit=0) == []
+    
+    def test_get_latest_message_id(self, test_db, test_user_id):
+        """Test looking up the newest message without loading content"""
+        repo = ConversationRepository(test_db)
+        conversation = repo.create_conversation(user_id=test_user_id)
+        
+        assert repo.get_latest_message_id(conversation.id) is None
+        
+        first = repo.create_message(conversation_id=conversation.id, message_type="user", encrypted_content=b"a")
+        second = repo.create_message(conversation_id=conversation.id, message_type="ai", encrypted_content=b"b")
+        first.created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        second.created_at = datetime(2024, 1, 2, tzinfo=timezone.utc)
+        test_db.commit()
+        
+        assert repo.get_latest_message_id(conversation.id) == second.id
+    
+    def test_delete_conversation(self, test_db, test_user_id):
+        """Test deleting a conversation removes its messages"""
+        repo = ConversationRepository(test_db)
+        conversation = repo.create_conversation(user_id=test_user_id)
+        repo.create_message(conversation_id=conversation.id, message_type="user", encrypted_content=b"a")
+        
+        assert repo.delete_conversation(conversation.id) is True
+        assert repo.get_conversation(conversation.id) is None
+        assert repo.get_conversation_messages(conversation.id) == []
+        assert repo.delete_conversation(conversation.id) is False
+    
     def test_update_conversation(self, test_db, test_user_id):
         """Test updating a conversation"""
         repo = ConversationRepository(test_db)
@@ -55,31 +55,50 @@ class TestConversationEngine:
 
                 fake_encryption.encrypt_text = AsyncMock(side_effect=_encrypt_text)
                 fake_encryption.decrypt_text = AsyncMock(return_value="decrypted")
+                fake_encryption.decrypt_many = AsyncMock(
+                    side_effect=lambda *, ciphertexts, key_id=None: [c.decode() for c in ciphertexts]
+                )
                 mock_encryption_client.return_value = fake_encryption
 
                 # Fake repository for DB operations
                 class _FakeConversation:
-                    def __init__(self, cid):
+                    def __init__(self, cid, user_id=None):
                         self.id = cid
+                        self.user_id = user_id
 
                 class _FakeRepo:
                     def __init__(self, _db):
                         self.created_messages = []
+                        self.history = []
+                        self.history_limits = []
+                        self.owners = {}
 
                     def get_conversation(self, conversation_id):
-                        return _FakeConversation(conversation_id)
+                        return _FakeConversation(conversation_id, self.owners.get(conversation_id))
 
                     def create_conversation(self, user_id, emotion_summary=None):
                         import uuid as _uuid
-                        return _FakeConversation(_uuid.uuid4())
+                        return _FakeConversation(_uuid.uuid4(), user_id)
 
-                    def get_conversation_messages(self, conversation_id):
-                        return []
+                    def get_recent_messages(self, conversation_id, limit=5):
+                        self.history_limits.append(limit)
+                        return self.history[-limit:]
+
+                    def get_latest_message_id(self, conversation_id):
+                        return self.history[-1].id if self.history else None
 
                     def create_message(self, conversation_id, message_type, encrypted_content, emotion_data=None):
                         self.created_messages.append(encrypted_content)
                         import uuid as _uuid
-                        return Mock(id=str(_uuid.uuid4()))
+                        message = Mock(id=str(_uuid.uuid4()), message_type=message_type, encrypted_content=encrypted_content)
+                        self.history.append(message)
+                        return message
+
+                    def update_conversation(self, conversation_id, ended_at=None, **kwargs):
+                        return True
+
+                    def delete_conversation(self, conversation_id):
+                        return True
 
                 fake_repo = _FakeRepo(None)
                 mock_repo_cls.return_value = fake_repo
@@ -95,10 +114,24 @@ class TestConversationEngine:
             if service_dir in sys.path:
                 sys.path.remove(service_dir)
     
+    @staticmethod
+    def _token_for(user_id):
+        """Bearer token signed like the gateway's"""
+        from jose import jwt
+        from config import settings
+        return "Bearer " + jwt.encode({"user_id": user_id}, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    
+    @staticmethod
+    def _own(client, conversation_id, user_id):
+        """Store a conversation owned by user_id in the fake repository"""
+        main = sys.modules["main"]
+        user_uuid = main._user_uuid(user_id)
+        client.app.state._fake_repo.owners[main._conversation_uuid(conversation_id, user_uuid)] = user_uuid
+    
     @pytest.fixture
-    def auth_token(self):
-        """Generate a test JWT token"""
-        return "Bearer test-token"
+    def auth_token(self, client):
+        """Generate a test JWT token for test-user"""
+        return self._token_for("test-user")
     
     def test_health_check(self, client):
         """Test health check endpoint"""
@@ -235,6 +268,106 @@ class TestConversationEngine:
         # The fake encryption client returns b\"ciphertext\" for all encryptions.
         assert all(m == b"ciphertext" for m in stored)
 
+    def test_chat_sends_recent_history_window(self, client, auth_token):
+        """Test history is read as one recent window and decrypted in one batch"""
+        fake_repo = client.app.state._fake_repo
+        fake_encryption = client.app.state._fake_encryption
+        fake_repo.history = [
+            Mock(id=str(i), message_type="ai" if i % 2 else "user", encrypted_content=f"m{i}".encode())
+            for i in range(3)
+        ]
+
+        with patch('main.gpt_service') as mock_gpt:
+            mock_gpt.generate_response = AsyncMock(return_value="Tell me more.")
+            response = client.post(
+                "/chat",
+                json={"user_id": "test-user", "message": "Still tired", "conversation_id": "c-1"},
+                headers={"Authorization": auth_token}
+            )
+
+        assert response.status_code == 200
+        assert fake_repo.history_limits == [5]
+        assert fake_encryption.decrypt_many.await_count == 1
+        fake_encryption.decrypt_text.assert_not_called()
+        history = mock_gpt.generate_response.call_args.kwargs["conversation_history"]
+        assert history == [
+            {"role": "user", "content": "m0"},
+            {"role": "assistant", "content": "m1"},
+            {"role": "user", "content": "m2"},
+        ]
+    
+    def test_chat_reuses_cached_history(self, client, auth_token):
+        """Test a follow-up turn builds its history without decrypt calls"""
+        fake_repo = client.app.state._fake_repo
+        fake_encryption = client.app.state._fake_encryption
+        fake_repo.history = [Mock(id="m0", message_type="user", encrypted_content=b"earlier")]
+        request_data = {"user_id": "test-user", "message": "first", "conversation_id": "c-2"}
+
+        with patch('main.gpt_service') as mock_gpt:
+            mock_gpt.generate_response = AsyncMock(return_value="reply")
+            client.post("/chat", json=request_data, headers={"Authorization": auth_token})
+            second = client.post(
+                "/chat", json={**request_data, "message": "second"}, headers={"Authorization": auth_token}
+            )
+
+        assert second.status_code == 200
+        assert fake_encryption.decrypt_many.await_count == 1
+        history = mock_gpt.generate_response.call_args.kwargs["conversation_history"]
+        assert history == [
+            {"role": "user", "content": "earlier"},
+            {"role": "user", "content": "first"},
+            {"role": "assistant", "content": "reply"},
+        ]
+    
+    def test_end_conversation_invalidates_cached_history(self, client, auth_token):
+        """Test ending a conversation forces the next turn to re-read history"""
+        fake_encryption = client.app.state._fake_encryption
+        client.app.state._fake_repo.history = [Mock(id="m0", message_type="user", encrypted_content=b"earlier")]
+        request_data = {"user_id": "test-user", "message": "hello", "conversation_id": "c-3"}
+        self._own(client, "c-3", "test-user")
+
+        client.post("/chat", json=request_data, headers={"Authorization": auth_token})
+        ended = client.post("/conversations/c-3/end", headers={"Authorization": auth_token})
+        client.post("/chat", json=request_data, headers={"Authorization": auth_token})
+
+        assert ended.status_code == 200
+        assert ended.json()["ended"] is True
+        assert fake_encryption.decrypt_many.await_count == 2
+    
+    def test_delete_conversation(self, client, auth_token):
+        """Test deleting one of the caller's conversations by UUID"""
+        import uuid as _uuid
+        conversation_id = str(_uuid.uuid4())
+        self._own(client, conversation_id, "test-user")
+
+        response = client.request(
+            "DELETE", f"/conversations/{conversation_id}", headers={"Authorization": auth_token}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"conversation_id": conversation_id, "deleted": True}
+    
+    def test_end_and_delete_require_ownership(self, client, auth_token):
+        """Test another user's conversation is reported as not found"""
+        import uuid as _uuid
+        conversation_id = str(_uuid.uuid4())
+        self._own(client, conversation_id, "test-user")
+        other = {"Authorization": self._token_for("other-user")}
+
+        ended = client.post(f"/conversations/{conversation_id}/end", headers=other)
+        deleted = client.request("DELETE", f"/conversations/{conversation_id}", headers=other)
+        missing = client.request("DELETE", "/conversations/unknown", headers={"Authorization": auth_token})
+
+        assert ended.status_code == 404
+        assert deleted.status_code == 404
+        assert missing.status_code == 404
+    
+    def test_end_conversation_rejects_invalid_token(self, client):
+        """Test end/delete need a token signed by the gateway"""
+        response = client.post("/conversations/c-5/end", headers={"Authorization": "Bearer test-token"})
+
+        assert response.status_code == 401
+    
     def test_chat_does_not_store_plaintext_on_encryption_failure(self, client, auth_token):
         """If encryption fails, we should not store plaintext bytes."""
         # Force encryption to fail
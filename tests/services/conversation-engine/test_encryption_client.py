@@ -0,0 +1,98 @@
+"""
+Unit tests for the conversation-engine encryption client
+"""
+
+import asyncio
+import base64
+import importlib.util
+import pytest
+import sys
+import os
+from unittest.mock import AsyncMock, Mock
+
+# Load the client by path: a `services` package import here would shadow the
+# other services' `services` packages for the rest of the session
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'conversation-engine'
+    )
+)
+_spec = importlib.util.spec_from_file_location(
+    "conversation_engine_encryption_client",
+    os.path.join(service_dir, 'services', 'encryption_client.py')
+)
+encryption_client = importlib.util.module_from_spec(_spec)
+sys.modules[_spec.name] = encryption_client
+_spec.loader.exec_module(encryption_client)
+EncryptionClient = encryption_client.EncryptionClient
+
+def _decrypt_response(payload):
+    """Fake /decrypt response echoing the ciphertext back as plaintext"""
+    ciphertext = base64.b64decode(payload["encrypted_data"]).decode("utf-8")
+    response = Mock()
+    response.raise_for_status = Mock()
+    response.json.return_value = {"success": True, "data": f"plain:{ciphertext}"}
+    return response
+
+
+class TestDecryptMany:
+    """Test concurrent history decryption"""
+
+    @pytest.mark.asyncio
+    async def test_decrypts_in_input_order(self):
+        http = AsyncMock()
+        http.post = AsyncMock(side_effect=lambda url, json: _decrypt_response(json))
+        client = EncryptionClient("http://encryption-service:8000/", http_client=http)
+
+        plaintexts = await client.decrypt_many(ciphertexts=[b"one", b"two", b"three"], key_id="conversation:1")
+
+        assert plaintexts == ["plain:one", "plain:two", "plain:three"]
+        assert http.post.call_count == 3
+        url, = {call.args[0] for call in http.post.call_args_list}
+        assert url == "http://encryption-service:8000/decrypt"
+        assert all(call.kwargs["json"]["key_id"] == "conversation:1" for call in http.post.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_requests_are_concurrent(self):
+        in_flight = 0
+        peak = 0
+
+        async def post(url, json):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return _decrypt_response(json)
+
+        http = AsyncMock()
+        http.post = AsyncMock(side_effect=post)
+        client = EncryptionClient("http://encryption-service:8000", http_client=http)
+
+        await client.decrypt_many(ciphertexts=[b"a", b"b", b"c", b"d", b"e"])
+
+        assert peak == 5
+
+    @pytest.mark.asyncio
+    async def test_failed_item_is_none(self):
+        async def post(url, json):
+            if base64.b64decode(json["encrypted_data"]) == b"bad":
+                raise RuntimeError("Decryption failed")
+            return _decrypt_response(json)
+
+        http = AsyncMock()
+        http.post = AsyncMock(side_effect=post)
+        client = EncryptionClient("http://encryption-service:8000", http_client=http)
+
+        plaintexts = await client.decrypt_many(ciphertexts=[b"good", b"bad"])
+
+        assert plaintexts == ["plain:good", None]
+
+    @pytest.mark.asyncio
+    async def test_empty_input_makes_no_calls(self):
+        http = AsyncMock()
+        client = EncryptionClient("http://encryption-service:8000", http_client=http)
+
+        assert await client.decrypt_many(ciphertexts=[]) == []
+        http.post.assert_not_called()
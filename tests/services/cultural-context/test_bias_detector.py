@@ -157,3 +157,74 @@ class TestBiasDetector:
         assert "appropriate_advice" in check_types
         assert "inclusive_language" in check_types
 
+
+
+class TestCompiledBiasRules:
+    """Test the single-pass rule scanner and rule reloading"""
+    
+    def test_matches_follow_regex_findall(self):
+        """Greedy gaps, whole words and one line per match, as the regex rules behave"""
+        import re
+        from services.bias_detector import CompiledBiasRules
+        
+        rules = CompiledBiasRules({"t": [["just|simply", "get over|move on"]]}, [])
+        regex = re.compile(r'\b(just|simply)\b.*\b(get over|move on)\b')
+        for text in [
+            "just get over it and simply move on, just move on",
+            "justice will get over\njust\nmove on",
+            "simply put, you will move on. just get over it",
+        ]:
+            found = rules.scan(text).get("t", {}).get(0, [])
+            assert [tuple(text[s:e] for s, e in m) for m in found] == regex.findall(text)
+    
+    def test_one_scan_serves_biases_and_checks(self):
+        """assess_overall_sensitivity scans the text once"""
+        from services.bias_detector import BiasDetector
+        
+        detector = BiasDetector()
+        with patch.object(detector.compiled, 'scan', wraps=detector.compiled.scan) as scan:
+            assessment = detector.assess_overall_sensitivity("You're crazy, just get over it")
+        
+        assert scan.call_count == 1
+        assert assessment["checks_failed"] >= 1
+        assert {b["type"] for b in assessment["biases"]} == {"stigmatizing"}
+    
+    def test_rules_load_from_cultural_norms(self):
+        """Norms add categories and replace default rules"""
+        from services.bias_detector import BiasDetector
+        
+        norms = {"bias_rules": {"categories": {
+            "stigmatizing": [["lazy"]],
+            "fatalism": {"rules": [["nothing|no one", "can help"]], "description": "Fatalistic framing", "severity": "medium"},
+        }}}
+        detector = BiasDetector(norms)
+        
+        biases = detector.detect_biases("Nothing can help, you are lazy. You're crazy")
+        
+        assert [(b.bias_type, b.detected_pattern) for b in biases] == [
+            ("stigmatizing", "lazy"), ("fatalism", "('nothing', 'can help')")
+        ]
+        assert biases[1].description == "Fatalistic framing"
+        assert biases[1].severity == "medium"
+    
+    def test_invalid_rules_keep_current_rules(self):
+        from services.bias_detector import BiasDetector
+        
+        detector = BiasDetector()
+        
+        assert detector.load_rules({"bias_rules": {"categories": {"stigmatizing": [[42]]}}}) is False
+        assert detector.detect_biases("that is crazy")[0].bias_type == "stigmatizing"
+    
+    def test_get_bias_detector_recompiles_for_new_norms(self):
+        from services.bias_detector import get_bias_detector
+        
+        norms = {"bias_rules": {"categories": {"stigmatizing": [["lazy"]]}}}
+        detector = get_bias_detector(norms)
+        compiled = detector.compiled
+        
+        assert get_bias_detector(norms).compiled is compiled
+        assert detector.detect_biases("so lazy")[0].detected_pattern == "lazy"
+        
+        get_bias_detector({})
+        assert detector.compiled is not compiled
+        assert detector.detect_biases("so lazy") == []
@@ -0,0 +1,107 @@
+"""
+Unit tests for the layered /context cache
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+from unittest.mock import AsyncMock, patch
+
+# Add service directory to path
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'cultural-context'
+    )
+)
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from services.context_cache import ContextCache, LocalTTLCache, context_cache_key
+
+
+class TestContextCacheKey:
+    """Test key normalization"""
+
+    def test_case_whitespace_and_diacritics_are_ignored(self):
+        assert context_cache_key("sw", "  Nimechóka \n sana ") == "sw:nimechoka sana"
+        assert context_cache_key("SW", "nimechoka sana") == "sw:nimechoka sana"
+
+    def test_language_is_part_of_the_key(self):
+        assert context_cache_key("en", "sawa") != context_cache_key("sw", "sawa")
+
+    def test_kb_version_is_part_of_the_key(self):
+        assert context_cache_key("sw", "sawa", "v1") == "v1:sw:sawa"
+        assert context_cache_key("sw", "sawa", "v1") != context_cache_key("sw", "sawa", "v2")
+
+
+class TestLocalTTLCache:
+    """Test in-process tier"""
+
+    def test_lru_eviction(self):
+        cache = LocalTTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", {"v": 1})
+        cache.set("b", {"v": 2})
+        cache.get("a")
+        cache.set("c", {"v": 3})
+
+        assert cache.get("b") is None
+        assert cache.get("a") == {"v": 1}
+        assert len(cache) == 2
+
+    def test_entries_expire(self):
+        cache = LocalTTLCache(ttl_seconds=10)
+        with patch('services.context_cache.time.monotonic', return_value=100.0):
+            cache.set("a", {"v": 1})
+        with patch('services.context_cache.time.monotonic', return_value=111.0):
+            assert cache.get("a") is None
+
+
+class TestContextCache:
+    """Test tier lookups and single-flight loading"""
+
+    async def test_concurrent_misses_load_once(self):
+        cache = ContextCache()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"context": "built"}, None
+
+        results = await asyncio.gather(*[cache.get_or_load("sw:sawa", loader) for _ in range(10)])
+
+        assert len(calls) == 1
+        assert all(result == ({"context": "built"}, None) for result in results)
+        assert cache.stats()["coalesced"] == 9
+        assert await cache.get_or_load("sw:sawa", loader) == ({"context": "built"}, "memory_cache")
+
+    async def test_loader_failure_is_not_cached(self):
+        cache = ContextCache()
+        loader = AsyncMock(side_effect=[RuntimeError("db down"), ({"context": "ok"}, "db_cache")])
+
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load("en:x", loader)
+        assert await cache.get_or_load("en:x", loader) == ({"context": "ok"}, "db_cache")
+
+    async def test_redis_tier_shared_between_instances(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        shared = fakeredis.aioredis.FakeRedis()
+        writer, reader = ContextCache(), ContextCache()
+        writer.redis = reader.redis = shared
+
+        await writer.set("en:hello", {"context": "from redis"})
+
+        assert await reader.get("en:hello") == ({"context": "from redis"}, "redis_cache")
+        # Promoted into the reader's memory tier
+        assert await reader.get("en:hello") == ({"context": "from redis"}, "memory_cache")
+
+    async def test_redis_errors_skip_the_tier(self):
+        cache = ContextCache(redis_retry_seconds=60)
+        cache.redis = AsyncMock()
+        cache.redis.get.side_effect = ConnectionError("refused")
+
+        assert await cache.get("en:a") == (None, None)
+        assert await cache.get("en:b") == (None, None)
+        assert cache.redis.get.call_count == 1
@@ -123,11 +123,24 @@ class TestCulturalRepository:
         cache_entry.expires_at = datetime.now(timezone.utc) - timedelta(hours=1)
         test_db.commit()
         
-        # Try to retrieve (should return None and delete expired entry)
+        # Try to retrieve (should return None; the row is left for the sweeper)
         cached = repo.get_cached_context("en:test")
         
         assert cached is None
     
+    def test_delete_expired_entries(self, test_db):
+        """Test that the sweeper removes only expired entries"""
+        repo = CulturalRepository(test_db)
+        
+        expired = repo.cache_context(context_key="en:old", context_data={"context": "old"}, language="en")
+        repo.cache_context(context_key="en:new", context_data={"context": "new"}, language="en")
+        expired.expires_at = datetime.now(timezone.utc) - timedelta(hours=1)
+        test_db.commit()
+        
+        assert repo.delete_expired_entries() == 1
+        assert repo.get_cached_context("en:new") is not None
+        assert test_db.query(CulturalContextCache).count() == 1
+    
     def test_delete_context(self, test_db):
         """Test deleting cached context"""
         repo = CulturalRepository(test_db)
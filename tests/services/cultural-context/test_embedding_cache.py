@@ -0,0 +1,149 @@
+"""
+Unit tests for the embedding cache and micro-batcher
+"""
+
+import pytest
+import sys
+import os
+import threading
+import numpy as np
+from unittest.mock import Mock, patch
+
+# Add service directory to path
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'cultural-context'
+    )
+)
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from services.embedding_cache import (
+    EmbeddingBatcher,
+    EmbeddingCache,
+    SQLiteEmbeddingStore,
+    build_store,
+    normalize_text,
+)
+
+
+class TestEmbeddingCache:
+    """Test key normalization, LRU behaviour and persistent tiers"""
+
+    def test_normalize_text(self):
+        assert normalize_text("  Nimechoka\n\tSANA ") == "nimechoka sana"
+        # Decomposed and composed forms share a key
+        assert normalize_text("cafe\u0301") == normalize_text("caf\u00e9")
+
+    def test_lru_eviction_and_stats(self):
+        cache = EmbeddingCache("m", max_size=2)
+        cache.put_many({"a": [1.0], "b": [2.0]})
+        assert cache.get("a") == [1.0]
+
+        cache.put_many({"c": [3.0]})  # evicts "b", the least recently used
+
+        assert cache.get("b") is None
+        assert cache.get_many(["a", "c"]) == {"a": [1.0], "c": [3.0]}
+        assert cache.stats()["hits"] == 3
+        assert cache.stats()["misses"] == 1
+
+    def test_keys_are_versioned_by_model(self, tmp_path):
+        store = SQLiteEmbeddingStore(str(tmp_path / "emb.db"))
+        EmbeddingCache("model-a", store=store).put_many({"sawa": [0.5, 0.25]})
+
+        assert EmbeddingCache("model-a", store=store).get("sawa") == [0.5, 0.25]
+        assert EmbeddingCache("model-b", store=store).get("sawa") is None
+
+    def test_store_failure_is_a_miss(self):
+        store = Mock()
+        store.get_many.side_effect = ConnectionError("down")
+        store.set_many.side_effect = ConnectionError("down")
+        cache = EmbeddingCache("m", max_size=0, store=store)
+
+        cache.put_many({"a": [1.0]})
+        assert cache.get("a") is None
+
+    def test_redis_store_roundtrip(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        store = build_store("redis://localhost:6379/0", ttl_seconds=60)
+        store.client = fakeredis.FakeRedis()
+
+        EmbeddingCache("m", max_size=0, store=store).put_many({"hakuna": [0.125, -1.0]})
+
+        assert EmbeddingCache("m", store=store).get("hakuna") == [0.125, -1.0]
+
+    def test_build_store_empty_url(self):
+        assert build_store("", ttl_seconds=60) is None
+
+
+class TestEmbeddingBatcher:
+    """Test coalescing of concurrent requests"""
+
+    def test_concurrent_submits_share_one_call(self):
+        calls = []
+
+        def encode(texts):
+            calls.append(list(texts))
+            return [[float(len(text))] for text in texts]
+
+        batcher = EmbeddingBatcher(encode, max_batch=32, max_wait=0.2)
+        barrier = threading.Barrier(8)
+        results = {}
+
+        def worker(i):
+            barrier.wait()
+            results[i] = batcher.submit(f"text {i % 4}").result(timeout=5)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(calls[0]) == [f"text {i}" for i in range(4)]
+        assert all(results[i] == [6.0] for i in range(8))
+
+    def test_encode_failure_resolves_to_none(self):
+        batcher = EmbeddingBatcher(Mock(side_effect=RuntimeError("boom")), max_wait=0)
+
+        assert batcher.submit("x").result(timeout=5) is None
+
+
+class TestEmbeddingServiceCaching:
+    """Test EmbeddingService cache and batching with a stub model"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        monkeypatch.delenv("EMBEDDING_CACHE_URL", raising=False)
+        monkeypatch.setenv("EMBEDDING_BATCH_WINDOW_MS", "0")
+        monkeypatch.setenv("EMBEDDING_BATCH_SIZE", "2")
+
+        model = Mock()
+        model.encode.side_effect = lambda texts, **kwargs: (
+            np.array([[float(len(t)), 1.0] for t in texts])
+            if isinstance(texts, list) else np.array([float(len(texts)), 1.0])
+        )
+        with patch('services.embeddings.SENTENCE_TRANSFORMERS_AVAILABLE', True), \
+                patch('services.embeddings.SentenceTransformer', Mock(return_value=model), create=True):
+            from services.embeddings import EmbeddingService
+            yield EmbeddingService()
+
+    def test_embed_text_uses_cache(self, service):
+        first = service.embed_text("Nimechoka")
+        second = service.embed_text("  nimechoka ")
+
+        assert first == second == [9.0, 1.0]
+        assert service.local_model.encode.call_count == 1
+
+    def test_embed_batch_dedupes_and_chunks(self, service):
+        service.embed_text("sawa")
+        service.local_model.encode.reset_mock()
+
+        result = service.embed_batch(["sawa", "a", "Sawa", "", "bb", "ccc", "A"])
+
+        assert result == [[4.0, 1.0], [1.0, 1.0], [4.0, 1.0], None, [2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+        # Three new texts in chunks of two
+        assert [c.args[0] for c in service.local_model.encode.call_args_list] == [["a", "bb"], ["ccc"]]
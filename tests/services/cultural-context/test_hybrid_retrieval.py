@@ -0,0 +1,156 @@
+"""
+Unit tests for BM25 and hybrid (BM25 + vector) retrieval
+"""
+
+import json
+import pytest
+import sys
+import os
+import threading
+import numpy as np
+from unittest.mock import Mock
+
+# Add service directory to path
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'cultural-context'
+    )
+)
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from services.bm25_index import BM25Index, tokenize
+from services.hybrid_retriever import HybridRetriever, reciprocal_rank_fusion
+from services.knowledge_base import KnowledgeBase
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'retrieval_relevance.json')
+
+
+@pytest.fixture(scope="module")
+def relevance():
+    with open(FIXTURE, encoding="utf-8") as f:
+        fixture = json.load(f)
+    return KnowledgeBase({"entries": fixture["entries"]}, {}), fixture["queries"]
+
+
+class TestTokenize:
+    """Test Swahili-aware tokenization"""
+
+    def test_swahili_verbs_share_their_stem(self):
+        assert tokenize("Nimechóka sana") == ["nimechoka", "choka", "sana"]
+        assert "choka" in tokenize("tumechoka")
+        assert "omba" in tokenize("Tunaomba msaada")
+
+    def test_stopwords_dropped_and_short_stems_kept_whole(self):
+        assert tokenize("I am tired of the city") == ["am", "tired", "city"]
+        # "si-ja-mbo" is not a subject + tense form: no stem
+        assert tokenize("sijambo") == ["sijambo"]
+
+
+class TestBM25Index:
+    """Test BM25 ranking"""
+
+    def test_rare_terms_outrank_common_ones(self):
+        index = BM25Index(["sawa sawa huzuni", "sawa", "sawa tu", "upweke"])
+
+        results = index.search("sawa huzuni", top_k=2)
+
+        assert results[0][0] == 0
+        assert index.search("upweke")[0][0] == 3
+        assert index.search("hakuna") == []
+
+    def test_mask_filters_documents(self):
+        index = BM25Index(["huzuni", "huzuni sana"])
+
+        results = index.search("huzuni", mask=np.array([False, True]))
+
+        assert [position for position, _ in results] == [1]
+
+
+class TestReciprocalRankFusion:
+    """Test rank fusion"""
+
+    def test_documents_in_both_lists_win(self):
+        fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]], k=60)
+
+        assert [doc for doc, _ in fused][:2] == [1, 3]
+        assert fused[0][1] == pytest.approx(1 / 61 + 1 / 62)
+
+    def test_empty_lists(self):
+        assert reciprocal_rank_fusion([[], []]) == []
+
+
+class TestHybridRetriever:
+    """Test fusion, language filtering and the latency budget"""
+
+    def test_vector_hits_are_fused_and_filtered(self, relevance):
+        kb, _ = relevance
+        rag = Mock()
+        rag.search.return_value = [
+            {"id": "en_stigma", "score": 0.9},  # Wrong language: dropped
+            {"id": "sw_exhaustion_kuchoka", "score": 0.8},
+            {"id": "unknown", "score": 0.7},
+        ]
+
+        retrieved = HybridRetriever().retrieve(kb, "nimechoka", {"", "sw"}, rag, vector_language="sw")
+
+        assert retrieved[0]["id"] == "sw_exhaustion_kuchoka"
+        assert retrieved[0]["rag_score"] == 0.8
+        assert "bm25_score" in retrieved[0]
+        assert all(entry["id"] != "en_stigma" for entry in retrieved)
+        rag.search.assert_called_once_with("nimechoka", top_k=10, language="sw")
+
+    def test_slow_vector_search_is_dropped(self, relevance):
+        kb, _ = relevance
+        release = threading.Event()
+        rag = Mock()
+        rag.search.side_effect = lambda *args, **kwargs: release.wait(5) and []
+        retriever = HybridRetriever(budget_ms=20)
+
+        retrieved = retriever.retrieve(kb, "msiba", {"", "sw"}, rag)
+        release.set()
+
+        assert retrieved[0]["id"] == "sw_grief_msiba"
+        assert "rag_score" not in retrieved[0]
+        assert retriever.stats()["vector_timeouts"] == 1
+
+    def test_vector_failure_uses_bm25(self, relevance):
+        kb, _ = relevance
+        rag = Mock()
+        rag.search.side_effect = RuntimeError("index offline")
+
+        retrieved = HybridRetriever().retrieve(kb, "wasiwasi", {"", "sw"}, rag)
+
+        assert retrieved[0]["id"] == "sw_anxiety_wasiwasi"
+
+    def test_retrieve_many_uses_one_vector_call(self, relevance):
+        kb, _ = relevance
+        rag = Mock()
+        rag.search_many.return_value = [[{"id": "en_stigma", "score": 0.9}], []]
+
+        retrieved = HybridRetriever().retrieve_many(
+            kb, ["people think I'm weak", "upweke"], [{"", "en"}, {"", "sw"}], rag, vector_language=None
+        )
+
+        assert rag.search_many.call_count == 1
+        assert retrieved[0][0]["id"] == "en_stigma"
+        assert retrieved[1][0]["id"] == "sw_loneliness_upweke"
+
+    def test_bm25_recall_on_relevance_fixture(self, relevance):
+        """Regression guard: BM25 must keep beating substring keyword matching"""
+        kb, queries = relevance
+        retriever = HybridRetriever()
+
+        def recall(retrieve):
+            hits = 0.0
+            for item in queries:
+                top = {entry.get("id") for entry in retrieve(item["query"], {"", item["language"], "sw"})[:3]}
+                hits += len(top & set(item["relevant"])) / len(item["relevant"])
+            return hits / len(queries)
+
+        bm25_recall = recall(lambda q, languages: retriever.retrieve(kb, q, languages))
+        keyword_recall = recall(lambda q, languages: kb.search_keywords(q, languages, top_k=3))
+
+        assert bm25_recall >= 0.9
+        assert bm25_recall > keyword_recall
@@ -0,0 +1,150 @@
+"""
+Unit tests for the knowledge base manager
+"""
+
+import pytest
+import sys
+import os
+import json
+
+# Add service directory to path
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'cultural-context'
+    )
+)
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from services.knowledge_base import KnowledgeBase, KnowledgeBaseManager
+
+
+KB = {
+    "entries": [
+        {"id": "kb1", "language": "sw", "keywords": ["nimechoka", "uchovu"], "content": "Fatigue"},
+        {"id": "kb2", "language": "en", "keywords": ["tired", "exhausted"], "content": "Exhaustion"},
+        {"id": "kb3", "keywords": ["family", "tired"], "content": "Family pressure"},
+        {"id": "kb4", "language": "en", "keywords": ["tired", "work"], "content": "Work stress"},
+    ]
+}
+NORMS = {"cultural_values": {"ubuntu": {}}}
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data), encoding="utf-8")
+
+
+class TestKnowledgeBase:
+    """Test snapshot indexes and keyword retrieval"""
+
+    def test_indexes(self):
+        kb = KnowledgeBase(KB, NORMS)
+
+        assert len(kb) == 4
+        assert kb.get("kb2")["content"] == "Exhaustion"
+        assert kb.get("missing") is None
+        assert kb.keyword_index["tired"] == (1, 2, 3)
+        assert kb.by_language["en"] == (1, 3)
+        assert kb.by_language[""] == (2,)
+        assert kb.norms["cultural_values"] == {"ubuntu": {}}
+
+    def test_search_ranks_by_score_then_order(self):
+        kb = KnowledgeBase(KB, NORMS)
+
+        results = kb.search_keywords("Tired after WORK", languages={"", "en"})
+
+        assert [e["id"] for e in results] == ["kb4", "kb2", "kb3"]
+
+    def test_search_filters_language(self):
+        kb = KnowledgeBase(KB, NORMS)
+
+        assert [e["id"] for e in kb.search_keywords("nimechoka, tired", languages={"sw"})] == ["kb1"]
+        assert kb.search_keywords("nimechoka", languages={"en"}) == []
+
+    def test_snapshot_is_read_only(self):
+        kb = KnowledgeBase(KB, NORMS)
+
+        with pytest.raises(TypeError):
+            kb.norms["cultural_values"] = {}
+
+    def test_version_follows_content(self):
+        kb = KnowledgeBase(KB, NORMS)
+
+        assert KnowledgeBase(KB, NORMS).version == kb.version
+        assert KnowledgeBase({"entries": KB["entries"][:1]}, NORMS).version != kb.version
+        assert KnowledgeBase(KB, {}).version != kb.version
+
+
+class TestKnowledgeBaseManager:
+    """Test loading, hot reload and failure handling"""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        kb_path, norms_path = tmp_path / "kb.json", tmp_path / "cultural_norms.json"
+        _write(kb_path, KB)
+        _write(norms_path, NORMS)
+        return kb_path, norms_path
+
+    def test_loads_once(self, files):
+        kb_path, norms_path = files
+        manager = KnowledgeBaseManager([str(kb_path)], [str(norms_path)], check_interval=0)
+
+        first = manager.current()
+        _write(kb_path, {"entries": []})
+
+        # The request path never stats the files; only the reload check does
+        assert manager.current() is first
+        assert len(first) == 4
+
+    def test_reloads_on_change(self, files):
+        kb_path, norms_path = files
+        manager = KnowledgeBaseManager([str(kb_path)], [str(norms_path)], check_interval=0)
+
+        first = manager.current()
+        assert manager.reload_if_changed() is False
+
+        _write(kb_path, {"entries": KB["entries"][:1]})
+        assert manager.current() is first
+        assert manager.reload_if_changed() is True
+        second = manager.current()
+
+        assert second is not first
+        assert len(second) == 1
+        assert len(first) == 4
+
+    def test_bad_json_keeps_previous_snapshot(self, files):
+        kb_path, norms_path = files
+        manager = KnowledgeBaseManager([str(kb_path)], [str(norms_path)], check_interval=0)
+        first = manager.current()
+
+        kb_path.write_text("{not json", encoding="utf-8")
+
+        assert manager.reload_if_changed() is False
+        assert manager.current() is first
+
+    def test_missing_files_serve_empty_kb(self, tmp_path):
+        manager = KnowledgeBaseManager([str(tmp_path / "kb.json")], [str(tmp_path / "norms.json")])
+
+        kb = manager.current()
+
+        assert len(kb) == 0
+        assert dict(kb.norms) == {}
+
+    def test_path_priority(self, files, tmp_path):
+        kb_path, norms_path = files
+        mounted = tmp_path / "mounted.json"
+        _write(mounted, {"entries": KB["entries"][:2]})
+        manager = KnowledgeBaseManager([str(mounted), str(kb_path)], [str(norms_path)])
+
+        assert len(manager.current()) == 2
+        assert manager.current().stats()["kb_path"] == str(mounted)
+
+    def test_forced_reload(self, files):
+        kb_path, norms_path = files
+        manager = KnowledgeBaseManager([str(kb_path)], [str(norms_path)], check_interval=60)
+        first = manager.current()
+
+        assert manager.reload_if_changed() is False
+        assert manager.reload() is True
+        assert manager.current() is not first
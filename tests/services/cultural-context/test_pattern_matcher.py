@@ -0,0 +1,70 @@
+"""
+Unit tests for the multi-pattern matcher
+"""
+
+import pytest
+import sys
+import os
+import re
+
+# Add service directory to path
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'cultural-context'
+    )
+)
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from services.pattern_matcher import PatternMatcher
+
+
+PATTERNS = ["sawa", "sawa tu", "ni", "ni hali ya kawaida", "hakuna shida", "hakuna", "i'm fine", "can't"]
+TEXTS = [
+    "sawa tu, ni hali ya kawaida",
+    "Nasawa? hakuna shida sana",
+    "i'm fine i'm fine, i can't",
+    "sawasawa sawa_ sawa-tu",
+    "",
+]
+
+
+class TestPatternMatcher:
+    """Test matching semantics against the regexes they replace"""
+
+    @pytest.fixture
+    def matcher(self):
+        return PatternMatcher(PATTERNS)
+
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_find_all_matches_per_pattern_regex(self, matcher, text):
+        text = text.lower()
+        expected = sorted(
+            (m.start(), i)
+            for i, p in enumerate(PATTERNS)
+            for m in re.finditer(r'\b' + re.escape(p) + r'\b', text)
+        )
+
+        assert [(m.start, m.index) for m in matcher.find_all(text)] == expected
+
+    @pytest.mark.parametrize("text", TEXTS)
+    def test_find_leftmost_matches_alternation(self, matcher, text):
+        text = text.lower()
+        alternation = re.compile('|'.join(r'\b' + re.escape(p) + r'\b' for p in PATTERNS))
+
+        assert [m.pattern for m in matcher.find_leftmost(text)] == alternation.findall(text)
+
+    def test_substring_mode(self):
+        matcher = PatternMatcher(["choka", "tired", "fear", "fearful"], word_boundary=False)
+
+        assert matcher.found("nimechoka and fearful") == ["choka", "fear", "fearful"]
+
+    def test_patterns_are_lowercased_and_deduplicated(self):
+        matcher = PatternMatcher(["Sawa", "sawa", "", None])
+
+        assert matcher.patterns == ["sawa"]
+        assert matcher.found("sawa") == ["sawa"]
+
+    def test_empty_matcher(self):
+        assert PatternMatcher([]).find_all("anything") == []
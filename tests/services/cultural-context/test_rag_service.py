@@ -27,6 +27,7 @@ class TestRAGService:
         mock_service = MagicMock()
         mock_service.is_available.return_value = True
         mock_service.embed_text.return_value = [0.1] * 384  # Mock embedding vector
+        mock_service.embed_batch.side_effect = lambda texts: [[0.1] * 384 if text else None for text in texts]
         mock_service.cosine_similarity.return_value = 0.85
         return mock_service
     
@@ -173,6 +174,22 @@ class TestRAGService:
         
         assert len(results) <= 3
     
+    def test_search_many_embeds_once(self, rag_service, mock_embedding_service):
+        """Test batch search uses one embedding batch and matches single search"""
+        for i, language in enumerate(["en", "sw", "sw"]):
+            vector = [0.0] * 384
+            vector[i] = 1.0
+            rag_service.in_memory_vectors.add(f"entry-{i}", vector, f"Content {i}", {"language": language})
+        mock_embedding_service.embed_batch.side_effect = lambda texts: [
+            [1.0 if j == int(text[-1]) else 0.0 for j in range(384)] if text != "bad" else None
+            for text in texts
+        ]
+        
+        results = rag_service.search_many(["q1", "bad", "q2"], top_k=1, language="sw")
+        
+        assert mock_embedding_service.embed_batch.call_count == 1
+        assert [[r["id"] for r in result] for result in results] == [["entry-1"], [], ["entry-2"]]
+    
     def test_ensure_index_exists_memory(self, rag_service):
         """Test ensure_index_exists for memory mode"""
         result = rag_service.ensure_index_exists()
@@ -262,3 +279,180 @@ class TestRAGService:
                         # Should have called create_index
                         assert mock_pinecone_client.create_index.called or result is True
 
+    
+    def test_memory_index_persists_across_restarts(self, mock_embedding_service, tmp_path):
+        """Test that a persisted in-memory index is reused without re-embedding"""
+        mock_embedding_service.embedding_model = "test-model"
+        kb_entries = [
+            {"id": "entry-1", "content": "Test content 1", "keywords": ["test"], "language": "en"},
+            {"id": "entry-2", "content": "Test content 2", "keywords": ["test"], "language": "sw"}
+        ]
+        
+        with patch('services.rag_service.get_embedding_service', return_value=mock_embedding_service):
+            with patch.dict(os.environ, {'RAG_INDEX_PATH': str(tmp_path / "kb")}):
+                from services.rag_service import RAGService
+                assert RAGService().index_knowledge_base(kb_entries) == 2
+                embed_calls = mock_embedding_service.embed_batch.call_count
+                
+                restarted = RAGService()
+                assert len(restarted.in_memory_vectors) == 2
+                assert restarted.get_index_stats()["memory_mapped"] is True
+                
+                # Unchanged entries are not embedded again
+                assert restarted.index_knowledge_base(kb_entries) == 2
+                assert mock_embedding_service.embed_batch.call_count == embed_calls
+                
+                # A different embedding model invalidates the persisted index
+                mock_embedding_service.embedding_model = "other-model"
+                assert len(RAGService().in_memory_vectors) == 0
+    
+    def test_local_store_backend(self, mock_embedding_service, tmp_path):
+        """Test serving a prebuilt local vector store read-only"""
+        from services.rag_service import RAGService
+        from services.vector_index import VectorIndex
+        
+        store = VectorIndex()
+        store.model = "test-model"
+        kb_entries = [
+            {"id": "sw-ea", "content": "A", "keywords": [], "language": "sw", "region": "east_africa"},
+            {"id": "sw-tz", "content": "B", "keywords": [], "language": "sw", "region": "tanzania"},
+            {"id": "en-ea", "content": "C", "keywords": [], "language": "en", "region": "east_africa"}
+        ]
+        for i, entry in enumerate(kb_entries):
+            vector = [0.1] * 384
+            vector[i] = 1.0
+            store.add(entry["id"], vector, entry["content"], {
+                "keywords": [], "language": entry["language"], "region": entry["region"]
+            })
+        store.save(str(tmp_path / "kb"))
+        mock_embedding_service.embedding_model = "test-model"
+        
+        with patch('services.rag_service.get_embedding_service', return_value=mock_embedding_service):
+            with patch.dict(os.environ, {'LOCAL_VECTOR_STORE_PATH': str(tmp_path / "kb")}):
+                service = RAGService()
+                
+                assert service.vector_db_type == "local"
+                assert service.get_index_stats()["memory_mapped"] is True
+                results = service.search("query", top_k=3, language="sw", region="tanzania")
+                assert [r["id"] for r in results] == ["sw-tz"]
+                
+                # Read-only: startup indexing only checks coverage and embeds nothing
+                assert service.index_knowledge_base(kb_entries + [{"id": "new", "content": "D"}]) == 3
+                assert mock_embedding_service.embed_batch.call_count == 0
+                assert service.index_entry("new", "D", {}) is False
+                assert service.clear_index() is False
+                
+                # A store built with another model is not used
+                mock_embedding_service.embedding_model = "other-model"
+                assert RAGService().vector_db_type == "memory"
+    
+    def test_incremental_sync_memory(self, rag_service, mock_embedding_service):
+        """Test that only new and changed entries are embedded and removed ones deleted"""
+        kb_entries = [
+            {"id": "a", "content": "A", "language": "en"},
+            {"id": "b", "content": "B", "language": "en"},
+            {"id": "c", "content": "C", "language": "sw"}
+        ]
+        assert rag_service.sync_knowledge_base(kb_entries)["added"]["count"] == 3
+        mock_embedding_service.embed_batch.reset_mock()
+        
+        edited = [
+            {"id": "a", "content": "A", "language": "en"},
+            {"id": "b", "content": "B, revised", "language": "en"},
+            {"id": "d", "content": "D", "language": "sw"}
+        ]
+        diff = rag_service.sync_knowledge_base(edited)
+        
+        assert {name: diff[name]["ids"] for name in ("added", "changed", "unchanged", "removed")} == {
+            "added": ["d"], "changed": ["b"], "unchanged": ["a"], "removed": ["c"]
+        }
+        assert diff["indexed_count"] == 3
+        assert diff["embedded"] == 2
+        mock_embedding_service.embed_batch.assert_called_once_with(["B, revised", "D"])
+        assert "c" not in rag_service.in_memory_vectors
+        
+        # Full re-index embeds everything again
+        assert rag_service.sync_knowledge_base(edited, full=True)["embedded"] == 3
+    
+    def test_entries_without_id_get_a_stable_id(self):
+        """Test the fallback id is a content digest, not the per-process hash()"""
+        import hashlib
+        from services.rag_service import kb_entry_fields
+        
+        entry_id, text, _ = kb_entry_fields({"content": "Pole sana", "language": "sw"})
+        
+        assert text == "Pole sana"
+        assert entry_id == hashlib.sha256("Pole sana".encode("utf-8")).hexdigest()
+        assert kb_entry_fields({"id": "sw_pole", "content": "Pole sana"})[0] == "sw_pole"
+    
+    def test_incremental_sync_pinecone_manifest(self, mock_embedding_service, tmp_path):
+        """Test that the Pinecone manifest survives restarts and writes are batched"""
+        mock_embedding_service.embedding_model = "test-model"
+        manifest_path = str(tmp_path / "manifest.json")
+        kb_entries = [{"id": f"e{i}", "content": f"Entry {i}", "language": "en"} for i in range(5)]
+        
+        def pinecone_service():
+            from services.rag_service import RAGService
+            service = RAGService()
+            service.vector_db_type = "pinecone"
+            service.pinecone_index = Mock()
+            return service
+        
+        with patch('services.rag_service.get_embedding_service', return_value=mock_embedding_service), \
+                patch('services.rag_service.UPSERT_BATCH_SIZE', 2), \
+                patch.dict(os.environ, {'KB_INDEX_MANIFEST_PATH': manifest_path}):
+            first = pinecone_service()
+            assert first.sync_knowledge_base(kb_entries)["embedded"] == 5
+            assert first.pinecone_index.upsert.call_count == 3  # 2 + 2 + 1 vectors
+            
+            restarted = pinecone_service()
+            diff = restarted.sync_knowledge_base(kb_entries[1:])
+            assert diff["unchanged"]["count"] == 4
+            assert diff["embedded"] == 0
+            restarted.pinecone_index.upsert.assert_not_called()
+            restarted.pinecone_index.delete.assert_called_once_with(ids=["e0"], namespace="")
+            
+            # A new embedding model marks every entry as changed
+            mock_embedding_service.embedding_model = "other-model"
+            assert pinecone_service().sync_knowledge_base(kb_entries[1:])["changed"]["count"] == 4
+    
+    def test_default_manifest_survives_restart(self, mock_embedding_service, tmp_path):
+        """Test that without KB_INDEX_MANIFEST_PATH a restart re-embeds nothing and deletes removed entries"""
+        mock_embedding_service.embedding_model = "test-model"
+        kb_entries = [{"id": f"e{i}", "content": f"Entry {i}", "language": "en"} for i in range(3)]
+        environ = {k: v for k, v in os.environ.items() if k != 'KB_INDEX_MANIFEST_PATH'}
+        
+        def pinecone_service():
+            from services.rag_service import RAGService
+            service = RAGService()
+            service.vector_db_type = "pinecone"
+            service.pinecone_index = Mock()
+            return service
+        
+        with patch('services.rag_service.get_embedding_service', return_value=mock_embedding_service), \
+                patch('services.rag_service.MOUNT_DIR', str(tmp_path)), \
+                patch.dict(os.environ, environ, clear=True):
+            assert pinecone_service().sync_knowledge_base(kb_entries)["embedded"] == 3
+            assert (tmp_path / "kb_index_manifest.json").exists()
+            
+            restarted = pinecone_service()
+            diff = restarted.sync_knowledge_base(kb_entries[:2])
+            
+            assert diff["embedded"] == 0
+            assert diff["removed"]["ids"] == ["e2"]
+            restarted.pinecone_index.upsert.assert_not_called()
+            restarted.pinecone_index.delete.assert_called_once_with(ids=["e2"], namespace="")
+    
+    def test_failed_upsert_is_retried_next_sync(self, mock_embedding_service, tmp_path):
+        """Test that entries whose write failed are not recorded as indexed"""
+        with patch('services.rag_service.get_embedding_service', return_value=mock_embedding_service), \
+                patch.dict(os.environ, {'KB_INDEX_MANIFEST_PATH': str(tmp_path / "manifest.json")}):
+            from services.rag_service import RAGService
+            service = RAGService()
+            service.vector_db_type = "pinecone"
+            service.pinecone_index = Mock()
+            service.pinecone_index.upsert.side_effect = [ConnectionError("timeout"), None]
+            kb_entries = [{"id": "a", "content": "A"}]
+            
+            assert service.sync_knowledge_base(kb_entries)["failed"] == 1
+            assert service.sync_knowledge_base(kb_entries)["added"]["count"] == 1
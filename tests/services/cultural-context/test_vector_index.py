@@ -0,0 +1,127 @@
+"""
+Unit tests for the in-memory vector index
+"""
+
+import pytest
+import sys
+import os
+import numpy as np
+
+# Add service directory to path
+service_dir = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__),
+        '..', '..', '..', 'apps', 'backend', 'services', 'cultural-context'
+    )
+)
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from services.vector_index import VectorIndex
+
+
+def _cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestVectorIndex:
+    """Test exact search, filtering, updates and persistence"""
+
+    @pytest.fixture
+    def vectors(self):
+        return np.random.default_rng(7).normal(size=(300, 16))
+
+    @pytest.fixture
+    def index(self, vectors):
+        index = VectorIndex()
+        for i, vector in enumerate(vectors):
+            index.add(f"e{i}", vector.tolist(), f"text {i}", {"language": ["en", "sw", "en"][i % 3]})
+        return index
+
+    def test_matches_brute_force_cosine(self, index, vectors):
+        query = vectors[5] + 0.1
+        expected = sorted(range(len(vectors)), key=lambda i: -_cosine(query, vectors[i]))[:5]
+
+        results = index.search(query.tolist(), top_k=5)
+
+        assert [r["id"] for r in results] == [f"e{i}" for i in expected]
+        assert results[0]["score"] == pytest.approx(_cosine(query, vectors[expected[0]]), abs=1e-5)
+        assert results[0]["metadata"]["language"] in ("en", "sw")
+
+    def test_language_filter(self, index, vectors):
+        results = index.search(vectors[1].tolist(), top_k=10, language="sw")
+
+        assert results[0]["id"] == "e1"
+        assert all(r["metadata"]["language"] == "sw" for r in results)
+        assert index.search(vectors[1].tolist(), top_k=3, language="fr") == []
+
+    def test_region_filter(self, vectors):
+        index = VectorIndex()
+        for i, vector in enumerate(vectors[:30]):
+            index.add(f"e{i}", vector.tolist(), "", {"language": "sw", "region": ["kenya", "tanzania"][i % 2]})
+
+        results = index.search(vectors[4].tolist(), top_k=5, language="sw", region="tanzania")
+
+        assert results[0]["id"] != "e4"
+        assert all(r["metadata"]["region"] == "tanzania" for r in results)
+        assert index.search(vectors[4].tolist(), top_k=5, region="uganda") == []
+        assert index.search_many([vectors[4].tolist()], top_k=1, region="kenya")[0][0]["id"] == "e4"
+
+    def test_upsert_and_remove(self, index, vectors):
+        index.add("e0", vectors[42].tolist(), "replaced", {"language": "en"})
+        assert len(index) == 300
+        assert index.get("e0")["text"] == "replaced"
+
+        assert index.remove("e42") is True
+        assert "e42" not in index
+        assert len(index) == 299
+        assert index.search(vectors[42].tolist(), top_k=1)[0]["id"] == "e0"
+        assert index.remove("missing") is False
+
+    def test_search_many_matches_search(self, index, vectors):
+        queries = [vectors[i] + 0.05 for i in (2, 7, 11)]
+
+        batched = index.search_many([q.tolist() for q in queries], top_k=4, language="en")
+
+        for query, results in zip(queries, batched):
+            expected = index.search(query.tolist(), top_k=4, language="en")
+            assert [r["id"] for r in results] == [r["id"] for r in expected]
+            assert [r["score"] for r in results] == pytest.approx([r["score"] for r in expected], abs=1e-5)
+        assert index.search_many([], top_k=4) == []
+        assert index.search_many([vectors[0].tolist()], top_k=4, language="fr") == [[]]
+
+    def test_dimension_mismatch_rejected(self, index):
+        assert index.add("bad", [1.0, 2.0], "x", {}) is False
+        assert index.search([1.0, 2.0]) == []
+
+    def test_ivf_finds_exact_neighbours(self, vectors):
+        index = VectorIndex(mode="ivf", min_ann_size=100, ivf_lists=4, ivf_probes=4)
+        for i, vector in enumerate(vectors):
+            index.add(f"e{i}", vector.tolist(), "", {"language": "en"})
+
+        # Probing every list makes IVF exhaustive
+        assert index.search(vectors[9].tolist(), top_k=1)[0]["id"] == "e9"
+        index.add("late", vectors[9].tolist(), "", {"language": "en"})
+        assert {r["id"] for r in index.search(vectors[9].tolist(), top_k=2)} == {"e9", "late"}
+
+    def test_save_and_memory_mapped_load(self, index, vectors, tmp_path):
+        path = str(tmp_path / "kb")
+        index.model = "test-model"
+        index.save(path)
+
+        loaded = VectorIndex.load(path)
+
+        assert loaded.stats()["memory_mapped"] is True
+        assert loaded.model == "test-model"
+        assert [r["id"] for r in loaded.search(vectors[3].tolist(), top_k=3, language="en")] == \
+            [r["id"] for r in index.search(vectors[3].tolist(), top_k=3, language="en")]
+        assert loaded.is_current("e3", "text 3", {"language": "en"})
+
+        # Writes go to a private copy, never to the mapped file
+        loaded.add("new", vectors[0].tolist(), "new", {"language": "sw"})
+        assert loaded.stats()["memory_mapped"] is False
+        assert len(VectorIndex.load(path)) == 300
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            VectorIndex(mode="annoy")
@@ -0,0 +1,142 @@
+"""
+Tests for request deadline propagation
+"""
+
+import asyncio
+import glob
+import os
+import re
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from src import deadline
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIRS = sorted(
+    os.path.dirname(path)
+    for path in glob.glob(os.path.join(REPO_ROOT, "apps", "backend", "**", "main.py"), recursive=True)
+    if "from src.deadline import" in open(path, encoding="utf-8").read()
+)
+
+
+class TestDeadline:
+    """Test cases for src.deadline"""
+
+    @pytest.fixture(autouse=True)
+    def clear_deadline(self):
+        token = deadline.set_deadline(None)
+        yield
+        deadline.reset_deadline(token)
+
+    def test_parse_header(self):
+        assert deadline.parse_deadline_header("1500") == 1.5
+        assert deadline.parse_deadline_header("soon") is None
+        assert deadline.parse_deadline_header(None) is None
+
+    def test_no_deadline_is_a_noop(self):
+        assert deadline.remaining() is None
+        assert deadline.timeout_for(10.0) == 10.0
+        assert deadline.deadline_headers() == {}
+        deadline.check_deadline()
+
+    def test_timeout_for_uses_remaining_budget(self):
+        deadline.set_deadline(2.0)
+
+        assert deadline.timeout_for(10.0) <= 2.0
+        assert deadline.timeout_for(0.5) == 0.5
+        assert 1900 <= int(deadline.deadline_headers()[deadline.DEADLINE_HEADER]) < 2000
+
+    def test_expired_deadline_raises(self):
+        deadline.set_deadline(-1.0)
+
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.check_deadline()
+        with pytest.raises(deadline.DeadlineExceeded):
+            deadline.timeout_for(10.0)
+
+    async def test_outbound_calls_forward_budget(self):
+        seen = {}
+
+        def handler(request):
+            seen["header"] = request.headers.get(deadline.DEADLINE_HEADER)
+            seen["timeout"] = request.extensions["timeout"]
+            return httpx.Response(200)
+
+        deadline.set_deadline(1.0)
+        async with httpx.AsyncClient(
+            transport=httpx.MockTransport(handler),
+            timeout=30.0,
+            event_hooks=deadline.deadline_event_hooks()
+        ) as client:
+            await client.get("http://emotion-analysis:8000/health")
+
+        assert 0 < int(seen["header"]) < 1000
+        assert all(value <= 1.0 for value in seen["timeout"].values())
+
+    async def test_with_deadline_cancels_slow_work(self):
+        deadline.set_deadline(0.05)
+
+        with pytest.raises(deadline.DeadlineExceeded):
+            await deadline.with_deadline(asyncio.sleep(5))
+
+    def test_queries_refused_after_deadline(self):
+        deadline.instrument_sqlalchemy_deadline()
+        engine = create_engine("sqlite://")
+
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+            deadline.set_deadline(-1.0)
+            with pytest.raises(deadline.DeadlineExceeded):
+                conn.execute(text("SELECT 1"))
+
+    def test_middleware_enforces_header(self):
+        app = FastAPI()
+        deadline.install_deadline(app, max_timeout=5.0)
+
+        @app.get("/slow")
+        async def slow():
+            await asyncio.sleep(1)
+            return {"ok": True}
+
+        @app.get("/budget")
+        async def budget():
+            return {"remaining": deadline.remaining()}
+
+        client = TestClient(app)
+
+        assert client.get("/slow", headers={deadline.DEADLINE_HEADER: "50"}).status_code == 504
+        assert client.get("/slow", headers={deadline.DEADLINE_HEADER: "0"}).status_code == 504
+        assert client.get("/budget").json()["remaining"] is None
+        assert client.get("/budget", headers={deadline.DEADLINE_HEADER: "60000"}).json()["remaining"] <= 5.0
+
+
+class TestServicePackaging:
+    """Every service honoring X-Deadline-Ms must ship src.deadline in its image"""
+
+    def test_services_found(self):
+        assert len(BACKEND_DIRS) >= 14
+
+    @pytest.mark.parametrize("service_dir", BACKEND_DIRS, ids=os.path.basename)
+    def test_deadline_import_is_unconditional(self, service_dir):
+        source = open(os.path.join(service_dir, "main.py"), encoding="utf-8").read()
+
+        assert re.search(r"^from src\.deadline import", source, re.MULTILINE)
+        assert "install_deadline(app" in source
+
+    @pytest.mark.parametrize("service_dir", BACKEND_DIRS, ids=os.path.basename)
+    def test_image_ships_and_checks_shared_modules(self, service_dir):
+        dockerfile = os.path.join(service_dir, "Dockerfile")
+        if not os.path.exists(dockerfile):
+            pytest.skip("service has no Dockerfile")
+        content = open(dockerfile, encoding="utf-8").read()
+
+        assert re.search(r"^COPY [^\n]*src/deadline\.py[^\n]* \./src/$", content, re.MULTILINE)
+        # Build-time import check: the image fails to build without the shared modules
+        check = re.search(r'^RUN python -c "import ([^"]+)"$', content, re.MULTILINE)
+        assert check
+        assert {"src.deadline", "src.metrics"} <= {name.strip() for name in check.group(1).split(",")}
+        assert content.index("src/deadline.py") < check.start()
@@ -0,0 +1,129 @@
+"""
+Tests for shared Prometheus instrumentation
+"""
+
+import glob
+import os
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from src import metrics
+
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+BACKEND_DIRS = sorted(
+    os.path.dirname(path)
+    for path in glob.glob(os.path.join(REPO_ROOT, "apps", "backend", "**", "main.py"), recursive=True)
+    if "from src.metrics import" in open(path, encoding="utf-8").read()
+)
+
+
+def _sample(name, labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetrics:
+    """Test cases for src.metrics"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        metrics.instrument_app(app)
+
+        @app.get("/baseline/{user_id}")
+        async def get_baseline(user_id: str):
+            return {"user_id": user_id}
+
+        return TestClient(app)
+
+    def test_request_latency_labelled_by_route_template(self, client):
+        labels = {"method": "GET", "route": "/baseline/{user_id}", "status": "200"}
+        before = _sample("http_request_duration_seconds_count", labels)
+
+        client.get("/baseline/abc")
+        client.get("/baseline/def")
+
+        assert _sample("http_request_duration_seconds_count", labels) == before + 2
+        assert _sample("http_requests_in_progress", {"method": "GET"}) == 0
+
+    def test_unmatched_paths_share_a_label(self, client):
+        labels = {"method": "GET", "route": "unmatched", "status": "404"}
+        before = _sample("http_request_duration_seconds_count", labels)
+
+        client.get("/wp-admin/setup.php")
+
+        assert _sample("http_request_duration_seconds_count", labels) == before + 1
+
+    def test_metrics_endpoint_exports(self, client):
+        client.get("/baseline/abc")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert "http_request_duration_seconds_bucket" in response.text
+
+    def test_db_queries_are_timed(self):
+        metrics.instrument_sqlalchemy()
+        before = _sample("db_query_duration_seconds_count", {"operation": "SELECT"})
+
+        engine = create_engine("sqlite:///:memory:")
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert _sample("db_query_duration_seconds_count", {"operation": "SELECT"}) == before + 1
+
+    def test_cache_and_inference_helpers(self):
+        hits = _sample("cache_requests_total", {"cache": "test_cache", "result": "hit"})
+        misses = _sample("cache_requests_total", {"cache": "test_cache", "result": "miss"})
+
+        metrics.record_cache_access("test_cache", True)
+        metrics.record_cache_access("test_cache", False)
+        with metrics.time_inference("test_model"):
+            pass
+
+        assert _sample("cache_requests_total", {"cache": "test_cache", "result": "hit"}) == hits + 1
+        assert _sample("cache_requests_total", {"cache": "test_cache", "result": "miss"}) == misses + 1
+        assert _sample("model_inference_duration_seconds_count", {"model": "test_model"}) >= 1
+
+    def test_upstream_outcomes(self):
+        class ReadTimeout(Exception):
+            pass
+
+        with pytest.raises(ReadTimeout):
+            with metrics.time_upstream("test_upstream"):
+                raise ReadTimeout()
+        with metrics.time_upstream("test_upstream"):
+            pass
+
+        assert _sample("upstream_request_duration_seconds_count", {"upstream": "test_upstream", "outcome": "timeout"}) == 1
+        assert _sample("upstream_request_duration_seconds_count", {"upstream": "test_upstream", "outcome": "ok"}) == 1
+
+
+class TestServicePackaging:
+    """Every instrumented service must ship src.metrics in its image"""
+
+    def test_services_found(self):
+        assert len(BACKEND_DIRS) >= 14
+
+    @pytest.mark.parametrize("service_dir", BACKEND_DIRS, ids=os.path.basename)
+    def test_metrics_import_is_unconditional(self, service_dir):
+        source = open(os.path.join(service_dir, "main.py"), encoding="utf-8").read()
+
+        assert re.search(r"^from src\.metrics import", source, re.MULTILINE)
+        assert "sys.path.append(_repo_root)" not in source
+
+    @pytest.mark.parametrize("service_dir", BACKEND_DIRS, ids=os.path.basename)
+    def test_image_ships_metrics(self, service_dir):
+        dockerfile = os.path.join(service_dir, "Dockerfile")
+        if not os.path.exists(dockerfile):
+            pytest.skip("service has no Dockerfile")
+        relative = os.path.relpath(service_dir, REPO_ROOT).replace(os.sep, "/")
+        content = open(dockerfile, encoding="utf-8").read()
+
+        assert re.search(r"^COPY [^\n]*src/metrics\.py[^\n]* \./src/$", content, re.MULTILINE)
+        assert f"COPY {relative}/ ." in content